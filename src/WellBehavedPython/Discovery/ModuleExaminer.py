@@ -17,8 +17,12 @@
 #    You should have received a copy of the GNU General Public License
 #    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
 
+import ast
 import importlib
+import importlib.util
 import builtins
+import inspect
+import sys
 from types import ModuleType
 import pkgutil
 
@@ -30,9 +34,14 @@ class ModuleExaminer:
 
         Inputs
         ------
-        moduleName : The name of the module to be examined. This will be imported immediately."""
+        moduleName : The name of the module to be examined. This will be imported immediately.
+
+        The names of the modules which were first imported while importing
+        it, apart from the module itself, are kept in newModules."""
         self.moduleName = moduleName
+        loaded = set(sys.modules)
         self.module = importlib.import_module(moduleName)
+        self.newModules = sorted(set(sys.modules) - loaded - set([moduleName]))
 
     def listAllClasses(self):
         """lists all the classes defined directly in the module.
@@ -60,6 +69,59 @@ class ModuleExaminer:
         
         return localClasses
 
+    def listImportedModules(self):
+        """lists the modules that this module uses, as found from its globals.
+
+        A module is counted if the module itself, or a class or function
+        defined in it, is bound to a global name in this module, as happens
+        with both import x and from x import y.
+
+        Returns
+        -------
+        A sorted list of the names of the modules used, not including this module."""
+        names = set()
+        for value in list(vars(self.module).values()):
+            if isinstance(value, ModuleType):
+                names.add(value.__name__)
+            elif isinstance(value, builtins.type) or callable(value):
+                moduleName = getattr(value, "__module__", None)
+                if isinstance(moduleName, str):
+                    names.add(moduleName)
+        names.discard(self.moduleName)
+        return sorted(names)
+
+    def listModulesInImportStatements(self):
+        """lists the modules named by the import statements in this module's
+        source, including those inside functions.
+
+        Unlike listImportedModules, this finds the module a value was
+        imported from even when the value is not a class or function, as
+        with from config import settings. For from x import y, both x and
+        x.y are counted if y is a module.
+
+        Returns
+        -------
+        A sorted list of the names of the loaded modules imported, not
+        including this module, or an empty list if the source cannot be read."""
+        try:
+            tree = ast.parse(inspect.getsource(self.module))
+        except (OSError, TypeError, SyntaxError):
+            return []
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                try:
+                    base = importlib.util.resolve_name("." * node.level + (node.module or ""),
+                                                       self.module.__package__)
+                except (ImportError, ValueError):
+                    continue
+                names.add(base)
+                names.update(base + "." + alias.name for alias in node.names)
+        names.discard(self.moduleName)
+        return sorted(name for name in names if name in sys.modules)
+
     def listAllModules(self):
         """lists all the modules defined directly in the package. 
         When constructed from a pakcage name find all the module children only.
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import sys
+import sysconfig
+
+def getDefaultRoots():
+    """Gets the directories on sys.path which do not hold the standard
+    library or installed packages, which are those of the project being
+    tested."""
+    installed = set(os.path.abspath(path) for name, path in sysconfig.get_paths().items()
+                    if name in ("stdlib", "platstdlib", "purelib", "platlib"))
+    roots = []
+    for path in sys.path:
+        path = os.path.abspath(path or os.curdir)
+        if (os.path.isdir(path) and path not in roots and
+            not any(path == other or path.startswith(other + os.sep) for other in installed)):
+            roots.append(path)
+    return roots
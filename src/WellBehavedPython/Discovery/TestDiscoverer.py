@@ -26,7 +26,18 @@ class TestDiscoverer:
     """Class used to find tests given a package.
     
     Uses ModuleExaminer to determine classes in modules, modules and subpackages in packages,
-    and traverses them to find classes derived from TestCase."""
+    and traverses them to find classes derived from TestCase.
+
+    If an ImportGraph is given, the modules imported by each module examined
+    are recorded in it."""
+
+    def __init__(self, importGraph = None):
+        """Constructor.
+
+        Inputs
+        ------
+        importGraph : The [ImportGraph] to record imports in, or None."""
+        self.importGraph = importGraph
 
     def buildSuiteFromModuleName(self, moduleName, suiteName = None, ignoreFilters=[]):
         """Builds a test suite given a module or package name.
@@ -44,6 +55,8 @@ class TestDiscoverer:
             suiteName = moduleName
 
         examiner = ModuleExaminer(moduleName) 
+        if self.importGraph is not None:
+            self.importGraph.recordTestModule(examiner)
 
         suite = TestSuite(suiteName)    
 
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+import inspect
+import threading
+
+_loops = threading.local()
+
+def getEventLoop():
+    """Gets the event loop that async tests on the current thread run on.
+
+    One loop is shared by every async test run on a thread, so that
+    resources created in one test remain usable in the next. Each thread
+    gets its own loop, because a loop can only run on one thread at a time."""
+    loop = getattr(_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _loops.loop = loop
+    return loop
+
+def runOnEventLoop(awaitable):
+    """Runs an awaitable to completion on the shared event loop.
+
+    Returns
+    -------
+    The result of the awaitable."""
+    return getEventLoop().run_until_complete(awaitable)
+
+def isAsyncCallable(method):
+    """Determines whether calling the method returns something to await."""
+    return inspect.iscoroutinefunction(method)
+
+async def callAsync(method):
+    """Calls the method, awaiting the result if it is a coroutine function."""
+    result = method()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
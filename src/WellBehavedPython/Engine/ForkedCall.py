@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from .TestRunningException import TestRunningException
+
+import gc
+import os
+import pickle
+import select
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+try:
+    import faulthandler
+except ImportError: # it cannot be loaded in subinterpreters
+    faulthandler = None
+
+class ForkedCallError(TestRunningException):
+    """Raised when a call made in a forked child does not return normally."""
+
+    def __init__(self, message, exitStatus = None):
+        TestRunningException.__init__(self, message)
+        self.exitStatus = exitStatus
+
+def canFork():
+    """Determines whether the platform supports forking the current process."""
+    return hasattr(os, "fork")
+
+killGracePeriod = 1.0
+
+def freezeSharedObjects():
+    """Moves the objects tracked by the garbage collector out of its reach,
+    ready to fork several children.
+
+    Collections in the children then never write to the objects which
+    already exist, so the memory pages holding them stay shared with this
+    process instead of being copied into every child.
+
+    Returns
+    -------
+    True if the objects were frozen, in which case gc.unfreeze should be
+    called once the children are done. False if the platform cannot freeze
+    the collector, or if something else already has, as a warm worker's
+    template does, since unfreezing would also release its objects."""
+    if not hasattr(gc, "freeze") or gc.get_freeze_count() > 0:
+        return False
+    gc.freeze()
+    return True
+
+def callInFork(function, timeout = None):
+    """Calls the function in a forked child of this process.
+
+    The child starts as a copy of this process, so anything the function
+    changes, such as module level state, is thrown away when the child
+    exits. The function's return value is pickled and sent back through a
+    pipe.
+
+    If a timeout is given and the call takes longer, faulthandler dumps the
+    stacks of the child's threads and the child exits. If it has still not
+    exited killGracePeriod seconds later, it is killed.
+
+    Inputs
+    ------
+    function : A callable taking no arguments, returning a picklable value.
+    timeout : [float] The number of seconds the call may take, or None to
+        wait for as long as it takes.
+
+    Returns
+    -------
+    The value returned by the function in the child.
+
+    Raises
+    ------
+    ForkedCallError if the function raised an exception, the child
+    died before sending back a result, or the call timed out."""
+    if timeout is None:
+        return _callInFork(function, None, None)
+    with tempfile.TemporaryFile("w+") as stackFile:
+        try:
+            return _callInFork(function, timeout, stackFile)
+        except ForkedCallError as ex:
+            stackFile.seek(0)
+            stacks = stackFile.read()
+            if len(stacks) == 0:
+                raise
+            raise ForkedCallError("Forked call timed out after {}s\n{}".format(timeout, stacks),
+                                  ex.exitStatus)
+
+def startInFork(function):
+    """Starts calling the function in a forked child of this process,
+    without waiting for it to finish.
+
+    Several calls can be started this way and then waited for, so that
+    they run at the same time.
+
+    Inputs
+    ------
+    function : A callable taking no arguments, returning a picklable value.
+
+    Returns
+    -------
+    A callable taking no arguments, which waits for the child and returns
+    the value returned by the function. It raises ForkedCallError in the
+    same circumstances as callInFork."""
+    readFd, writeFd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(readFd)
+        _runChild(function, writeFd)
+
+    os.close(writeFd)
+    def wait():
+        with os.fdopen(readFd, "rb") as pipe:
+            data = pipe.read()
+        waitedPid, status = os.waitpid(pid, 0)
+        return _unpackResult(data, status)
+    return wait
+
+def describeExitStatus(status):
+    """Describes the wait status of a child process in words."""
+    if os.WIFSIGNALED(status):
+        number = os.WTERMSIG(status)
+        try:
+            name = signal.Signals(number).name
+        except ValueError:
+            name = str(number)
+        return "killed by signal {}".format(name)
+    return "exited with status {}".format(os.WEXITSTATUS(status))
+
+def describeExitCode(exitCode):
+    """Describes the exit code of a multiprocessing.Process in words."""
+    if exitCode is not None and exitCode < 0:
+        try:
+            name = signal.Signals(-exitCode).name
+        except ValueError:
+            name = str(-exitCode)
+        return "killed by signal {}".format(name)
+    return "exited with status {}".format(exitCode)
+
+def _callInFork(function, timeout, stackFile):
+    if timeout is None:
+        return startInFork(function)()
+
+    readFd, writeFd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(readFd)
+        if faulthandler is not None:
+            faulthandler.dump_traceback_later(timeout, exit = True, file = stackFile)
+        _runChild(function, writeFd)
+
+    os.close(writeFd)
+    data = _readUntil(readFd, time.monotonic() + timeout + killGracePeriod, pid)
+    pid, status = os.waitpid(pid, 0)
+    return _unpackResult(data, status)
+
+def _readUntil(readFd, deadline, pid):
+    """Reads the pipe to the end, killing the child if the deadline passes first."""
+    chunks = []
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            readable, writable, failed = select.select([readFd], [], [], max(remaining, 0))
+            if len(readable) == 0:
+                os.kill(pid, signal.SIGKILL)
+                return b""
+            chunk = os.read(readFd, 65536)
+            if len(chunk) == 0:
+                return b"".join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(readFd)
+
+def _runChild(function, writeFd):
+    """Runs the function in the child and never returns."""
+    try:
+        try:
+            data = pickle.dumps((True, function()))
+        except BaseException:
+            data = pickle.dumps((False, traceback.format_exc()))
+        if faulthandler is not None:
+            faulthandler.cancel_dump_traceback_later()
+        with os.fdopen(writeFd, "wb") as pipe:
+            pipe.write(data)
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+    finally:
+        os._exit(0)
+
+def _unpackResult(data, status):
+    if len(data) > 0:
+        succeeded, value = pickle.loads(data)
+        if succeeded:
+            return value
+        raise ForkedCallError("Forked call raised an exception:\n{}".format(value), status)
+    raise ForkedCallError("Forked child {} before returning a result".format(
+            describeExitStatus(status)), status)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+import builtins
+import importlib
+import importlib.util
+import sys
+import threading
+
+class ImportRecorder:
+    """Records the modules imported while it is active.
+
+    Used as a context manager. The modules loaded for the first time are
+    found from the modules which appear in sys.modules, and while any
+    recorder is active, the import statement and importlib.import_module
+    are wrapped, so modules which were already loaded are recorded when
+    they are imported again. Imports on every thread are recorded, since
+    tests can run on threads other than the one which started them.
+
+    Imports through a reference to importlib.import_module taken before
+    the recorder was entered are only seen if they load the module for the
+    first time."""
+
+    _lock = threading.Lock()
+    _active = []
+    _originalImport = None
+    _originalImportModule = None
+
+    def __init__(self):
+        """Constructor."""
+        self.modules = set()
+        self._loadedBefore = set()
+
+    def __enter__(self):
+        self._loadedBefore = set(sys.modules)
+        with ImportRecorder._lock:
+            if len(ImportRecorder._active) == 0:
+                ImportRecorder._install()
+            ImportRecorder._active.append(self)
+        return self
+
+    def __exit__(self, exceptionType, exception, traceback):
+        with ImportRecorder._lock:
+            ImportRecorder._active.remove(self)
+            if len(ImportRecorder._active) == 0:
+                ImportRecorder._uninstall()
+        self.modules.update(set(sys.modules) - self._loadedBefore)
+        return False
+
+    def listModules(self):
+        """Lists the names of the modules imported while the recorder was active, sorted."""
+        return sorted(self.modules)
+
+    @staticmethod
+    def _install():
+        ImportRecorder._originalImport = builtins.__import__
+        ImportRecorder._originalImportModule = importlib.import_module
+        builtins.__import__ = ImportRecorder._recordingImport
+        importlib.import_module = ImportRecorder._recordingImportModule
+
+    @staticmethod
+    def _uninstall():
+        builtins.__import__ = ImportRecorder._originalImport
+        importlib.import_module = ImportRecorder._originalImportModule
+
+    @staticmethod
+    def _recordingImport(name, globals = None, locals = None, fromlist = (), level = 0):
+        module = ImportRecorder._originalImport(name, globals, locals, fromlist, level)
+        if level > 0:
+            package = (globals or {}).get("__package__")
+            try:
+                name = importlib.util.resolve_name("." * level + name, package)
+            except (ImportError, ValueError):
+                return module
+        names = [name]
+        for item in fromlist or ():
+            # from package import submodule imports the submodule too
+            if "{}.{}".format(name, item) in sys.modules:
+                names.append("{}.{}".format(name, item))
+        ImportRecorder._record(names)
+        return module
+
+    @staticmethod
+    def _recordingImportModule(name, package = None):
+        module = ImportRecorder._originalImportModule(name, package)
+        ImportRecorder._record([module.__name__])
+        return module
+
+    @staticmethod
+    def _record(names):
+        for recorder in list(ImportRecorder._active):
+            recorder.modules.update(names)
@@ -22,13 +22,77 @@ import re
 from .TestResults import TestResults
 from .TestSuite import TestSuite
 from .TestComponent import TestComponent
+from .EventLoop import *
+from .ForkedCall import *
+from .TestEventRecorder import TestEventRecorder
+from .Watchdog import *
+
+import time
 
 class TestCase(TestComponent):
     """Base class for TestCases. 
 
     At the moment, all test methods have to be in classes derived from
     TestCase. There may be a more convenient method based on decorators
-    implemented in the future."""
+    implemented in the future.
+
+    Test methods, before and after may be written as async def
+    coroutines, in which case they are run on a shared event loop.
+    By default async tests run one after another; set asyncConcurrency
+    in a derived class to let up to that many of the class's async
+    tests run at once. None lets them all run at once.
+
+    Tests which change module level state can be isolated from the
+    tests which run after them by setting isolation in a derived class.
+    "test" runs each test in a forked child of the test process, and
+    "class" runs the whole class, including beforeClass and afterClass,
+    in one forked child. Results are sent back to the parent process.
+    With "test", beforeClass runs once in the parent, so every test starts
+    from the state it set up, however much the tests before it changed
+    their copies. The fixtures are shared with the children rather than
+    copied into them. Isolation is ignored on platforms which cannot fork.
+
+    Hung tests can be stopped by setting timeout in a derived class, or by
+    decorating a test method with WellBehavedPython.api.timeout. A test
+    which takes longer than that many seconds is registered as an error,
+    with the stacks of all threads in its stack trace. Setting classTimeout
+    limits the time taken by the whole class; once it has passed, the tests
+    which have not started are registered as errors. Isolated tests which
+    time out have their process killed, other tests are abandoned on the
+    thread they were running on.
+
+    Classes which need exclusive use of something, such as a fixed port,
+    can say so by setting resources to a list of token names, or to a
+    dictionary from token names to weights. Parallel executors do not run
+    classes at the same time if that would take the total weight of a token
+    over its limit, which is 1 unless the executor is told otherwise.
+
+    Classes whose tests share nothing that they change, apart from what
+    beforeClass sets up, can have their tests run in parallel by setting
+    parallelMethods to "thread" or "process". beforeClass runs first, then
+    the tests are shared between methodWorkers threads or forked processes
+    (one per cpu if methodWorkers is None), then afterClass runs. Results
+    are registered in the usual order, under the class suite. "process" is
+    ignored on platforms which cannot fork.
+
+    Classes whose tests start processes of their own, such as with
+    multiprocessing or subprocess, should set usesProcesses, so that
+    ThreadPoolTestExecutor does not start them while other threads are
+    running tests, which can leave the new processes deadlocked.
+
+    Tests which a ResultCache has marked as cached, because they passed
+    last time with the same inputs, are registered as cached passes
+    without being run."""
+
+    asyncConcurrency = 1
+    isolation = None
+    timeout = None
+    classTimeout = None
+    classDeadline = None
+    resources = None
+    parallelMethods = None
+    methodWorkers = None
+    usesProcesses = False
     
     def __init__(self):
         """Creates an instance of this test class configured
@@ -42,6 +106,7 @@ class TestCase(TestComponent):
         self.testMethod = lambda results: None
         self.testMethodName = '<TestUnset>'
         self.ignore = True
+        self.cached = False
 
     def configureTest(self, testMethodName):
         self.testMethod = getattr(self, testMethodName)
@@ -76,6 +141,38 @@ class TestCase(TestComponent):
         if self.ignore:
             results.registerTestIgnored(suiteName, self.testMethodName)
             return
+        if self.cached:
+            results.registerTestCached(suiteName, self.testMethodName)
+            return
+        timeout = self.getTimeout()
+        if self.isolation == "test" and canFork():
+            self._runTestInFork(results, timeout)
+        else:
+            self._runTest(results, timeout)
+
+    def getTimeout(self):
+        """Gets the number of seconds the test may take to run.
+
+        Returns
+        -------
+        The smaller of the test's own timeout and the time left before the
+        class times out, or None if neither is set."""
+        timeout = getattr(self.testMethod, "timeout", self.timeout)
+        if self.classDeadline is not None:
+            remaining = max(self.classDeadline - time.monotonic(), 0)
+            if timeout is None or remaining < timeout:
+                timeout = remaining
+        return timeout
+
+    def _runTest(self, results, timeout = None):
+        """Runs before, the test method and after, registering the outcome."""
+        suiteName = ""
+        if self.isAsync():
+            runOnEventLoop(self._runAsyncTest(results, timeout))
+            return
+        if timeout is not None:
+            self._runTestWithWatchdog(results, Watchdog(timeout))
+            return
         self.before()
         try:
             self.testMethod()
@@ -89,6 +186,81 @@ class TestCase(TestComponent):
         finally:
             self.after()
 
+    def _runTestWithWatchdog(self, results, watchdog):
+        suiteName = ""
+        try:
+            watchdog.call(self._callTest)
+            results.registerTestPassed(suiteName, self.testMethodName)
+        except AssertionError as ex:
+            stackTrace = self.getStackTrace(ex)
+            results.registerTestFailed(suiteName, self.testMethodName, stackTrace)
+        except Exception as ex:
+            stackTrace = self.getStackTrace(ex)
+            results.registerTestError(suiteName, self.testMethodName, stackTrace)
+
+    def _callTest(self):
+        self.before()
+        try:
+            self.testMethod()
+        finally:
+            self.after()
+
+    def _runTestInFork(self, results, timeout = None):
+        # the child is killed if it runs out of time, so the test is
+        # run without a watchdog inside it
+        try:
+            recorder = callInFork(lambda: TestEventRecorder().recordCall(self._runTest), timeout)
+        except ForkedCallError as ex:
+            results.registerTestError("", self.testMethodName, [ex.args[0] + "\n"])
+            return
+        recorder.replay(results)
+
+    async def runAsync(self, results):
+        """Coroutine version of run, for use from within a running event loop.
+
+        Inputs
+        ------
+        results : Expected to be an instance of TestResults. Runs
+                  the test and calls methods on TestResults to indicate
+                  the results of the test."""
+        suiteName = ""
+        try:
+            results.registerTestStarted(suiteName, self.testMethodName)
+        except Exception as ex:
+            return
+
+        if self.ignore:
+            results.registerTestIgnored(suiteName, self.testMethodName)
+            return
+        if self.cached:
+            results.registerTestCached(suiteName, self.testMethodName)
+            return
+        await self._runAsyncTest(results, self.getTimeout())
+
+    async def _runAsyncTest(self, results, timeout = None):
+        suiteName = ""
+        await callAsync(self.before)
+        try:
+            if timeout is None:
+                await callAsync(self.testMethod)
+            else:
+                await Watchdog(timeout).callAsync(callAsync(self.testMethod))
+            results.registerTestPassed(suiteName, self.testMethodName)
+        except AssertionError as ex:
+            stackTrace = self.getStackTrace(ex)
+            results.registerTestFailed(suiteName, self.testMethodName, stackTrace)
+        except Exception as ex:
+            stackTrace = self.getStackTrace(ex)
+            results.registerTestError(suiteName, self.testMethodName, stackTrace)
+        finally:
+            await callAsync(self.after)
+
+    def isAsync(self):
+        """Determines whether any of the test method, before or after are coroutines."""
+        return (isAsyncCallable(self.testMethod) or
+                isAsyncCallable(self.before) or
+                isAsyncCallable(self.after))
+
     def handleError(self, error, errorType):
         """Handles the case of an error in running a test.
 
@@ -167,6 +339,23 @@ class TestCase(TestComponent):
 
         return suite
 
+    def getTestIdentifier(self):
+        """Gets a name for the configured test which is unique across modules.
+
+        Returns
+        -------
+        The module, class and test method names, separated by dots."""
+        return "{}.{}".format(self.getTestClassIdentifier(), self.testMethodName)
+
+    @classmethod
+    def getTestClassIdentifier(klass):
+        """Gets a name for the test case class which is unique across modules.
+
+        Returns
+        -------
+        The module and qualified class names, separated by a dot."""
+        return "{}.{}".format(klass.__module__, klass.__qualname__)
+
     @staticmethod
     def getUnqualifiedClassName(klass):        
         pattern = "\\.([^'\\.]*)'"
@@ -27,8 +27,17 @@ class TestComponent:
         if len(exception.args) > 0:
             stackTrace = [exception.args[0] + "\n"]
         else:
-            stackTrace = [""]
+            # exceptions such as MemoryError are raised without a message
+            stackTrace = [type(exception).__name__ + "\n"]
         stackTrace.extend(traceback.format_list(stackInfo))
         return stackTrace
 
+    def isRunStopping(self, results):
+        """Determines whether results has asked for no more tests to be started.
 
+        Inputs
+        ------
+        results : The object test events are being registered with. Objects
+            without a shouldStop method never stop the run."""
+        shouldStop = getattr(results, "shouldStop", None)
+        return shouldStop is not None and shouldStop()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from .TestResults import TestResults
+from .ThreadLocalStream import ThreadLocalStream
+
+from datetime import datetime
+import io
+import sys
+
+class TestEventRecorder:
+    """Records the events raised by running tests, so they can be replayed later.
+
+    A TestEventRecorder can be passed to the run method of any test or suite in
+    place of a TestResults object. Every register call is stored along with the
+    time it happened, together with anything the tests wrote to stdout and stderr.
+    The recorder only holds strings and times, so it can be pickled and sent
+    between processes.
+
+    Recorders filled in by worker processes also hold the peak memory the
+    worker used while running, in bytes, or None where it was not measured."""
+
+    def __init__(self, maxFailures = None):
+        """Constructor.
+
+        Inputs
+        ------
+        maxFailures : [int] The number of recorded failures and errors after
+            which tests should stop being started, or None to run every test."""
+        self.events = []
+        self.output = ""
+        self.maxFailures = maxFailures
+        self.peakMemory = None
+
+    def record(self, test):
+        """Runs the test, recording its events and output.
+
+        Inputs
+        ------
+        test : The test or suite to run.
+
+        Returns
+        -------
+        This recorder."""
+        return self.recordCall(test.run)
+
+    def recordCall(self, function):
+        """Calls the function with this recorder, recording the output.
+
+        If sys.stdout and sys.stderr are ThreadLocalStreams, only the output
+        written on this thread is captured, so several recorders can record
+        at once on different threads. Otherwise the streams are replaced for
+        the duration of the call.
+
+        Inputs
+        ------
+        function : A callable taking the object to register test events with.
+
+        Returns
+        -------
+        This recorder."""
+        buffer = io.StringIO()
+        stdout = sys.stdout
+        stderr = sys.stderr
+        if isinstance(stdout, ThreadLocalStream) and isinstance(stderr, ThreadLocalStream):
+            oldStdout = stdout.redirect(buffer)
+            oldStderr = stderr.redirect(buffer)
+            try:
+                function(self)
+            finally:
+                stdout.redirect(oldStdout)
+                stderr.redirect(oldStderr)
+        else:
+            sys.stdout = buffer
+            sys.stderr = buffer
+            try:
+                function(self)
+            finally:
+                sys.stdout = stdout
+                sys.stderr = stderr
+        self.output += buffer.getvalue()
+        return self
+
+    async def recordAsync(self, test):
+        """Runs an async test on the running event loop, recording its events.
+
+        Output is only captured if sys.stdout and sys.stderr are
+        ThreadLocalStreams, since other tasks on the same thread may be
+        writing at the same time. Otherwise it is written as normal.
+
+        Inputs
+        ------
+        test : The TestCase to run.
+
+        Returns
+        -------
+        This recorder."""
+        stdout = sys.stdout
+        stderr = sys.stderr
+        if not (isinstance(stdout, ThreadLocalStream) and isinstance(stderr, ThreadLocalStream)):
+            await test.runAsync(self)
+            return self
+
+        buffer = io.StringIO()
+        oldStdout = stdout.redirect(buffer)
+        oldStderr = stderr.redirect(buffer)
+        try:
+            await test.runAsync(self)
+        finally:
+            stdout.redirect(oldStdout)
+            stderr.redirect(oldStderr)
+        self.output += buffer.getvalue()
+        return self
+
+    def replay(self, results):
+        """Replays the recorded events into a results object.
+
+        Events are replayed in the order they were recorded, with the times
+        they were originally recorded at. Any recorded output is written to
+        sys.stdout afterwards.
+
+        Inputs
+        ------
+        results : The object to replay events into. This will usually be a
+                  TestResults or a test runner."""
+        try:
+            for eventName, arguments, time in self.events:
+                TestResults.overrideTime(time)
+                getattr(results, eventName)(*arguments)
+        finally:
+            TestResults.overrideTime(None)
+        if len(self.output) > 0:
+            sys.stdout.write(self.output)
+
+    def countFailures(self):
+        """Counts the failures and errors recorded so far."""
+        count = 0
+        for eventName, arguments, time in self.events:
+            if eventName == "registerTestFailed":
+                count += 1
+            elif eventName == "registerTestError":
+                count += arguments[3]
+        return count
+
+    def shouldStop(self):
+        """Determines whether the recorded failures have reached maxFailures."""
+        return self.maxFailures is not None and self.countFailures() >= self.maxFailures
+
+    def toDict(self):
+        """Converts the recorder to a dictionary of plain values, for sending as JSON."""
+        return { "events" : [self.eventToDict(event) for event in self.events],
+                 "output" : self.output }
+
+    @staticmethod
+    def fromDict(values):
+        """Creates a recorder from a dictionary created by toDict."""
+        recorder = TestEventRecorder()
+        recorder.events = [TestEventRecorder.eventFromDict(event) for event in values["events"]]
+        recorder.output = values["output"]
+        return recorder
+
+    @staticmethod
+    def eventToDict(event):
+        """Converts a recorded event to a dictionary of plain values, for sending as JSON."""
+        eventName, arguments, time = event
+        return { "name" : eventName,
+                 "arguments" : list(arguments),
+                 "time" : time.timestamp() }
+
+    @staticmethod
+    def eventFromDict(values):
+        """Converts a dictionary created by eventToDict back to an event."""
+        return (values["name"],
+                tuple(values["arguments"]),
+                datetime.fromtimestamp(values["time"]))
+
+    def registerSuiteStarted(self, suiteName):
+        self._record("registerSuiteStarted", suiteName)
+        return self
+
+    def registerSuiteCompleted(self, suiteName):
+        self._record("registerSuiteCompleted", suiteName)
+
+    def registerTestStarted(self, suiteName, testName):
+        self._record("registerTestStarted", suiteName, testName)
+
+    def registerTestPassed(self, suiteName, testName):
+        self._record("registerTestPassed", suiteName, testName)
+
+    def registerTestFailed(self, suiteName, testName, stackTrace):
+        self._record("registerTestFailed", suiteName, testName, list(stackTrace))
+
+    def registerTestError(self, suiteName, testName, stackTrace, numErrors = 1):
+        self._record("registerTestError", suiteName, testName, list(stackTrace), numErrors)
+
+    def registerTestCached(self, suiteName, testName):
+        self._record("registerTestCached", suiteName, testName)
+
+    def registerTestIgnored(self, suiteName, testName):
+        self._record("registerTestIgnored", suiteName, testName)
+
+    def registerModulesUsed(self, suiteName, moduleNames):
+        self._record("registerModulesUsed", suiteName, list(moduleNames))
+
+    def _record(self, eventName, *arguments):
+        self.events.append((eventName, arguments, TestResults.now()))
@@ -19,6 +19,7 @@
 
 
 from datetime import *
+import threading
 import traceback
 
 class TestResults:
@@ -27,48 +28,115 @@ class TestResults:
     A test run may be an individual test, or the results of runinng
     multiple tests through a suite."""
 
-    def __init__(self, name = "<anonymous>"):
-        """Constructor."""
+    _timeOverride = threading.local()
+
+    def __init__(self, name = "<anonymous>", maxFailures = None):
+        """Constructor.
+
+        Inputs
+        ------
+        name : The name of the test or suite the results are for.
+        maxFailures : [int] The number of failures and errors after which
+            the run should stop, or None to run every test."""
         self.name = name
+        self.maxFailures = maxFailures
+        self._registeredFailures = 0
         self._testCount = 0
         self._failCount = 0
         self._passCount = 0
         self._errorCount = 0
         self._ignoredCount = 0
+        self._cachedCount = 0
+        self._flakyCount = 0
         self.stackTraces = []
+        self.modulesUsed = []
         self.suiteResults = []
-        self.suiteStack = []
-        self.activeResults = self
+        self._lock = threading.RLock()
+        self._threadState = threading.local()
         self.startTime = None
         self.endTime = None
 
+    @property
+    def activeResults(self):
+        """The results that events on the current thread are registered against.
+
+        Each thread keeps its own stack of active results, starting from these
+        results, so that tests on different threads can register concurrently."""
+        return self._getThreadState().activeResults
+
+    @property
+    def suiteStack(self):
+        return self._getThreadState().suiteStack
+
     def registerSuiteStarted(self, suiteName):
-        self._pushActiveResults(suiteName)
-        return self.activeResults
+        with self._lock:
+            self._pushActiveResults(suiteName)
+            return self.activeResults
 
     def registerSuiteCompleted(self, suiteName):
-        self._popActiveResults()        
+        with self._lock:
+            self._popActiveResults()
 
     def registerTestStarted(self, suiteName, testName):
-        self._pushActiveResults(testName)
-        return self.activeResults._registerTestStarted(suiteName, testName)
+        with self._lock:
+            self._pushActiveResults(testName)
+            return self.activeResults._registerTestStarted(suiteName, testName)
 
     def registerTestPassed(self, suiteName, testName):
-        self.activeResults._registerTestPassed(suiteName, testName)
-        self._popActiveResults()
+        with self._lock:
+            self.activeResults._registerTestPassed(suiteName, testName)
+            self._popActiveResults()
 
     def registerTestFailed(self, suiteName, testName, stackTrace):
-        self.activeResults._registerTestFailed(suiteName, testName, stackTrace)
-        self._popActiveResults()
+        with self._lock:
+            self.activeResults._registerTestFailed(suiteName, testName, stackTrace)
+            self._registeredFailures += 1
+            self._popActiveResults()
 
     def registerTestError(self, suiteName, testName, stackTrace, numErrors = 1):
-        self.activeResults._registerTestError(suiteName, testName, stackTrace, numErrors)
-        if testName not in ("beforeClass", "afterClass"):
+        with self._lock:
+            self.activeResults._registerTestError(suiteName, testName, stackTrace, numErrors)
+            self._registeredFailures += numErrors
+            if testName not in ("beforeClass", "afterClass"):
+                self._popActiveResults()
+
+    def registerTestCached(self, suiteName, testName):
+        """Registers a test which was not run, because it passed last time
+        it ran with the same inputs. It counts as a pass."""
+        with self._lock:
+            self.activeResults._registerTestCached(suiteName, testName)
             self._popActiveResults()
 
     def registerTestIgnored(self, suiteName, testName):
-        self.activeResults._registerTestIgnored(suiteName, testName)
-        self._popActiveResults()
+        with self._lock:
+            self.activeResults._registerTestIgnored(suiteName, testName)
+            self._popActiveResults()
+
+    def registerModulesUsed(self, suiteName, moduleNames):
+        """Registers the modules a class suite imported while it ran, which
+        a ResultCache counts among the inputs of its tests."""
+        with self._lock:
+            self.activeResults.modulesUsed.extend(moduleNames)
+
+    def markFlaky(self):
+        """Marks the results of a test which failed, or had an error, but
+        passed when it was run again. It then counts as a pass, and the
+        stack traces of its failure are dropped."""
+        with self._lock:
+            self._passCount += 1
+            self._failCount = 0
+            self._errorCount = 0
+            self._flakyCount = 1
+            self.stackTraces = []
+
+    def shouldStop(self):
+        """Determines whether enough tests have failed that no more should be started.
+
+        Tests check this before they start, so a run stops cooperatively:
+        tests which are already running carry on, and afterClass still runs
+        for any class whose tests were started."""
+        return (self.maxFailures is not None and
+                self._registeredFailures >= self.maxFailures)
 
     def countTests(self):
         total = self._testCount
@@ -100,6 +168,26 @@ class TestResults:
             total += results.countIgnored()
         return total
 
+    def countCached(self):
+        """Counts the passes which were cached rather than run."""
+        total = self._cachedCount
+        for results in self.suiteResults:
+            total += results.countCached()
+        return total
+
+    def countFlaky(self):
+        """Counts the passes of tests which failed before passing when run again."""
+        total = self._flakyCount
+        for results in self.suiteResults:
+            total += results.countFlaky()
+        return total
+
+    def hasOwnErrors(self):
+        """Determines whether errors were registered against these results
+        themselves, rather than the results of a test within them, as
+        errors in beforeClass and afterClass are."""
+        return self.activeResults._errorCount > 0
+
     def getStateDescription(self):
         return self.activeResults._getStateDescription()
 
@@ -107,6 +195,8 @@ class TestResults:
         result = "passed"
         if self.countIgnored() > 0:
             result = "ignored"
+        if self.countFlaky() > 0:
+            result = "flaky"
         if self.countFailures() > 0:
             result = "failed"
         if self.countErrors() > 0:
@@ -149,7 +239,8 @@ class TestResults:
         return self.activeResults._getDuration()
 
     def _getDuration(self):
-        if self.endTime is None and self.startTime is None:
+        if self.endTime is None or self.startTime is None:
+            # errors in beforeClass and afterClass finish without starting
             totalDuration = timedelta()
         else:
             totalDuration = self.endTime - self.startTime #timedelta()
@@ -157,6 +248,92 @@ class TestResults:
             totalDuration += suite.getDuration()
         return totalDuration
 
+    def merge(self, other):
+        """Adds the results in other into these results.
+
+        Child results with the same name which both hold the results of
+        suites are merged together, so that the results of running parts
+        of a suite separately, such as in shards, combine into the tree
+        that running the whole suite would have given.
+
+        Inputs
+        ------
+        other : The [TestResults] to merge in. These should not be used afterwards."""
+        with self._lock:
+            self._testCount += other._testCount
+            self._passCount += other._passCount
+            self._failCount += other._failCount
+            self._errorCount += other._errorCount
+            self._ignoredCount += other._ignoredCount
+            self._cachedCount += other._cachedCount
+            self._flakyCount += other._flakyCount
+            self.stackTraces.extend(other.stackTraces)
+            self.modulesUsed.extend(other.modulesUsed)
+            for otherChild in other.suiteResults:
+                child = self._findSuiteResults(otherChild.name)
+                if child is None or len(otherChild.suiteResults) == 0:
+                    self.suiteResults.append(otherChild)
+                else:
+                    child.merge(otherChild)
+
+    def toDict(self):
+        """Converts the results to a dictionary of plain values, for saving as JSON."""
+        return { "name" : self.name,
+                 "tests" : self._testCount,
+                 "passes" : self._passCount,
+                 "failures" : self._failCount,
+                 "errors" : self._errorCount,
+                 "ignored" : self._ignoredCount,
+                 "cached" : self._cachedCount,
+                 "flaky" : self._flakyCount,
+                 "stackTraces" : self.stackTraces,
+                 "modulesUsed" : self.modulesUsed,
+                 "startTime" : self._timeToValue(self.startTime),
+                 "endTime" : self._timeToValue(self.endTime),
+                 "children" : [child.toDict() for child in self.suiteResults] }
+
+    @staticmethod
+    def fromDict(values):
+        """Creates results from a dictionary created by toDict."""
+        results = TestResults(values["name"])
+        results._testCount = values["tests"]
+        results._passCount = values["passes"]
+        results._failCount = values["failures"]
+        results._errorCount = values["errors"]
+        results._ignoredCount = values["ignored"]
+        results._cachedCount = values.get("cached", 0)
+        results._flakyCount = values.get("flaky", 0)
+        results.stackTraces = list(values["stackTraces"])
+        results.modulesUsed = list(values.get("modulesUsed", []))
+        results.startTime = TestResults._valueToTime(values["startTime"])
+        results.endTime = TestResults._valueToTime(values["endTime"])
+        results.suiteResults = [TestResults.fromDict(child) for child in values["children"]]
+        return results
+
+    @staticmethod
+    def now():
+        """Gets the time to record against a test event.
+
+        This is normally the current time, unless an override has been
+        set on this thread with overrideTime."""
+        time = getattr(TestResults._timeOverride, "time", None)
+        if time is None:
+            time = datetime.now()
+        return time
+
+    @staticmethod
+    def overrideTime(time):
+        """Sets the time recorded against test events on this thread.
+
+        This is used when replaying events that were recorded elsewhere,
+        so that the durations reflect when the tests actually ran.
+
+        Inputs
+        ------
+        time : The [datetime] to use, or None to go back to using the
+               current time."""
+        TestResults._timeOverride.time = time
+
     def pluralise(self, count, pluraliseFlag = True):        
         if (count != 1 and pluraliseFlag):
             plural = "s"
@@ -165,20 +342,47 @@ class TestResults:
         
         return plural
         
+    def _findSuiteResults(self, name):
+        for child in self.suiteResults:
+            if child.name == name and len(child.suiteResults) > 0:
+                return child
+        return None
+
+    @staticmethod
+    def _timeToValue(time):
+        if time is None:
+            return None
+        return time.timestamp()
+
+    @staticmethod
+    def _valueToTime(value):
+        if value is None:
+            return None
+        return datetime.fromtimestamp(value)
+
+    def _getThreadState(self):
+        state = self._threadState
+        if not hasattr(state, "activeResults"):
+            state.activeResults = self
+            state.suiteStack = []
+        return state
+
     def _pushActiveResults(self, name):
-        self.suiteStack.append(self.activeResults)
+        state = self._getThreadState()
+        state.suiteStack.append(state.activeResults)
         results = TestResults(name);
-        self.activeResults.suiteResults.append(results)
-        self.activeResults = results
+        state.activeResults.suiteResults.append(results)
+        state.activeResults = results
 
     def _popActiveResults(self):
-        self.activeResults = self.suiteStack.pop()
+        state = self._getThreadState()
+        state.activeResults = state.suiteStack.pop()
 
     def _registerTestStarted(self, suiteName, testName):
         """Register the fact that a test started running."""
         
         self._testCount += 1
-        self.startTime = datetime.now()
+        self.startTime = TestResults.now()
         return self
 
     def _registerTestPassed(self, suiteName, testName):
@@ -192,6 +396,12 @@ class TestResults:
         self._failCount += 1
         self._registerTestFinished(suiteName, testName)
 
+    def _registerTestCached(self, suiteName, testName):
+        """Register the fact that a test passed last time, and was not run."""
+        self._passCount += 1
+        self._cachedCount += 1
+        self._registerTestFinished(suiteName, testName)
+
     def _registerTestIgnored(self, suiteName, testName):
         """Register the fact that a test was ignored."""
         self._ignoredCount += 1
@@ -208,7 +418,7 @@ class TestResults:
         self._registerTestFinished(suiteName, testName)
 
     def _registerTestFinished(self, suiteName, testName):
-        self.endTime = datetime.now()
+        self.endTime = TestResults.now()
 
     def __repr__(self):
         return """TestResults : {}
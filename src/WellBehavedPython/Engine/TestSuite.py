@@ -19,6 +19,20 @@
 
 from .TestRunningException import *
 from .TestComponent import *
+from .TestEventRecorder import TestEventRecorder
+from .EventLoop import runOnEventLoop
+from .ForkedCall import *
+from .ImportRecorder import ImportRecorder
+from .Watchdog import Watchdog
+
+from .ThreadLocalStream import ThreadLocalStream
+
+import asyncio
+import concurrent.futures
+import gc
+import os
+import sys
+import time
 
 class TestSuite(TestComponent):
     """Class for containing multiple tests.
@@ -60,16 +74,154 @@ class TestSuite(TestComponent):
                 length = newLength
         return length
 
+    def isClassSuite(self):
+        """Determines whether this suite directly contains the tests of a
+        single test case class, as built by TestCase.suite()."""
+        return (self.testClass is not None and
+                not issubclass(self.testClass, TestSuite))
+
+    def listClassSuites(self):
+        """Lists the class suites within this suite, in the order they run.
+
+        Returns
+        -------
+        A list of the [TestSuite] objects which directly contain tests. If this
+        suite is itself a class suite, the list contains only this suite."""
+        if self.isClassSuite():
+            return [self]
+        classSuites = []
+        for test in self.tests:
+            classSuites.extend(test.listClassSuites())
+        return classSuites
+
+    def listTestModules(self):
+        """Lists the names of the modules that the suite's test classes are
+        defined in, without repeats, in the order they run."""
+        modules = []
+        for classSuite in self.listClassSuites():
+            moduleName = classSuite.testClass.__module__
+            if moduleName not in modules:
+                modules.append(moduleName)
+        return modules
+
     def run(self, results):
-        """Runs all the tests in the suite."""
-        if self.testClass is None:
+        """Runs all the tests in the suite.
+
+        If results asks the run to stop before the suite starts, nothing is
+        run or registered. If it asks part way through, the remaining tests
+        are skipped, but afterClass is still run.
+
+        If the test class has a classTimeout, tests which have not started
+        by the time it has passed are registered as errors.
+
+        If every test in a class suite is cached, beforeClass and afterClass
+        are not run either."""
+        if self.testClass is None or self.isRunStopping(results):
+            return
+
+        if self.isCached():
+            self._registerCachedTests(results)
+        elif (self.isClassSuite() and getattr(self.testClass, "isolation", None) == "class"
+            and canFork()):
+            self._runInFork(results)
+        else:
+            self._runHere(results, self._getClassDeadline())
+
+    def isCached(self):
+        """Determines whether this is a class suite with cached tests, and
+        nothing else to run, since the rest of its tests are ignored."""
+        if not self.isClassSuite():
+            return False
+        return (any(test.cached for test in self.tests) and
+                all(test.cached or test.ignore for test in self.tests))
+
+    def forksProcesses(self):
+        """Determines whether this is a class suite which runs its tests, or
+        itself, in forked processes, because of its isolation or
+        parallelMethods."""
+        if self._forksTests():
+            return True
+        return (self.isClassSuite() and canFork() and
+                getattr(self.testClass, "isolation", None) == "class")
+
+    def startsProcesses(self):
+        """Determines whether this is a class suite which starts processes,
+        either because it forks them itself, or because its class sets
+        usesProcesses."""
+        if self.forksProcesses():
+            return True
+        return self.isClassSuite() and getattr(self.testClass, "usesProcesses", False)
+
+    def registerAllAsErrors(self, results, stackTrace):
+        """Registers every test in the suite as an error, without running them.
+
+        This is used when the results of running a suite somewhere else,
+        such as in another process, could not be collected."""
+        results.registerSuiteStarted(self.suiteName)
+        for test in self.tests:
+            if isinstance(test, TestSuite):
+                test.registerAllAsErrors(results, stackTrace)
+            else:
+                results.registerTestStarted(self.suiteName, test.testMethodName)
+                results.registerTestError(self.suiteName, test.testMethodName, stackTrace)
+        results.registerSuiteCompleted(self.suiteName)
+
+    def _registerCachedTests(self, results):
+        results.registerSuiteStarted(self.suiteName)
+        for test in self.tests:
+            if self.isRunStopping(results):
+                break
+            test.run(results)
+        results.registerSuiteCompleted(self.suiteName)
+
+    def _runInFork(self, results):
+        try:
+            maxFailures = getattr(results, "maxFailures", None)
+            recorder = callInFork(
+                lambda: TestEventRecorder(maxFailures).recordCall(self._runHere),
+                self._getClassTimeout())
+        except ForkedCallError as ex:
+            self.registerAllAsErrors(results, [ex.args[0] + "\n"])
             return
+        recorder.replay(results)
+
+    def _getClassTimeout(self):
+        if not self.isClassSuite():
+            return None
+        return getattr(self.testClass, "classTimeout", None)
 
+    def _getClassDeadline(self):
+        timeout = self._getClassTimeout()
+        if timeout is None:
+            return None
+        return time.monotonic() + timeout
+
+    def _runHere(self, results, deadline = None):
+        results.registerSuiteStarted(self.suiteName)
+        if self.isClassSuite():
+            # what the class imports is counted among its inputs by a ResultCache
+            with ImportRecorder() as recorder:
+                self._runClass(results, deadline)
+            results.registerModulesUsed(self.suiteName, recorder.listModules())
+        else:
+            self._runClass(results, deadline)
+        results.registerSuiteCompleted(self.suiteName)
+
+    def _runClass(self, results, deadline):
         try:
-            suiteResults = results.registerSuiteStarted(self.suiteName)
-            self.testClass.beforeClass()
-            for test in self.tests:                
-                test.run(results)
+            if deadline is None:
+                self.testClass.beforeClass()
+            else:
+                self._setClassDeadline(deadline)
+                Watchdog(max(deadline - time.monotonic(), 0)).call(self.testClass.beforeClass)
+            # what beforeClass set up is shared with, rather than copied
+            # into, the processes forked for the tests
+            frozen = self._forksTests() and freezeSharedObjects()
+            try:
+                self._runTests(results, deadline)
+            finally:
+                if frozen:
+                    gc.unfreeze()
             try:
                 self.testClass.afterClass()
             except Exception as ex:
@@ -79,7 +231,190 @@ class TestSuite(TestComponent):
             trace = self.getStackTrace(ex)
             results.registerTestError(self.suiteName, "beforeClass", trace, self.countTests())
 
-        results.registerSuiteCompleted(self.suiteName)
+    def _runTests(self, results, deadline):
+        if self._runsAsyncTestsConcurrently():
+            self._runAsyncTestsConcurrently(results)
+        elif self._runsMethodsInParallel():
+            self._runMethodsInParallel(results)
+        else:
+            for index, test in enumerate(self.tests):
+                if self.isRunStopping(results):
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._registerTimedOutTests(results, self.tests[index:])
+                    break
+                test.run(results)
+
+    def _forksTests(self):
+        if not self.isClassSuite() or not canFork():
+            return False
+        return (getattr(self.testClass, "isolation", None) == "test" or
+                getattr(self.testClass, "parallelMethods", None) == "process")
+
+    def _setClassDeadline(self, deadline):
+        for test in self.tests:
+            test.classDeadline = deadline
+
+    def _registerTimedOutTests(self, results, tests):
+        stackTrace = ["Class timed out after {}s, before the test started\n".format(
+                self._getClassTimeout())]
+        for test in tests:
+            results.registerTestStarted(self.suiteName, test.testMethodName)
+            if test.ignore:
+                results.registerTestIgnored(self.suiteName, test.testMethodName)
+            else:
+                results.registerTestError(self.suiteName, test.testMethodName, stackTrace)
+
+    def _runsAsyncTestsConcurrently(self):
+        if not self.isClassSuite():
+            return False
+        if getattr(self.testClass, "asyncConcurrency", 1) == 1:
+            return False
+        return any(self._runsConcurrently(test) for test in self.tests)
+
+    def _runsConcurrently(self, test):
+        # cached tests are registered by run, without being awaited
+        return not test.ignore and not test.cached and test.isAsync()
+
+    def _runAsyncTestsConcurrently(self, results):
+        """Runs the async tests in the suite at the same time, then the rest.
+
+        Each async test records its events separately while they run, and
+        they are replayed in suite order afterwards, so the results look the
+        same as if the tests had run one after another."""
+        asyncTests = [test for test in self.tests if self._runsConcurrently(test)]
+        recorders = {}
+        runOnEventLoop(self._gatherAsyncTests(asyncTests, recorders, results))
+        for test in self.tests:
+            recorder = recorders.get(id(test))
+            if recorder is None:
+                if self.isRunStopping(results):
+                    break
+                test.run(results)
+            else:
+                recorder.replay(results)
+
+    async def _gatherAsyncTests(self, tests, recorders, results):
+        limit = self.testClass.asyncConcurrency
+        semaphore = None
+        if limit is not None:
+            semaphore = asyncio.Semaphore(limit)
+
+        async def runTest(test):
+            if semaphore is None:
+                await self._recordAsyncTest(test, recorders, results)
+            else:
+                async with semaphore:
+                    await self._recordAsyncTest(test, recorders, results)
+
+        await asyncio.gather(*[runTest(test) for test in tests])
+
+    async def _recordAsyncTest(self, test, recorders, results):
+        if self._reachedFailureLimit(results, recorders.values()):
+            return
+        recorder = TestEventRecorder()
+        recorders[id(test)] = recorder
+        await recorder.recordAsync(test)
+
+    def _reachedFailureLimit(self, results, recorders):
+        # failures recorded by tests which have finished are not in results
+        # until they are replayed, so they are counted here as well
+        if self.isRunStopping(results):
+            return True
+        maxFailures = getattr(results, "maxFailures", None)
+        if maxFailures is None:
+            return False
+        return sum(recorder.countFailures() for recorder in list(recorders)) >= maxFailures
+
+    def _runsMethodsInParallel(self):
+        if not self.isClassSuite():
+            return False
+        mode = getattr(self.testClass, "parallelMethods", None)
+        if mode == "process":
+            return canFork()
+        return mode == "thread"
+
+    def _getMethodWorkerCount(self):
+        workerCount = getattr(self.testClass, "methodWorkers", None)
+        if workerCount is None:
+            workerCount = os.cpu_count() or 1
+        return workerCount
+
+    def _runMethodsInParallel(self, results):
+        """Runs the tests in the suite in a pool of threads or forked processes.
+
+        Each test records its events separately, and they are replayed in
+        suite order afterwards, so the results look the same as if the tests
+        had run one after another. Forked processes are started after
+        beforeClass has run, so they see whatever it set up."""
+        tests = [test for test in self.tests if not test.ignore]
+        if self.testClass.parallelMethods == "process":
+            recorders = self._recordTestsInForks(tests, results)
+        else:
+            recorders = self._recordTestsInThreads(tests, results)
+        for test in self.tests:
+            if test.ignore:
+                test.run(results)
+            elif id(test) in recorders:
+                recorders[id(test)].replay(results)
+
+    def _recordTestsInThreads(self, tests, results):
+        recorders = {}
+
+        def recordTest(test):
+            if self._reachedFailureLimit(results, recorders.values()):
+                return
+            recorder = TestEventRecorder()
+            recorders[id(test)] = recorder
+            recorder.record(test)
+
+        # output is only captured per thread by ThreadLocalStreams
+        stdout = sys.stdout
+        stderr = sys.stderr
+        if not isinstance(stdout, ThreadLocalStream):
+            sys.stdout = ThreadLocalStream(stdout)
+        if not isinstance(stderr, ThreadLocalStream):
+            sys.stderr = ThreadLocalStream(stderr)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(self._getMethodWorkerCount()) as pool:
+                list(pool.map(recordTest, tests))
+        finally:
+            sys.stdout = stdout
+            sys.stderr = stderr
+        return recorders
+
+    def _recordTestsInForks(self, tests, results):
+        maxFailures = getattr(results, "maxFailures", None)
+        chunks = [tests[i::self._getMethodWorkerCount()]
+                  for i in range(self._getMethodWorkerCount())]
+        chunks = [chunk for chunk in chunks if len(chunk) > 0]
+        waits = [startInFork(lambda chunk = chunk: self._recordChunk(chunk, maxFailures))
+                 for chunk in chunks]
+
+        recorders = {}
+        for chunk, wait in zip(chunks, waits):
+            try:
+                chunkRecorders = wait()
+            except ForkedCallError as ex:
+                chunkRecorders = [self._recordCrashedTest(test, ex) for test in chunk]
+            for test, recorder in zip(chunk, chunkRecorders):
+                recorders[id(test)] = recorder
+        return recorders
+
+    def _recordChunk(self, tests, maxFailures):
+        recorders = []
+        for test in tests:
+            if maxFailures is not None and sum(
+                recorder.countFailures() for recorder in recorders) >= maxFailures:
+                break
+            recorders.append(TestEventRecorder().record(test))
+        return recorders
+
+    def _recordCrashedTest(self, test, error):
+        recorder = TestEventRecorder()
+        recorder.registerTestStarted("", test.testMethodName)
+        recorder.registerTestError("", test.testMethodName, [error.args[0] + "\n"])
+        return recorder
 
     @classmethod
     def beforeClass(type):
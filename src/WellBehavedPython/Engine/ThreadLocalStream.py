@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+import contextvars
+
+class ThreadLocalStream:
+    """A text stream which sends writes to a different stream on each thread.
+
+    This is installed as sys.stdout and sys.stderr by the test runners, so
+    that tests running concurrently on different threads can each capture
+    their own output. Threads which have not redirected the stream write to
+    the default stream.
+
+    Redirection is held in a context variable, so asyncio tasks each get
+    their own redirection as well."""
+
+    def __init__(self, default):
+        """Constructor.
+
+        Inputs
+        ------
+        default : The stream to write to on threads which have not been redirected."""
+        self.default = default
+        self._stream = contextvars.ContextVar("stream", default = None)
+
+    def redirect(self, stream):
+        """Redirects writes made on the current thread or asyncio task.
+
+        Inputs
+        ------
+        stream : The stream to write to, or None to write to the default stream.
+
+        Returns
+        -------
+        The stream that writes were previously redirected to on this thread, or
+        None if they were going to the default stream."""
+        previous = self._stream.get()
+        self._stream.set(stream)
+        return previous
+
+    def current(self):
+        """Gets the stream that writes on the current thread go to."""
+        stream = self._stream.get()
+        if stream is None:
+            stream = self.default
+        return stream
+
+    def write(self, text):
+        return self.current().write(text)
+
+    def writelines(self, lines):
+        self.current().writelines(lines)
+
+    def flush(self):
+        self.current().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from .TestRunningException import TestRunningException
+
+import asyncio
+import contextvars
+import sys
+import tempfile
+import threading
+import traceback
+
+try:
+    import faulthandler
+except ImportError: # it cannot be loaded in subinterpreters
+    faulthandler = None
+
+class TestTimeoutError(TestRunningException):
+    """Raised when a call watched by a Watchdog does not finish in time."""
+
+class Watchdog:
+    """Calls functions with a time limit.
+
+    Python cannot stop a thread from the outside, so the function is called
+    on a separate thread while the calling thread waits for it. If the time
+    limit passes first, the stacks of all threads are dumped with
+    faulthandler, so that it can be seen where the call was stuck, and a
+    TestTimeoutError is raised. The stuck thread is abandoned, which lets
+    the rest of the run carry on in the same process."""
+
+    def __init__(self, timeout):
+        """Constructor.
+
+        Inputs
+        ------
+        timeout : [float] The number of seconds a call is allowed to take."""
+        self.timeout = timeout
+
+    def call(self, function):
+        """Calls the function on a watched thread.
+
+        The thread runs in a copy of the calling thread's context, so
+        redirections made with ThreadLocalStream still apply.
+
+        Inputs
+        ------
+        function : A callable taking no arguments.
+
+        Returns
+        -------
+        The value returned by the function.
+
+        Raises
+        ------
+        Whatever the function raised, or TestTimeoutError if it did not
+        finish in time."""
+        outcome = {}
+        context = contextvars.copy_context()
+
+        def target():
+            try:
+                outcome["value"] = context.run(function)
+            except BaseException as ex:
+                outcome["exception"] = ex
+
+        thread = threading.Thread(target = target, name = "WellBehavedPython watched call",
+                                  daemon = True)
+        thread.start()
+        thread.join(self.timeout)
+        if thread.is_alive():
+            raise TestTimeoutError(self.describeTimeout(dumpThreadStacks()))
+        if "exception" in outcome:
+            raise outcome["exception"]
+        return outcome.get("value")
+
+    async def callAsync(self, coroutine):
+        """Awaits the coroutine on the running event loop, cancelling it if
+        it does not finish in time.
+
+        Inputs
+        ------
+        coroutine : The coroutine to await.
+
+        Returns
+        -------
+        The value the coroutine returned.
+
+        Raises
+        ------
+        Whatever the coroutine raised, or TestTimeoutError if it did not
+        finish in time. The error includes the stack of the coroutine as
+        well as those of all threads."""
+        task = asyncio.ensure_future(coroutine)
+        done, pending = await asyncio.wait({ task }, timeout = self.timeout)
+        if task in done:
+            return task.result()
+
+        stack = describeCoroutineStack(task.get_coro())
+        task.cancel()
+        raise TestTimeoutError(self.describeTimeout(stack + dumpThreadStacks()))
+
+    def describeTimeout(self, stacks):
+        return "Timed out after {}s\n{}".format(self.timeout, stacks)
+
+def describeCoroutineStack(coroutine):
+    """Describes where a suspended coroutine is waiting, following the
+    chain of coroutines it is awaiting."""
+    frames = []
+    while coroutine is not None:
+        frame = getattr(coroutine, "cr_frame", None)
+        if frame is not None:
+            frames.append((frame, frame.f_lineno))
+        coroutine = getattr(coroutine, "cr_await", None)
+    lines = traceback.StackSummary.extract(frames).format()
+    return "Coroutine (most recent call last):\n" + "".join(lines)
+
+def dumpThreadStacks():
+    """Gets the current stack of every thread, as dumped by faulthandler."""
+    if faulthandler is None:
+        return "".join("Thread 0x{:016x}:\n".format(ident) +
+                       "".join(traceback.format_stack(frame))
+                       for ident, frame in sys._current_frames().items())
+    with tempfile.TemporaryFile("w+") as file:
+        faulthandler.dump_traceback(file, all_threads = True)
+        file.seek(0)
+        return file.read()
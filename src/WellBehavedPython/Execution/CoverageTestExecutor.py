@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Discovery.SourceRoots import getDefaultRoots
+from ..Engine.TestComponent import TestComponent
+from ..Engine.TestSuite import TestSuite
+
+import os
+import sys
+import threading
+
+class CoverageTestExecutor(TestComponent):
+    """Runs a suite in this process, recording which lines of the source
+    files under the source roots each test runs, in a CoverageIndex.
+
+    Lines are traced with sys.settrace, on the thread running the tests and
+    on any threads started while a test runs. Lines run by beforeClass and
+    afterClass are counted against every test in the class. WellBehavedPython
+    itself is not recorded.
+
+    Tests are run one after another. Tests whose lines could not be traced,
+    such as isolated tests, which run in forked processes, are left out of
+    the index, so that they are never assumed to be unaffected by a change.
+    The coverage of tests which did not run, because the run stopped early,
+    is kept from before."""
+
+    def __init__(self, index, roots = None):
+        """Constructor.
+
+        Inputs
+        ------
+        index : The [CoverageIndex] to record the coverage in.
+        roots : [list of str] The directories holding the source files to
+            record. If None, the directories on sys.path are used, apart
+            from those of the standard library and installed packages."""
+        if roots is None:
+            roots = getDefaultRoots()
+        self.index = index
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.history = None
+        self.loadMonitor = None
+        # the WellBehavedPython package directory
+        self._excluded = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self._recordedFiles = {}
+        self._coverage = None
+        self._previousTrace = None
+
+    def run(self, suite, results):
+        """Runs the suite, registering events with results, and records the
+        coverage of each test that ran in the index."""
+        self._runComponent(suite, results)
+
+    def _runComponent(self, component, results):
+        if isinstance(component, TestSuite) and component.isClassSuite():
+            self._runClassSuite(component, results)
+        elif isinstance(component, TestSuite):
+            if component.testClass is None or self.isRunStopping(results):
+                return
+            results.registerSuiteStarted(component.suiteName)
+            for test in component.tests:
+                self._runComponent(test, results)
+            results.registerSuiteCompleted(component.suiteName)
+        else:
+            component.run(results)
+
+    def _runClassSuite(self, classSuite, results):
+        tracingResults = _TracingResults(results, self)
+        self._coverage = tracingResults.classCoverage
+        self._startTracing()
+        try:
+            classSuite.run(tracingResults)
+        finally:
+            self._stopTracing()
+            self._coverage = None
+
+        tests = dict((test.testMethodName, test) for test in classSuite.tests)
+        ran = [(tests[testName], coverage)
+               for testName, coverage in tracingResults.testCoverage.items()
+               if testName in tests]
+        self.index.removeTests([test.getTestIdentifier() for test, coverage in ran])
+        for test, coverage in ran:
+            if len(coverage) == 0:
+                continue
+            for path, lines in tracingResults.classCoverage.items():
+                coverage.setdefault(path, set()).update(lines)
+            self.index.recordTest(test.getTestIdentifier(), coverage)
+
+    def _startTracing(self):
+        self._previousTrace = sys.gettrace()
+        threading.settrace(self._trace)
+        sys.settrace(self._trace)
+
+    def _stopTracing(self):
+        sys.settrace(self._previousTrace)
+        threading.settrace(self._previousTrace)
+
+    def _trace(self, frame, event, argument):
+        coverage = self._coverage
+        if coverage is None:
+            return None
+        path = frame.f_code.co_filename
+        if not self._isRecorded(path):
+            return None
+        lines = coverage.setdefault(path, set())
+        lines.add(frame.f_lineno)
+
+        def traceLines(frame, event, argument):
+            if event == "line":
+                lines.add(frame.f_lineno)
+            return traceLines
+        return traceLines
+
+    def _isRecorded(self, path):
+        recorded = self._recordedFiles.get(path)
+        if recorded is None:
+            absolutePath = os.path.abspath(path)
+            recorded = (not absolutePath.startswith(self._excluded + os.sep) and
+                        any(absolutePath.startswith(root + os.sep) for root in self.roots))
+            self._recordedFiles[path] = recorded
+        return recorded
+
+class _TracingResults:
+    """Passes events on to the real results, switching where traced lines
+    are counted as each test starts and finishes."""
+
+    def __init__(self, results, executor):
+        self.results = results
+        self.executor = executor
+        self.classCoverage = {}
+        self.testCoverage = {}
+        self.maxFailures = getattr(results, "maxFailures", None)
+
+    def __getattr__(self, name):
+        return getattr(self.results, name)
+
+    def registerSuiteStarted(self, suiteName):
+        self.results.registerSuiteStarted(suiteName)
+        return self
+
+    def registerTestStarted(self, suiteName, testName):
+        self.executor._coverage = self.testCoverage.setdefault(testName, {})
+        self.results.registerTestStarted(suiteName, testName)
+
+    def registerTestPassed(self, suiteName, testName):
+        self._finishTest()
+        self.results.registerTestPassed(suiteName, testName)
+
+    def registerTestFailed(self, suiteName, testName, stackTrace):
+        self._finishTest()
+        self.results.registerTestFailed(suiteName, testName, stackTrace)
+
+    def registerTestError(self, suiteName, testName, stackTrace, numErrors = 1):
+        if testName not in ("beforeClass", "afterClass"):
+            self._finishTest()
+        self.results.registerTestError(suiteName, testName, stackTrace, numErrors)
+
+    def registerTestIgnored(self, suiteName, testName):
+        self._finishTest()
+        self.testCoverage.pop(testName, None)
+        self.results.registerTestIgnored(suiteName, testName)
+
+    def registerTestCached(self, suiteName, testName):
+        self._finishTest()
+        self.testCoverage.pop(testName, None)
+        self.results.registerTestCached(suiteName, testName)
+
+    def _finishTest(self):
+        self.executor._coverage = self.classCoverage
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from .DistributedTestWorker import DistributedTestWorker
+from .ParallelTestExecutor import ParallelTestExecutor
+from .SocketMessages import isLocalAddress
+from .SuiteReference import SuiteReference
+from .WorkerCoordinator import WorkerCoordinator
+
+import multiprocessing
+
+class DistributedTestExecutor(ParallelTestExecutor):
+    """Runs class suites on workers which connect over TCP or Unix sockets.
+
+    This process acts as the coordinator: it owns the discovered suite, hands
+    out class suites to workers as they become free and replays the events
+    they stream back. Workers may run on other machines, started with
+
+        python3 -m WellBehavedPython.Execution.DistributedTestWorker host:port --token TOKEN
+
+    or can be started on this machine by passing localWorkers. By default
+    only workers on this machine can connect; to accept workers from other
+    machines, listen on an address they can reach, and give a token which
+    the workers are started with too.
+
+    A coordinator can be started from the command line with
+
+        python3 -m WellBehavedPython.Runners.CommandLineRunner MyTests --coordinate host:port"""
+
+    def __init__(self, address = ("127.0.0.1", 0), localWorkers = 0, history = None,
+                 resourceLimits = None, token = None):
+        """Constructor.
+
+        Inputs
+        ------
+        address : The address to listen on. A (host, port) tuple for TCP, or a
+            path string for a Unix socket. Only a loopback host or a Unix
+            socket can be used without a token.
+        localWorkers : [int] The number of worker processes to start on this
+            machine for each run.
+        history : The [DurationHistory] used to order class suites, or None to
+            hand them out in suite order.
+        resourceLimits : [dict] Maps resource token names to the total weight
+            of running suites which may use them at once, across all workers.
+        token : [str] The token workers must know, or None to accept only
+            workers on this machine.
+
+        Raises
+        ------
+        ValueError if the address can be connected to from other machines,
+        but no token is given."""
+        if token is None and not isLocalAddress(address):
+            raise ValueError("workers on other machines can connect to {}, so a token is "
+                             "needed to authenticate them".format(address))
+        ParallelTestExecutor.__init__(self, localWorkers or 1, history, resourceLimits)
+        self.address = address
+        self.token = token
+        self.localWorkers = localWorkers
+        self._processes = []
+        self._results = None
+
+    def _createPool(self):
+        results = self._results
+        coordinator = WorkerCoordinator(self.address, lambda: self.isRunStopping(results),
+                                        self.token)
+        self._processes = []
+        for i in range(self.localWorkers):
+            worker = DistributedTestWorker(self._connectableAddress(coordinator.address),
+                                           self.token)
+            process = multiprocessing.Process(target = worker.run, daemon = True)
+            process.start()
+            self._processes.append(process)
+        return coordinator
+
+    def _getWorkerSlots(self):
+        # workers can connect from other machines at any time, so the
+        # coordinator's queue is relied on to share out suites
+        return None
+
+    def _submit(self, pool, suite):
+        if not SuiteReference.canReference(suite):
+            return None
+        return pool.submit(SuiteReference.fromSuite(suite), self.maxFailures)
+
+    def run(self, suite, results):
+        # the coordinator stops handing out suites once results asks the run to stop
+        self._results = results
+        try:
+            ParallelTestExecutor.run(self, suite, results)
+        finally:
+            for process in self._processes:
+                process.join()
+            self._processes = []
+            self._results = None
+
+    def _connectableAddress(self, address):
+        if isinstance(address, str):
+            return address
+        host, port = address[0], address[1]
+        if host in ("", "0.0.0.0"):
+            host = "127.0.0.1"
+        return (host, port)
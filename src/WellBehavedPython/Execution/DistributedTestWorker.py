@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestEventRecorder import TestEventRecorder
+from .SocketMessages import *
+from .SuiteReference import SuiteReference
+
+import argparse
+import os
+import time
+
+class DistributedTestWorker:
+    """Runs class suites handed out by a WorkerCoordinator.
+
+    The worker connects to the coordinator, then runs each suite it is sent,
+    streaming the events back as they happen, until it is told to stop.
+    The test modules must be importable by the worker.
+
+    A worker can be started from the command line with
+
+        python3 -m WellBehavedPython.Execution.DistributedTestWorker host:port --token TOKEN
+
+    where the token may instead be given in the WELLBEHAVEDPYTHON_TOKEN
+    environment variable, so that it is not seen in the list of processes."""
+
+    def __init__(self, address, token = None):
+        """Constructor.
+
+        Inputs
+        ------
+        address : The address of the coordinator. A (host, port) tuple for
+            TCP or a path string for a Unix socket.
+        token : [str] The token shared with the coordinator, or None if the
+            coordinator does not need one."""
+        self.address = address
+        self.token = token
+
+    def run(self, connectAttempts = 50, retryInterval = 0.1):
+        """Connects to the coordinator and runs suites until told to stop.
+
+        Inputs
+        ------
+        connectAttempts : [int] How many times to try connecting before giving up
+        retryInterval : [float] The number of seconds to wait between attempts
+
+        Returns
+        -------
+        The number of suites run.
+
+        Raises
+        ------
+        AuthenticationError if the worker and coordinator do not share a token."""
+        connection = self._connect(connectAttempts, retryInterval)
+        stream = openStream(connection)
+        suitesRun = 0
+        try:
+            if self.token is not None:
+                authenticate(stream, self.token, "worker")
+            while True:
+                message = receiveMessage(stream)
+                if message is None or message["type"] == "stop":
+                    return suitesRun
+                if message["type"] == "run":
+                    self._runSuite(stream, SuiteReference.fromDict(message["suite"]),
+                                   message.get("maxFailures"))
+                    suitesRun += 1
+        finally:
+            stream.close()
+            connection.close()
+
+    def _connect(self, connectAttempts, retryInterval):
+        for attempt in range(connectAttempts):
+            connection = createSocket(self.address)
+            try:
+                connection.connect(self.address)
+                return connection
+            except OSError:
+                connection.close()
+                if attempt == connectAttempts - 1:
+                    raise
+                time.sleep(retryInterval)
+
+    def _runSuite(self, stream, reference, maxFailures):
+        recorder = _StreamingRecorder(stream, maxFailures)
+        try:
+            suite = reference.build()
+        except Exception as ex:
+            suite = _UnbuildableSuite(reference, ex)
+        recorder.record(suite)
+        sendMessage(stream, { "type" : "done", "output" : recorder.output })
+
+class _StreamingRecorder(TestEventRecorder):
+    """Recorder which sends each event to the coordinator as it is recorded."""
+
+    def __init__(self, stream, maxFailures = None):
+        TestEventRecorder.__init__(self, maxFailures)
+        self._stream = stream
+
+    def _record(self, eventName, *arguments):
+        TestEventRecorder._record(self, eventName, *arguments)
+        event = TestEventRecorder.eventToDict(self.events[-1])
+        sendMessage(self._stream, { "type" : "event", "event" : event })
+
+class _UnbuildableSuite:
+    """Stands in for a suite that could not be built, such as when the
+    module cannot be imported on the worker, and reports every test as an error."""
+
+    def __init__(self, reference, exception):
+        self.reference = reference
+        self.stackTrace = ["Could not build suite {}: {!r}\n".format(
+                reference.suiteName, exception)]
+
+    def run(self, results):
+        suiteName = self.reference.suiteName
+        results.registerSuiteStarted(suiteName)
+        for testName, ignore in self.reference.tests:
+            results.registerTestStarted(suiteName, testName)
+            results.registerTestError(suiteName, testName, self.stackTrace)
+        results.registerSuiteCompleted(suiteName)
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog = "python3 -m WellBehavedPython.Execution.DistributedTestWorker",
+        description = "Runs the test classes handed out by a coordinator.")
+    parser.add_argument("address", help = "the coordinator's host:port or socket path")
+    parser.add_argument("--token", default = os.environ.get("WELLBEHAVEDPYTHON_TOKEN"),
+                        help = "the token shared with the coordinator. Defaults to the "
+                               "WELLBEHAVEDPYTHON_TOKEN environment variable")
+    options = parser.parse_args()
+    DistributedTestWorker(parseAddress(options.address), options.token).run()
+
+if __name__ == "__main__":
+    main()
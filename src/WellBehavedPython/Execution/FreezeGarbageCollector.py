@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Freezes the garbage collector when it is imported.
+
+This is preloaded into a forkserver after the test modules, so that
+everything they created is moved out of the garbage collector's reach.
+The collector then never touches those objects in the forked workers,
+so the memory pages holding them stay shared with the forkserver."""
+
+import gc
+
+if hasattr(gc, "freeze"):
+    gc.freeze()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestComponent import TestComponent
+from ..Engine.TestSuite import TestSuite
+from .ResourceScheduler import ResourceScheduler
+
+import concurrent.futures
+import os
+import threading
+
+class ParallelTestExecutor(TestComponent):
+    """Base class for running the class suites of a suite tree in a pool of workers.
+
+    Each class suite (as built by TestCase.suite()) is handed to a worker as a
+    whole, so beforeClass and afterClass run once, in the worker that runs the
+    class. The events from each class suite are recorded in the worker and then
+    replayed into the results in the original suite order, so the results tree
+    and the console output are the same as for a serial run.
+
+    If a DurationHistory is given, class suites are submitted longest first,
+    so that the run is not left waiting on a slow class that started last.
+
+    If results has a maxFailures limit, class suites which have not started
+    are cancelled as soon as the suites that have finished reach the limit.
+    Each worker also stops starting tests once the class it is running
+    reaches the limit on its own.
+
+    If any test case class declares resources, class suites are started
+    by a ResourceScheduler, so that suites needing the same resources are
+    kept apart, and no more suites are started than there are workers.
+
+    If a SystemLoadMonitor is given, suites are always started by a
+    ResourceScheduler, which asks the monitor how many should be running
+    given the load and free memory of the machine. The pool is created with
+    workerCount workers, so the monitor's maxWorkers should not be more than
+    that. The peak memory measured by workers is recorded with the monitor.
+
+    Derived classes provide the pool and decide how a class suite is submitted
+    to it."""
+
+    def __init__(self, workerCount = None, history = None, resourceLimits = None,
+                 loadMonitor = None):
+        """Constructor.
+
+        Inputs
+        ------
+        workerCount : [int] The number of workers to use. If None, one worker
+            per cpu is used.
+        history : The [DurationHistory] used to order class suites, or None to
+            submit them in suite order.
+        resourceLimits : [dict] Maps resource token names to the total weight
+            of running suites which may use them at once. Tokens not in the
+            dictionary have a limit of 1.
+        loadMonitor : The [SystemLoadMonitor] used to adapt the number of
+            suites running at once, or None to keep every worker busy."""
+        if workerCount is None:
+            workerCount = os.cpu_count() or 1
+        self.workerCount = workerCount
+        self.history = history
+        self.resourceLimits = resourceLimits
+        self.loadMonitor = loadMonitor
+        self.maxFailures = None
+
+    def run(self, suite, results):
+        """Runs the suite, registering events with results.
+
+        Inputs
+        ------
+        suite : The test or suite to run
+        results : The object to register test events with. This will usually
+            be a TestResults or a test runner."""
+        if not isinstance(suite, TestSuite):
+            suite.run(results)
+            return
+
+        self.maxFailures = getattr(results, "maxFailures", None)
+        pool = self._createPool()
+        scheduler = None
+        try:
+            classSuites = suite.listClassSuites()
+            submit = lambda classSuite: self._submit(pool, classSuite)
+            if self.loadMonitor is not None or any(
+                ResourceScheduler.getRequirements(classSuite.testClass)
+                for classSuite in classSuites):
+                scheduler = ResourceScheduler(submit, self.resourceLimits,
+                                              self._getWorkerSlots(), self.loadMonitor)
+                submit = scheduler.submit
+            pending = self._submitClassSuites(classSuites, submit)
+            if self.loadMonitor is not None:
+                self._recordPeakMemory(classSuites, pending)
+            if self.maxFailures is not None:
+                self._cancelAfterFailures(pending)
+            self._runComponent(suite, results, pending)
+        finally:
+            if scheduler is not None:
+                scheduler.close()
+            pool.shutdown()
+
+    def _createPool(self):
+        """Override to create the pool that class suites are submitted to.
+
+        The pool is expected to have the same interface as the executors
+        in concurrent.futures."""
+        raise NotImplementedError()
+
+    def _submit(self, pool, suite):
+        """Override to submit a class suite to the pool.
+
+        The recorder running the suite should be given self.maxFailures,
+        so that the worker stops starting tests once it is reached.
+
+        Returns
+        -------
+        A future whose result is a TestEventRecorder holding the events
+        of running the suite, or None if the suite should be run serially
+        in this process instead."""
+        raise NotImplementedError()
+
+    def _getWorkerSlots(self):
+        """The number of class suites to start at once when scheduling by
+        resources, or None for no limit."""
+        return self.workerCount
+
+    def _submitClassSuites(self, classSuites, submit):
+        pending = {}
+        if self.history is not None:
+            classSuites = self.history.orderLongestFirst(classSuites)
+        for classSuite in classSuites:
+            if classSuite.isCached():
+                # nothing to run, so it is registered here
+                continue
+            future = submit(classSuite)
+            if future is not None:
+                pending[id(classSuite)] = future
+        return pending
+
+    def _recordPeakMemory(self, classSuites, pending):
+        def record(testClass, future):
+            if future.cancelled() or future.exception() is not None or future.result() is None:
+                return
+            self.loadMonitor.recordPeakMemory(testClass, future.result().peakMemory)
+
+        for classSuite in classSuites:
+            future = pending.get(id(classSuite))
+            if future is not None:
+                future.add_done_callback(
+                    lambda future, testClass = classSuite.testClass: record(testClass, future))
+
+    def _cancelAfterFailures(self, pending):
+        lock = threading.Lock()
+        failures = [0]
+
+        def countFailures(future):
+            if future.cancelled() or future.exception() is not None or future.result() is None:
+                return
+            with lock:
+                failures[0] += future.result().countFailures()
+                if failures[0] < self.maxFailures:
+                    return
+            for otherFuture in pending.values():
+                otherFuture.cancel()
+
+        for future in list(pending.values()):
+            future.add_done_callback(countFailures)
+
+    def _runComponent(self, component, results, pending):
+        future = pending.get(id(component))
+        if future is not None:
+            if not future.cancelled():
+                self._replayFuture(component, results, future)
+        elif isinstance(component, TestSuite) and not component.isClassSuite():
+            if component.testClass is None:
+                return
+            if self.isRunStopping(results) and not self._hasFinishedWork(component, pending):
+                return
+            results.registerSuiteStarted(component.suiteName)
+            for test in component.tests:
+                self._runComponent(test, results, pending)
+            results.registerSuiteCompleted(component.suiteName)
+        else:
+            component.run(results)
+
+    def _hasFinishedWork(self, suite, pending):
+        for classSuite in suite.listClassSuites():
+            future = pending.get(id(classSuite))
+            if future is not None and not future.cancelled():
+                return True
+        return False
+
+    def _replayFuture(self, suite, results, future):
+        try:
+            recorder = future.result()
+        except concurrent.futures.CancelledError:
+            # the pool stopped the run after this was checked
+            return
+        except Exception as ex:
+            trace = self.getStackTrace(ex)
+            suite.registerAllAsErrors(results, trace)
+            return
+        if recorder is None:
+            suite.run(results)
+        else:
+            recorder.replay(results)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from .ParallelTestExecutor import ParallelTestExecutor
+from .SuiteReference import SuiteReference
+from .SupervisedProcessPool import SupervisedProcessPool
+
+class ProcessPoolTestExecutor(ParallelTestExecutor):
+    """Runs class suites in a pool of worker processes.
+
+    Suites are sent to workers as SuiteReferences, so the test case classes
+    must be importable by the workers. Class suites which cannot be
+    referenced, such as those for classes defined inside functions, are
+    run serially in this process.
+
+    Workers which die, for example because a C extension crashed, are
+    replaced, and only the test that was running is lost. Workers can also
+    be recycled after a number of tests or once they use too much memory,
+    and have their address space limited. See SupervisedProcessPool."""
+
+    def __init__(self, workerCount = None, history = None, resourceLimits = None,
+                 loadMonitor = None, maxTestsPerWorker = None, maxWorkerMemory = None,
+                 workerMemoryLimit = None):
+        """Constructor.
+
+        Inputs
+        ------
+        workerCount : [int] The number of workers to use. If None, one worker
+            per cpu is used.
+        history : The [DurationHistory] used to order class suites, or None to
+            submit them in suite order.
+        resourceLimits : [dict] Maps resource token names to the total weight
+            of running suites which may use them at once.
+        loadMonitor : The [SystemLoadMonitor] used to adapt the number of
+            suites running at once, or None to keep every worker busy.
+        maxTestsPerWorker : [int] The number of tests after which a worker is
+            replaced, or None to keep it.
+        maxWorkerMemory : [int] The resident memory in bytes above which a
+            worker is replaced, or None to keep it.
+        workerMemoryLimit : [int] The address space in bytes each worker may
+            use, or None for no limit."""
+        ParallelTestExecutor.__init__(self, workerCount, history, resourceLimits, loadMonitor)
+        self.maxTestsPerWorker = maxTestsPerWorker
+        self.maxWorkerMemory = maxWorkerMemory
+        self.workerMemoryLimit = workerMemoryLimit
+
+    def _createPool(self):
+        return self._createSupervisedPool()
+
+    def _createSupervisedPool(self, context = None):
+        return SupervisedProcessPool(self.workerCount, context, self.maxTestsPerWorker,
+                                     self.maxWorkerMemory, self.workerMemoryLimit)
+
+    def _submit(self, pool, suite):
+        if not SuiteReference.canReference(suite):
+            return None
+        reference = SuiteReference.fromSuite(suite)
+        return pool.submit(reference, self.maxFailures)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+import concurrent.futures
+import os
+import threading
+
+class ResourceScheduler:
+    """Holds back class suites until the resources they need are free.
+
+    A test case class declares the resources it uses with its resources
+    attribute, either as a collection of token names, each used with a
+    weight of 1, or as a dictionary from token names to weights:
+
+        resources = ["port:8080"]
+        resources = { "cpu-heavy" : 2, "sqlite:results.db" : 1 }
+
+    Each token has a limit, 1 unless set otherwise, and class suites are
+    only started while the total weight of the running suites using a token
+    stays within its limit. With the default limit of 1, suites using the
+    same token never run at the same time. A weight greater than the limit
+    is treated as equal to it, so the suite runs on its own.
+
+    The number of suites started at once can also be limited, so that
+    suites are not queued in a pool while holding resources that other
+    suites could have used.
+
+    If a SystemLoadMonitor is given, it decides how many suites may run
+    at once instead, and can hold back suites which need more memory than
+    is free. The monitor is checked again every interval while suites are
+    waiting, so that they start once load or memory allows.
+
+    Suites are started by a scheduling thread, in the order they were
+    submitted, skipping over any whose resources are not free."""
+
+    def __init__(self, submitFunction, limits = None, slots = None, monitor = None):
+        """Constructor.
+
+        Inputs
+        ------
+        submitFunction : Called with a class suite to start it. Returns a
+            future for the suite's result, or None if the suite should not
+            be started here.
+        limits : [dict] Maps token names to the total weight that may be in
+            use at once. Tokens which are not in limits have a limit of 1.
+        slots : [int] The number of suites which may run at once, or None
+            for no limit.
+        monitor : The [SystemLoadMonitor] deciding how many suites may run
+            at once, or None to use slots."""
+        self.submitFunction = submitFunction
+        self.limits = dict(limits or {})
+        self.slots = slots
+        self.monitor = monitor
+        self._inUse = {}
+        self._running = 0
+        self._waiting = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target = self._schedule, daemon = True)
+        self._thread.start()
+
+    @staticmethod
+    def getRequirements(testClass):
+        """Gets the resources declared by a test case class.
+
+        Returns
+        -------
+        A dictionary from token names to weights, empty if the class
+        declares no resources."""
+        resources = getattr(testClass, "resources", None)
+        if not resources:
+            return {}
+        if isinstance(resources, dict):
+            return dict(resources)
+        return { token : 1 for token in resources }
+
+    @staticmethod
+    def parseLimit(text):
+        """Parses a limit written as token=N, token=cores or token=cores/N.
+
+        Returns
+        -------
+        A (token, limit) tuple. Limits written in terms of cores are at
+        least 1.
+
+        Raises
+        ------
+        ValueError if the text is not in one of those forms."""
+        token, separator, value = text.rpartition("=")
+        if separator == "" or token == "":
+            raise ValueError("Resource limit {} is not of the form token=limit".format(text))
+        if value == "cores" or value.startswith("cores/"):
+            cores = os.cpu_count() or 1
+            divisor = int(value[len("cores/"):]) if value != "cores" else 1
+            return token, max(cores // divisor, 1)
+        return token, int(value)
+
+    def submit(self, suite):
+        """Queues a class suite to be started once its resources are free.
+
+        Returns
+        -------
+        A future which completes with the result of the future returned by
+        submitFunction. If submitFunction returns None, it completes with
+        None. The future can be cancelled until the suite is started."""
+        future = concurrent.futures.Future()
+        requirements = self.getRequirements(suite.testClass)
+        with self._condition:
+            self._waiting.append((suite, requirements, future))
+            self._condition.notify()
+        return future
+
+    def close(self):
+        """Stops the scheduling thread, cancelling any suites which have not started."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _schedule(self):
+        with self._condition:
+            while True:
+                if self._closed:
+                    for suite, requirements, future in self._waiting:
+                        future.cancel()
+                    return
+                self._startAvailable()
+                if self.monitor is not None and len(self._waiting) > 0:
+                    self._condition.wait(self.monitor.interval)
+                else:
+                    self._condition.wait()
+
+    def _startAvailable(self):
+        for work in list(self._waiting):
+            suite, requirements, future = work
+            if future.cancelled():
+                self._waiting.remove(work)
+                continue
+            if not self._canStart(suite, requirements):
+                continue
+            self._waiting.remove(work)
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._start(suite, requirements, future)
+
+    def _canStart(self, suite, requirements):
+        slots = self.slots
+        if self.monitor is not None:
+            slots = self.monitor.getWorkerCount()
+        if slots is not None and self._running >= slots:
+            return False
+        if self.monitor is not None and not self.monitor.canStart(suite.testClass, self._running):
+            return False
+        for token, weight in requirements.items():
+            limit = self._getLimit(token)
+            if self._inUse.get(token, 0) + min(weight, limit) > limit:
+                return False
+        return True
+
+    def _start(self, suite, requirements, future):
+        self._acquire(requirements)
+        if self.monitor is not None:
+            self.monitor.suiteStarted(suite.testClass)
+        try:
+            started = self.submitFunction(suite)
+        except Exception as ex:
+            self._release(requirements)
+            future.set_exception(ex)
+            return
+        if started is None:
+            self._release(requirements)
+            future.set_result(None)
+            return
+        started.add_done_callback(
+            lambda finished: self._finished(requirements, future, finished))
+
+    def _finished(self, requirements, future, finished):
+        with self._condition:
+            self._release(requirements)
+            self._condition.notify()
+        try:
+            future.set_result(finished.result())
+        except BaseException as ex:
+            future.set_exception(ex)
+
+    def _acquire(self, requirements):
+        self._running += 1
+        for token, weight in requirements.items():
+            self._inUse[token] = self._inUse.get(token, 0) + min(weight, self._getLimit(token))
+
+    def _release(self, requirements):
+        self._running -= 1
+        for token, weight in requirements.items():
+            self._inUse[token] -= min(weight, self._getLimit(token))
+
+    def _getLimit(self, token):
+        return self.limits.get(token, 1)
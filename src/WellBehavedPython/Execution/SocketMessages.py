@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+"""Helpers for sending messages between distributed coordinators and workers.
+
+Messages are dictionaries, sent as one line of JSON each. Addresses are
+either a (host, port) tuple for TCP, or a path string for a Unix socket.
+
+Connections which other machines can make are authenticated with a token
+shared by the coordinator and its workers, which is never sent itself:
+each end sends a random challenge, and answers the other's with an HMAC
+of it keyed by the token."""
+
+from multiprocessing import AuthenticationError
+
+import hmac
+import ipaddress
+import json
+import os
+import socket
+
+def createSocket(address):
+    """Creates an unconnected socket of the right family for the address."""
+    if isinstance(address, str):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+def parseAddress(text):
+    """Parses an address given on the command line.
+
+    host:port gives a TCP address, anything else is taken as the path
+    of a Unix socket."""
+    host, separator, port = text.rpartition(":")
+    if separator and port.isdigit():
+        return (host, int(port))
+    return text
+
+def isLocalAddress(address):
+    """Determines whether only this machine can connect to an address,
+    because it is a Unix socket or a TCP address on a loopback interface.
+
+    The empty host, which listens on every interface, is not local."""
+    if isinstance(address, str):
+        return True
+    host = address[0]
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def authenticate(stream, token, role):
+    """Proves to the other end of a connection that this end knows the
+    token, and checks that the other end knows it too. Both ends call this
+    straight after connecting, with different roles.
+
+    The coordinator sends a challenge, the worker answers it along with a
+    challenge of its own, and the coordinator answers that only once the
+    worker has proved it knows the token. Messages go one way at a time,
+    since a stream drops what it has read ahead when it is written to.
+
+    Inputs
+    ------
+    stream : The stream opened on the connection.
+    token : [str] The token shared by both ends.
+    role : [str] "coordinator" or "worker", saying which end this is, so
+        that an answer cannot be sent back to the end which gave it.
+
+    Raises
+    ------
+    AuthenticationError if the other end did not answer with the token."""
+    challenge = os.urandom(32).hex()
+    if role == "coordinator":
+        sendMessage(stream, { "type" : "challenge", "challenge" : challenge })
+        message = _receiveAnswer(stream, token, "worker", challenge)
+        answer = _answerChallenge(token, role, message.get("challenge"))
+        sendMessage(stream, { "type" : "answer", "answer" : answer })
+    else:
+        message = receiveMessage(stream)
+        if message is None or message.get("type") != "challenge":
+            raise AuthenticationError("The coordinator did not send a challenge")
+        answer = _answerChallenge(token, role, message.get("challenge"))
+        sendMessage(stream, { "type" : "answer", "answer" : answer, "challenge" : challenge })
+        _receiveAnswer(stream, token, "coordinator", challenge)
+
+def _receiveAnswer(stream, token, otherRole, challenge):
+    message = receiveMessage(stream)
+    expected = _answerChallenge(token, otherRole, challenge)
+    if (message is None or message.get("type") != "answer" or
+        not hmac.compare_digest(str(message.get("answer")), expected)):
+        raise AuthenticationError("The {} does not know the token".format(otherRole))
+    return message
+
+def _answerChallenge(token, role, challenge):
+    return hmac.new(token.encode("utf-8"), "{}:{}".format(role, challenge).encode("utf-8"),
+                    "sha256").hexdigest()
+
+def openStream(connection):
+    """Opens a text stream for reading and writing messages on a connected socket."""
+    return connection.makefile("rw", encoding = "utf-8", newline = "\n")
+
+def sendMessage(stream, message):
+    stream.write(json.dumps(message))
+    stream.write("\n")
+    stream.flush()
+
+def receiveMessage(stream):
+    """Receives the next message.
+
+    Returns
+    -------
+    The message, or None if the other end closed the connection."""
+    line = stream.readline()
+    if len(line) == 0:
+        return None
+    return json.loads(line)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestRunningException import TestRunningException
+
+import importlib
+
+try:
+    from concurrent import interpreters as _interpreters
+except ImportError:
+    _interpreters = None
+
+class _ChannelApi:
+    """The private modules used to create subinterpreters and channels
+    between them, before concurrent.interpreters. Their names and functions
+    have changed between versions of python, so each version is described by
+    the modules to import, the prefix of the channel functions, and how the
+    functions are called."""
+
+    # newest first: 3.13, 3.12, then 3.11 and earlier
+    versions = [{ "interpreters" : "_interpreters", "channels" : "_interpchannels",
+                  "prefix" : "", "createArguments" : (1,), # remove unbound items
+                  "sendArguments" : ", blocking = False", "receivesPairs" : True },
+                { "interpreters" : "_xxsubinterpreters", "channels" : "_xxinterpchannels",
+                  "prefix" : "", "createArguments" : (),
+                  "sendArguments" : "", "receivesPairs" : False },
+                { "interpreters" : "_xxsubinterpreters", "channels" : "_xxsubinterpreters",
+                  "prefix" : "channel_", "createArguments" : (),
+                  "sendArguments" : "", "receivesPairs" : False }]
+
+    def __init__(self, version):
+        """Constructor.
+
+        Raises
+        ------
+        ImportError if the modules for the version cannot be imported."""
+        self.interpreters = importlib.import_module(version["interpreters"])
+        self.channels = importlib.import_module(version["channels"])
+        self.version = version
+
+    @staticmethod
+    def find():
+        """Finds the API this version of python has.
+
+        Returns
+        -------
+        A [_ChannelApi], or None if none of the versions are supported."""
+        for version in _ChannelApi.versions:
+            try:
+                api = _ChannelApi(version)
+            except ImportError:
+                continue
+            if api.isComplete():
+                return api
+        return None
+
+    def isComplete(self):
+        """Determines whether every function which is used exists."""
+        return (all(hasattr(self.interpreters, name)
+                    for name in ("create", "destroy", "run_string")) and
+                all(hasattr(self.channels, self.version["prefix"] + name)
+                    for name in ("create", "send", "recv", "destroy")))
+
+    def createChannel(self):
+        return self._channelFunction("create")(*self.version["createArguments"])
+
+    def receive(self, channel):
+        value = self._channelFunction("recv")(channel)
+        if self.version["receivesPairs"]:
+            value = value[0]
+        return value
+
+    def destroyChannel(self, channel):
+        self._channelFunction("destroy")(channel)
+
+    def buildRespondFunction(self):
+        """Builds the source of the respond function run in a subinterpreter,
+        which sends its response down the channel."""
+        return ("import {0}\n"
+                "def respond(response):\n"
+                "    {0}.{1}send(channel, response{2})\n").format(
+            self.version["channels"], self.version["prefix"], self.version["sendArguments"])
+
+    def _channelFunction(self, name):
+        return getattr(self.channels, self.version["prefix"] + name)
+
+_channelApi = None if _interpreters is not None else _ChannelApi.find()
+
+# whether subinterpreters can start threads and fork, found the first time it is needed
+_canStartThreadsAndFork = None
+
+_capabilityProbeScript = """
+import os
+import threading
+try:
+    _thread = threading.Thread(target = lambda: None, daemon = True)
+    _thread.start()
+    _thread.join()
+    _pid = os.fork()
+    if _pid == 0:
+        os._exit(0)
+    os.waitpid(_pid, 0)
+    respond("yes")
+except RuntimeError:
+    respond("no")
+"""
+
+class Subinterpreter:
+    """An interpreter running in this process, with its own modules and state.
+
+    Scripts run in a subinterpreter cannot share objects with the interpreter
+    that created it, so requests and responses are passed as strings. This
+    uses concurrent.interpreters where it is available, and on older
+    versions of python the private modules for subinterpreters and channels
+    which that version has, from 3.11's _xxsubinterpreters to 3.13's
+    _interpreters and _interpchannels."""
+
+    def __init__(self):
+        """Constructor.
+
+        Raises
+        ------
+        TestRunningException if this version of python does not support
+        subinterpreters."""
+        if _interpreters is not None:
+            self._interpreter = _interpreters.create()
+            self._queue = _interpreters.create_queue()
+        elif _channelApi is not None:
+            self._interpreter = _channelApi.interpreters.create()
+            self._channel = _channelApi.createChannel()
+        else:
+            raise TestRunningException("Subinterpreters are not supported by this version of python")
+
+    @staticmethod
+    def isSupported():
+        """Determines whether this version of python supports subinterpreters,
+        with the functions used to pass responses back from them."""
+        return _interpreters is not None or _channelApi is not None
+
+    @staticmethod
+    def isAvailable():
+        """Determines whether subinterpreters are supported, and tests can do
+        everything in them that they can in this interpreter.
+
+        Subinterpreters are isolated from each other, and depending on the
+        version of python this stops them from starting threads, or daemon
+        threads, or forking. Timeouts, and classes which run their methods
+        in threads or isolate their tests, need these, so subinterpreters
+        are only used if a daemon thread can be started and a process
+        forked in one."""
+        global _canStartThreadsAndFork
+        if not Subinterpreter.isSupported():
+            return False
+        if _canStartThreadsAndFork is None:
+            subinterpreter = Subinterpreter()
+            try:
+                _canStartThreadsAndFork = subinterpreter.call(_capabilityProbeScript, "") == "yes"
+            finally:
+                subinterpreter.close()
+        return _canStartThreadsAndFork
+
+    def call(self, script, request):
+        """Runs a script in the subinterpreter and waits for its response.
+
+        Inputs
+        ------
+        script : [str] The python source to run. It can read the request from
+            the variable request, and must pass its response to respond().
+        request : [str] The request to pass to the script.
+
+        Returns
+        -------
+        The string the script passed to respond.
+
+        Raises
+        ------
+        An exception describing the failure, if the script raised one."""
+        if _interpreters is not None:
+            self._interpreter.prepare_main(request = request, responses = self._queue)
+            self._interpreter.exec("def respond(response):\n"
+                                   "    responses.put(response)\n" + script)
+            return self._queue.get()
+
+        # older versions raise the failure, newer ones return a description of it
+        failure = _channelApi.interpreters.run_string(
+            self._interpreter, _channelApi.buildRespondFunction() + script,
+            shared = { "request" : request, "channel" : self._channel })
+        if failure is not None:
+            raise TestRunningException(getattr(failure, "errdisplay", None) or
+                                       getattr(failure, "formatted", str(failure)))
+        return _channelApi.receive(self._channel)
+
+    def close(self):
+        """Destroys the subinterpreter. It cannot be used afterwards."""
+        if _interpreters is not None:
+            self._interpreter.close()
+        else:
+            _channelApi.destroyChannel(self._channel)
+            _channelApi.interpreters.destroy(self._interpreter)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestEventRecorder import TestEventRecorder
+from .ProcessPoolTestExecutor import ProcessPoolTestExecutor
+from .Subinterpreter import Subinterpreter
+from .SuiteReference import SuiteReference
+
+import concurrent.futures
+import json
+import queue
+import sys
+import threading
+
+class SubinterpreterTestExecutor(ProcessPoolTestExecutor):
+    """Runs class suites in a pool of subinterpreters.
+
+    Each worker is a subinterpreter in this process, with its own modules,
+    so test classes are isolated from each other much as they are in worker
+    processes, but without starting processes or pickling suites. Suites are
+    sent to workers as SuiteReferences, and the events from running them are
+    sent back as JSON. A worker keeps its subinterpreter for the whole run,
+    so modules are imported once per worker.
+
+    Whether workers can run python code at the same time depends on the
+    version of python: before 3.12, subinterpreters share a single GIL.
+
+    If this version of python does not support subinterpreters, or they
+    cannot start threads or fork, as in every version up to 3.13, worker
+    processes are used instead, as by ProcessPoolTestExecutor. The limits
+    on worker tests and memory only apply to worker processes."""
+
+    def _createPool(self):
+        if not Subinterpreter.isAvailable():
+            return ProcessPoolTestExecutor._createPool(self)
+        return _SubinterpreterPool(self.workerCount)
+
+    def _submit(self, pool, suite):
+        if not isinstance(pool, _SubinterpreterPool):
+            return ProcessPoolTestExecutor._submit(self, pool, suite)
+        if not SuiteReference.canReference(suite):
+            return None
+        return pool.submit(SuiteReference.fromSuite(suite), self.maxFailures)
+
+# run in each subinterpreter for every suite
+_workerScript = """
+import json
+import sys
+_request = json.loads(request)
+sys.path[:] = _request["path"]
+from WellBehavedPython.Execution.SuiteReference import SuiteReference
+_recorder = SuiteReference.fromDict(_request["reference"]).run(_request["maxFailures"])
+respond(json.dumps(_recorder.toDict()))
+"""
+
+class _SubinterpreterPool:
+    """Pool of threads, each of which runs suites in its own subinterpreter.
+
+    Subinterpreters are created and destroyed on the thread that uses them,
+    since destroying one from another thread can deadlock."""
+
+    def __init__(self, workerCount):
+        self._queue = queue.Queue()
+        self._threads = [threading.Thread(target = self._work, daemon = True)
+                         for i in range(workerCount)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, reference, maxFailures):
+        future = concurrent.futures.Future()
+        self._queue.put((future, reference, maxFailures))
+        return future
+
+    def shutdown(self):
+        for thread in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self):
+        subinterpreter = None
+        try:
+            while True:
+                work = self._queue.get()
+                if work is None:
+                    return
+                future, reference, maxFailures = work
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if subinterpreter is None:
+                        subinterpreter = Subinterpreter()
+                    future.set_result(self._run(subinterpreter, reference, maxFailures))
+                except Exception as ex:
+                    future.set_exception(ex)
+        finally:
+            if subinterpreter is not None:
+                subinterpreter.close()
+
+    def _run(self, subinterpreter, reference, maxFailures):
+        request = json.dumps({ "path" : sys.path,
+                               "reference" : reference.toDict(),
+                               "maxFailures" : maxFailures })
+        response = subinterpreter.call(_workerScript, request)
+        return TestEventRecorder.fromDict(json.loads(response))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestSuite import TestSuite
+from ..History.FlakyHistory import FlakyHistory
+from ..History.LastRunHistory import LastRunHistory
+
+import random
+
+class SuiteOrderer:
+    """Reorders the suites in a suite tree, so that the tests most likely to
+    give useful feedback run first.
+
+    The strategies are:
+
+        failed-first : classes with a test which failed or had an error last run
+        new-first : classes with a test which is new or has changed since last run
+        flaky-first : classes with a test which has been flaky, so that
+            retrying them does not hold up the end of the run
+        flaky-last : classes with a test which has been flaky go last, out
+            of the way of the rest of the run
+        random : a random order, which can be repeated by giving the same seed
+
+    Strategies given earlier take priority over later ones, and suites which
+    no strategy separates keep their original order. Random orders every
+    suite, so strategies after it have no effect.
+
+    Only the order of suites changes. The tests of each class stay together,
+    in their original order, so beforeClass and afterClass still run once
+    per class, and a module suite moves along with the classes in it: it
+    is placed by the highest placed of its classes.
+
+    Suites are only ranked among their siblings, so classes are never moved
+    out of their modules. If two modules both hold a class which failed,
+    the failed class in the later module runs after every class in the
+    earlier one, including those which passed."""
+
+    strategies = ("failed-first", "new-first", "flaky-first", "flaky-last", "random")
+
+    def __init__(self, strategies, lastRun = None, seed = None, flakyHistory = None):
+        """Constructor.
+
+        Inputs
+        ------
+        strategies : [list of str] The strategies to order by, highest
+            priority first.
+        lastRun : The [LastRunHistory] of the previous run. If None, every
+            test is treated as new and none as failed.
+        seed : [int] The seed for the random strategy. If None, one is
+            chosen, and can be read back from seed.
+        flakyHistory : The [FlakyHistory] of earlier runs. If None, no
+            test is treated as flaky.
+
+        Raises
+        ------
+        ValueError if a strategy is not known."""
+        for strategy in strategies:
+            if strategy not in SuiteOrderer.strategies:
+                raise ValueError("Unknown test order {}, expected one of {}".format(
+                        strategy, ", ".join(SuiteOrderer.strategies)))
+        if lastRun is None:
+            # an empty path never loads anything, so there is no last run
+            lastRun = LastRunHistory(path = "")
+        if flakyHistory is None:
+            flakyHistory = FlakyHistory(path = "")
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.orderBy = list(strategies)
+        self.lastRun = lastRun
+        self.flakyHistory = flakyHistory
+        self.seed = seed
+
+    def reorder(self, suite):
+        """Builds a reordered copy of the suite tree.
+
+        Inputs
+        ------
+        suite : The [TestSuite] to reorder. It is not changed.
+
+        Returns
+        -------
+        A [TestSuite] with the same class suites as suite, reordered."""
+        if not isinstance(suite, TestSuite):
+            return suite
+        return self._reorder(suite, random.Random(self.seed))
+
+    def _reorder(self, suite, generator):
+        if suite.isClassSuite() or suite.testClass is None:
+            return suite
+        children = [self._reorder(test, generator) for test in suite.tests]
+        if "random" in self.orderBy:
+            generator.shuffle(children)
+        children.sort(key = self._rank)
+        reordered = TestSuite(suite.suiteName)
+        for child in children:
+            reordered.add(child)
+        return reordered
+
+    def _rank(self, suite):
+        rank = []
+        for strategy in self.orderBy:
+            if strategy == "random":
+                break
+            if strategy == "failed-first":
+                rank.append(0 if self._anyTest(suite, self.lastRun.hasFailed) else 1)
+            elif strategy == "new-first":
+                rank.append(0 if self._anyTest(suite, self.lastRun.isNewOrModified) else 1)
+            elif strategy == "flaky-first":
+                rank.append(0 if self._anyTest(suite, self.flakyHistory.isFlaky) else 1)
+            elif strategy == "flaky-last":
+                rank.append(1 if self._anyTest(suite, self.flakyHistory.isFlaky) else 0)
+        return rank
+
+    def _anyTest(self, suite, predicate):
+        if not isinstance(suite, TestSuite):
+            return not suite.ignore and predicate(suite)
+        return any(self._anyTest(test, predicate) for test in suite.tests)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from ..Engine.TestCase import TestCase
+from ..Engine.TestEventRecorder import TestEventRecorder
+from ..Engine.TestSuite import TestSuite
+
+import importlib
+
+class SuiteReference:
+    """A picklable description of a class suite.
+
+    Test case instances can hold arbitrary state, so rather than sending
+    suites between processes we send the name of the module and class, and
+    the names of the test methods, and rebuild the suite at the other end."""
+
+    def __init__(self, moduleName, className, suiteName, tests, cachedTests = []):
+        """Constructor.
+
+        Inputs
+        ------
+        moduleName : [str] The name of the module the test case class is in
+        className : [str] The name of the test case class within the module
+        suiteName : [str] The name of the suite to build
+        tests : [list of (str, bool)] The test method names, and whether each
+            test is ignored.
+        cachedTests : [list of str] The names of the test methods which are
+            cached passes, and so are not run."""
+        self.moduleName = moduleName
+        self.className = className
+        self.suiteName = suiteName
+        self.tests = tests
+        self.cachedTests = cachedTests
+
+    @staticmethod
+    def canReference(suite):
+        """Determines whether the suite can be rebuilt from a reference.
+
+        This is the case for class suites whose test case class can be found
+        again by importing its module. Classes defined inside functions cannot."""
+        if not isinstance(suite, TestSuite) or not suite.isClassSuite():
+            return False
+        klass = suite.testClass
+        if not issubclass(klass, TestCase):
+            return False
+        try:
+            module = importlib.import_module(klass.__module__)
+        except Exception:
+            return False
+        return SuiteReference.findClass(module, klass.__qualname__) is klass
+
+    @staticmethod
+    def findClass(module, qualifiedName):
+        """Finds a class in a module from its qualified name, which names
+        the classes it is nested in too, such as Outer.Inner.
+
+        Returns
+        -------
+        The class, or None if there is nothing with that name."""
+        found = module
+        for name in qualifiedName.split("."):
+            found = getattr(found, name, None)
+            if found is None:
+                return None
+        return found
+
+    @staticmethod
+    def fromSuite(suite):
+        """Creates a reference to the given class suite.
+
+        Inputs
+        ------
+        suite : The [TestSuite] to reference. This must satisfy canReference.
+
+        Returns
+        -------
+        A [SuiteReference] which will build an equivalent suite."""
+        klass = suite.testClass
+        tests = [(test.testMethodName, test.ignore) for test in suite.tests]
+        cachedTests = [test.testMethodName for test in suite.tests if test.cached]
+        return SuiteReference(klass.__module__, klass.__qualname__, suite.suiteName, tests,
+                              cachedTests)
+
+    def build(self):
+        """Builds the suite that this refers to.
+
+        Returns
+        -------
+        A [TestSuite] configured with the referenced tests."""
+        module = importlib.import_module(self.moduleName)
+        klass = SuiteReference.findClass(module, self.className)
+        if klass is None:
+            raise AttributeError("module '{}' has no class {}".format(self.moduleName,
+                                                                    self.className))
+        suite = TestSuite(self.suiteName)
+        for testMethodName, ignore in self.tests:
+            test = klass()
+            test.configureTest(testMethodName)
+            test.ignore = ignore
+            test.cached = testMethodName in self.cachedTests
+            suite.add(test)
+        return suite
+
+    def run(self, maxFailures = None):
+        """Builds the referenced suite and runs it.
+
+        Inputs
+        ------
+        maxFailures : [int] The number of failures and errors after which
+            no more tests in the suite are started, or None to run them all.
+
+        Returns
+        -------
+        A [TestEventRecorder] holding the events from the run."""
+        return TestEventRecorder(maxFailures).record(self.build())
+
+    def countTests(self):
+        return len(self.tests)
+
+    def toDict(self):
+        """Converts the reference to a dictionary of plain values, for sending as JSON."""
+        return { "moduleName" : self.moduleName,
+                 "className" : self.className,
+                 "suiteName" : self.suiteName,
+                 "tests" : [[name, ignore] for name, ignore in self.tests],
+                 "cachedTests" : list(self.cachedTests) }
+
+    @staticmethod
+    def fromDict(values):
+        """Creates a reference from a dictionary created by toDict."""
+        tests = [(name, ignore) for name, ignore in values["tests"]]
+        return SuiteReference(values["moduleName"], values["className"],
+                              values["suiteName"], tests, values.get("cachedTests", []))
+
+    def __repr__(self):
+        return "SuiteReference({}.{})".format(self.moduleName, self.className)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestSuite import TestSuite
+
+import re
+
+class SuiteSelector:
+    """Selects some of the tests in a suite tree.
+
+    The selected tests are put in a copy of the tree with the same
+    structure, so they are reported as they would be in a full run. Class
+    suites keep their test case class, so beforeClass and afterClass still
+    run, but only for classes with selected tests."""
+
+    def __init__(self, predicate):
+        """Constructor.
+
+        Inputs
+        ------
+        predicate : Called with each configured test. Returns True to select it."""
+        self.predicate = predicate
+
+    @staticmethod
+    def matching(patterns):
+        """Creates a selector for the tests whose identifiers, such as
+        package.module.Class.test_method, contain a match for any of the
+        regular expressions."""
+        expressions = [re.compile(pattern) for pattern in patterns]
+        return SuiteSelector(lambda test: any(
+                expression.search(test.getTestIdentifier()) for expression in expressions))
+
+    def select(self, suite):
+        """Builds a copy of the suite tree holding only the selected tests.
+
+        Inputs
+        ------
+        suite : The [TestSuite] to select from. It is not changed.
+
+        Returns
+        -------
+        A [TestSuite], which is empty if no tests were selected."""
+        selected = self._select(suite)
+        if selected is None:
+            return TestSuite(getattr(suite, "suiteName", ""))
+        return selected
+
+    def _select(self, suite):
+        if not isinstance(suite, TestSuite):
+            return suite if self.predicate(suite) else None
+        selected = TestSuite(suite.suiteName)
+        for test in suite.tests:
+            child = self._select(test)
+            if child is not None:
+                selected.add(child)
+        if len(selected.tests) == 0:
+            return None
+        return selected
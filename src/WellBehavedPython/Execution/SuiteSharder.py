@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestSuite import TestSuite
+from ..History.DurationHistory import DurationHistory
+
+class SuiteSharder:
+    """Splits a suite into shards which can be run separately, such as on
+    different machines.
+
+    Whole class suites are assigned to shards, so beforeClass and afterClass
+    still run once per class. Classes are assigned longest first, each to
+    the shard with the least work so far, using the durations from a
+    DurationHistory; this balances the shards by time rather than by number
+    of tests. The assignment only depends on the suite and the history, so
+    every machine given the same history computes the same shards."""
+
+    def __init__(self, shardCount, history = None):
+        """Constructor.
+
+        Inputs
+        ------
+        shardCount : [int] The number of shards to split suites into.
+        history : The [DurationHistory] to balance the shards with. If None,
+            every test is assumed to take the same time."""
+        if shardCount < 1:
+            raise ValueError("There must be at least one shard, not {}".format(shardCount))
+        if history is None:
+            # an empty path never loads anything, so every test gets the default duration
+            history = DurationHistory(path = "")
+        self.shardCount = shardCount
+        self.history = history
+
+    def assignShards(self, suite):
+        """Assigns each class suite within the suite to a shard.
+
+        Returns
+        -------
+        A list, with one entry per shard, of the class suites in that shard."""
+        classSuites = []
+        self._listClassSuites(suite, (), classSuites)
+        classSuites.sort(key = lambda entry: (-self.history.estimateDuration(entry[1]),
+                                              entry[1].testClass.getTestClassIdentifier(),
+                                              entry[0]))
+        shards = [[] for i in range(self.shardCount)]
+        loads = [0.0] * self.shardCount
+        for path, classSuite in classSuites:
+            index = loads.index(min(loads))
+            shards[index].append(classSuite)
+            loads[index] += self.history.estimateDuration(classSuite)
+        return shards
+
+    def buildShard(self, suite, shardIndex):
+        """Builds the suite for one shard.
+
+        Inputs
+        ------
+        suite : The [TestSuite] to split
+        shardIndex : [int] The shard to build, counting from 0.
+
+        Returns
+        -------
+        A [TestSuite] with the same structure as suite, but only holding the
+        class suites assigned to the shard."""
+        if shardIndex < 0 or shardIndex >= self.shardCount:
+            raise ValueError("Shard {} is not between 0 and {}".format(
+                    shardIndex, self.shardCount - 1))
+        if not isinstance(suite, TestSuite):
+            return suite if shardIndex == 0 else TestSuite()
+        keep = set(id(classSuite) for classSuite in self.assignShards(suite)[shardIndex])
+        shard = self._prune(suite, keep)
+        if shard is None:
+            shard = TestSuite(suite.suiteName)
+        return shard
+
+    @staticmethod
+    def parseShard(text):
+        """Parses a shard given as i/n on the command line, where i counts from 1.
+
+        Returns
+        -------
+        A tuple of the shard index counting from 0, and the number of shards."""
+        number, separator, count = text.partition("/")
+        if separator != "/" or not number.isdigit() or not count.isdigit():
+            raise ValueError("Shards must be given as i/n, not '{}'".format(text))
+        number = int(number)
+        count = int(count)
+        if number < 1 or number > count:
+            raise ValueError("Shard {} must be between 1 and {}".format(number, count))
+        return (number - 1, count)
+
+    def _listClassSuites(self, suite, path, classSuites):
+        if not isinstance(suite, TestSuite):
+            return
+        path = path + (suite.suiteName,)
+        if suite.isClassSuite():
+            classSuites.append(("/".join(path), suite))
+            return
+        for test in suite.tests:
+            self._listClassSuites(test, path, classSuites)
+
+    def _prune(self, suite, keep):
+        if suite.isClassSuite():
+            return suite if id(suite) in keep else None
+        pruned = TestSuite(suite.suiteName)
+        for test in suite.tests:
+            child = self._prune(test, keep)
+            if child is not None:
+                pruned.add(child)
+        if len(pruned.tests) == 0:
+            return None
+        return pruned
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.ForkedCall import describeExitCode
+from ..Engine.TestEventRecorder import TestEventRecorder
+from ..Engine.TestResults import TestResults
+from ..Engine.TestRunningException import TestRunningException
+from .SuiteReference import SuiteReference
+from .SystemLoadMonitor import readPeakMemory, readResidentMemory, resetPeakMemory
+
+import atexit
+import concurrent.futures
+import multiprocessing
+import queue
+import re
+import threading
+import traceback
+
+class SupervisedProcessPool:
+    """Pool of worker processes which replaces workers that die.
+
+    Each worker runs one class suite at a time and sends the events from it
+    back as they happen, so when a worker dies, for example because a C
+    extension crashed, it is known which test it was running. That test is
+    registered as an error saying how the worker died, a new worker is
+    started, and the tests in the suite which had not started are run on
+    it. A crash costs only the test that was running when it happened.
+
+    If the worker dies in beforeClass, every test in the suite is registered
+    as an error, and if it dies in afterClass, afterClass is registered as
+    an error.
+
+    Workers measure their peak resident memory while running each suite,
+    and it is returned as the peakMemory of the suite's recorder.
+
+    Tests which leak memory make long lived workers grow. A worker can be
+    recycled, that is stopped and replaced by a new one, once it has run
+    maxTestsPerWorker tests or its resident memory has grown beyond
+    maxWorkerMemory. Workers are only recycled between suites, so a class
+    is always run by one worker. A worker is also recycled once a suite
+    leaves threads of its own running, such as a call abandoned by a
+    Watchdog when a test timed out, since forking isolated tests from it
+    could deadlock on locks those threads hold. A memoryLimit caps the address space of
+    each worker with RLIMIT_AS, where the platform supports it, so a test
+    which tries to use too much memory gets a MemoryError, and is
+    registered as an error, instead of exhausting the machine. If the
+    worker dies instead, that is registered as an error like any crash.
+
+    Workers are not daemonic, so tests can start processes of their own.
+    Any workers still running when the interpreter exits are terminated.
+
+    The pool has the submit and shutdown methods of a concurrent.futures
+    executor, so it can be used as the pool for a ParallelTestExecutor."""
+
+    def __init__(self, workerCount, context = None, maxTestsPerWorker = None,
+                 maxWorkerMemory = None, memoryLimit = None):
+        """Constructor.
+
+        Inputs
+        ------
+        workerCount : [int] The number of worker processes.
+        context : The multiprocessing context used to start workers, or None
+            for the default one.
+        maxTestsPerWorker : [int] The number of tests after which a worker is
+            recycled, or None to never recycle by test count.
+        maxWorkerMemory : [int] The resident memory in bytes above which a
+            worker is recycled, or None to never recycle by memory.
+        memoryLimit : [int] The address space in bytes each worker may use,
+            or None for no limit."""
+        self.context = context or multiprocessing.get_context()
+        self.maxTestsPerWorker = maxTestsPerWorker
+        self.maxWorkerMemory = maxWorkerMemory
+        self.memoryLimit = memoryLimit
+        self.workersStarted = 0
+        self.workersRecycled = 0
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        # non-daemonic workers would otherwise be waited for at exit
+        atexit.register(self._terminateWorkers)
+        self._threads = [threading.Thread(target = self._superviseWorker, daemon = True)
+                         for i in range(workerCount)]
+        for thread in self._threads:
+            thread.start()
+
+    @staticmethod
+    def parseMemorySize(text):
+        """Parses a memory size written as a number of bytes, optionally
+        followed by K, M or G for kibibytes, mebibytes or gibibytes.
+
+        Raises
+        ------
+        ValueError if the text is not in that form."""
+        match = re.fullmatch(r"\s*(\d+)\s*([KMG]?)B?\s*", text, re.IGNORECASE)
+        if match is None:
+            raise ValueError("Memory size {} is not a number of bytes, K, M or G".format(text))
+        power = " KMG".index(match.group(2).upper() or " ")
+        return int(match.group(1)) * 1024 ** power
+
+    def submit(self, reference, maxFailures = None):
+        """Queues a suite to be run by the next free worker.
+
+        Inputs
+        ------
+        reference : The [SuiteReference] of the suite to run.
+        maxFailures : [int] The number of failures and errors after which
+            no more tests in the suite are started, or None to run them all.
+
+        Returns
+        -------
+        A future whose result is a TestEventRecorder holding the suite's events."""
+        future = concurrent.futures.Future()
+        self._jobs.put((reference, maxFailures, future))
+        return future
+
+    def shutdown(self, wait = True):
+        """Stops the workers once the queued suites are done."""
+        for thread in self._threads:
+            self._jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+            atexit.unregister(self._terminateWorkers)
+
+    def _terminateWorkers(self):
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.terminate()
+
+    def _superviseWorker(self):
+        worker = None
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    return
+                reference, maxFailures, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    recorder, worker = self._runSuite(worker, reference, maxFailures)
+                except Exception as ex:
+                    future.set_exception(ex)
+                    continue
+                if worker is not None and self._shouldRecycle(worker):
+                    self._stopWorker(worker)
+                    worker = None
+                    with self._lock:
+                        self.workersRecycled += 1
+                future.set_result(recorder)
+        finally:
+            if worker is not None:
+                self._stopWorker(worker)
+
+    def _runSuite(self, worker, reference, maxFailures):
+        recorder = TestEventRecorder()
+        attempt = reference
+        while attempt is not None:
+            if worker is None:
+                worker = self._startWorker()
+            events, output, peakMemory, exitDescription = worker.run(attempt, maxFailures)
+            if attempt is not reference and len(events) > 0:
+                # the suite was started by the first attempt
+                events = events[1:]
+            recorder.events.extend(events)
+            recorder.output += output
+            if peakMemory is not None:
+                recorder.peakMemory = max(peakMemory, recorder.peakMemory or 0)
+            if exitDescription is None:
+                return recorder, worker
+            self._stopWorker(worker)
+            worker = None
+            attempt = self._recordCrash(recorder, reference, attempt, events, exitDescription)
+        return recorder, worker
+
+    def _startWorker(self):
+        worker = _Worker(self.context, self.memoryLimit)
+        with self._lock:
+            self.workersStarted += 1
+            self._workers.add(worker)
+        return worker
+
+    def _stopWorker(self, worker):
+        worker.stop()
+        with self._lock:
+            self._workers.discard(worker)
+
+    def _shouldRecycle(self, worker):
+        if self.maxTestsPerWorker is not None and worker.testsRun >= self.maxTestsPerWorker:
+            return True
+        if worker.hasOtherThreads:
+            return True
+        return (self.maxWorkerMemory is not None and worker.residentMemory is not None and
+                worker.residentMemory >= self.maxWorkerMemory)
+
+    def _recordCrash(self, recorder, reference, attempt, events, exitDescription):
+        """Records the events the crashed worker did not, and works out which
+        tests are still to run.
+
+        Returns
+        -------
+        A SuiteReference to the tests in the suite which have not started,
+        or None if there are none that can be run."""
+        def record(eventName, *arguments):
+            recorder.events.append((eventName, arguments, TestResults.now()))
+
+        suiteName = reference.suiteName
+        started = [arguments[1] for eventName, arguments, time in events
+                   if eventName == "registerTestStarted"]
+        finished = [arguments[1] for eventName, arguments, time in events
+                    if eventName in ("registerTestPassed", "registerTestFailed",
+                                     "registerTestError", "registerTestIgnored",
+                                     "registerTestCached")]
+        if len(recorder.events) == 0:
+            record("registerSuiteStarted", suiteName)
+
+        if len(started) > 0 and started[-1] not in finished:
+            stackTrace = ["Worker process {} while running the test\n".format(exitDescription)]
+            record("registerTestError", "", started[-1], stackTrace, 1)
+        elif len(started) == 0:
+            stackTrace = ["Worker process {} in beforeClass\n".format(exitDescription)]
+            record("registerTestError", suiteName, "beforeClass", stackTrace, len(attempt.tests))
+            record("registerSuiteCompleted", suiteName)
+            return None
+
+        remaining = [test for test in attempt.tests if test[0] not in started]
+        if len(remaining) == 0:
+            if len(finished) == len(started):
+                stackTrace = ["Worker process {} in afterClass\n".format(exitDescription)]
+                record("registerTestError", suiteName, "afterClass", stackTrace, 1)
+            record("registerSuiteCompleted", suiteName)
+            return None
+        return SuiteReference(reference.moduleName, reference.className, suiteName, remaining,
+                              reference.cachedTests)
+
+# seconds a worker is given to finish before it is terminated
+_stopTimeout = 5
+
+class _Worker:
+    """A worker process, and the connection used to talk to it."""
+
+    def __init__(self, context, memoryLimit = None):
+        self.testsRun = 0
+        self.residentMemory = None
+        self.hasOtherThreads = False
+        self._connection, childConnection = context.Pipe()
+        # not daemonic, since daemonic processes cannot start processes
+        self._process = context.Process(target = _runWorker,
+                                        args = (childConnection, memoryLimit))
+        self._process.start()
+        childConnection.close()
+
+    def run(self, reference, maxFailures):
+        """Runs the suite on the worker.
+
+        Returns
+        -------
+        A tuple of the events received, the output of the suite, the peak
+        memory used by the worker, and a description of how the worker
+        died, or None if it did not. The peak memory is None if it could
+        not be measured. Afterwards hasOtherThreads says whether the suite
+        left threads running in the worker."""
+        events = []
+        try:
+            self._connection.send((reference.toDict(), maxFailures))
+            while True:
+                message = self._connection.recv()
+                if message[0] == "event":
+                    events.append(message[1])
+                    if message[1][0] == "registerTestStarted":
+                        self.testsRun += 1
+                elif message[0] == "done":
+                    self.residentMemory = message[3]
+                    self.hasOtherThreads = message[4]
+                    return events, message[1], message[2], None
+                else:
+                    raise TestRunningException(message[1])
+        except (EOFError, OSError):
+            self._process.join(_stopTimeout)
+            if self._process.is_alive():
+                self.terminate()
+            self._connection.close()
+            return events, "", None, describeExitCode(self._process.exitcode)
+
+    def stop(self):
+        """Asks the worker to finish, terminating it if it does not."""
+        try:
+            self._connection.send(None)
+        except OSError:
+            pass
+        self._process.join(_stopTimeout)
+        if self._process.is_alive():
+            self.terminate()
+        self._connection.close()
+
+    def terminate(self):
+        """Kills the worker, without waiting for it to finish what it is doing."""
+        self._process.terminate()
+        self._process.join()
+
+class _PipeRecorder(TestEventRecorder):
+    """Recorder which sends each event down a pipe as it is recorded."""
+
+    def __init__(self, connection, maxFailures):
+        TestEventRecorder.__init__(self, maxFailures)
+        self._connection = connection
+
+    def _record(self, eventName, *arguments):
+        TestEventRecorder._record(self, eventName, *arguments)
+        self._connection.send(("event", self.events[-1]))
+
+def _runWorker(connection, memoryLimit):
+    """The main loop of a worker process."""
+    if memoryLimit is not None:
+        _limitAddressSpace(memoryLimit)
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        values, maxFailures = job
+        try:
+            suite = SuiteReference.fromDict(values).build()
+        except Exception:
+            connection.send(("failed", traceback.format_exc()))
+            continue
+        measured = resetPeakMemory()
+        recorder = _PipeRecorder(connection, maxFailures).record(suite)
+        peakMemory = readPeakMemory() if measured else None
+        connection.send(("done", recorder.output, peakMemory, readResidentMemory(),
+                         threading.active_count() > 1))
+
+def _limitAddressSpace(memoryLimit):
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            memoryLimit = min(memoryLimit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (memoryLimit, hard))
+    except (ImportError, AttributeError, ValueError, OSError):
+        pass
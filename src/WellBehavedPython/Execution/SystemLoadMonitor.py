@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import threading
+import time
+
+class SystemLoadMonitor:
+    """Decides how many class suites a parallel run should have running,
+    from the load average and available memory of the machine.
+
+    The readings are taken from /proc/loadavg and /proc/meminfo, at most
+    once every interval seconds. The number of workers starts at the number
+    of cpus which are not already busy, and is then adjusted by one at each
+    reading: it shrinks while the one minute load average is above the
+    number of cpus, or available memory is below the reserve, and grows
+    while there are cpus to spare and memory is not short. It always stays
+    between minWorkers and maxWorkers.
+
+    If a MemoryHistory is given, a class whose recorded peak memory is
+    more than is available above the reserve is held back until memory is
+    freed, unless nothing else is running. Memory expected to be used by
+    classes started since the last reading is taken off what is available.
+
+    Where /proc cannot be read, maxWorkers are used and nothing is held back."""
+
+    def __init__(self, maxWorkers, minWorkers = 1, memoryHistory = None,
+                 memoryReserve = None, interval = 2.0, procPath = "/proc"):
+        """Constructor.
+
+        Inputs
+        ------
+        maxWorkers : [int] The most class suites to run at once.
+        minWorkers : [int] The fewest class suites to run at once.
+        memoryHistory : The [MemoryHistory] giving the memory used by each
+            class, or None to not hold classes back.
+        memoryReserve : [int] The bytes of memory to leave free. If None, a
+            tenth of the total memory is kept in reserve.
+        interval : [float] The least time in seconds between readings.
+        procPath : [str] Where the proc filesystem is mounted."""
+        self.maxWorkers = maxWorkers
+        self.minWorkers = min(minWorkers, maxWorkers)
+        self.memoryHistory = memoryHistory
+        self.memoryReserve = memoryReserve
+        self.interval = interval
+        self.procPath = procPath
+        self.cpuCount = os.cpu_count() or 1
+        self.workerCount = None
+        self._totalMemory = None
+        self._availableMemory = None
+        self._expectedMemory = 0
+        self._lastReading = None
+        self._lock = threading.Lock()
+
+    def readLoadAverage(self):
+        """Reads the one minute load average, or None if it cannot be read."""
+        try:
+            with open(os.path.join(self.procPath, "loadavg")) as file:
+                return float(file.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def readMemory(self):
+        """Reads the total and available memory.
+
+        Returns
+        -------
+        A (total, available) tuple of byte counts, or None if they cannot be read."""
+        values = {}
+        try:
+            with open(os.path.join(self.procPath, "meminfo")) as file:
+                for line in file:
+                    name, separator, value = line.partition(":")
+                    if name in ("MemTotal", "MemAvailable"):
+                        values[name] = int(value.split()[0]) * 1024
+        except (OSError, ValueError, IndexError):
+            return None
+        if len(values) != 2:
+            return None
+        return values["MemTotal"], values["MemAvailable"]
+
+    def getWorkerCount(self):
+        """Gets the number of class suites which should be running now."""
+        with self._lock:
+            self._updateIfDue()
+            return self.workerCount
+
+    def canStart(self, testClass, running):
+        """Determines whether a class suite can start without running short of memory.
+
+        Inputs
+        ------
+        testClass : The test case class of the suite.
+        running : [int] The number of class suites already running."""
+        with self._lock:
+            self._updateIfDue()
+            expected = self._getExpectedMemory(testClass)
+            if running == 0 or expected is None or self._availableMemory is None:
+                return True
+            return expected <= self._availableMemory - self._expectedMemory - self._getReserve()
+
+    def suiteStarted(self, testClass):
+        """Tells the monitor that a class suite has been started, so that
+        its memory is counted until the next reading sees it."""
+        with self._lock:
+            self._updateIfDue()
+            self._expectedMemory += self._getExpectedMemory(testClass) or 0
+
+    def recordPeakMemory(self, testClass, peakMemory):
+        """Records the peak memory a class suite used, in the memory history if there is one."""
+        if self.memoryHistory is not None and peakMemory is not None:
+            self.memoryHistory.recordClassMemory(testClass, peakMemory)
+
+    def _getExpectedMemory(self, testClass):
+        if self.memoryHistory is None:
+            return None
+        return self.memoryHistory.getClassMemory(testClass)
+
+    def _getReserve(self):
+        if self.memoryReserve is not None:
+            return self.memoryReserve
+        return self._totalMemory // 10
+
+    def _updateIfDue(self):
+        now = time.monotonic()
+        if self._lastReading is not None and now - self._lastReading < self.interval:
+            return
+        self._lastReading = now
+        load = self.readLoadAverage()
+        memory = self.readMemory()
+        self._expectedMemory = 0
+        if memory is None:
+            self._availableMemory = None
+        else:
+            self._totalMemory, self._availableMemory = memory
+
+        if self.workerCount is None:
+            workerCount = self.maxWorkers
+            if load is not None:
+                workerCount = round(self.cpuCount - load)
+        else:
+            workerCount = self.workerCount
+            if self._isUnderPressure(load):
+                workerCount -= 1
+            elif load is not None and load < self.cpuCount - 1:
+                workerCount += 1
+        self.workerCount = max(self.minWorkers, min(workerCount, self.maxWorkers))
+
+    def _isUnderPressure(self, load):
+        if load is not None and load > self.cpuCount:
+            return True
+        return self._availableMemory is not None and self._availableMemory < self._getReserve()
+
+def resetPeakMemory():
+    """Resets the recorded peak resident memory of this process, where the
+    platform allows it.
+
+    Returns
+    -------
+    True if the peak was reset, so that readPeakMemory will give the peak
+    since now, or False if it gives the peak since the process started."""
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+def readResidentMemory():
+    """Reads the resident memory of this process in bytes, or None if it
+    cannot be read."""
+    return _readStatusValue("VmRSS:")
+
+def readPeakMemory():
+    """Reads the peak resident memory of this process in bytes, or None if
+    it cannot be read."""
+    peakMemory = _readStatusValue("VmHWM:")
+    if peakMemory is not None:
+        return peakMemory
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _readStatusValue(name):
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith(name):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
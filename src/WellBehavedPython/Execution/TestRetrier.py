@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from ..Engine.TestResults import TestResults
+from ..Engine.TestSuite import TestSuite
+from ..History.ResultsHistory import ResultsHistory
+
+class TestRetrier:
+    """Runs the tests which failed or had errors again, to find the flaky
+    ones: those which pass when they are run again.
+
+    Retries happen once the rest of the run is over, one test at a time,
+    so a test is not competing with other tests when it runs again. Each
+    retry runs a fresh copy of the test on its own in a copy of its class
+    suite, so it runs as it did the first time: beforeClass and afterClass
+    run around it, and the class's isolation and timeouts apply. A test is
+    retried until it passes or has been run the given number of times. The
+    results of a test which passes are marked flaky, so it counts as a pass.
+
+    Failures in beforeClass and afterClass are not retried."""
+
+    def __init__(self, retries):
+        """Constructor.
+
+        Inputs
+        ------
+        retries : [int] The most times to run each failed test again."""
+        self.retries = retries
+
+    def retry(self, suite, results):
+        """Runs the failed tests in a suite again, and marks those which
+        pass as flaky in the results.
+
+        Inputs
+        ------
+        suite : The [TestSuite] which was run.
+        results : The [TestResults] from running it, as registered with a
+            runner, so the suite's own results are a child of them.
+
+        Returns
+        -------
+        A list of the flaky tests."""
+        flaky = []
+        for classSuite, test, testResults in self._findFailedTests(suite, results):
+            if self.runAgain(test, classSuite):
+                testResults.markFlaky()
+                flaky.append(test)
+        return flaky
+
+    def findFailedTests(self, suite, results):
+        """Pairs up the tests in a suite which failed or had errors with their results.
+
+        Returns
+        -------
+        A list of (test, results) tuples, in the order the tests ran."""
+        return [(test, testResults) for classSuite, test, testResults
+                in self._findFailedTests(suite, results)]
+
+    def runAgain(self, test, classSuite):
+        """Runs a test again, on its own, until it passes or has run retries times.
+
+        Inputs
+        ------
+        test : The configured [TestCase] to run again.
+        classSuite : The class [TestSuite] the test first ran in.
+
+        Returns
+        -------
+        True if the test passed."""
+        for attempt in range(self.retries):
+            suite = TestRetrier._buildRetrySuite(test, classSuite)
+            results = TestResults()
+            suite.run(results)
+            if results.countFailures() + results.countErrors() == 0 and results.countPasses() > 0:
+                return True
+        return False
+
+    @staticmethod
+    def _buildRetrySuite(test, classSuite):
+        copy = classSuite.testClass()
+        copy.configureTest(test.testMethodName)
+        suite = TestSuite(classSuite.suiteName)
+        suite.add(copy)
+        return suite
+
+    def _findFailedTests(self, suite, results):
+        failed = []
+        for classSuite, classResults in ResultsHistory.findClassResults(suite, results):
+            for test, testResults in ResultsHistory.findTestResults(classSuite, classResults):
+                if testResults.countFailures() + testResults.countErrors() > 0:
+                    failed.append((classSuite, test, testResults))
+        return failed
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestEventRecorder import TestEventRecorder
+from ..Engine.TestSuite import TestSuite
+from ..Engine.ThreadLocalStream import ThreadLocalStream
+from .ParallelTestExecutor import ParallelTestExecutor
+
+import concurrent.futures
+import sys
+
+class ThreadPoolTestExecutor(ParallelTestExecutor):
+    """Runs class suites in a pool of threads.
+
+    This suits suites which spend most of their time waiting on I/O, such as
+    sockets and subprocesses, rather than computing. Output written by each
+    test is routed to the recorder on its own thread, so it stays with the
+    test that wrote it.
+
+    Starting a process while other threads are running copies any locks they
+    hold, so the new process can deadlock and the test wait for it forever.
+    Classes which start processes, because their isolation or parallelMethods
+    fork them, or because they set usesProcesses, are therefore run one after
+    another on the calling thread before the pool starts. Their results are
+    registered in suite order with the rest."""
+
+    def __init__(self, workerCount = None, history = None, resourceLimits = None,
+                 loadMonitor = None):
+        """Constructor. The inputs are as for ParallelTestExecutor."""
+        ParallelTestExecutor.__init__(self, workerCount, history, resourceLimits, loadMonitor)
+        self._processSuiteFutures = {}
+
+    def run(self, suite, results):
+        stdout = sys.stdout
+        stderr = sys.stderr
+        if not isinstance(stdout, ThreadLocalStream):
+            sys.stdout = ThreadLocalStream(stdout)
+        if not isinstance(stderr, ThreadLocalStream):
+            sys.stderr = ThreadLocalStream(stderr)
+        try:
+            if isinstance(suite, TestSuite):
+                self._runProcessSuites(suite, getattr(results, "maxFailures", None))
+            ParallelTestExecutor.run(self, suite, results)
+        finally:
+            self._processSuiteFutures = {}
+            sys.stdout = stdout
+            sys.stderr = stderr
+
+    def _runProcessSuites(self, suite, maxFailures):
+        failures = 0
+        for classSuite in suite.listClassSuites():
+            if classSuite.isCached() or not classSuite.startsProcesses():
+                continue
+            future = concurrent.futures.Future()
+            if maxFailures is not None and failures >= maxFailures:
+                future.cancel()
+            else:
+                recorder = TestEventRecorder(maxFailures).record(classSuite)
+                failures += recorder.countFailures()
+                future.set_result(recorder)
+            self._processSuiteFutures[id(classSuite)] = future
+
+    def _createPool(self):
+        return concurrent.futures.ThreadPoolExecutor(self.workerCount)
+
+    def _submit(self, pool, suite):
+        future = self._processSuiteFutures.get(id(suite))
+        if future is not None:
+            return future
+        return pool.submit(TestEventRecorder(self.maxFailures).record, suite)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.ForkedCall import freezeSharedObjects
+from ..Engine.TestSuite import TestSuite
+from .ProcessPoolTestExecutor import ProcessPoolTestExecutor
+
+import gc
+import multiprocessing
+
+class WarmProcessPoolTestExecutor(ProcessPoolTestExecutor):
+    """Runs class suites in worker processes forked from a process which has
+    already imported the test modules.
+
+    With the fork start method, this process is the template: the modules
+    were imported when the tests were discovered, so workers start with them
+    already loaded. With the forkserver start method, the test modules of the
+    suite being run are preloaded into the forkserver, which then forks the
+    workers. Either way, the garbage collector is frozen in the template
+    before forking, so collections in the workers do not write to, and so
+    copy, the memory pages shared with the template.
+
+    The collector is only unfrozen after the run if this executor froze it,
+    so objects frozen by something else stay frozen.
+
+    The forkserver is shared by everything in this process, and preloading
+    only has an effect before it first starts."""
+
+    def __init__(self, workerCount = None, history = None, startMethod = None,
+                 resourceLimits = None, loadMonitor = None, maxTestsPerWorker = None,
+                 maxWorkerMemory = None, workerMemoryLimit = None):
+        """Constructor.
+
+        Inputs
+        ------
+        workerCount : [int] The number of workers to use. If None, one worker
+            per cpu is used.
+        history : The [DurationHistory] used to order class suites, or None to
+            submit them in suite order.
+        startMethod : [str] Either "fork" or "forkserver". If None, fork is used
+            where the platform supports it.
+        resourceLimits : [dict] Maps resource token names to the total weight
+            of running suites which may use them at once.
+        loadMonitor : The [SystemLoadMonitor] used to adapt the number of
+            suites running at once, or None to keep every worker busy.
+        maxTestsPerWorker : [int] The number of tests after which a worker is
+            replaced, or None to keep it.
+        maxWorkerMemory : [int] The resident memory in bytes above which a
+            worker is replaced, or None to keep it.
+        workerMemoryLimit : [int] The address space in bytes each worker may
+            use, or None for no limit."""
+        ProcessPoolTestExecutor.__init__(self, workerCount, history, resourceLimits,
+                                         loadMonitor, maxTestsPerWorker, maxWorkerMemory,
+                                         workerMemoryLimit)
+        if startMethod is None:
+            startMethod = WarmProcessPoolTestExecutor.getDefaultStartMethod()
+        self.startMethod = startMethod
+        self._preloadModules = []
+
+    @staticmethod
+    def getDefaultStartMethod():
+        methods = multiprocessing.get_all_start_methods()
+        if "fork" in methods:
+            return "fork"
+        return "forkserver"
+
+    def run(self, suite, results):
+        if isinstance(suite, TestSuite):
+            self._preloadModules = suite.listTestModules()
+        frozen = self.startMethod == "fork" and freezeSharedObjects()
+        try:
+            ProcessPoolTestExecutor.run(self, suite, results)
+        finally:
+            if frozen:
+                gc.unfreeze()
+
+    def _createPool(self):
+        context = multiprocessing.get_context(self.startMethod)
+        if self.startMethod == "forkserver":
+            preload = self._preloadModules + [
+                "WellBehavedPython.Execution.FreezeGarbageCollector"]
+            context.set_forkserver_preload(preload)
+        return self._createSupervisedPool(context)
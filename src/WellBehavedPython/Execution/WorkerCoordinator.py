@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestEventRecorder import TestEventRecorder
+from .SocketMessages import *
+
+import concurrent.futures
+import os
+import queue
+import threading
+
+class WorkerCoordinator:
+    """Hands out class suites to workers which connect over a socket.
+
+    The coordinator listens on an address, and each worker that connects is
+    sent one suite at a time. Workers stream the events from each suite back
+    as they happen. The coordinator has the submit and shutdown methods of a
+    concurrent.futures executor, so it can be used as the pool for a
+    ParallelTestExecutor.
+
+    If the run is stopping when a suite is about to be handed out, that
+    suite and every queued one are cancelled, and connected workers are
+    told to stop.
+
+    Workers on other machines could ask to run, and so import, any module,
+    so listening where they can connect needs a token, which each worker
+    must prove it knows before it is sent suites. See SocketMessages."""
+
+    def __init__(self, address, shouldStop = None, token = None):
+        """Constructor. Starts listening straight away.
+
+        Inputs
+        ------
+        address : A (host, port) tuple to listen on TCP, or a path string to
+            listen on a Unix socket. A port of 0 picks a free port; the address
+            actually used is available from the address attribute.
+        shouldStop : A callable taking no arguments, which returns True once
+            no more suites should be handed out, or None to hand out every
+            suite.
+        token : [str] The token workers must know, or None to accept any
+            worker, which is only allowed on addresses local to this machine.
+
+        Raises
+        ------
+        ValueError if the address can be connected to from other machines,
+        but no token is given."""
+        if token is None and not isLocalAddress(address):
+            raise ValueError("workers on other machines can connect to {}, so a token is "
+                             "needed to authenticate them".format(address))
+        self.token = token
+        if isinstance(address, str) and os.path.exists(address):
+            os.remove(address)
+        self._listener = createSocket(address)
+        self._listener.bind(address)
+        self._listener.listen()
+        self.address = self._listener.getsockname()
+        self._shouldStop = shouldStop
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._threads = []
+        self._closed = False
+        self._acceptThread = threading.Thread(target = self._acceptWorkers, daemon = True)
+        self._acceptThread.start()
+
+    def submit(self, reference, maxFailures = None):
+        """Queues a suite to be run by the next free worker.
+
+        Inputs
+        ------
+        reference : The [SuiteReference] of the suite to run.
+        maxFailures : [int] The number of failures and errors after which
+            no more tests in the suite are started, or None to run them all.
+
+        Returns
+        -------
+        A future whose result is a TestEventRecorder holding the suite's
+        events. It is cancelled if the run stops before the suite is handed out."""
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self._stopping:
+                future.cancel()
+            else:
+                self._jobs.put((reference, maxFailures, future))
+        return future
+
+    def shutdown(self, wait = True):
+        """Tells connected workers to stop once the queued suites are done,
+        and stops accepting new workers."""
+        self._closed = True
+        self._jobs.put(None)
+        try:
+            self._listener.close()
+        except OSError:
+            pass
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _acceptWorkers(self):
+        while not self._closed:
+            try:
+                connection, address = self._listener.accept()
+            except OSError:
+                return
+            thread = threading.Thread(target = self._serveWorker, args = (connection,),
+                                      daemon = True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _serveWorker(self, connection):
+        stream = openStream(connection)
+        try:
+            if self.token is not None:
+                authenticate(stream, self.token, "coordinator")
+            while True:
+                job = self._jobs.get()
+                if job is not None and self._shouldStop is not None and self._shouldStop():
+                    self._cancelJobs(job)
+                    job = None
+                if job is None:
+                    # leave the marker for the other workers
+                    self._jobs.put(None)
+                    sendMessage(stream, { "type" : "stop" })
+                    return
+                reference, maxFailures, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    recorder = self._runOnWorker(stream, reference, maxFailures)
+                except Exception as ex:
+                    future.set_exception(ex)
+                    return
+                future.set_result(recorder)
+        except (OSError, ValueError, KeyError, AuthenticationError):
+            # the worker went away, or is not one of ours
+            pass
+        finally:
+            stream.close()
+            connection.close()
+
+    def _cancelJobs(self, job):
+        """Cancels the job and every queued one, which no worker will run
+        now that they are being stopped."""
+        with self._lock:
+            self._stopping = True
+            while job is not None:
+                job[-1].cancel()
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    job = None
+
+    def _runOnWorker(self, stream, reference, maxFailures):
+        recorder = TestEventRecorder()
+        sendMessage(stream, { "type" : "run", "suite" : reference.toDict(),
+                              "maxFailures" : maxFailures })
+        while True:
+            message = receiveMessage(stream)
+            if message is None:
+                raise ConnectionError("Worker disconnected while running {}".format(
+                        reference.suiteName))
+            if message["type"] == "event":
+                recorder.events.append(TestEventRecorder.eventFromDict(message["event"]))
+            elif message["type"] == "done":
+                recorder.output = message["output"]
+                return recorder
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from .JsonStore import JsonStore
+
+import os
+import re
+
+class CoverageIndex(JsonStore):
+    """Records which lines of which source files each test ran.
+
+    The index is kept compact by listing each test identifier once, and
+    storing, for each file, the ranges of lines each test ran, such as
+    "3-9,12", against the test's position in that list. Files are stored
+    relative to a base directory, normally the project directory the tests
+    are run from.
+
+    Given the files, or the ranges of lines within them, that have changed,
+    the index finds the tests which ran them. Line numbers are those of the
+    files when the coverage was recorded, so the index should be recorded
+    again once changes which move lines around have been committed."""
+
+    def __init__(self, path = None, baseDirectory = None):
+        """Constructor.
+
+        Inputs
+        ------
+        path : [str] The file to keep the index in. Defaults to
+            .wellbehavedpython/coverage.json
+        baseDirectory : [str] The directory file paths are stored relative
+            to. Defaults to the current working directory."""
+        if path is None:
+            path = JsonStore.defaultPath("coverage.json")
+        JsonStore.__init__(self, path)
+        self.data.setdefault("tests", [])
+        self.data.setdefault("files", {})
+        if baseDirectory is None:
+            baseDirectory = os.getcwd()
+        self.baseDirectory = os.path.abspath(baseDirectory)
+        self._testIndexes = dict((identifier, str(index))
+                                 for index, identifier in enumerate(self.data["tests"])
+                                 if identifier is not None)
+
+    def hasTest(self, identifier):
+        """Determines whether the coverage of a test has been recorded."""
+        return identifier in self._testIndexes
+
+    def removeTests(self, identifiers):
+        """Removes the tests and their recorded coverage, before they are
+        recorded again. Until then, they are not known to the index."""
+        indexes = set(self._testIndexes.pop(identifier, None) for identifier in identifiers)
+        indexes.discard(None)
+        if len(indexes) == 0:
+            return
+        for index in indexes:
+            # the other tests keep their positions until the index is saved
+            self.data["tests"][int(index)] = None
+        for path, testLines in list(self.data["files"].items()):
+            for index in indexes & set(testLines):
+                del testLines[index]
+            if len(testLines) == 0:
+                del self.data["files"][path]
+
+    def save(self):
+        """Saves the index, first closing the gaps left by removed tests."""
+        self._compact()
+        JsonStore.save(self)
+
+    def recordTest(self, identifier, coverage):
+        """Records the lines a test ran.
+
+        Inputs
+        ------
+        identifier : [str] The test identifier, such as package.module.Class.test_method
+        coverage : [dict] Maps the paths of the files the test ran to the
+            sets of line numbers it ran in each. If it holds no lines, as for
+            tests run in forked processes, the test is not recorded, so it
+            stays unknown and is never ruled out by a change."""
+        if not any(len(lines) > 0 for lines in coverage.values()):
+            return
+        index = self._testIndexes.get(identifier)
+        if index is None:
+            index = str(len(self.data["tests"]))
+            self.data["tests"].append(identifier)
+            self._testIndexes[identifier] = index
+        for path, lines in coverage.items():
+            if len(lines) > 0:
+                testLines = self.data["files"].setdefault(self._relativePath(path), {})
+                testLines[index] = CoverageIndex.formatLines(lines)
+
+    def getCoverage(self, identifier):
+        """Gets the recorded coverage of a test.
+
+        Returns
+        -------
+        A dictionary from the stored file paths to sets of line numbers."""
+        index = self._testIndexes.get(identifier)
+        coverage = {}
+        for path, testLines in self.data["files"].items():
+            if index in testLines:
+                coverage[path] = CoverageIndex.parseLines(testLines[index])
+        return coverage
+
+    def findAffectedTests(self, changes):
+        """Finds the tests which ran any of the changed lines.
+
+        Inputs
+        ------
+        changes : [dict] Maps the paths of changed files to lists of
+            (first, last) line ranges that changed, or to None if the whole
+            file should be counted as changed.
+
+        Returns
+        -------
+        A set of the identifiers of the affected tests."""
+        affected = set()
+        for path, ranges in changes.items():
+            testLines = self.data["files"].get(self._relativePath(path), {})
+            for index, lines in testLines.items():
+                if ranges is None or CoverageIndex._overlaps(
+                    CoverageIndex.parseLines(lines), ranges):
+                    affected.add(self.data["tests"][int(index)])
+        return affected
+
+    @staticmethod
+    def formatLines(lines):
+        """Formats a set of line numbers as ranges, such as "3-9,12"."""
+        ranges = []
+        for line in sorted(lines):
+            if len(ranges) > 0 and ranges[-1][1] == line - 1:
+                ranges[-1][1] = line
+            else:
+                ranges.append([line, line])
+        return ",".join(str(first) if first == last else "{}-{}".format(first, last)
+                        for first, last in ranges)
+
+    @staticmethod
+    def parseLines(text):
+        """Parses line ranges formatted by formatLines into a set of line numbers."""
+        lines = set()
+        for part in text.split(","):
+            if len(part) == 0:
+                continue
+            first, separator, last = part.partition("-")
+            lines.update(range(int(first), int(last or first) + 1))
+        return lines
+
+    @staticmethod
+    def parseChange(text):
+        """Parses a changed file given on the command line, as a path
+        optionally followed by :first-last or :line.
+
+        Returns
+        -------
+        A (path, ranges) tuple, where ranges is None for the whole file."""
+        path, separator, lines = text.rpartition(":")
+        match = re.fullmatch(r"(\d+)(?:-(\d+))?", lines)
+        if not separator or match is None:
+            return text, None
+        first = int(match.group(1))
+        return path, [(first, int(match.group(2) or first))]
+
+    @staticmethod
+    def parseDiff(text):
+        """Finds the changed lines in a unified diff, such as git diff gives.
+
+        Lines are numbered as in the old version of each file, which is the
+        version the coverage was recorded against. Removed lines count as
+        changed, and where lines were only added, the lines either side of
+        them count as changed. Context lines do not.
+
+        Returns
+        -------
+        A dictionary from the paths of the changed files to lists of
+        (first, last) line ranges."""
+        changes = {}
+        path = None
+        oldLine = remainingOld = remainingNew = 0
+        previous = None
+        for line in text.splitlines():
+            if remainingOld > 0 or remainingNew > 0:
+                # within a hunk, lines are context, removed or added
+                if line.startswith(" ") or len(line) == 0:
+                    oldLine += 1
+                    remainingOld -= 1
+                    remainingNew -= 1
+                elif line.startswith("-"):
+                    CoverageIndex._addRange(changes, path, oldLine, oldLine)
+                    oldLine += 1
+                    remainingOld -= 1
+                elif line.startswith("+"):
+                    if previous not in ("-", "+"):
+                        CoverageIndex._addRange(changes, path, max(oldLine - 1, 1), oldLine)
+                    remainingNew -= 1
+                previous = line[:1]
+            elif line.startswith("--- "):
+                path = CoverageIndex._parseDiffPath(line[4:])
+            elif line.startswith("+++ ") and path is None:
+                path = CoverageIndex._parseDiffPath(line[4:])
+            elif line.startswith("@@"):
+                match = re.match(r"@@ -(\d+)(?:,(\d+))? \+\d+(?:,(\d+))? @@", line)
+                if match is None:
+                    continue
+                oldLine = int(match.group(1))
+                remainingOld = int(match.group(2) or 1)
+                remainingNew = int(match.group(3) or 1)
+                previous = None
+                if remainingOld == 0:
+                    # an empty old range starts at the line the new lines follow
+                    oldLine += 1
+        return changes
+
+    @staticmethod
+    def _addRange(changes, path, first, last):
+        if path is None:
+            return
+        ranges = changes.setdefault(path, [])
+        if len(ranges) > 0 and ranges[-1][1] >= first - 1:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], last))
+        else:
+            ranges.append((first, last))
+
+    @staticmethod
+    def _parseDiffPath(text):
+        path = text.split("\t")[0].strip()
+        if path == "/dev/null":
+            return None
+        if path.startswith("a/") or path.startswith("b/"):
+            path = path[2:]
+        return path
+
+    def _compact(self):
+        if None not in self.data["tests"]:
+            return
+        self.data["tests"] = [identifier for identifier in self.data["tests"]
+                              if identifier is not None]
+        newIndexes = dict((self._testIndexes[identifier], str(index))
+                          for index, identifier in enumerate(self.data["tests"]))
+        for path, testLines in self.data["files"].items():
+            self.data["files"][path] = dict((newIndexes[index], lines)
+                                            for index, lines in testLines.items())
+        self._testIndexes = dict((identifier, str(index))
+                                 for index, identifier in enumerate(self.data["tests"]))
+
+    @staticmethod
+    def _overlaps(lines, ranges):
+        return any(first <= line <= last for line in lines for first, last in ranges)
+
+    def _relativePath(self, path):
+        path = os.path.abspath(os.path.join(self.baseDirectory, path))
+        relativePath = os.path.relpath(path, self.baseDirectory)
+        if relativePath.startswith(os.pardir):
+            return path
+        return relativePath.replace(os.sep, "/")
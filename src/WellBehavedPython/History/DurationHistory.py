@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestSuite import TestSuite
+from .JsonStore import JsonStore
+from .ResultsHistory import ResultsHistory
+
+class DurationHistory(ResultsHistory):
+    """Records how long each test class and test took to run.
+
+    Durations are taken from the TestResults of a run and saved between
+    runs, keyed by the qualified class and test names. Parallel and sharded
+    runs use the history to start the longest running classes first, so the
+    run is not left waiting on one slow class that was started last."""
+
+    defaultTestDuration = 0.001
+
+    def __init__(self, path = None):
+        """Constructor.
+
+        Inputs
+        ------
+        path : [str] The file to keep the history in. Defaults to
+            .wellbehavedpython/durations.json"""
+        if path is None:
+            path = JsonStore.defaultPath("durations.json")
+        ResultsHistory.__init__(self, path)
+        self.data.setdefault("classes", {})
+        self.data.setdefault("tests", {})
+        # the median test duration, found when first needed after each load or update
+        self._typicalTestDuration = None
+
+    def getClassDuration(self, testClass):
+        """Gets the recorded duration in seconds of a test case class, or None."""
+        return self.data["classes"].get(testClass.getTestClassIdentifier())
+
+    def getTestDuration(self, test):
+        """Gets the recorded duration in seconds of a configured test, or None."""
+        return self.data["tests"].get(test.getTestIdentifier())
+
+    def estimateDuration(self, suite):
+        """Estimates how long a suite will take to run, in seconds.
+
+        Class suites use the recorded duration of the class where all of its
+        tests have been run before. Otherwise, tests with no history are
+        assumed to take as long as a typical recorded test."""
+        if isinstance(suite, TestSuite) and not suite.isClassSuite():
+            return sum(self.estimateDuration(test) for test in suite.tests)
+        if not isinstance(suite, TestSuite):
+            duration = self.getTestDuration(suite)
+            if suite.ignore:
+                duration = 0
+            elif duration is None:
+                duration = self._getTypicalTestDuration()
+            return duration
+
+        testDurations = [self.getTestDuration(test) for test in suite.tests
+                         if not test.ignore]
+        classDuration = self.getClassDuration(suite.testClass)
+        if classDuration is not None and None not in testDurations:
+            return classDuration
+        typical = self._getTypicalTestDuration()
+        return sum(typical if duration is None else duration
+                   for duration in testDurations)
+
+    def orderLongestFirst(self, suites):
+        """Orders suites so that the longest running come first.
+
+        Suites with equal estimates keep their original order, so the order
+        is deterministic."""
+        return sorted(suites, key = self.estimateDuration, reverse = True)
+
+    def _getTypicalTestDuration(self):
+        if self._typicalTestDuration is None:
+            durations = sorted(self.data["tests"].values())
+            if len(durations) == 0:
+                self._typicalTestDuration = DurationHistory.defaultTestDuration
+            else:
+                self._typicalTestDuration = durations[len(durations) // 2]
+        return self._typicalTestDuration
+
+    def _recordClass(self, classSuite, classResults):
+        self._typicalTestDuration = None
+        # cached passes took no time, so the durations from when they last
+        # ran are kept
+        for test, testResults in ResultsHistory.findTestResults(classSuite, classResults):
+            if not test.ignore and not test.cached:
+                self.data["tests"][test.getTestIdentifier()] = \
+                    testResults.getDuration().total_seconds()
+        if not any(test.cached for test in classSuite.tests):
+            self.data["classes"][classSuite.testClass.getTestClassIdentifier()] = \
+                classResults.getDuration().total_seconds()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from .JsonStore import JsonStore
+from .ResultsHistory import ResultsHistory
+
+class FlakyHistory(ResultsHistory):
+    """Records how often each test has run, and how many of those runs
+    were flaky: the test failed, or had an error, but passed when it was
+    run again.
+
+    The flake rate of a test is the fraction of its runs which were flaky.
+    Tests which were ignored, or were cached passes, did not run and are
+    not counted."""
+
+    def __init__(self, path = None):
+        """Constructor.
+
+        Inputs
+        ------
+        path : [str] The file to keep the history in. Defaults to
+            .wellbehavedpython/flaky.json"""
+        if path is None:
+            path = JsonStore.defaultPath("flaky.json")
+        ResultsHistory.__init__(self, path)
+        self.data.setdefault("tests", {})
+
+    def getFlakeRate(self, test):
+        """Gets the fraction of the recorded runs of a configured test which
+        were flaky, or 0 if it has not been recorded."""
+        entry = self.data["tests"].get(test.getTestIdentifier())
+        if entry is None or entry["runs"] == 0:
+            return 0.0
+        return entry["flaky"] / entry["runs"]
+
+    def isFlaky(self, test):
+        """Determines whether a configured test has been flaky in any recorded run."""
+        return self.getFlakeRate(test) > 0
+
+    def _recordClass(self, classSuite, classResults):
+        for test, testResults in ResultsHistory.findTestResults(classSuite, classResults):
+            if testResults.getStateDescription() == "ignored" or testResults.countCached() > 0:
+                continue
+            entry = self.data["tests"].setdefault(test.getTestIdentifier(),
+                                                  { "runs" : 0, "flaky" : 0 })
+            entry["runs"] += 1
+            if testResults.countFlaky() > 0:
+                entry["flaky"] += 1
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from ..Discovery.ModuleExaminer import ModuleExaminer
+from ..Discovery.SourceRoots import getDefaultRoots
+from ..Engine.TestCase import TestCase
+from .JsonStore import JsonStore
+
+import importlib
+import os
+import sys
+
+class ImportGraph(JsonStore):
+    """Records which source modules each test module imports, so the test
+    modules affected by changed files can be found without importing every
+    test module.
+
+    The graph is built as a TestDiscoverer imports test modules. The
+    modules which first appear in sys.modules while a test module is
+    imported are recorded as its imports, along with the modules bound to
+    its globals, since modules imported by an earlier test module do not
+    appear again, and the modules named by its import statements, so that
+    from config import settings counts config. The modules reached that way
+    have their own imports found the same way, from their globals and their
+    import statements, with ModuleExaminer.listImportedModules and
+    listModulesInImportStatements. Only
+    modules under the source roots are recorded, and the test modules are
+    those which define TestCase classes.
+
+    Each module is saved with the modification time of its file. A module
+    whose file has changed since it was recorded counts as changed itself,
+    as its imports may have changed too, until it is recorded again. Test
+    modules which are not in the graph yet are always selected."""
+
+    def __init__(self, path = None, roots = None):
+        """Constructor.
+
+        Inputs
+        ------
+        path : [str] The file to keep the graph in. Defaults to
+            .wellbehavedpython/imports.json
+        roots : [list of str] The directories holding the source modules
+            to record. If None, the directories on sys.path are used, apart
+            from those of the standard library and installed packages."""
+        if path is None:
+            path = JsonStore.defaultPath("imports.json")
+        JsonStore.__init__(self, path)
+        self.data.setdefault("modules", {})
+        if roots is None:
+            roots = getDefaultRoots()
+        self.roots = [os.path.abspath(root) for root in roots]
+        self._recorded = set()
+
+    def hasTestModules(self):
+        """Determines whether any test modules have been recorded."""
+        return any(entry["test"] for entry in self.data["modules"].values())
+
+    def recordTestModule(self, examiner):
+        """Records the imports of a module examined for tests, and of the
+        source modules it imports which have not been recorded in this run.
+
+        Inputs
+        ------
+        examiner : The [ModuleExaminer] which imported the module."""
+        imports = (set(examiner.newModules) | set(examiner.listImportedModules()) |
+                   set(examiner.listModulesInImportStatements()))
+        isTest = any(issubclass(klass, TestCase) for klass in examiner.listAllClasses())
+        self._recordModule(examiner.moduleName, imports, isTest)
+        toVisit = sorted(imports)
+        while len(toVisit) > 0:
+            name = toVisit.pop()
+            if name in self._recorded or not self._isSourceModule(name):
+                continue
+            moduleExaminer = ModuleExaminer(name)
+            imported = sorted(set(moduleExaminer.listImportedModules()) |
+                              set(moduleExaminer.listModulesInImportStatements()))
+            self._recordModule(name, imported, None)
+            toVisit.extend(imported)
+
+    def findAffectedTestModules(self, packageName, changedPaths):
+        """Finds the test modules in a package which import any of the
+        changed files, directly or indirectly.
+
+        Inputs
+        ------
+        packageName : [str] The module or package holding the tests.
+        changedPaths : [list of str] The paths of the changed files.
+
+        Returns
+        -------
+        A sorted list of the names of the affected test modules, and of the
+        test modules which have not been recorded."""
+        modules = self.data["modules"]
+        modulesByPath = dict((entry["file"], name) for name, entry in modules.items())
+        changed = set(self.findStaleModules())
+        for path in changedPaths:
+            name = modulesByPath.get(os.path.abspath(path))
+            if name is not None:
+                changed.add(name)
+
+        importers = {}
+        for name, entry in modules.items():
+            for importedName in entry["imports"]:
+                importers.setdefault(importedName, set()).add(name)
+        affected = set()
+        toVisit = list(changed)
+        while len(toVisit) > 0:
+            name = toVisit.pop()
+            if name in affected:
+                continue
+            affected.add(name)
+            toVisit.extend(importers.get(name, ()))
+
+        selected = set(self.findNewTestModules(packageName))
+        selected.update(name for name in affected
+                        if modules[name]["test"] and self._isInPackage(name, packageName) and
+                        os.path.exists(modules[name]["file"]))
+        return sorted(selected)
+
+    def listTestModules(self, packageName):
+        """Lists the recorded test modules in a package, and the modules
+        which have not been examined for tests."""
+        modules = self.data["modules"]
+        recorded = [name for name, entry in modules.items()
+                    if entry["test"] and self._isInPackage(name, packageName) and
+                    os.path.exists(entry["file"])]
+        return sorted(set(recorded + self.findNewTestModules(packageName)))
+
+    def findStaleModules(self):
+        """Finds the recorded modules whose files have changed or gone since
+        they were recorded."""
+        return sorted(name for name, entry in self.data["modules"].items()
+                      if ImportGraph._getModificationTime(entry["file"]) != entry["mtime"])
+
+    def findNewTestModules(self, packageName):
+        """Finds the modules in a package which have not been examined for
+        tests since they last changed. The package itself is imported, but
+        its modules are not."""
+        modules = self.data["modules"]
+        def isNew(name):
+            return name not in modules or modules[name]["test"] is None
+        package = importlib.import_module(packageName)
+        if not hasattr(package, "__path__"):
+            return [packageName] if isNew(packageName) else []
+
+        found = []
+        for packagePath in list(package.__path__):
+            for directory, subdirectories, files in os.walk(packagePath):
+                subdirectories[:] = sorted(name for name in subdirectories
+                                           if not name.startswith(".") and name != "__pycache__")
+                relativeParts = os.path.relpath(directory, packagePath).split(os.sep)
+                prefix = ".".join([packageName] + [part for part in relativeParts if part != "."])
+                for fileName in sorted(files):
+                    if not fileName.endswith(".py") or fileName == "__init__.py":
+                        continue
+                    name = "{}.{}".format(prefix, fileName[:-len(".py")])
+                    if isNew(name):
+                        found.append(name)
+        return found
+
+    def _recordModule(self, name, imports, isTest):
+        """Records the imports of a module, and whether it has tests, which
+        is None if it has not been examined for them."""
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if path is None:
+            return
+        path = os.path.abspath(path)
+        imports = set(importedName for importedName in imports
+                      if importedName != name and self._isSourceModule(importedName))
+        imports.update(parent for parent in self._listParentPackages(name)
+                       if self._isSourceModule(parent))
+        modificationTime = ImportGraph._getModificationTime(path)
+        entry = self.data["modules"].get(name)
+        if (entry is not None and entry["file"] == path and
+            entry["mtime"] == modificationTime):
+            # modules imported earlier in this run do not show up as new,
+            # so what was recorded against the same file still holds
+            imports.update(entry["imports"])
+            if isTest is None:
+                isTest = entry["test"]
+        self.data["modules"][name] = { "file" : path, "mtime" : modificationTime,
+                                       "imports" : sorted(imports), "test" : isTest }
+        self._recorded.add(name)
+
+    def _isSourceModule(self, name):
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if path is None:
+            return False
+        path = os.path.abspath(path)
+        return any(path.startswith(root + os.sep) for root in self.roots)
+
+    def _isInPackage(self, name, packageName):
+        return name == packageName or name.startswith(packageName + ".")
+
+    def _listParentPackages(self, name):
+        parts = name.split(".")
+        return [".".join(parts[:index]) for index in range(1, len(parts))]
+
+    @staticmethod
+    def _getModificationTime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+import json
+import os
+
+class JsonStore:
+    """Base class for information persisted between test runs.
+
+    The information is held as a dictionary of plain values and saved as
+    JSON. By default files live in a .wellbehavedpython directory in the
+    current working directory."""
+
+    defaultDirectory = ".wellbehavedpython"
+
+    def __init__(self, path):
+        """Constructor. Loads the file if it exists.
+
+        Inputs
+        ------
+        path : [str] The path of the file to load from and save to."""
+        self.path = path
+        self.data = self.load()
+
+    @classmethod
+    def defaultPath(klass, fileName):
+        return os.path.join(klass.defaultDirectory, fileName)
+
+    def load(self):
+        """Loads the stored data.
+
+        Returns
+        -------
+        The stored dictionary, or an empty dictionary if there is no file
+        or it cannot be read."""
+        try:
+            with open(self.path, encoding = "utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return data
+
+    def save(self):
+        """Saves the data, replacing the file in one step so that a run which
+        is interrupted never leaves a partly written file behind."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        temporaryPath = "{}.{}.tmp".format(self.path, os.getpid())
+        with open(temporaryPath, "w", encoding = "utf-8") as file:
+            json.dump(self.data, file, indent = 1, sort_keys = True)
+        os.replace(temporaryPath, self.path)
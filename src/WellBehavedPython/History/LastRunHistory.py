@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestSuite import TestSuite
+from ..Execution.SuiteReference import SuiteReference
+from .JsonStore import JsonStore
+from .ResultsHistory import ResultsHistory
+
+import hashlib
+import importlib
+import inspect
+
+class LastRunHistory(ResultsHistory):
+    """Records the outcome of each test the last time it ran.
+
+    Each test's state, one of passed, failed, error or ignored, is saved
+    with a fingerprint of the test method's source, so that the next run
+    can tell which tests failed last time, and which tests are new or have
+    been changed since. Tests which did not run, for example because the
+    run was stopped early, keep the state they had before. An error in
+    beforeClass or afterClass is recorded as an error in each test of the
+    class.
+
+    The module, class and method of each test are saved too, so the tests
+    which failed can be run again by importing only their modules."""
+
+    def __init__(self, path = None):
+        """Constructor.
+
+        Inputs
+        ------
+        path : [str] The file to keep the history in. Defaults to
+            .wellbehavedpython/lastrun.json"""
+        if path is None:
+            path = JsonStore.defaultPath("lastrun.json")
+        ResultsHistory.__init__(self, path)
+        self.data.setdefault("tests", {})
+
+    def getState(self, test):
+        """Gets the state of a configured test when it last ran, or None if
+        it has not been run before."""
+        entry = self.data["tests"].get(test.getTestIdentifier())
+        if entry is None:
+            return None
+        return entry["state"]
+
+    def hasFailed(self, test):
+        """Determines whether a configured test failed or had an error when it last ran."""
+        return self.getState(test) in ("failed", "error")
+
+    def isNewOrModified(self, test):
+        """Determines whether a configured test has not been run before, or
+        its source has changed since it last ran."""
+        entry = self.data["tests"].get(test.getTestIdentifier())
+        return entry is None or entry["fingerprint"] != LastRunHistory.fingerprint(test)
+
+    def listFailedTests(self, packageName = None):
+        """Lists the tests which failed or had errors when they last ran.
+
+        Inputs
+        ------
+        packageName : [str] The module or package to list tests in, or None
+            to list them all.
+
+        Returns
+        -------
+        A sorted list of (moduleName, className, testMethodName) tuples."""
+        failed = []
+        for entry in self.data["tests"].values():
+            if entry["state"] not in ("failed", "error") or "module" not in entry:
+                continue
+            moduleName = entry["module"]
+            if (packageName is None or moduleName == packageName or
+                moduleName.startswith(packageName + ".")):
+                failed.append((moduleName, entry["class"], entry["method"]))
+        return sorted(failed)
+
+    def buildFailedSuite(self, packageName):
+        """Builds a suite of the tests in a package which failed or had
+        errors when they last ran, importing only the modules they are in.
+
+        Tests whose module, class or method no longer exists are left out.
+
+        Returns
+        -------
+        A [TestSuite] holding a suite for each module, which holds the
+        class suites of the failed tests in it."""
+        testsByClass = {}
+        for moduleName, className, testMethodName in self.listFailedTests(packageName):
+            testsByClass.setdefault((moduleName, className), []).append(testMethodName)
+
+        suite = TestSuite(packageName)
+        moduleSuites = {}
+        for (moduleName, className), testMethodNames in sorted(testsByClass.items()):
+            try:
+                module = importlib.import_module(moduleName)
+            except ModuleNotFoundError as ex:
+                if ex.name != moduleName:
+                    raise
+                continue
+            klass = SuiteReference.findClass(module, className)
+            if klass is None:
+                continue
+            tests = [(name, False) for name in testMethodNames if hasattr(klass, name)]
+            if len(tests) == 0:
+                continue
+            if moduleName not in moduleSuites:
+                moduleSuites[moduleName] = TestSuite(moduleName)
+                suite.add(moduleSuites[moduleName])
+            reference = SuiteReference(moduleName, className, klass.__name__, tests)
+            moduleSuites[moduleName].add(reference.build())
+        return suite
+
+    @staticmethod
+    def fingerprint(test):
+        """Gets a hash of the source of a configured test's method.
+
+        Where the source cannot be found, the method's byte code is used instead."""
+        try:
+            source = inspect.getsource(test.testMethod).encode("utf-8")
+        except (OSError, TypeError):
+            source = getattr(test.testMethod, "__code__", None)
+            source = b"" if source is None else source.co_code
+        return hashlib.sha1(source).hexdigest()
+
+    def _recordClass(self, classSuite, classResults):
+        # an error in beforeClass or afterClass counts against every test
+        # in the class, as the tests need to run again once it is fixed
+        fixtureError = classResults.hasOwnErrors()
+        testResults = dict((test.testMethodName, results) for test, results
+                           in ResultsHistory.findTestResults(classSuite, classResults))
+        for test in classSuite.tests:
+            if fixtureError and not test.ignore:
+                state = "error"
+            elif test.testMethodName in testResults:
+                state = testResults[test.testMethodName].getStateDescription()
+            else:
+                continue
+            self.data["tests"][test.getTestIdentifier()] = {
+                "state" : state,
+                "fingerprint" : LastRunHistory.fingerprint(test),
+                "module" : type(test).__module__,
+                "class" : type(test).__qualname__,
+                "method" : test.testMethodName }
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from .JsonStore import JsonStore
+
+import threading
+
+class MemoryHistory(JsonStore):
+    """Records the peak memory used by each test class when it last ran.
+
+    Class suites run in worker processes measure the peak resident memory
+    of the worker while the class runs. Adaptive parallel runs use the
+    history to hold back classes which need a lot of memory while the
+    machine is short of it."""
+
+    def __init__(self, path = None):
+        """Constructor.
+
+        Inputs
+        ------
+        path : [str] The file to keep the history in. Defaults to
+            .wellbehavedpython/memory.json"""
+        if path is None:
+            path = JsonStore.defaultPath("memory.json")
+        JsonStore.__init__(self, path)
+        self.data.setdefault("classes", {})
+        self._lock = threading.Lock()
+
+    def recordClassMemory(self, testClass, peakMemory):
+        """Records the peak memory of a test case class, in bytes."""
+        with self._lock:
+            self.data["classes"][testClass.getTestClassIdentifier()] = peakMemory
+
+    def getClassMemory(self, testClass):
+        """Gets the recorded peak memory of a test case class in bytes, or None."""
+        return self.data["classes"].get(testClass.getTestClassIdentifier())
+
+    def save(self):
+        with self._lock:
+            JsonStore.save(self)
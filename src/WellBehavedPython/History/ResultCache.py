@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Discovery.ModuleExaminer import ModuleExaminer
+from ..Discovery.SourceRoots import getDefaultRoots
+from .JsonStore import JsonStore
+from .ResultsHistory import ResultsHistory
+
+import hashlib
+import importlib.util
+import os
+import sys
+
+class ResultCache(ResultsHistory):
+    """Records the inputs of each test when it last passed, so that it need
+    not be run again until they change.
+
+    The inputs of a test are the source files of its module and of every
+    module that module uses, directly or through other modules, along with
+    the python version and the versions of the installed packages. The
+    modules used are those its class imported while it ran, as recorded by
+    an ImportRecorder, and those found once it has run from the globals
+    bound to modules and from the import statements in the source, with
+    ModuleExaminer.listImportedModules and listModulesInImportStatements,
+    so that from config import settings counts config as used. Only
+    modules under the source roots are followed; the rest are covered by
+    the package versions. The modules found are saved with a hash of all
+    the inputs, and a test is cached when hashing the same modules again
+    gives the same result."""
+
+    def __init__(self, path = None, roots = None):
+        """Constructor.
+
+        Inputs
+        ------
+        path : [str] The file to keep the cache in. Defaults to
+            .wellbehavedpython/resultcache.json
+        roots : [list of str] The directories holding the source modules
+            whose files are hashed. If None, the directories on sys.path
+            are used, apart from those of the standard library and
+            installed packages."""
+        if path is None:
+            path = JsonStore.defaultPath("resultcache.json")
+        ResultsHistory.__init__(self, path)
+        self.data.setdefault("tests", {})
+        if roots is None:
+            roots = getDefaultRoots()
+        self.roots = [os.path.abspath(root) for root in roots]
+        self._environment = None
+        self._fileHashes = {}
+        self._dependencies = {}
+
+    def isCached(self, test):
+        """Determines whether a configured test passed when it last ran, and
+        none of its inputs have changed since."""
+        entry = self.data["tests"].get(test.getTestIdentifier())
+        if entry is None:
+            return False
+        return entry["key"] == self.computeKey(entry["modules"])
+
+    def markCached(self, suite):
+        """Marks the tests in the suite which are cached, so they are
+        registered as cached passes instead of being run.
+
+        Returns
+        -------
+        The number of tests marked."""
+        count = 0
+        for classSuite in suite.listClassSuites():
+            for test in classSuite.tests:
+                test.cached = not test.ignore and self.isCached(test)
+                if test.cached:
+                    count += 1
+        return count
+
+    def computeKey(self, moduleNames):
+        """Computes a hash of the environment and the source files of the modules.
+
+        Modules which are not loaded, or have no source file, give a
+        different key from any they gave when they had one."""
+        key = hashlib.sha1(self.getEnvironment().encode("utf-8"))
+        for name in sorted(moduleNames):
+            key.update("\n{}:{}".format(name, self._hashModule(name)).encode("utf-8"))
+        return key.hexdigest()
+
+    def getEnvironment(self):
+        """Describes the interpreter and the installed packages, as a string."""
+        if self._environment is None:
+            lines = [sys.version, sys.platform]
+            try:
+                import importlib.metadata
+                lines.extend(sorted("{}=={}".format(
+                            distribution.metadata["Name"], distribution.version)
+                                    for distribution in importlib.metadata.distributions()))
+            except ImportError:
+                pass
+            self._environment = "\n".join(lines)
+        return self._environment
+
+    def findDependencies(self, moduleName):
+        """Finds the source modules that a module depends on.
+
+        Returns
+        -------
+        A sorted list of the names of the module itself, the modules under
+        the source roots that it uses, directly or indirectly, and the
+        packages that contain them."""
+        dependencies = self._dependencies.get(moduleName)
+        if dependencies is not None:
+            return dependencies
+        found = set()
+        toVisit = [moduleName]
+        while len(toVisit) > 0:
+            name = toVisit.pop()
+            if name in found or (name != moduleName and not self._isSourceModule(name)):
+                continue
+            found.add(name)
+            examiner = ModuleExaminer(name)
+            toVisit.extend(examiner.listImportedModules())
+            toVisit.extend(examiner.listModulesInImportStatements())
+            toVisit.extend(self._listParentPackages(name))
+        dependencies = sorted(found)
+        self._dependencies[moduleName] = dependencies
+        return dependencies
+
+    def _recordClass(self, classSuite, classResults):
+        moduleName = classSuite.testClass.__module__
+        modules = set(self.findDependencies(moduleName))
+        for name in classResults.modulesUsed:
+            if self._isSourceModule(name):
+                modules.update(self.findDependencies(name))
+        modules = sorted(modules)
+        key = self.computeKey(modules)
+        # without the test's own source, a change to it could not be seen
+        cacheable = self._hashModule(moduleName) != "missing"
+        for test, testResults in ResultsHistory.findTestResults(classSuite, classResults):
+            identifier = test.getTestIdentifier()
+            if testResults.countCached() > 0:
+                # the test did not run, so what it uses was not recorded again
+                continue
+            if cacheable and testResults.getStateDescription() == "passed":
+                self.data["tests"][identifier] = { "key" : key, "modules" : modules }
+            else:
+                self.data["tests"].pop(identifier, None)
+
+    def _isSourceModule(self, name):
+        path = self._findModuleFile(name)
+        if path is None:
+            return False
+        path = os.path.abspath(path)
+        return any(path.startswith(root + os.sep) for root in self.roots)
+
+    def _listParentPackages(self, name):
+        parts = name.split(".")
+        return [".".join(parts[:index]) for index in range(1, len(parts))]
+
+    def _findModuleFile(self, name):
+        module = sys.modules.get(name)
+        if module is not None:
+            return getattr(module, "__file__", None)
+        # modules imported while tests ran in other processes may not be
+        # loaded here, so they are found without being run
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            return None
+        if spec is None or not spec.has_location:
+            return None
+        return spec.origin
+
+    def _hashModule(self, name):
+        path = self._findModuleFile(name)
+        if path is None:
+            return "missing"
+        digest = self._fileHashes.get(path)
+        if digest is None:
+            try:
+                with open(path, "rb") as file:
+                    digest = hashlib.sha1(file.read()).hexdigest()
+            except OSError:
+                digest = "missing"
+            self._fileHashes[path] = digest
+        return digest
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Engine.TestSuite import TestSuite
+from .JsonStore import JsonStore
+
+class ResultsHistory(JsonStore):
+    """Base class for information about test classes which is updated from
+    the results of each run.
+
+    Derived classes record what they need for each class suite in the run
+    by overriding _recordClass."""
+
+    def update(self, suite, results):
+        """Records the information from a run.
+
+        Inputs
+        ------
+        suite : The [TestSuite] that was run
+        results : The [TestResults] from running the suite."""
+        for classSuite, classResults in ResultsHistory.findClassResults(suite, results):
+            self._recordClass(classSuite, classResults)
+
+    def _recordClass(self, classSuite, classResults):
+        """Override to record the results of a class suite.
+
+        Inputs
+        ------
+        classSuite : The [TestSuite] holding the tests of the class.
+        classResults : The [TestResults] of the class suite, which has a
+            child for each test which ran."""
+        raise NotImplementedError()
+
+    @staticmethod
+    def findClassResults(suite, results):
+        """Pairs up the class suites in a suite tree with their results.
+
+        Inputs
+        ------
+        suite : The [TestSuite] that was run
+        results : The [TestResults] from running the suite.
+
+        Returns
+        -------
+        A list of (classSuite, classResults) tuples for the class suites
+        which ran, in the order they ran."""
+        classSuites = {}
+        ResultsHistory._findClassSuites(suite, (), classSuites)
+        pairs = []
+        ResultsHistory._findClassResults(results, (), classSuites, pairs)
+        return pairs
+
+    @staticmethod
+    def findTestResults(classSuite, classResults):
+        """Pairs up the tests of a class suite with their results.
+
+        Returns
+        -------
+        A list of (test, results) tuples for the tests which ran."""
+        testsByName = dict((test.testMethodName, test) for test in classSuite.tests)
+        pairs = []
+        for testResults in classResults.suiteResults:
+            test = testsByName.get(testResults.name.strip())
+            if test is not None:
+                pairs.append((test, testResults))
+        return pairs
+
+    @staticmethod
+    def _findClassSuites(suite, path, classSuites):
+        if not isinstance(suite, TestSuite):
+            return
+        path = path + (suite.suiteName,)
+        if suite.isClassSuite():
+            classSuites[path] = suite
+            return
+        for test in suite.tests:
+            ResultsHistory._findClassSuites(test, path, classSuites)
+
+    @staticmethod
+    def _findClassResults(results, path, classSuites, pairs):
+        for childResults in results.suiteResults:
+            childPath = path + (childResults.name,)
+            classSuite = classSuites.get(childPath)
+            if classSuite is None:
+                ResultsHistory._findClassResults(childResults, childPath, classSuites, pairs)
+            else:
+                pairs.append((classSuite, childResults))
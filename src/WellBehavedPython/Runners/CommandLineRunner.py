@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..api import discoverTests
+from ..Discovery.TestDiscoverer import TestDiscoverer
+from ..Engine.TestSuite import TestSuite
+from ..Engine.TestResults import TestResults
+from ..Execution.CoverageTestExecutor import CoverageTestExecutor
+from ..Execution.DistributedTestExecutor import DistributedTestExecutor
+from ..Execution.ProcessPoolTestExecutor import ProcessPoolTestExecutor
+from ..Execution.ResourceScheduler import ResourceScheduler
+from ..Execution.SocketMessages import parseAddress
+from ..Execution.SubinterpreterTestExecutor import SubinterpreterTestExecutor
+from ..Execution.SuiteOrderer import SuiteOrderer
+from ..Execution.SuiteSelector import SuiteSelector
+from ..Execution.SuiteSharder import SuiteSharder
+from ..Execution.SupervisedProcessPool import SupervisedProcessPool
+from ..Execution.SystemLoadMonitor import SystemLoadMonitor
+from ..Execution.ThreadPoolTestExecutor import ThreadPoolTestExecutor
+from ..Execution.WarmProcessPoolTestExecutor import WarmProcessPoolTestExecutor
+from ..History.CoverageIndex import CoverageIndex
+from ..History.DurationHistory import DurationHistory
+from ..History.FlakyHistory import FlakyHistory
+from ..History.ImportGraph import ImportGraph
+from ..History.JsonStore import JsonStore
+from ..History.LastRunHistory import LastRunHistory
+from ..History.MemoryHistory import MemoryHistory
+from ..History.ResultCache import ResultCache
+from .ConsoleTestRunner import ConsoleTestRunner
+from .TestWatcher import TestWatcher
+from .VerboseConsoleTestRunner import VerboseConsoleTestRunner
+
+import argparse
+import os
+import subprocess
+import sys
+
+backends = { "process" : ProcessPoolTestExecutor,
+             "thread" : ThreadPoolTestExecutor,
+             "subinterpreter" : SubinterpreterTestExecutor,
+             "warm" : WarmProcessPoolTestExecutor }
+
+class CommandLineRunner:
+    """Discovers and runs tests, configured by command line arguments.
+
+    Run with
+
+        python3 -m WellBehavedPython.Runners.CommandLineRunner package [options]
+
+    and use --help to list the options."""
+
+    def __init__(self, output = sys.stdout):
+        """Constructor.
+
+        Inputs
+        ------
+        output : The stream to write the test run output to."""
+        self.output = output
+
+    def buildParser(self):
+        parser = argparse.ArgumentParser(
+            prog = "python3 -m WellBehavedPython.Runners.CommandLineRunner",
+            description = "Discovers and runs the tests in a module or package.")
+        parser.add_argument("moduleName", nargs = "?",
+                            help = "the module or package to discover tests in")
+        parser.add_argument("--verbose", action = "store_true",
+                            help = "print each test name and outcome")
+        parser.add_argument("--ignore", action = "append", default = [], metavar = "PATTERN",
+                            help = "ignore modules and classes matching the regular expression")
+        parser.add_argument("--no-buffer", dest = "bufferOutput", action = "store_false",
+                            help = "let tests write straight to stdout and stderr")
+        parser.add_argument("--jobs", "-j", type = int, default = 1, metavar = "N",
+                            help = "run test classes in N workers")
+        parser.add_argument("--backend", choices = sorted(backends), default = "process",
+                            help = "what the workers are: processes (the default), threads, "
+                                   "subinterpreters, which fall back to processes where "
+                                   "they are not supported, or warm processes, forked from "
+                                   "this one after the tests are imported")
+        parser.add_argument("--coordinate", metavar = "ADDRESS",
+                            help = "hand out test classes to workers which connect to ADDRESS, "
+                                   "a host:port or socket path, started with python3 -m "
+                                   "WellBehavedPython.Execution.DistributedTestWorker ADDRESS. "
+                                   "With --jobs, that many workers are started here too")
+        parser.add_argument("--token", default = os.environ.get("WELLBEHAVEDPYTHON_TOKEN"),
+                            help = "the token workers must know to connect to --coordinate, "
+                                   "needed unless it is a loopback or socket address. Defaults "
+                                   "to the WELLBEHAVEDPYTHON_TOKEN environment variable")
+        parser.add_argument("--adaptive", action = "store_true",
+                            help = "treat --jobs as the most classes to run at once, running "
+                                   "fewer while the load average is high or memory is short, "
+                                   "and holding back classes which used a lot of memory before")
+        parser.add_argument("--max-tests-per-worker", dest = "maxTestsPerWorker", type = int,
+                            metavar = "N", help = "replace each worker process once it has run "
+                                                  "N tests")
+        parser.add_argument("--max-worker-memory", dest = "maxWorkerMemory",
+                            type = SupervisedProcessPool.parseMemorySize, metavar = "SIZE",
+                            help = "replace each worker process once its resident memory "
+                                   "passes SIZE, in bytes or with a K, M or G suffix")
+        parser.add_argument("--worker-memory-limit", dest = "workerMemoryLimit",
+                            type = SupervisedProcessPool.parseMemorySize, metavar = "SIZE",
+                            help = "limit the address space of each worker process to SIZE, "
+                                   "so a test using too much memory fails with MemoryError")
+        parser.add_argument("--resource-limit", dest = "resourceLimits", action = "append",
+                            default = [], metavar = "TOKEN=LIMIT",
+                            help = "let running classes use up to LIMIT of the resource TOKEN "
+                                   "at once, where LIMIT is a number, cores or cores/N. "
+                                   "Resources have a limit of 1 by default")
+        parser.add_argument("--max-failures", dest = "maxFailures", type = int, metavar = "N",
+                            help = "stop starting tests once N have failed or had errors")
+        parser.add_argument("--fail-fast", "-x", dest = "maxFailures", action = "store_const",
+                            const = 1, help = "stop at the first failure or error")
+        parser.add_argument("--retries", type = int, default = 0, metavar = "N",
+                            help = "once the run is over, run each failed test on its own up "
+                                   "to N more times, reporting those which pass as flaky")
+        parser.add_argument("--history", default = DurationHistory().path, metavar = "PATH",
+                            help = "file recording test durations between runs")
+        parser.add_argument("--order", action = "append", default = [],
+                            choices = SuiteOrderer.strategies,
+                            help = "run classes which failed last run first, classes with new or "
+                                   "changed tests first, classes with tests which have been "
+                                   "flaky first or last, or in a random order. Can be given "
+                                   "more than once, the first taking priority")
+        parser.add_argument("--seed", type = int, metavar = "N",
+                            help = "the seed for --order random, to repeat an earlier order")
+        parser.add_argument("--cache", action = "store_true",
+                            help = "do not run tests which passed last time they ran with the "
+                                   "same source files, python and installed packages, and "
+                                   "report them as cached passes")
+        parser.add_argument("--record-coverage", dest = "recordCoverage", action = "store_true",
+                            help = "run the tests one after another, recording which source "
+                                   "lines each test runs, for selecting tests with --changed")
+        parser.add_argument("--changed", action = "append", default = [],
+                            metavar = "FILE[:FIRST-LAST]",
+                            help = "only run tests which ran the changed file, or the changed "
+                                   "lines of it, when their coverage was recorded, along with "
+                                   "tests with no recorded coverage")
+        parser.add_argument("--changed-diff", dest = "changedDiff", metavar = "PATH",
+                            help = "as --changed, for the lines changed by a unified diff, such "
+                                   "as git diff gives, whose paths are relative to the top of "
+                                   "the git work tree. - reads the diff from stdin")
+        parser.add_argument("--select-by", dest = "selectBy", choices = ["coverage", "imports"],
+                            default = "coverage",
+                            help = "select the tests affected by --changed from their recorded "
+                                   "coverage (the default), or from the modules the test "
+                                   "modules import, which is recorded as they are discovered "
+                                   "and ignores line ranges")
+        parser.add_argument("--last-failed", dest = "lastFailed", action = "store_true",
+                            help = "only run the tests which failed or had errors last time "
+                                   "they ran, importing only their modules")
+        parser.add_argument("--shard", metavar = "I/N",
+                            help = "only run shard I of N, balanced by recorded duration")
+        parser.add_argument("--watch", action = "store_true",
+                            help = "keep running, and re-run the tests affected by each change "
+                                   "to the source files, until interrupted")
+        parser.add_argument("--watch-path", dest = "watchPaths", action = "append",
+                            metavar = "DIR", help = "a directory to watch for changes. Defaults "
+                                                    "to the directories on the python path")
+        parser.add_argument("--watch-interval", dest = "watchInterval", type = float,
+                            default = 1.0, metavar = "SECONDS",
+                            help = "how often to check for changes")
+        parser.add_argument("--write-results", dest = "writeResults", metavar = "PATH",
+                            help = "save the results of the run, for merging with --merge-results")
+        parser.add_argument("--merge-results", dest = "mergeResults", nargs = "+",
+                            metavar = "PATH",
+                            help = "merge results saved by --write-results and print the summary "
+                                   "instead of running tests")
+        return parser
+
+    def main(self, arguments = None):
+        """Runs according to the arguments.
+
+        Inputs
+        ------
+        arguments : [list of str] The command line arguments, without the
+            program name. If None, sys.argv is used.
+
+        Returns
+        -------
+        The exit code: 0 if everything passed, 1 if there were failures or
+        errors, 2 if the arguments were wrong."""
+        parser = self.buildParser()
+        options = parser.parse_args(arguments)
+        if options.mergeResults is not None:
+            try:
+                results = self.mergeResults(options.mergeResults)
+            except FileNotFoundError as ex:
+                parser.error(str(ex))
+            self.output.write(results.summary())
+            self.output.write("\n")
+            return self._exitCode(results)
+        if options.moduleName is None:
+            parser.error("a module or package name is needed to discover tests")
+        if options.watch and options.shard is not None:
+            parser.error("--watch runs every test, so cannot be used with --shard")
+        if options.watch and options.lastFailed:
+            parser.error("--watch runs every test, so cannot be used with --last-failed")
+        try:
+            if options.watch:
+                results = self.watchTests(options)
+            else:
+                results = self.runTests(options)
+        except ValueError as ex:
+            parser.error(str(ex))
+        if options.writeResults is not None:
+            self.writeResults(results, options.writeResults)
+        return self._exitCode(results)
+
+    def runTests(self, options):
+        changed = len(options.changed) > 0 or options.changedDiff is not None
+        if options.lastFailed:
+            suite = self.discoverLastFailed(options)
+        elif changed and options.selectBy == "imports":
+            suite = self.discoverImporters(options)
+        else:
+            suite = discoverTests(options.moduleName, ignoreFilters = options.ignore)
+        if options.shard is not None:
+            shardIndex, shardCount = SuiteSharder.parseShard(options.shard)
+            history = DurationHistory(options.history)
+            suite = SuiteSharder(shardCount, history).buildShard(suite, shardIndex)
+        if changed and options.selectBy == "coverage":
+            suite = self.selectChanged(options, suite)
+        return self.runSuite(options, suite)
+
+    def discoverLastFailed(self, options):
+        """Builds a suite of the tests which failed or had errors last time
+        they ran, without discovering the rest."""
+        lastRun = LastRunHistory(self._getHistoryPath(options, "lastrun.json"))
+        suite = lastRun.buildFailedSuite(options.moduleName)
+        self.output.write("Re-running {} tests which failed last time they ran\n".format(
+                suite.countTests()))
+        return suite
+
+    def discoverImporters(self, options):
+        """Discovers the tests in the test modules which import the files
+        changed according to the options, and in new test modules.
+
+        Only those test modules are imported, unless no imports have been
+        recorded yet, in which case every test is discovered, recording
+        their imports, and the affected tests are selected from them."""
+        graph = ImportGraph(self._getHistoryPath(options, "imports.json"))
+        discoverer = TestDiscoverer(graph)
+        changes = self._readChanges(options)
+        if graph.hasTestModules():
+            testModules = graph.findAffectedTestModules(options.moduleName, changes)
+            suite = TestSuite(options.moduleName)
+            for name in testModules:
+                subsuite = discoverer.buildSuiteFromModuleName(name, ignoreFilters = options.ignore)
+                if subsuite.countTests() > 0:
+                    suite.add(subsuite)
+            self.output.write("Selected the tests in {} of {} test modules affected by the "
+                              "changes\n".format(len(testModules),
+                                                 len(graph.listTestModules(options.moduleName))))
+        else:
+            allTests = discoverer.buildSuiteFromModuleName(options.moduleName,
+                                                           ignoreFilters = options.ignore)
+            testModules = set(graph.findAffectedTestModules(options.moduleName, changes))
+            suite = SuiteSelector(lambda test: type(test).__module__ in testModules).select(allTests)
+            self.output.write("Selected {} of {} tests affected by the changes\n".format(
+                    suite.countTests(), allTests.countTests()))
+        graph.save()
+        return suite
+
+    def selectChanged(self, options, suite):
+        """Selects the tests affected by the changes given in the options,
+        and the tests whose coverage is not known."""
+        index = CoverageIndex(self._getHistoryPath(options, "coverage.json"))
+        if len(index.data["tests"]) == 0:
+            raise ValueError("no coverage has been recorded, run with --record-coverage first")
+        affected = index.findAffectedTests(self._readChanges(options))
+        selected = SuiteSelector(lambda test: test.getTestIdentifier() in affected or
+                                 not index.hasTest(test.getTestIdentifier())).select(suite)
+        self.output.write("Selected {} of {} tests affected by the changes\n".format(
+                selected.countTests(), suite.countTests()))
+        return selected
+
+    def _readChanges(self, options):
+        changes = {}
+        for change in options.changed:
+            self._addChange(changes, *CoverageIndex.parseChange(change))
+        if options.changedDiff is not None:
+            root = self._findDiffRoot()
+            for path, ranges in CoverageIndex.parseDiff(self._readDiff(options.changedDiff)).items():
+                self._addChange(changes, os.path.join(root, path), ranges)
+        return changes
+
+    def _findDiffRoot(self):
+        # git diff names files relative to the top of the work tree, wherever it is run from
+        try:
+            process = subprocess.run(["git", "rev-parse", "--show-toplevel"],
+                                     stdout = subprocess.PIPE, stderr = subprocess.DEVNULL,
+                                     universal_newlines = True)
+        except OSError:
+            return os.getcwd()
+        root = process.stdout.strip()
+        if process.returncode != 0 or len(root) == 0:
+            return os.getcwd()
+        return root
+
+    def _addChange(self, changes, path, ranges):
+        # None stands for the whole file, which covers any ranges
+        if ranges is None or changes.get(path, []) is None:
+            changes[path] = None
+        else:
+            changes[path] = changes.get(path, []) + ranges
+
+    def _readDiff(self, path):
+        if path == "-":
+            return sys.stdin.read()
+        with open(path, encoding = "utf-8") as file:
+            return file.read()
+
+    def watchTests(self, options):
+        """Runs the tests, then re-runs those affected by each change until interrupted.
+
+        Returns
+        -------
+        The results of the last run."""
+        watcher = TestWatcher(options.moduleName, lambda suite: self.runSuite(options, suite),
+                              options.ignore, options.watchPaths, options.watchInterval,
+                              self.output)
+        return watcher.watch()
+
+    def runSuite(self, options, suite):
+        """Runs a discovered suite as the options say, and records its history.
+
+        Returns
+        -------
+        The results of the run."""
+        history = DurationHistory(options.history)
+        lastRun = LastRunHistory(self._getHistoryPath(options, "lastrun.json"))
+        flakyHistory = FlakyHistory(self._getHistoryPath(options, "flaky.json"))
+        if len(options.order) > 0:
+            orderer = SuiteOrderer(options.order, lastRun, options.seed, flakyHistory)
+            suite = orderer.reorder(suite)
+            if "random" in options.order:
+                self.output.write("Running in random order with --seed {}\n".format(orderer.seed))
+
+        executor = None
+        coverageIndex = None
+        if options.recordCoverage:
+            if options.jobs > 1 or options.coordinate is not None:
+                raise ValueError("--record-coverage runs tests one after another, "
+                                 "so cannot be used with --jobs or --coordinate")
+            coverageIndex = CoverageIndex(self._getHistoryPath(options, "coverage.json"))
+            executor = CoverageTestExecutor(coverageIndex)
+        elif options.coordinate is not None:
+            executor = self._createCoordinator(options)
+        elif options.jobs > 1:
+            resourceLimits = dict(ResourceScheduler.parseLimit(limit)
+                                  for limit in options.resourceLimits)
+            loadMonitor = None
+            if options.adaptive:
+                memoryHistory = MemoryHistory(self._getHistoryPath(options, "memory.json"))
+                loadMonitor = SystemLoadMonitor(options.jobs, memoryHistory = memoryHistory)
+            executor = backends[options.backend](options.jobs, resourceLimits = resourceLimits,
+                                                 loadMonitor = loadMonitor,
+                                                 **self._getWorkerLimits(options))
+
+        resultCache = None
+        if options.cache:
+            resultCache = ResultCache(self._getHistoryPath(options, "resultcache.json"))
+            resultCache.markCached(suite)
+
+        if options.verbose:
+            runner = VerboseConsoleTestRunner(self.output, bufferOutput = options.bufferOutput,
+                                              executor = executor, history = history,
+                                              maxFailures = options.maxFailures,
+                                              retries = options.retries)
+        else:
+            runner = ConsoleTestRunner(self.output, bufferOutput = options.bufferOutput,
+                                       executor = executor, history = history,
+                                       maxFailures = options.maxFailures,
+                                       retries = options.retries)
+        try:
+            results = runner.run(suite)
+            lastRun.update(suite, results)
+            lastRun.save()
+            flakyHistory.update(suite, results)
+            flakyHistory.save()
+            if resultCache is not None:
+                resultCache.update(suite, results)
+                resultCache.save()
+            if coverageIndex is not None:
+                coverageIndex.save()
+            return results
+        finally:
+            if executor is not None and executor.loadMonitor is not None:
+                executor.loadMonitor.memoryHistory.save()
+            if options.bufferOutput:
+                sys.stdout = sys.__stdout__
+                sys.stderr = sys.__stderr__
+
+    def _getHistoryPath(self, options, fileName):
+        # the other histories are kept next to the durations
+        return os.path.join(os.path.dirname(options.history), fileName)
+
+    def _createCoordinator(self, options):
+        resourceLimits = dict(ResourceScheduler.parseLimit(limit)
+                              for limit in options.resourceLimits)
+        localWorkers = options.jobs if options.jobs > 1 else 0
+        executor = DistributedTestExecutor(parseAddress(options.coordinate), localWorkers,
+                                           resourceLimits = resourceLimits,
+                                           token = options.token)
+        self.output.write("Handing out tests to workers connecting to {}\n".format(
+                options.coordinate))
+        return executor
+
+    def _getWorkerLimits(self, options):
+        limits = { name : getattr(options, name)
+                   for name in ("maxTestsPerWorker", "maxWorkerMemory", "workerMemoryLimit")
+                   if getattr(options, name) is not None }
+        if len(limits) > 0 and options.backend not in ("process", "warm"):
+            raise ValueError("worker test and memory limits need the process backend")
+        return limits
+
+    def writeResults(self, results, path):
+        store = JsonStore(path)
+        store.data = results.toDict()
+        store.save()
+
+    def mergeResults(self, paths):
+        results = TestResults()
+        for path in paths:
+            store = JsonStore(path)
+            if len(store.data) == 0:
+                raise FileNotFoundError("No results could be read from {}".format(path))
+            results.merge(TestResults.fromDict(store.data))
+        return results
+
+    def _exitCode(self, results):
+        if results.countFailures() + results.countErrors() > 0:
+            return 1
+        return 0
+
+def main():
+    exit(CommandLineRunner().main())
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@
 #    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
 
 from ..Engine.TestResults import TestResults
+from ..Execution.TestRetrier import TestRetrier
+from ..Engine.ThreadLocalStream import ThreadLocalStream
 from ..Engine.TestSuite import TestSuite
 
 import io
@@ -29,8 +31,27 @@ class ConsoleTestRunner:
 
     This behaves like the simple cosole test runners in JUnit etc,
     displaying a dot for a passed test, F for a failed test,
-    E for a test that had an error, and I for an ignored test."""
-    def __init__(self, output = sys.stdout, resultsPerLine = 30, bufferOutput = True):
+    E for a test that had an error, and I for an ignored test.
+    A test which was not run because its result was cached from an
+    earlier run with the same inputs is a cached pass, shown by C.
+
+    By default tests are run one after another in this process. Passing
+    an executor, such as a ProcessPoolTestExecutor, runs them through
+    that instead.
+
+    Passing a DurationHistory records how long each test took once the
+    run is complete, and lets the executor order work longest first.
+
+    Passing maxFailures stops the run once that many tests have failed or
+    had errors. Tests which have already started are allowed to finish,
+    and the summary covers the tests which ran.
+
+    Passing retries runs each test which failed or had an error up to that
+    many more times once the run is over, with a TestRetrier. Tests which
+    pass when run again are flaky: they count as passes, and are listed
+    after the summary."""
+    def __init__(self, output = sys.stdout, resultsPerLine = 30, bufferOutput = True,
+                 executor = None, history = None, maxFailures = None, retries = 0):
         self._output = output
         self._resultsPerLine = resultsPerLine
         self._currentResult = 0
@@ -38,9 +59,16 @@ class ConsoleTestRunner:
         self.bufferOutput = bufferOutput
         self.resultsStack = []
         self.suite = TestSuite()
+        self.executor = executor
+        self.history = history
+        self.maxFailures = maxFailures
+        self.retries = retries
+        self.flakyTests = []
+        if executor is not None and executor.history is None:
+            executor.history = history
         if self.bufferOutput:
-            sys.stdout = self.outputBuffer
-            sys.stderr = self.outputBuffer
+            sys.stdout = ThreadLocalStream(self.outputBuffer)
+            sys.stderr = ThreadLocalStream(self.outputBuffer)
 
     def __del__(self):
         if self.bufferOutput:
@@ -58,15 +86,21 @@ class ConsoleTestRunner:
         suite : A testable object, most probably a test suite.
         """
         try:
-            self.results = TestResults()
+            self.results = TestResults(maxFailures = self.maxFailures)
             self.suite = suite
             self._testCount = suite.countTests()
             self._output.write("Starting test run of {} test{}\n".format(
                 self._testCount, self.results.pluralise(self._testCount)))
-            suite.run(self)
+            self._runSuite(suite)
+            if self.retries > 0:
+                self.flakyTests = TestRetrier(self.retries).retry(suite, self.results)
+            self._recordHistory(suite)
             self._output.write("\n")
             self._output.write(self.results.summary())
             self._output.write("\n")
+            self._writeStoppedMessage()
+            self._writeCachedMessage()
+            self._writeFlakyMessage()
             self._output.write(self.outputBuffer.getvalue())
         except Exception as ex:
             sys.__stdout__.write("\n\nError running test suite:\n")
@@ -74,6 +108,38 @@ class ConsoleTestRunner:
 
         return self.results
 
+    def _runSuite(self, suite):
+        if self.executor is None:
+            suite.run(self)
+        else:
+            self.executor.run(suite, self)
+
+    def _writeStoppedMessage(self):
+        if self.results.shouldStop():
+            self._output.write("Run stopped at the failure limit of {}, remaining tests were not run\n".format(
+                self.maxFailures))
+
+    def _writeCachedMessage(self):
+        cached = self.results.countCached()
+        if cached > 0:
+            self._output.write("Cached passes, which were not run again: {}\n".format(cached))
+
+    def _writeFlakyMessage(self):
+        if len(self.flakyTests) > 0:
+            self._output.write("Flaky tests, which failed but passed when run again: {}\n".format(
+                    len(self.flakyTests)))
+            for test in self.flakyTests:
+                self._output.write("    {}\n".format(test.getTestIdentifier()))
+
+    def _recordHistory(self, suite):
+        if self.history is not None:
+            self.history.update(suite, self.results)
+            self.history.save()
+
+    def shouldStop(self):
+        """Determines whether the run has reached maxFailures."""
+        return self.results.shouldStop()
+
     def registerSuiteStarted(self, suiteName):
         suiteResults = self.results.registerSuiteStarted(suiteName)
         return self
@@ -100,11 +166,19 @@ class ConsoleTestRunner:
         self._writeResult("E")
         self.results.registerTestError(suiteName, testName, stackTrace, numErrors)
 
+    def registerTestCached(self, suiteName, testName):
+        """Register a cached pass."""
+        self._writeResult("C")
+        self.results.registerTestCached(suiteName, testName)
+
     def registerTestIgnored(self, suiteName, testName):
         """Register a test ignored."""
         self._writeResult("I")
         self.results.registerTestIgnored(suiteName, testName)
 
+    def registerModulesUsed(self, suiteName, moduleNames):
+        self.results.registerModulesUsed(suiteName, moduleNames)
+
     def _endResultsLineIfNecessary(self):
         """End the results line if it is right to do so."""
         if (self._isEndOfLine() or self._isLastResult()): 
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Execution.SocketMessages import *
+
+import argparse
+import sys
+
+class TestClient:
+    """Asks a TestDaemon to run tests, and writes out the results as they arrive.
+
+    A client can be run from the command line with
+
+        python3 -m WellBehavedPython.Runners.TestClient socket-path [pattern ...]
+
+    which exits with 0 if the tests passed, 1 if any failed or had errors,
+    and 2 if no daemon could be reached."""
+
+    def __init__(self, address, output = sys.stdout):
+        """Constructor.
+
+        Inputs
+        ------
+        address : [str] The path of the Unix socket the daemon listens on.
+        output : The stream to write the results to."""
+        self.address = address
+        self.output = output
+
+    def run(self, patterns = [], verbose = False, maxFailures = None):
+        """Runs tests on the daemon.
+
+        Inputs
+        ------
+        patterns : [list of str] Regular expressions matched against the
+            test identifiers. If empty, every test is run.
+        verbose : [bool] Whether to use the verbose console runner output.
+        maxFailures : [int] The number of failures after which the run
+            stops, or None to run every test.
+
+        Returns
+        -------
+        The exit code: 0 if every test passed, 1 otherwise."""
+        done = self._send({ "type" : "run", "tests" : list(patterns),
+                            "verbose" : verbose, "maxFailures" : maxFailures })
+        if done["failures"] + done["errors"] > 0:
+            return 1
+        return 0
+
+    def stop(self):
+        """Asks the daemon to stop."""
+        self._send({ "type" : "stop" })
+
+    def _send(self, request):
+        connection = createSocket(self.address)
+        try:
+            connection.connect(self.address)
+            stream = openStream(connection)
+            try:
+                sendMessage(stream, request)
+                while True:
+                    message = receiveMessage(stream)
+                    if message is None:
+                        raise ConnectionError("The test daemon closed the connection")
+                    if message["type"] == "output":
+                        self.output.write(message["text"])
+                        self.output.flush()
+                    elif message["type"] == "done":
+                        return message
+            finally:
+                stream.close()
+        finally:
+            connection.close()
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(
+        prog = "python3 -m WellBehavedPython.Runners.TestClient",
+        description = "Runs tests on a TestDaemon.")
+    parser.add_argument("socket", help = "the path of the Unix socket the daemon listens on")
+    parser.add_argument("patterns", nargs = "*", metavar = "PATTERN",
+                        help = "only run tests whose identifiers match a regular expression")
+    parser.add_argument("--verbose", action = "store_true",
+                        help = "print each test name and outcome")
+    parser.add_argument("--max-failures", dest = "maxFailures", type = int, metavar = "N",
+                        help = "stop starting tests once N have failed or had errors")
+    parser.add_argument("--stop", action = "store_true", help = "stop the daemon")
+    options = parser.parse_args(arguments)
+    client = TestClient(options.socket)
+    try:
+        if options.stop:
+            client.stop()
+            return 0
+        return client.run(options.patterns, options.verbose, options.maxFailures)
+    except OSError as ex:
+        sys.stderr.write("Could not reach a test daemon on {}: {}\n".format(options.socket, ex))
+        return 2
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Discovery.TestDiscoverer import TestDiscoverer
+from ..Execution.SocketMessages import *
+from ..Execution.SuiteSelector import SuiteSelector
+from .ConsoleTestRunner import ConsoleTestRunner
+from .TestWatcher import TestWatcher
+from .VerboseConsoleTestRunner import VerboseConsoleTestRunner
+
+import argparse
+import os
+import re
+import sys
+import traceback
+
+class TestDaemon:
+    """Keeps test modules imported and their suite discovered, and runs
+    tests when a TestClient asks.
+
+    The daemon listens on a Unix socket. Each request names the tests to
+    run by regular expressions matched against the test identifiers, such
+    as package.module.Class.test_method, and the console runner output is
+    streamed back to the client as it is written. Requests are handled one
+    at a time.
+
+    Before each run, modules whose files have changed are reloaded, along
+    with the modules which import them, as by a TestWatcher, and the suite
+    is discovered again, so the daemon never runs stale code.
+
+    A daemon can be started from the command line with
+
+        python3 -m WellBehavedPython.Runners.TestDaemon package socket-path"""
+
+    def __init__(self, moduleName, address, ignoreFilters = [], roots = None):
+        """Constructor. Discovers the tests and starts listening straight away.
+
+        Inputs
+        ------
+        moduleName : [str] The module or package to discover tests in.
+        address : [str] The path of the Unix socket to listen on.
+        ignoreFilters : [list of str] Regular expressions for the modules and
+            classes to leave out, as for TestDiscoverer.
+        roots : [list of str] The directories watched for changes, as for
+            TestWatcher."""
+        self.moduleName = moduleName
+        self.ignoreFilters = ignoreFilters
+        self.watcher = TestWatcher(moduleName, None, ignoreFilters, roots)
+        self.watcher.snapshotFiles()
+        self.suite = self.discover()
+        if os.path.exists(address):
+            os.remove(address)
+        self._listener = createSocket(address)
+        self._listener.bind(address)
+        self._listener.listen()
+        self.address = address
+
+    def discover(self):
+        return TestDiscoverer().buildSuiteFromModuleName(
+            self.moduleName, ignoreFilters = self.ignoreFilters)
+
+    def serve(self):
+        """Handles requests until a client asks the daemon to stop."""
+        try:
+            while True:
+                connection, address = self._listener.accept()
+                stream = openStream(connection)
+                try:
+                    if not self.handle(stream):
+                        return
+                except OSError:
+                    # the client went away
+                    pass
+                except Exception:
+                    # one bad request should not stop the daemon
+                    traceback.print_exc()
+                finally:
+                    stream.close()
+                    connection.close()
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops listening and removes the socket."""
+        self._listener.close()
+        if os.path.exists(self.address):
+            os.remove(self.address)
+
+    def handle(self, stream):
+        """Handles one request.
+
+        Returns
+        -------
+        False if the daemon was asked to stop, True otherwise."""
+        try:
+            message = receiveMessage(stream)
+        except ValueError as ex:
+            self._reject(stream, "Could not read the request: {}\n".format(ex))
+            return True
+        if message is None:
+            return True
+        requestType = message.get("type") if isinstance(message, dict) else None
+        if requestType == "stop":
+            sendMessage(stream, { "type" : "done", "failures" : 0, "errors" : 0 })
+            return False
+        if requestType == "run":
+            self._run(stream, message)
+        else:
+            self._reject(stream, "Unknown request: {}\n".format(message))
+        return True
+
+    def _reject(self, stream, reason):
+        sendMessage(stream, { "type" : "output", "text" : reason })
+        sendMessage(stream, { "type" : "done", "failures" : 0, "errors" : 1 })
+
+    def _run(self, stream, request):
+        patterns = request.get("tests", [])
+        if not isinstance(patterns, list) or not all(isinstance(pattern, str)
+                                                     for pattern in patterns):
+            self._reject(stream, "The tests to run must be a list of patterns\n")
+            return
+        maxFailures = request.get("maxFailures")
+        if maxFailures is not None and (not isinstance(maxFailures, int) or
+                                        isinstance(maxFailures, bool)):
+            self._reject(stream, "The maximum number of failures must be a whole number\n")
+            return
+
+        output = _MessageStream(stream)
+        try:
+            if len(self.watcher.reloadChanges()) > 0:
+                self.suite = self.discover()
+        except Exception:
+            output.write("Could not reload the changed modules:\n")
+            output.write(traceback.format_exc())
+            sendMessage(stream, { "type" : "done", "failures" : 0, "errors" : 1 })
+            return
+
+        suite = self.suite
+        if len(patterns) > 0:
+            try:
+                selector = SuiteSelector.matching(patterns)
+            except re.error as ex:
+                self._reject(stream, "Invalid test pattern: {}\n".format(ex))
+                return
+            suite = selector.select(suite)
+        results = self._runSuite(suite, output, request)
+        sendMessage(stream, { "type" : "done",
+                              "failures" : results.countFailures(),
+                              "errors" : results.countErrors() })
+
+    def _runSuite(self, suite, output, request):
+        if request.get("verbose", False):
+            runnerClass = VerboseConsoleTestRunner
+        else:
+            runnerClass = ConsoleTestRunner
+        stdout = sys.stdout
+        stderr = sys.stderr
+        runner = runnerClass(output, maxFailures = request.get("maxFailures"))
+        try:
+            return runner.run(suite)
+        finally:
+            # the runner puts back the original streams when it is deleted
+            del runner
+            sys.stdout = stdout
+            sys.stderr = stderr
+
+class _MessageStream:
+    """Stream which sends everything written to it to a client."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        if len(text) > 0:
+            sendMessage(self._stream, { "type" : "output", "text" : text })
+        return len(text)
+
+    def flush(self):
+        pass
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(
+        prog = "python3 -m WellBehavedPython.Runners.TestDaemon",
+        description = "Keeps tests loaded and runs them when a TestClient asks.")
+    parser.add_argument("moduleName", help = "the module or package to discover tests in")
+    parser.add_argument("socket", help = "the path of the Unix socket to listen on")
+    parser.add_argument("--ignore", action = "append", default = [], metavar = "PATTERN",
+                        help = "ignore modules and classes matching the regular expression")
+    options = parser.parse_args(arguments)
+    TestDaemon(options.moduleName, options.socket, options.ignore).serve()
+
+if __name__ == "__main__":
+    main()
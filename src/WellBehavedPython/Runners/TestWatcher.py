@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+#
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from ..Discovery.ModuleExaminer import ModuleExaminer
+from ..Discovery.SourceRoots import getDefaultRoots
+from ..Discovery.TestDiscoverer import TestDiscoverer
+from ..Engine.TestSuite import TestSuite
+
+import importlib
+import os
+import sys
+import time
+import traceback
+
+class TestWatcher:
+    """Re-runs tests whenever the source files they depend on change.
+
+    The interpreter is kept running between runs, so each run only pays for
+    reloading what changed. The python files under the watched directories
+    are polled for changes to their modification times. When files change,
+    their modules are reloaded, followed by every module which imports them,
+    directly or through other modules, and dependencies are reloaded before
+    the modules that use them. The test modules among those reloaded, and
+    any new test modules, are then rediscovered with a TestDiscoverer and
+    only their tests are run.
+
+    Modules which import each other are found from their globals and from
+    their import statements, with ModuleExaminer.listImportedModules and
+    listModulesInImportStatements, so a module doing from config import
+    settings is reloaded when config changes. WellBehavedPython itself is
+    never reloaded."""
+
+    def __init__(self, moduleName, runSuite, ignoreFilters = [], roots = None,
+                 interval = 1.0, output = sys.stdout):
+        """Constructor.
+
+        Inputs
+        ------
+        moduleName : [str] The module or package to discover tests in.
+        runSuite : Called with each [TestSuite] to run, returning the results.
+        ignoreFilters : [list of str] Regular expressions for the modules and
+            classes to leave out, as for TestDiscoverer.
+        roots : [list of str] The directories to watch. If None, the
+            directories on sys.path are watched, apart from those of the
+            standard library and installed packages.
+        interval : [float] The seconds to wait between checks for changes.
+        output : The stream to report reloads and errors to."""
+        self.moduleName = moduleName
+        self.runSuite = runSuite
+        self.ignoreFilters = ignoreFilters
+        if roots is None:
+            roots = TestWatcher.getDefaultRoots()
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.interval = interval
+        self.output = output
+        self.results = None
+        self._modificationTimes = {}
+
+    getDefaultRoots = staticmethod(getDefaultRoots)
+
+    def watch(self):
+        """Runs every test, then re-runs tests as files change, until interrupted.
+
+        Returns
+        -------
+        The results of the last run."""
+        self.start()
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.checkForChanges()
+        except KeyboardInterrupt:
+            pass
+        return self.results
+
+    def start(self):
+        """Records the current state of the watched files, then runs every test.
+
+        Returns
+        -------
+        The results of the run."""
+        self.snapshotFiles()
+        suite = TestDiscoverer().buildSuiteFromModuleName(
+            self.moduleName, ignoreFilters = self.ignoreFilters)
+        self.results = self.runSuite(suite)
+        return self.results
+
+    def snapshotFiles(self):
+        """Records the modification times of the watched files, which later
+        changes are found against."""
+        self._modificationTimes = self._scanFiles()
+
+    def checkForChanges(self):
+        """Reloads changed modules and re-runs the tests affected by them.
+
+        Returns
+        -------
+        The results of running the affected tests, or None if nothing
+        changed or no tests were affected."""
+        try:
+            testModules = self.reloadChanges()
+        except Exception:
+            self.output.write("Could not reload the changed modules:\n")
+            self.output.write(traceback.format_exc())
+            return None
+
+        suite = self.buildSuite(testModules)
+        if suite.countTests() == 0:
+            return None
+        self.output.write("Re-running tests in {}\n".format(", ".join(suite.listTestModules())))
+        self.results = self.runSuite(suite)
+        return self.results
+
+    def reloadChanges(self):
+        """Reloads the modules whose files have changed since they were last
+        checked, and the modules which import them.
+
+        Returns
+        -------
+        The names of the test modules which were reloaded, followed by the
+        names of any new test modules. The list is empty if nothing changed.
+
+        Raises
+        ------
+        Whatever reloading a module raised, such as a SyntaxError. The
+        changes are not looked for again until the files change again."""
+        modificationTimes = self._scanFiles()
+        changedFiles = [path for path, modified in modificationTimes.items()
+                        if self._modificationTimes.get(path) != modified]
+        self._modificationTimes = modificationTimes
+        if len(changedFiles) == 0:
+            return []
+
+        importlib.invalidate_caches()
+        changedModules, newModules = self._findModules(changedFiles)
+        reloaded = self.findAffectedModules(changedModules)
+        self.reloadModules(reloaded)
+        return [name for name in reloaded + newModules if self._isTestModule(name)]
+
+    def findAffectedModules(self, moduleNames):
+        """Finds the loaded modules which need reloading when modules change.
+
+        Inputs
+        ------
+        moduleNames : [list of str] The names of the modules which changed.
+
+        Returns
+        -------
+        The names of the changed modules and every watched module which
+        imports them, directly or indirectly, ordered so that each module
+        comes after the modules it imports."""
+        imports = self._findImports()
+        importers = {}
+        for name, imported in imports.items():
+            for importedName in imported:
+                importers.setdefault(importedName, set()).add(name)
+
+        affected = set()
+        toVisit = [name for name in moduleNames if name in imports]
+        while len(toVisit) > 0:
+            name = toVisit.pop()
+            if name in affected:
+                continue
+            affected.add(name)
+            toVisit.extend(importers.get(name, ()))
+
+        ordered = []
+        def visit(name, visiting):
+            if name in ordered or name in visiting:
+                return
+            visiting.add(name)
+            for importedName in sorted(imports[name] & affected):
+                visit(importedName, visiting)
+            ordered.append(name)
+        for name in sorted(affected):
+            visit(name, set())
+        return ordered
+
+    def reloadModules(self, moduleNames):
+        """Reloads the modules, in the order given."""
+        for name in moduleNames:
+            importlib.reload(sys.modules[name])
+
+    def buildSuite(self, testModules):
+        """Builds a suite holding the tests of the given test modules."""
+        suite = TestSuite(self.moduleName)
+        discoverer = TestDiscoverer()
+        for name in testModules:
+            subsuite = discoverer.buildSuiteFromModuleName(name, ignoreFilters = self.ignoreFilters)
+            if subsuite.countTests() > 0:
+                suite.add(subsuite)
+        return suite
+
+    def _isTestModule(self, name):
+        return name == self.moduleName or name.startswith(self.moduleName + ".")
+
+    def _isWatched(self, path):
+        return any(path.startswith(root + os.sep) for root in self.roots)
+
+    def _scanFiles(self):
+        modificationTimes = {}
+        for root in self.roots:
+            for directory, subdirectories, files in os.walk(root):
+                subdirectories[:] = [name for name in subdirectories
+                                     if not name.startswith(".") and name != "__pycache__"]
+                for name in files:
+                    if name.endswith(".py"):
+                        path = os.path.join(directory, name)
+                        try:
+                            modificationTimes[path] = os.stat(path).st_mtime_ns
+                        except OSError:
+                            pass
+        return modificationTimes
+
+    def _getReloadableModules(self):
+        modules = {}
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, "__file__", None)
+            if (path is None or name == "__main__" or name == "WellBehavedPython" or
+                name.startswith("WellBehavedPython.")):
+                continue
+            path = os.path.abspath(path)
+            if self._isWatched(path):
+                modules[name] = path
+        return modules
+
+    def _findImports(self):
+        imports = {}
+        for name in self._getReloadableModules():
+            examiner = ModuleExaminer(name)
+            imports[name] = (set(examiner.listImportedModules()) |
+                             set(examiner.listModulesInImportStatements()))
+        return imports
+
+    def _findModules(self, paths):
+        """Splits changed files into the names of loaded modules, and the
+        names of new modules in loaded test packages."""
+        modulesByPath = dict((path, name) for name, path in self._getReloadableModules().items())
+        changed = []
+        new = []
+        for path in paths:
+            name = modulesByPath.get(path)
+            if name is not None:
+                changed.append(name)
+                continue
+            name = self._findNewModuleName(path)
+            if name is not None and self._isTestModule(name):
+                new.append(name)
+        return changed, new
+
+    def _findNewModuleName(self, path):
+        directory, fileName = os.path.split(path)
+        for name, module in list(sys.modules.items()):
+            packagePaths = getattr(module, "__path__", None)
+            if packagePaths is None:
+                continue
+            if any(os.path.abspath(packagePath) == directory for packagePath in list(packagePaths)):
+                return "{}.{}".format(name, fileName[:-len(".py")])
+        return None
@@ -18,6 +18,7 @@
 #    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
 
 from ..Engine.TestResults import TestResults
+from ..Engine.ThreadLocalStream import ThreadLocalStream
 from .ConsoleTestRunner import ConsoleTestRunner
 
 import io
@@ -30,8 +31,11 @@ class VerboseConsoleTestRunner(ConsoleTestRunner):
     This behaves like the verbose cosole test runners in JUnit etc,
     displaying the name of a test and then the result and timing
     details."""
-    def __init__(self, output = sys.stdout,  bufferOutput = True):
-        ConsoleTestRunner.__init__(self, output, bufferOutput = bufferOutput)
+    def __init__(self, output = sys.stdout,  bufferOutput = True, executor = None,
+                 history = None, maxFailures = None, retries = 0):
+        ConsoleTestRunner.__init__(self, output, bufferOutput = bufferOutput,
+                                   executor = executor, history = history,
+                                   maxFailures = maxFailures, retries = retries)
         self._currentResult = 0
         self.outputBuffer = io.StringIO()
         self.bufferOutput = bufferOutput
@@ -40,8 +44,8 @@ class VerboseConsoleTestRunner(ConsoleTestRunner):
         self.dotsLevel = 3 # the column to fill dots into
         self._updateIndentation()
         if self.bufferOutput:
-            sys.stdout = self.outputBuffer
-            sys.stderr = self.outputBuffer
+            sys.stdout = ThreadLocalStream(self.outputBuffer)
+            sys.stderr = ThreadLocalStream(self.outputBuffer)
 
     def __del__(self):
         if self.bufferOutput:
@@ -101,8 +105,18 @@ class VerboseConsoleTestRunner(ConsoleTestRunner):
     def registerTestError(self, suiteName, testName, stackTrace, numberErrors = 1):
         """Register a test failed."""
         self.results.registerTestError(suiteName, testName, stackTrace, numberErrors)
+        if testName in ("beforeClass", "afterClass"):
+            # these are not started like tests, so have no duration of their own
+            self._output.write("{} error\n".format(
+                    self.addDotsTo("{}{}".format(self.indentation, testName))))
+            return
         self.registerTestFinished(suiteName, testName, "error")
 
+    def registerTestCached(self, suiteName, testName):
+        """Register a cached pass."""
+        self.results.registerTestCached(suiteName, testName)
+        self.registerTestFinished(suiteName, testName, "cached pass")
+
     def registerTestIgnored(self, suiteName, testName):
         """Register a test ignored."""
         self.results.registerTestIgnored(suiteName, testName)
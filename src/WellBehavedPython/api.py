@@ -43,6 +43,28 @@ def discoverTests(name, suiteName=None, ignoreFilters=[]):
     discoverer = TestDiscoverer()
     return discoverer.buildSuiteFromModuleName(name, suiteName = suiteName, ignoreFilters = ignoreFilters)
 
+def timeout(seconds):
+    """Decorator limiting how long tests may take to run.
+
+    Applied to a test method, it limits that test. Applied to a TestCase
+    class, it limits each test in the class, unless the test has its own
+    limit. A test which runs out of time is registered as an error, with
+    the stacks of all threads in its stack trace.
+
+    Inputs
+    ------
+    seconds : [float] The number of seconds each test may take.
+
+    Example
+    -------
+    @timeout(5)
+    def test_service_replies(self):
+        ..."""
+    def decorate(testMethodOrClass):
+        testMethodOrClass.timeout = seconds
+        return testMethodOrClass
+    return decorate
+
 def registerExpectationClass(usePredicate, constructor):
     """Way of registereing new expectation classes.
 
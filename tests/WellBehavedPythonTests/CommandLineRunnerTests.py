@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Runners.CommandLineRunner import *
+
+from .Samples.Execution.SampleFlakyTestCases import TestCaseWithFlakyTest
+
+import io
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+class CommandLineRunnerTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        self.output = io.StringIO()
+        self.runner = CommandLineRunner(self.output)
+        self.directory = tempfile.mkdtemp()
+        self.history = os.path.join(self.directory, "durations.json")
+        self.moduleName = "WellBehavedPythonTests.Samples.SampleComplexModule"
+
+    def after(self):
+        shutil.rmtree(self.directory)
+
+    def runWith(self, *arguments):
+        return self.runner.main(["--no-buffer", "--history", self.history] + list(arguments))
+
+    def test_passing_run_exits_with_zero(self):
+        # When
+        exitCode = self.runWith(self.moduleName)
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("from 4 tests")
+
+    def test_failing_run_exits_with_one(self):
+        # When
+        exitCode = self.runWith("WellBehavedPythonTests.Samples.SampleTestCases",
+                            "--ignore", "Saboteur")
+
+        # Then
+        expect(exitCode).toEqual(1)
+
+    def test_run_records_durations(self):
+        # When
+        self.runWith(self.moduleName)
+
+        # Then
+        expect(os.path.exists(self.history)).toBeTrue()
+
+    def test_verbose_run_lists_tests(self):
+        # When
+        self.runWith(self.moduleName, "--verbose")
+
+        # Then
+        expect(self.output.getvalue()).toMatch("SampleFirstTests\\.*")
+
+    def test_shards_together_run_every_test(self):
+        # Where
+        first = os.path.join(self.directory, "first.json")
+        second = os.path.join(self.directory, "second.json")
+
+        # When
+        self.runWith(self.moduleName, "--shard", "1/2", "--write-results", first)
+        self.runWith(self.moduleName, "--shard", "2/2", "--write-results", second)
+        self.output = io.StringIO()
+        self.runner = CommandLineRunner(self.output)
+        exitCode = self.runner.main(["--merge-results", first, second])
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toStartWith("0 failures 0 errors 0 ignored from 4 tests")
+
+    def test_each_shard_runs_part_of_the_suite(self):
+        # When
+        self.runWith(self.moduleName, "--shard", "1/2")
+
+        # Then
+        expect(self.output.getvalue()).toContain("from 2 tests")
+
+    def test_fail_fast_stops_at_the_first_failure(self):
+        # When
+        exitCode = self.runWith("WellBehavedPythonTests.Samples.Execution.SampleFailFastTestCases",
+                                "--fail-fast")
+
+        # Then
+        expect(exitCode).toEqual(1)
+        expect(self.output.getvalue()).toContain("from 3 tests")
+
+    def test_each_backend_runs_every_test(self):
+        for backend in ["process", "thread", "subinterpreter", "warm"]:
+            # Where
+            self.output = io.StringIO()
+            self.runner = CommandLineRunner(self.output)
+
+            # When
+            exitCode = self.runWith(self.moduleName, "--jobs", "2", "--backend", backend)
+
+            # Then
+            expect(exitCode).toEqual(0)
+            expect(self.output.getvalue()).toContain("from 4 tests")
+
+    def test_coordinator_hands_tests_to_local_workers(self):
+        # When
+        exitCode = self.runWith(self.moduleName, "--jobs", "2", "--coordinate", "127.0.0.1:0")
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("from 4 tests")
+
+    def test_coordinator_for_other_machines_needs_a_token(self):
+        expect(self.runExpectingError(self.moduleName, "--coordinate", ":0")).toEqual(2)
+        expect(self.runWith(self.moduleName, "--jobs", "2", "--coordinate", ":0",
+                            "--token", "secret")).toEqual(0)
+
+    def test_unknown_backend_is_rejected(self):
+        # Where
+        stderr = sys.stderr
+        sys.stderr = io.StringIO()
+
+        # When
+        try:
+            exitCode = None
+            self.runWith(self.moduleName, "--backend", "fibres")
+        except SystemExit as ex:
+            exitCode = ex.code
+        finally:
+            sys.stderr = stderr
+
+        # Then
+        expect(exitCode).toEqual(2)
+
+    def test_resource_limits_are_accepted(self):
+        # When
+        exitCode = self.runWith(self.moduleName, "--jobs", "2", "--backend", "thread",
+                                "--resource-limit", "cpu-heavy=cores/2")
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("from 4 tests")
+
+    def test_adaptive_run_records_memory_next_to_durations(self):
+        # When
+        exitCode = self.runWith(self.moduleName, "--jobs", "2", "--adaptive")
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("from 4 tests")
+        expect(os.path.exists(os.path.join(self.directory, "memory.json"))).toBeTrue()
+
+    def test_worker_limits_are_accepted(self):
+        # When
+        exitCode = self.runWith(self.moduleName, "--jobs", "2", "--max-tests-per-worker", "1",
+                                "--max-worker-memory", "1G", "--worker-memory-limit", "16G")
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("from 4 tests")
+
+    def test_worker_limits_are_accepted_by_the_warm_backend(self):
+        # When
+        exitCode = self.runWith(self.moduleName, "--jobs", "2", "--backend", "warm",
+                                "--max-tests-per-worker", "1")
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("from 4 tests")
+
+    def test_worker_limits_need_the_process_backend(self):
+        # Where
+        stderr = sys.stderr
+        sys.stderr = io.StringIO()
+
+        # When
+        try:
+            exitCode = self.runWith(self.moduleName, "--jobs", "2", "--backend", "thread",
+                                    "--max-tests-per-worker", "1")
+        except SystemExit as ex:
+            exitCode = ex.code
+        finally:
+            sys.stderr = stderr
+
+        # Then
+        expect(exitCode).toEqual(2)
+
+    def test_run_records_last_run_next_to_durations(self):
+        # When
+        self.runWith(self.moduleName)
+
+        # Then
+        expect(os.path.exists(os.path.join(self.directory, "lastrun.json"))).toBeTrue()
+
+    def test_cached_run_skips_tests_which_passed_before(self):
+        # Where
+        self.runWith(self.moduleName, "--cache")
+        self.output.truncate(0)
+
+        # When
+        exitCode = self.runWith(self.moduleName, "--cache")
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("Cached passes, which were not run again: 4")
+        expect(os.path.exists(os.path.join(self.directory, "resultcache.json"))).toBeTrue()
+
+    def runExpectingError(self, *arguments):
+        stderr = sys.stderr
+        sys.stderr = io.StringIO()
+        try:
+            return self.runWith(*arguments)
+        except SystemExit as ex:
+            return ex.code
+        finally:
+            sys.stderr = stderr
+
+    def getSamplePath(self, moduleName):
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "Samples",
+                            moduleName + ".py")
+
+    def test_changed_file_selects_the_tests_which_ran_it(self):
+        # Where
+        self.runWith(self.moduleName, "--record-coverage")
+        self.output.truncate(0)
+
+        # When
+        exitCode = self.runWith(self.moduleName, "--changed",
+                                self.getSamplePath("SampleComplexModule"))
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("Selected 4 of 4 tests affected by the changes")
+        expect(os.path.exists(os.path.join(self.directory, "coverage.json"))).toBeTrue()
+
+    def test_changed_file_no_test_ran_selects_nothing(self):
+        # Where
+        self.runWith(self.moduleName, "--record-coverage")
+        self.output.truncate(0)
+
+        # When
+        self.runWith(self.moduleName, "--changed", self.getSamplePath("SampleTestCases"))
+
+        # Then
+        expect(self.output.getvalue()).toContain("Selected 0 of 4 tests affected by the changes")
+
+    def test_changed_lines_select_the_tests_which_ran_them(self):
+        # Where
+        self.runWith(self.moduleName, "--record-coverage")
+        self.output.truncate(0)
+        path = self.getSamplePath("SampleComplexModule")
+        with open(path) as file:
+            line = file.read().splitlines().index("    def test_something_else(self):") + 2
+
+        # When
+        self.runWith(self.moduleName, "--changed", "{}:{}".format(path, line))
+
+        # Then
+        expect(self.output.getvalue()).toContain("Selected 1 of 4 tests affected by the changes")
+
+    def test_changed_diff_selects_the_tests_which_ran_the_changed_lines(self):
+        # Where
+        self.runWith(self.moduleName, "--record-coverage")
+        self.output.truncate(0)
+        path = self.getSamplePath("SampleComplexModule")
+        diff = os.path.join(self.directory, "changes.diff")
+        with open(diff, "w") as file:
+            file.write("--- a/{0}\n+++ b/{0}\n@@ -1,1 +1,1 @@\n-old\n+new\n".format(path))
+
+        # When
+        self.runWith(self.moduleName, "--changed-diff", diff)
+
+        # Then
+        expect(self.output.getvalue()).toContain("Selected 0 of 4 tests affected by the changes")
+
+    def test_changed_diff_paths_are_relative_to_the_top_of_the_work_tree(self):
+        # Where
+        path = self.getSamplePath("SampleComplexModule")
+        process = subprocess.run(["git", "rev-parse", "--show-toplevel"],
+                                 cwd = os.path.dirname(path), stdout = subprocess.PIPE,
+                                 stderr = subprocess.DEVNULL, universal_newlines = True)
+        if process.returncode != 0 or os.getcwd() == process.stdout.strip():
+            return
+        self.runWith(self.moduleName, "--record-coverage")
+        self.output.truncate(0)
+        with open(path) as file:
+            line = file.read().splitlines().index("    def test_something_else(self):") + 2
+        diff = os.path.join(self.directory, "changes.diff")
+        with open(diff, "w") as file:
+            file.write("--- a/{0}\n+++ b/{0}\n@@ -{1},1 +{1},1 @@\n-old\n+new\n".format(
+                os.path.relpath(path, process.stdout.strip()).replace(os.sep, "/"), line))
+
+        # When
+        self.runWith(self.moduleName, "--changed-diff", diff)
+
+        # Then
+        expect(self.output.getvalue()).toContain("Selected 1 of 4 tests affected by the changes")
+
+    def test_changed_needs_recorded_coverage(self):
+        expect(self.runExpectingError(self.moduleName, "--changed", "module.py")).toEqual(2)
+
+    def test_first_selection_by_imports_discovers_every_test(self):
+        # When
+        exitCode = self.runWith(self.moduleName, "--select-by", "imports", "--changed",
+                                self.getSamplePath("SampleComplexModule"))
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("Selected 4 of 4 tests affected by the changes")
+        expect(os.path.exists(os.path.join(self.directory, "imports.json"))).toBeTrue()
+
+    def test_changed_import_selects_the_test_modules_which_import_it(self):
+        # Where
+        testCasePath = sys.modules["WellBehavedPython.Engine.TestCase"].__file__
+        self.runWith(self.moduleName, "--select-by", "imports", "--changed", testCasePath)
+        self.output.truncate(0)
+
+        # When
+        exitCode = self.runWith(self.moduleName, "--select-by", "imports",
+                                "--changed", testCasePath)
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain(
+            "Selected the tests in 1 of 1 test modules affected by the changes")
+        expect(self.output.getvalue()).toContain("from 4 tests")
+
+    def test_changed_file_not_imported_selects_no_test_modules(self):
+        # Where
+        self.runWith(self.moduleName, "--select-by", "imports", "--changed",
+                     self.getSamplePath("SampleComplexModule"))
+        self.output.truncate(0)
+
+        # When
+        self.runWith(self.moduleName, "--select-by", "imports", "--changed",
+                     self.getSamplePath("SampleTestCases"))
+
+        # Then
+        expect(self.output.getvalue()).toContain(
+            "Selected the tests in 0 of 1 test modules affected by the changes")
+
+    def test_last_failed_runs_only_the_tests_which_failed(self):
+        # Where
+        self.runWith("WellBehavedPythonTests.Samples.SampleTestCases", "--ignore", "Saboteur")
+        match = re.search("(\\d+) failures? (\\d+) errors?", self.output.getvalue())
+        failedCount = int(match.group(1)) + int(match.group(2))
+        self.output.truncate(0)
+
+        # When
+        exitCode = self.runWith("WellBehavedPythonTests.Samples.SampleTestCases", "--last-failed")
+
+        # Then
+        expect(exitCode).toEqual(1)
+        expect(self.output.getvalue()).toContain(
+            "Re-running {} tests which failed last time they ran".format(failedCount))
+        expect(self.output.getvalue()).toContain("0 ignored from {} tests".format(failedCount))
+
+    def test_last_failed_after_passing_run_runs_nothing(self):
+        # Where
+        self.runWith(self.moduleName)
+        self.output.truncate(0)
+
+        # When
+        exitCode = self.runWith(self.moduleName, "--last-failed")
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain(
+            "Re-running 0 tests which failed last time they ran")
+
+    def test_watch_cannot_be_used_with_last_failed(self):
+        expect(self.runExpectingError(self.moduleName, "--watch", "--last-failed")).toEqual(2)
+
+    def test_retries_report_flaky_tests_and_record_them(self):
+        # Where
+        TestCaseWithFlakyTest.failuresLeft = 1
+
+        # When
+        try:
+            exitCode = self.runWith("WellBehavedPythonTests.Samples.Execution.SampleFlakyTestCases",
+                                    "--ignore", "Broken", "--retries", "1")
+        finally:
+            TestCaseWithFlakyTest.failuresLeft = 0
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain(
+            "Flaky tests, which failed but passed when run again: 1")
+        expect(os.path.exists(os.path.join(self.directory, "flaky.json"))).toBeTrue()
+
+    def test_record_coverage_cannot_be_used_with_jobs(self):
+        expect(self.runExpectingError(self.moduleName, "--record-coverage", "--jobs", "2")
+               ).toEqual(2)
+
+    def test_random_order_prints_the_seed(self):
+        # When
+        exitCode = self.runWith(self.moduleName, "--order", "random", "--seed", "42")
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("Running in random order with --seed 42")
+        expect(self.output.getvalue()).toContain("from 4 tests")
+
+    def test_failed_first_order_is_accepted(self):
+        # When
+        exitCode = self.runWith(self.moduleName, "--order", "failed-first", "--order", "new-first")
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("from 4 tests")
+
+    def test_watch_cannot_be_used_with_shards(self):
+        # Where
+        stderr = sys.stderr
+        sys.stderr = io.StringIO()
+
+        # When
+        try:
+            exitCode = self.runWith(self.moduleName, "--watch", "--shard", "1/2")
+        except SystemExit as ex:
+            exitCode = ex.code
+        finally:
+            sys.stderr = stderr
+
+        # Then
+        expect(exitCode).toEqual(2)
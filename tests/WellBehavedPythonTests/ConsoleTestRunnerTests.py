@@ -21,6 +21,7 @@ from WellBehavedPython.api import *
 from WellBehavedPython.Engine.TestCase import *
 from WellBehavedPython.Runners.ConsoleTestRunner import *
 
+from .Samples.Execution.SampleFlakyTestCases import *
 from .Samples.SampleTestCases import *
 
 import io
@@ -182,3 +183,52 @@ Failing test
 """)
         expect(theOutput).toContain("from 6 tests")
 
+    def test_that_flaky_test_is_retried_and_listed(self):
+        # Where
+        runner = ConsoleTestRunner(self.output, resultsPerLine = 3, retries = 2)
+        suite = TestCaseWithFlakyTest.suite()
+        TestCaseWithFlakyTest.failuresLeft = 1
+
+        # When
+        try:
+            runner.run(suite)
+        finally:
+            TestCaseWithFlakyTest.failuresLeft = 0
+
+        # Then
+        theOutput = self.output.getvalue()
+        expect(theOutput).toContain("0 failures 0 errors 0 ignored from 2 tests")
+        expect(theOutput).toContain("Flaky tests, which failed but passed when run again: 1")
+        expect(theOutput).toContain("    {}.TestCaseWithFlakyTest.test_flaky\n".format(
+                TestCaseWithFlakyTest.__module__))
+
+    def test_that_failed_tests_are_not_retried_by_default(self):
+        # Where
+        suite = TestCaseWithFlakyTest.suite()
+        TestCaseWithFlakyTest.failuresLeft = 1
+
+        # When
+        try:
+            self.runner.run(suite)
+        finally:
+            TestCaseWithFlakyTest.failuresLeft = 0
+
+        # Then
+        theOutput = self.output.getvalue()
+        expect(theOutput).toContain("1 failure 0 errors 0 ignored from 2 tests")
+        expect(theOutput).Not.toContain("Flaky tests")
+
+    def test_that_cached_pass_is_shown_as_c_and_counted(self):
+        # Where
+        runner = self.runner
+        suite = TestCaseWithPassingTest.suite()
+        suite.tests[0].cached = True
+
+        # When
+        runner.run(suite)
+
+        # Then
+        theOutput = self.output.getvalue()
+        expect(theOutput).toContain("C\n")
+        expect(theOutput).toContain("from 1 test ")
+        expect(theOutput).toContain("Cached passes, which were not run again: 1")
@@ -21,6 +21,12 @@ from WellBehavedPython.api import *
 from WellBehavedPython.Engine.TestCase import TestCase
 from WellBehavedPython.Discovery.ModuleExaminer import ModuleExaminer
 
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
 class ModuleExaminerTests(TestCase):
 
     def test_examiner_can_find__only_class_in_simple_module(self):
@@ -83,3 +89,61 @@ class ModuleExaminerTests(TestCase):
         # Then
         expect(packages).toContain('WellBehavedPythonTests.Discovery')
 
+
+    def test_examiner_lists_modules_imported_from(self):
+        # Where
+        examiner = ModuleExaminer('WellBehavedPythonTests.Samples.SampleComplexModule')
+
+        # When
+        modules = examiner.listImportedModules()
+
+        # Then
+        expect(modules).toEqual(['WellBehavedPython.Engine.TestCase'])
+
+    def test_examiner_lists_modules_imported_whole(self):
+        # Where
+        examiner = ModuleExaminer('WellBehavedPython.Discovery.ModuleExaminer')
+
+        # When
+        modules = examiner.listImportedModules()
+
+        # Then
+        expect(modules).toContain('importlib')
+        expect(modules).toContain('pkgutil')
+        expect(modules).Not.toContain('WellBehavedPython.Discovery.ModuleExaminer')
+
+    def test_examiner_lists_modules_in_import_statements(self):
+        # Where
+        examiner = ModuleExaminer('WellBehavedPython.Discovery.ModuleExaminer')
+
+        # When
+        modules = examiner.listModulesInImportStatements()
+
+        # Then
+        expect(modules).toContain('importlib.util')
+        expect(modules).toContain('types')
+        expect(modules).Not.toContain('WellBehavedPython.Discovery.ModuleExaminer')
+
+    def test_examiner_lists_modules_first_imported_with_the_module(self):
+        # Where
+        directory = tempfile.mkdtemp()
+        prefix = "Imported" + uuid.uuid4().hex
+        with open(os.path.join(directory, prefix + "Used.py"), "w") as file:
+            file.write("value = 1\n")
+        with open(os.path.join(directory, prefix + "User.py"), "w") as file:
+            file.write("import {}Used\n".format(prefix))
+        sys.path.insert(0, directory)
+
+        try:
+            # When
+            examiner = ModuleExaminer(prefix + "User")
+            again = ModuleExaminer(prefix + "User")
+        finally:
+            sys.path.remove(directory)
+            for name in (prefix + "Used", prefix + "User"):
+                sys.modules.pop(name, None)
+            shutil.rmtree(directory)
+
+        # Then
+        expect(examiner.newModules).toEqual([prefix + "Used"])
+        expect(again.newModules).toEqual([])
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+# Copyright 2013 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import TestCase
+from WellBehavedPython.Discovery.SourceRoots import getDefaultRoots
+
+import os
+import sys
+import tempfile
+
+class SourceRootsTests(TestCase):
+
+    def test_default_roots_leave_out_the_standard_library(self):
+        # When
+        roots = getDefaultRoots()
+
+        # Then
+        expect(roots).Not.toContain(os.path.dirname(os.__file__))
+
+    def test_default_roots_include_project_directories_on_the_path(self):
+        # Where
+        directory = tempfile.mkdtemp()
+        sys.path.append(directory)
+
+        # When
+        try:
+            roots = getDefaultRoots()
+        finally:
+            sys.path.remove(directory)
+            os.rmdir(directory)
+
+        # Then
+        expect(roots).toContain(os.path.abspath(directory))
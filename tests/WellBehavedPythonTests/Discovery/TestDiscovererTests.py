@@ -22,6 +22,14 @@ from WellBehavedPython.Engine.TestCase import TestCase
 from WellBehavedPython.Engine.TestSuite import TestSuite
 from WellBehavedPython.Discovery.TestDiscoverer import TestDiscoverer
 
+class RecordingImportGraph:
+
+    def __init__(self):
+        self.moduleNames = []
+
+    def recordTestModule(self, examiner):
+        self.moduleNames.append(examiner.moduleName)
+
 class TestDiscovererTests(TestCase):
 
     def test_can_find_only_TestCase_in_a_module(self):
@@ -40,6 +48,18 @@ class TestDiscovererTests(TestCase):
         childSuite = suite.tests[0]
         expect(childSuite.suiteName).toEqual('SampleTests')
 
+    def test_examined_modules_are_recorded_in_import_graph(self):
+        # Where
+        graph = RecordingImportGraph()
+        discoverer = TestDiscoverer(graph)
+        moduleName = 'WellBehavedPythonTests.Samples.SampleModule'
+
+        # When
+        discoverer.buildSuiteFromModuleName(moduleName)
+
+        # Then
+        expect(graph.moduleNames).toEqual([moduleName])
+
     def test_can_find_multiple_TestCases_in_a_module(self):
         # Where
         discoverer = TestDiscoverer();
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.ThreadLocalStream import *
+
+from ..Samples.Execution.SampleAsyncTestCases import *
+
+import asyncio
+import io
+import sys
+
+class AsyncTestCaseTests(TestCase):
+
+    def before(self):
+        self.results = TestResults()
+        TestCaseWithConcurrentAsyncTests.reset()
+
+    def createTest(self, klass, testMethod):
+        test = klass()
+        test.configureTest(testMethod)
+        return test
+
+    def test_async_test_is_detected(self):
+        test = self.createTest(TestCaseWithAsyncTests, "test_async_pass")
+
+        expect(test.isAsync()).toBeTrue()
+
+    def test_synchronous_test_is_not_async(self):
+        test = self.createTest(TestCaseWithConcurrentAsyncTests, "test_synchronous")
+
+        expect(test.isAsync()).toBeFalse()
+
+    def test_passing_async_test_is_awaited_and_passes(self):
+        # Where
+        test = self.createTest(TestCaseWithAsyncTests, "test_async_pass")
+
+        # When
+        test.run(self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(1)
+
+    def test_failing_async_test_fails(self):
+        # Where
+        test = self.createTest(TestCaseWithAsyncTests, "test_async_fail")
+
+        # When
+        test.run(self.results)
+
+        # Then
+        expect(self.results.countFailures()).toEqual(1)
+        expect(self.results.summary()).toContain("Failing async test")
+
+    def test_async_test_raising_error_is_an_error(self):
+        # Where
+        test = self.createTest(TestCaseWithAsyncTests, "test_async_error")
+
+        # When
+        test.run(self.results)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(1)
+
+    def test_cached_async_test_is_registered_as_cached_pass_without_running(self):
+        # Where
+        test = self.createTest(TestCaseWithAsyncTests, "test_async_fail")
+        test.cached = True
+
+        # When
+        asyncio.run(test.runAsync(self.results))
+
+        # Then
+        expect(self.results.countCached()).toEqual(1)
+        expect(self.results.countFailures()).toEqual(0)
+
+    def test_suite_of_async_tests_runs_them_all(self):
+        # Where
+        suite = TestCaseWithAsyncTests.suite()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(self.results.countTests()).toEqual(3)
+        expect(self.results.countPasses()).toEqual(1)
+        expect(self.results.countFailures()).toEqual(1)
+        expect(self.results.countErrors()).toEqual(1)
+
+    def test_concurrent_async_tests_respect_concurrency_limit(self):
+        # Where
+        suite = TestCaseWithConcurrentAsyncTests.suite()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(self.results.countTests()).toEqual(4)
+        expect(self.results.countPasses()).toEqual(4)
+        expect(TestCaseWithConcurrentAsyncTests.maxRunning).toEqual(2)
+
+    def test_concurrent_async_tests_are_registered_in_suite_order(self):
+        # Where
+        suite = TestCaseWithConcurrentAsyncTests.suite()
+        expectedNames = [test.testMethodName for test in suite.tests]
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        suiteResults = self.results.suiteResults[0]
+        names = [testResults.name for testResults in suiteResults.suiteResults]
+        expect(names).toEqual(expectedNames)
+
+    def test_concurrent_async_tests_keep_their_own_output(self):
+        # Where
+        suite = TestCaseWithConcurrentAsyncTests.suite()
+        output = io.StringIO()
+        stdout = sys.stdout
+        stderr = sys.stderr
+        sys.stdout = ThreadLocalStream(output)
+        sys.stderr = ThreadLocalStream(output)
+
+        # When
+        try:
+            suite.run(self.results)
+        finally:
+            sys.stdout = stdout
+            sys.stderr = stderr
+
+        # Then
+        expectedOutput = "".join(test.testMethodName + "\n" for test in suite.tests
+                                 if test.isAsync())
+        expect(output.getvalue()).toEqual(expectedOutput)
+
+    def test_cached_concurrent_async_tests_are_not_run(self):
+        # Where
+        suite = TestCaseWithConcurrentAsyncTests.suite()
+        for test in suite.tests:
+            test.cached = test.testMethodName != "test_third"
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(self.results.countTests()).toEqual(4)
+        expect(self.results.countCached()).toEqual(3)
+        expect(TestCaseWithConcurrentAsyncTests.maxRunning).toEqual(1)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.EventLoop import *
+
+import asyncio
+import threading
+
+class EventLoopTests(TestCase):
+
+    def test_loop_is_shared_on_a_thread(self):
+        expect(getEventLoop() is getEventLoop()).toBeTrue()
+
+    def test_each_thread_has_its_own_loop(self):
+        # Where
+        loops = []
+        thread = threading.Thread(target = lambda: loops.append(getEventLoop()))
+
+        # When
+        thread.start()
+        thread.join()
+
+        # Then
+        expect(loops[0] is getEventLoop()).toBeFalse()
+
+    def test_run_on_event_loop_returns_result(self):
+        async def answer():
+            await asyncio.sleep(0)
+            return 42
+
+        expect(runOnEventLoop(answer())).toEqual(42)
+
+    def test_coroutine_functions_are_async_callables(self):
+        async def coroutine():
+            pass
+        def function():
+            pass
+
+        expect(isAsyncCallable(coroutine)).toBeTrue()
+        expect(isAsyncCallable(function)).toBeFalse()
+
+    def test_call_async_calls_plain_functions(self):
+        expect(runOnEventLoop(callAsync(lambda: 7))).toEqual(7)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.ForkedCall import *
+from WellBehavedPython.Engine.TestCase import *
+
+import gc
+import os
+import signal
+import time
+
+class ForkedCallTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        self.state = []
+
+    def test_result_is_returned_from_child(self):
+        expect(callInFork(lambda: 6 * 7)).toEqual(42)
+
+    def test_changes_in_child_do_not_affect_parent(self):
+        # Where
+        def change():
+            self.state.append("child")
+            return len(self.state)
+
+        # When
+        childLength = callInFork(change)
+
+        # Then
+        expect(childLength).toEqual(1)
+        expect(self.state).toEqual([])
+
+    def test_exception_in_child_is_raised_in_parent(self):
+        def raiseError():
+            raise KeyError("child error")
+
+        expect(lambda: callInFork(raiseError)).toRaise(
+            ForkedCallError, expectedMessageMatches = "child error")
+
+    def test_killed_child_is_described(self):
+        def kill():
+            os.kill(os.getpid(), signal.SIGKILL)
+
+        expect(lambda: callInFork(kill)).toRaise(
+            ForkedCallError, expectedMessageMatches = "killed by signal SIGKILL")
+
+    def test_describes_normal_exit(self):
+        expect(describeExitStatus(3 << 8)).toEqual("exited with status 3")
+
+    def test_result_is_returned_when_call_is_within_timeout(self):
+        expect(callInFork(lambda: 6 * 7, timeout = 5)).toEqual(42)
+
+    def test_child_which_times_out_has_its_stacks_dumped(self):
+        def hang():
+            time.sleep(10)
+
+        expect(lambda: callInFork(hang, timeout = 0.1)).toRaise(
+            ForkedCallError,
+            expectedMessageMatches = "(?s)^Forked call timed out after 0.1s\n.*in hang")
+
+    def test_freeze_shared_objects_freezes_the_garbage_collector(self):
+        # Where
+        if gc.get_freeze_count() > 0:
+            return
+
+        # When
+        frozen = freezeSharedObjects()
+        try:
+            freezeCount = gc.get_freeze_count()
+        finally:
+            gc.unfreeze()
+
+        # Then
+        expect(frozen).toBeTrue()
+        expect(freezeCount).toBeGreaterThan(0)
+
+    def test_freeze_shared_objects_leaves_an_earlier_freeze_alone(self):
+        # Where
+        if gc.get_freeze_count() > 0:
+            return
+        gc.freeze()
+
+        # When
+        try:
+            frozen = freezeSharedObjects()
+        finally:
+            gc.unfreeze()
+
+        # Then
+        expect(frozen).toBeFalse()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# Copyright 2013 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.ImportRecorder import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.TestSuite import *
+
+from ..Samples.SampleTestCases import *
+
+import builtins
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+class ImportRecorderTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.moduleName = "RecordedModule" + uuid.uuid4().hex
+        with open(os.path.join(self.directory, self.moduleName + ".py"), "w") as file:
+            file.write("value = 1\n")
+        sys.path.insert(0, self.directory)
+
+    def after(self):
+        sys.path.remove(self.directory)
+        sys.modules.pop(self.moduleName, None)
+        shutil.rmtree(self.directory)
+
+    def test_module_loaded_for_the_first_time_is_recorded(self):
+        # When
+        with ImportRecorder() as recorder:
+            importlib.import_module(self.moduleName)
+
+        # Then
+        expect(recorder.listModules()).toContain(self.moduleName)
+
+    def test_loaded_module_imported_again_by_statement_is_recorded(self):
+        # Where
+        importlib.import_module(self.moduleName)
+
+        # When
+        with ImportRecorder() as recorder:
+            exec("from {} import value".format(self.moduleName), {})
+
+        # Then
+        expect(recorder.listModules()).toContain(self.moduleName)
+
+    def test_loaded_module_imported_again_by_import_module_is_recorded(self):
+        # Where
+        importlib.import_module(self.moduleName)
+
+        # When
+        with ImportRecorder() as recorder:
+            importlib.import_module(self.moduleName)
+
+        # Then
+        expect(recorder.listModules()).toEqual([self.moduleName])
+
+    def test_imports_are_unwrapped_once_the_last_recorder_stops(self):
+        # Where
+        originalImport = builtins.__import__
+
+        # When
+        with ImportRecorder():
+            with ImportRecorder():
+                pass
+            wrappedImport = builtins.__import__
+
+        # Then
+        expect(wrappedImport == ImportRecorder._recordingImport).toBeTrue()
+        expect(builtins.__import__ == originalImport).toBeTrue()
+
+    def test_class_suite_registers_the_modules_it_imported(self):
+        # Where
+        importlib.import_module(self.moduleName)
+        moduleName = self.moduleName
+
+        class ImportingTests(TestCase):
+            def test_import(self):
+                importlib.import_module(moduleName)
+
+        results = TestResults()
+
+        # When
+        ImportingTests.suite().run(results)
+
+        # Then
+        expect(results.suiteResults[0].modulesUsed).toContain(self.moduleName)
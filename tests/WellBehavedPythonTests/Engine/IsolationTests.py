@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.ThreadLocalStream import *
+
+from ..Samples.Execution import SampleIsolationTestCases
+from ..Samples.Execution.SampleIsolationTestCases import *
+
+import gc
+import io
+import sys
+
+class IsolationTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        self.results = TestResults()
+        del SampleIsolationTestCases.moduleState[:]
+
+    def test_isolated_tests_each_start_from_parent_state(self):
+        # Where
+        suite = TestCaseWithTestIsolation.suite()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(2)
+        expect(self.results.countFailures()).toEqual(1)
+        expect(self.results.summary()).toContain("Failing isolated test")
+        expect(SampleIsolationTestCases.moduleState).toEqual([])
+
+    def test_isolated_class_runs_before_class_in_child(self):
+        # Where
+        suite = TestCaseWithClassIsolation.suite()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(2)
+        expect(SampleIsolationTestCases.moduleState).toEqual([])
+
+    def test_isolated_class_output_is_returned_to_parent(self):
+        # Where
+        suite = TestCaseWithClassIsolation.suite()
+        output = io.StringIO()
+        stdout = sys.stdout
+        stderr = sys.stderr
+        sys.stdout = ThreadLocalStream(output)
+        sys.stderr = ThreadLocalStream(output)
+
+        # When
+        try:
+            suite.run(self.results)
+        finally:
+            sys.stdout = stdout
+            sys.stderr = stderr
+
+        # Then
+        expect(output.getvalue()).toContain("isolated output")
+
+    def test_isolated_tests_each_start_from_before_class_state(self):
+        # Where
+        suite = TestCaseWithIsolatedTestsSharingFixture.suite()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(3)
+        expect(len(TestCaseWithIsolatedTestsSharingFixture.fixture)).toEqual(1000)
+
+    def test_garbage_collector_is_unfrozen_after_isolated_tests(self):
+        # Where
+        suite = TestCaseWithIsolatedTestsSharingFixture.suite()
+        freezeCount = gc.get_freeze_count()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(gc.get_freeze_count()).toEqual(freezeCount)
+
+    def test_killed_isolated_test_is_an_error_and_run_continues(self):
+        # Where
+        suite = TestCaseWithKilledIsolatedTest.suite()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(1)
+        expect(self.results.countPasses()).toEqual(1)
+        expect(self.results.summary()).toContain("killed by signal SIGKILL")
+
+    def test_suite_can_register_all_tests_as_errors(self):
+        # Where
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithTestIsolation.suite())
+
+        # When
+        suite.registerAllAsErrors(self.results, ["worker lost\n"])
+
+        # Then
+        expect(self.results.countErrors()).toEqual(3)
+        expect(self.results.countTests()).toEqual(3)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.TestSuite import *
+from WellBehavedPython.Execution.ThreadPoolTestExecutor import *
+from WellBehavedPython.Runners.ConsoleTestRunner import *
+
+from ..Samples.Execution.SampleFailFastTestCases import *
+from ..Samples.Execution import SampleFailFastTestCases
+
+import io
+
+class MaxFailuresTests(TestCase):
+
+    def before(self):
+        SampleFailFastTestCases.moduleState["afterClassCalls"] = 0
+        self.suite = TestSuite("outer")
+        self.suite.add(TestCaseWithThreeFailingTests.suite())
+        self.suite.add(TestCaseWithPassingTestsAfterFailures.suite())
+
+    def test_without_a_limit_every_test_runs(self):
+        # Where
+        results = TestResults()
+
+        # When
+        self.suite.run(results)
+
+        # Then
+        expect(results.countTests()).toEqual(5)
+        expect(results.shouldStop()).toBeFalse()
+
+    def test_run_stops_starting_tests_at_the_limit(self):
+        # Where
+        results = TestResults(maxFailures = 2)
+
+        # When
+        self.suite.run(results)
+
+        # Then
+        expect(results.countTests()).toEqual(2)
+        expect(results.countFailures()).toEqual(2)
+        expect(results.shouldStop()).toBeTrue()
+
+    def test_after_class_runs_for_a_stopped_class(self):
+        # Where
+        results = TestResults(maxFailures = 1)
+
+        # When
+        self.suite.run(results)
+
+        # Then
+        expect(SampleFailFastTestCases.moduleState["afterClassCalls"]).toEqual(1)
+
+    def test_classes_not_started_are_not_registered(self):
+        # Where
+        results = TestResults(maxFailures = 1)
+
+        # When
+        self.suite.run(results)
+
+        # Then
+        outer = results.suiteResults[0]
+        expect([child.name for child in outer.suiteResults]).toEqual(
+            ["TestCaseWithThreeFailingTests"])
+
+    def test_parallel_run_cancels_classes_not_started(self):
+        # Where
+        results = TestResults(maxFailures = 1)
+        executor = ThreadPoolTestExecutor(1)
+
+        # When
+        executor.run(self.suite, results)
+
+        # Then
+        expect(results.countTests()).toEqual(1)
+        expect(results.countPasses()).toEqual(0)
+        expect(SampleFailFastTestCases.moduleState["afterClassCalls"]).toEqual(1)
+
+    def test_console_runner_reports_stopping(self):
+        # Where
+        output = io.StringIO()
+        runner = ConsoleTestRunner(output, bufferOutput = False, maxFailures = 1)
+
+        # When
+        results = runner.run(self.suite)
+
+        # Then
+        expect(results.countTests()).toEqual(1)
+        expect(output.getvalue()).toContain("Run stopped at the failure limit of 1")
+
+    def test_console_runner_does_not_report_stopping_when_under_the_limit(self):
+        # Where
+        output = io.StringIO()
+        runner = ConsoleTestRunner(output, bufferOutput = False, maxFailures = 4)
+
+        # When
+        results = runner.run(self.suite)
+
+        # Then
+        expect(results.countTests()).toEqual(5)
+        expect(output.getvalue()).Not.toContain("Run stopped")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.ForkedCall import canFork
+
+from ..Samples.Execution.SampleParallelMethodTestCases import *
+
+import io
+import sys
+
+class ParallelMethodTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        MethodActivity.reset()
+        TestCaseWithThreadedMethods.beforeClassCalls = 0
+        TestCaseWithForkedMethods.changedByTest = False
+        self.results = TestResults()
+
+    def getTestNames(self):
+        return [results.name for results in self.results.suiteResults[0].suiteResults]
+
+    def test_threaded_methods_run_at_the_same_time(self):
+        # When
+        TestCaseWithThreadedMethods.suite().run(self.results)
+
+        # Then
+        expect(MethodActivity.peak).toBeGreaterThan(1)
+        expect(TestCaseWithThreadedMethods.beforeClassCalls).toEqual(1)
+
+    def test_threaded_methods_are_registered_in_suite_order(self):
+        # When
+        TestCaseWithThreadedMethods.suite().run(self.results)
+
+        # Then
+        expect(self.results.suiteResults[0].name).toEqual("TestCaseWithThreadedMethods")
+        expect(self.getTestNames()).toEqual(
+            ["test_first", "test_second", "test_third", "test_fourth", "xtest_ignored"])
+        expect(self.results.countPasses()).toEqual(2)
+        expect(self.results.countFailures()).toEqual(1)
+        expect(self.results.countErrors()).toEqual(1)
+        expect(self.results.countIgnored()).toEqual(1)
+
+    def test_threaded_method_output_is_kept_in_order(self):
+        # Where
+        stdout = sys.stdout
+        sys.stdout = io.StringIO()
+
+        # When
+        try:
+            TestCaseWithThreadedMethods.suite().run(self.results)
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+
+        # Then
+        expect(output).toEqual("first output\nsecond output\n")
+
+    def test_threaded_methods_stop_at_failure_limit(self):
+        # Where
+        TestCaseWithThreadedMethods.methodWorkers = 1
+        results = TestResults(maxFailures = 1)
+
+        # When
+        try:
+            TestCaseWithThreadedMethods.suite().run(results)
+        finally:
+            TestCaseWithThreadedMethods.methodWorkers = 4
+
+        # Then
+        expect(results.countFailures() + results.countErrors()).toEqual(1)
+
+    def test_forked_methods_see_before_class_state(self):
+        if not canFork():
+            return
+        # When
+        TestCaseWithForkedMethods.suite().run(self.results)
+
+        # Then
+        expect(self.getTestNames()).toEqual(
+            ["test_first", "test_second", "test_third", "test_fourth"])
+        expect(self.results.countPasses()).toEqual(1)
+        expect(self.results.countFailures()).toEqual(1)
+        expect(TestCaseWithForkedMethods.changedByTest).toBeFalse()
+
+    def test_crashed_forked_worker_registers_each_of_its_tests_as_errors(self):
+        if not canFork():
+            return
+        # When
+        TestCaseWithForkedMethods.suite().run(self.results)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(2)
+        stackTrace = self.results.suiteResults[0].suiteResults[1].stackTraces
+        expect(stackTrace[0]).toContain("killed by signal SIGKILL")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestEventRecorder import *
+from WellBehavedPython.Engine.TestResults import *
+
+from ..Samples.SampleTestCases import *
+
+from datetime import *
+
+class TestEventRecorderTests(TestCase):
+
+    def before(self):
+        self.recorder = TestEventRecorder()
+        self.results = TestResults()
+
+    def test_recorder_records_events_in_order(self):
+        # Where
+        recorder = self.recorder
+
+        # When
+        recorder.registerSuiteStarted("suite")
+        recorder.registerTestStarted("suite", "test")
+        recorder.registerTestPassed("suite", "test")
+        recorder.registerSuiteCompleted("suite")
+
+        # Then
+        eventNames = [event[0] for event in recorder.events]
+        expect(eventNames).toEqual(["registerSuiteStarted",
+                                    "registerTestStarted",
+                                    "registerTestPassed",
+                                    "registerSuiteCompleted"])
+
+    def test_replaying_recorded_suite_gives_same_counts(self):
+        # Where
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithPassingTest.suite())
+        suite.add(TestCaseWithFailingTest.suite())
+        suite.add(TestCaseWithErrorTest.suite())
+        suite.add(TestCaseWithIgnoredTest.suite())
+
+        # When
+        self.recorder.record(suite).replay(self.results)
+
+        # Then
+        results = self.results
+        expect(results.countTests()).toEqual(4)
+        expect(results.countPasses()).toEqual(1)
+        expect(results.countFailures()).toEqual(1)
+        expect(results.countErrors()).toEqual(1)
+        expect(results.countIgnored()).toEqual(1)
+        expect(results.summary()).toContain("Failing test")
+
+    def test_replaying_uses_recorded_times(self):
+        # Where
+        recorder = self.recorder
+        recorder.registerTestStarted("suite", "test")
+        recorder.registerTestPassed("suite", "test")
+        startTime = datetime(2013, 1, 1)
+        recorder.events[0] = recorder.events[0][:2] + (startTime,)
+        recorder.events[1] = recorder.events[1][:2] + (startTime + timedelta(minutes = 1),)
+
+        # When
+        recorder.replay(self.results)
+
+        # Then
+        expect(self.results.summary()).toMatch("in 60\\.0+s")
+        expect(TestResults.now()).Not.toEqual(startTime)
+
+    def test_record_captures_output(self):
+        # Where
+        suite = TestCaseWithTwoPassingTests.suite()
+
+        # When
+        self.recorder.record(suite)
+
+        # Then
+        expect(self.recorder.output).toContain("test_example1")
+        expect(self.recorder.output).toContain("test_another_example")
+
+    def test_event_survives_conversion_to_dictionary(self):
+        # Where
+        self.recorder.registerTestFailed("suite", "test", ["line1\n", "line2\n"])
+        event = self.recorder.events[0]
+
+        # When
+        converted = TestEventRecorder.eventFromDict(TestEventRecorder.eventToDict(event))
+
+        # Then
+        expect(converted).toEqual(event)
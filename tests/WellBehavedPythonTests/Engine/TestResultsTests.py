@@ -21,6 +21,8 @@ from WellBehavedPython.api import *
 from WellBehavedPython.Engine.TestCase import *
 from WellBehavedPython.Engine.TestResults import *
 
+import threading
+
 class TestResultsTests(TestCase):
 
     def before(self):
@@ -376,3 +378,184 @@ line2
         expect(results.getDuration().total_seconds()).toBeGreaterThanOrEqualTo(2)
         expect(duration.total_seconds()).toBeLessThan(results.getDuration().total_seconds())
         
+
+    def test_threads_register_into_their_own_suites(self):
+        # Where
+        results = self.results
+        def registerSuite(suiteName):
+            for i in range(50):
+                results.registerSuiteStarted(suiteName)
+                results.registerTestStarted(suiteName, "test")
+                results.registerTestPassed(suiteName, "test")
+                results.registerSuiteCompleted(suiteName)
+        threads = [threading.Thread(target = registerSuite, args = ("suite{}".format(i),))
+                   for i in range(4)]
+
+        # When
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Then
+        expect(results.countTests()).toEqual(200)
+        expect(results.countPasses()).toEqual(200)
+        expect(len(results.suiteResults)).toEqual(200)
+        for suiteResults in results.suiteResults:
+            expect(suiteResults.countTests()).toEqual(1)
+
+    def test_time_override_is_used_for_test_times(self):
+        # Where
+        results = self.results
+        time = datetime(2013, 1, 1)
+
+        # When
+        TestResults.overrideTime(time)
+        try:
+            result = results.registerTestStarted("suite", "test")
+            results.registerTestPassed("suite", "test")
+        finally:
+            TestResults.overrideTime(None)
+
+        # Then
+        expect(result.startTime).toEqual(time)
+        expect(result.endTime).toEqual(time)
+
+    def test_results_survive_conversion_to_and_from_dict(self):
+        # Where
+        results = self.results
+        results.registerSuiteStarted("suite")
+        results.registerTestStarted("suite", "test_pass")
+        results.registerTestPassed("suite", "test_pass")
+        results.registerTestStarted("suite", "test_fail")
+        results.registerTestFailed("suite", "test_fail", ["trace\n"])
+        results.registerSuiteCompleted("suite")
+
+        # When
+        copy = TestResults.fromDict(results.toDict())
+
+        # Then
+        expect(copy.summary()).toEqual(results.summary())
+        expect(copy.suiteResults[0].name).toEqual("suite")
+        expect(copy.suiteResults[0].suiteResults[1].stackTraces).toEqual(["trace\n"])
+
+    def test_merge_combines_suites_with_the_same_name(self):
+        # Where
+        first = TestResults()
+        first.registerSuiteStarted("outer")
+        first.registerSuiteStarted("inner1")
+        first.registerTestStarted("inner1", "test")
+        first.registerTestPassed("inner1", "test")
+        first.registerSuiteCompleted("inner1")
+        first.registerSuiteCompleted("outer")
+        second = TestResults()
+        second.registerSuiteStarted("outer")
+        second.registerSuiteStarted("inner2")
+        second.registerTestStarted("inner2", "test")
+        second.registerTestError("inner2", "test", ["trace\n"])
+        second.registerSuiteCompleted("inner2")
+        second.registerSuiteCompleted("outer")
+
+        # When
+        self.results.merge(first)
+        self.results.merge(second)
+
+        # Then
+        expect(self.results.countTests()).toEqual(2)
+        expect(self.results.countErrors()).toEqual(1)
+        expect(len(self.results.suiteResults)).toEqual(1)
+        outer = self.results.suiteResults[0]
+        expect([child.name for child in outer.suiteResults]).toEqual(["inner1", "inner2"])
+
+    def test_register_test_cached_counts_a_cached_pass(self):
+        # Where
+        results = self.results
+        results.registerTestStarted("suite", "test")
+
+        # When
+        results.registerTestCached("suite", "test")
+
+        # Then
+        expect(results.countCached()).toEqual(1)
+        expect(results.countPasses()).toEqual(1)
+        expect(results.countTests()).toEqual(1)
+
+    def test_cached_passes_are_kept_when_converted_to_and_from_dict(self):
+        # Where
+        results = self.results
+        results.registerSuiteStarted("suite")
+        results.registerTestStarted("suite", "test_cached")
+        results.registerTestCached("suite", "test_cached")
+        results.registerSuiteCompleted("suite")
+
+        # When
+        copy = TestResults.fromDict(results.toDict())
+
+        # Then
+        expect(copy.countCached()).toEqual(1)
+        expect(copy.countPasses()).toEqual(1)
+
+    def test_flaky_test_counts_as_a_pass_without_stack_traces(self):
+        # Where
+        results = self.results
+        testResults = results.registerTestStarted("suite", "test")
+        results.registerTestFailed("suite", "test", ["trace"])
+
+        # When
+        testResults.markFlaky()
+
+        # Then
+        expect(results.countFlaky()).toEqual(1)
+        expect(results.countPasses()).toEqual(1)
+        expect(results.countFailures()).toEqual(0)
+        expect(results.countTests()).toEqual(1)
+        expect(results.getStackTraces()).toEqual([])
+        expect(testResults.getStateDescription()).toEqual("flaky")
+
+    def test_flaky_passes_are_kept_when_converted_to_and_from_dict(self):
+        # Where
+        results = self.results
+        results.registerSuiteStarted("suite")
+        testResults = results.registerTestStarted("suite", "test_flaky")
+        results.registerTestError("suite", "test_flaky", ["trace"])
+        results.registerSuiteCompleted("suite")
+        testResults.markFlaky()
+
+        # When
+        copy = TestResults.fromDict(results.toDict())
+
+        # Then
+        expect(copy.countFlaky()).toEqual(1)
+        expect(copy.countErrors()).toEqual(0)
+
+
+    def test_only_class_fixture_errors_are_own_errors_of_class_results(self):
+        # Where
+        results = self.results
+
+        # When
+        fixtureResults = results.registerSuiteStarted("fixture")
+        results.registerTestError("fixture", "beforeClass", ["trace"], 2)
+        results.registerSuiteCompleted("fixture")
+        testResults = results.registerSuiteStarted("test")
+        results.registerTestStarted("test", "test_error")
+        results.registerTestError("test", "test_error", ["trace"])
+        results.registerSuiteCompleted("test")
+
+        # Then
+        expect(fixtureResults.hasOwnErrors()).toBeTrue()
+        expect(testResults.hasOwnErrors()).toBeFalse()
+
+    def test_modules_used_are_kept_when_converted_to_and_from_dict(self):
+        # Where
+        results = self.results
+        suiteResults = results.registerSuiteStarted("suite")
+        results.registerModulesUsed("suite", ["helpers"])
+        results.registerSuiteCompleted("suite")
+
+        # When
+        copy = TestResults.fromDict(results.toDict())
+
+        # Then
+        expect(suiteResults.modulesUsed).toEqual(["helpers"])
+        expect(copy.suiteResults[0].modulesUsed).toEqual(["helpers"])
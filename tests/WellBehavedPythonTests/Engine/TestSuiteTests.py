@@ -23,6 +23,7 @@ import sys
 
 from WellBehavedPython.api import *
 from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
 from WellBehavedPython.Engine.TestRunningException import *
 from WellBehavedPython.Engine.TestSuite import *
 
@@ -378,12 +379,92 @@ class TestSuiteTests(TestCase):
         withUserMessage("Passing results should contain one failure").expect(passingResults.countPasses()).toEqual(1)
         withUserMessage("Passing results should contain no failures").expect(passingResults.countFailures()).toEqual(0)
 
+    def test_class_suite_lists_only_itself(self):
+        # Where
+        suite = TestCaseWithTwoPassingTests.suite()
+
+        # When
+        classSuites = suite.listClassSuites()
+
+        # Then
+        expect(suite.isClassSuite()).toBeTrue()
+        expect(classSuites).toEqual([suite])
+
+    def test_suite_of_suites_lists_nested_class_suites_in_order(self):
+        # Where
+        first = TestCaseWithPassingTest.suite()
+        second = TestCaseWithFailingTest.suite()
+        third = TestCaseWithErrorTest.suite()
+        inner = TestSuite("inner")
+        inner.add(second)
+        inner.add(third)
+        outer = TestSuite("outer")
+        outer.add(first)
+        outer.add(inner)
+
+        # When
+        classSuites = outer.listClassSuites()
+
+        # Then
+        expect(outer.isClassSuite()).toBeFalse()
+        expect(classSuites).toEqual([first, second, third])
+
+    def test_suite_lists_modules_of_its_test_classes_once(self):
+        # Where
+        outer = TestSuite("outer")
+        outer.add(TestCaseWithPassingTest.suite())
+        outer.add(TestCaseWithFailingTest.suite())
+        outer.add(TestSuiteTests.suite())
+
+        # When
+        modules = outer.listTestModules()
+
+        # Then
+        expect(modules).toEqual([TestCaseWithPassingTest.__module__,
+                                 TestSuiteTests.__module__])
+
     def createTestSuiteTests(self, testMethod):
         test = TestSuiteTests()
         test.configureTest(testMethod)
         return test
-        
 
+    def test_cached_test_is_registered_as_cached_pass_without_running(self):
+        # Where
+        suite = TestCaseWithFailingTest.suite()
+        suite.tests[0].cached = True
+        results = TestResults()
 
-       
+        # When
+        suite.run(results)
+
+        # Then
+        expect(results.countCached()).toEqual(1)
+        expect(results.countFailures()).toEqual(0)
+
+    def test_class_suite_with_only_cached_tests_does_not_run_before_class(self):
+        # Where
+        suite = TestCaseWithBeforeClassSaboteur.suite()
+        for test in suite.tests:
+            test.cached = True
+        results = TestResults()
+
+        # When
+        suite.run(results)
 
+        # Then
+        expect(suite.isCached()).toBeTrue()
+        expect(results.countErrors()).toEqual(0)
+        expect(results.countCached()).toEqual(2)
+
+    def test_class_suite_with_some_cached_tests_runs_before_class(self):
+        # Where
+        suite = TestCaseWithBeforeClassSaboteur.suite()
+        suite.tests[0].cached = True
+        results = TestResults()
+
+        # When
+        suite.run(results)
+
+        # Then
+        expect(suite.isCached()).toBeFalse()
+        expect(results.countErrors()).toBeGreaterThan(0)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.ThreadLocalStream import *
+
+import io
+import threading
+
+class ThreadLocalStreamTests(TestCase):
+
+    def before(self):
+        self.default = io.StringIO()
+        self.stream = ThreadLocalStream(self.default)
+
+    def test_writes_go_to_default_stream_unless_redirected(self):
+        # When
+        self.stream.write("hello")
+
+        # Then
+        expect(self.default.getvalue()).toEqual("hello")
+
+    def test_writes_go_to_redirected_stream(self):
+        # Where
+        redirected = io.StringIO()
+        self.stream.redirect(redirected)
+
+        # When
+        self.stream.write("hello")
+
+        # Then
+        expect(redirected.getvalue()).toEqual("hello")
+        expect(self.default.getvalue()).toEqual("")
+
+    def test_redirect_returns_previous_stream(self):
+        # Where
+        redirected = io.StringIO()
+
+        # When
+        first = self.stream.redirect(redirected)
+        second = self.stream.redirect(None)
+
+        # Then
+        expect(first).toBeNone()
+        expect(second is redirected).toBeTrue()
+
+    def test_redirection_only_applies_to_redirecting_thread(self):
+        # Where
+        redirected = io.StringIO()
+        stream = self.stream
+        def writeFromThread():
+            stream.redirect(redirected)
+            stream.write("thread")
+        thread = threading.Thread(target = writeFromThread)
+
+        # When
+        thread.start()
+        thread.join()
+        stream.write("main")
+
+        # Then
+        expect(redirected.getvalue()).toEqual("thread")
+        expect(self.default.getvalue()).toEqual("main")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.Watchdog import *
+from WellBehavedPython.Engine.ForkedCall import canFork
+
+from ..Samples.Execution.SampleTimeoutTestCases import *
+from ..Samples.Execution import SampleTimeoutTestCases
+
+import time
+
+class TimeoutTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        SampleTimeoutTestCases.release.clear()
+        self.results = TestResults()
+
+    def after(self):
+        SampleTimeoutTestCases.release.set()
+
+    def getTestResults(self, suite, testName):
+        classResults = self.results.suiteResults[0]
+        for results in classResults.suiteResults:
+            if results.name == testName:
+                return results
+        return None
+
+    def test_watchdog_returns_value_of_quick_call(self):
+        expect(Watchdog(1).call(lambda: 42)).toEqual(42)
+
+    def test_watchdog_reraises_exception_from_call(self):
+        def raiseError():
+            raise KeyError("broken")
+
+        expect(lambda: Watchdog(1).call(raiseError)).toRaise(KeyError)
+
+    def test_watchdog_raises_timeout_with_thread_stacks(self):
+        # Where
+        watchdog = Watchdog(0.05)
+
+        # Then
+        expect(lambda: watchdog.call(lambda: SampleTimeoutTestCases.release.wait(10))).toRaise(
+            TestTimeoutError, expectedMessageMatches = "(?s)^Timed out after 0.05s\n.*Thread")
+
+    def test_hanging_test_is_registered_as_error_and_run_continues(self):
+        # Where
+        suite = TestCaseWithHangingTest.suite()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(1)
+        expect(self.results.countPasses()).toEqual(1)
+        stackTrace = "".join(self.getTestResults(suite, "test_hangs").stackTraces)
+        expect(stackTrace).toMatch("(?s)^Timed out after 0.1s\n.*test_hangs")
+
+    def test_timeout_on_class_applies_to_each_test(self):
+        # Where
+        suite = TestCaseWithTimeoutOnClass.suite()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(1)
+        expect(self.results.countFailures()).toEqual(1)
+        expect(self.results.countPasses()).toEqual(1)
+
+    def test_class_timeout_registers_tests_not_started_as_errors(self):
+        # Where
+        suite = TestCaseWithClassTimeout.suite()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(2)
+        stackTrace = "".join(self.getTestResults(suite, "test_not_started").stackTraces)
+        expect(stackTrace).toContain("Class timed out after 0.1s")
+
+    def test_hanging_async_test_is_cancelled(self):
+        # Where
+        suite = TestCaseWithAsyncHangingTest.suite()
+        start = time.monotonic()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(time.monotonic() - start).toBeLessThan(5)
+        expect(self.results.countErrors()).toEqual(1)
+        expect(self.results.countPasses()).toEqual(1)
+        stackTrace = "".join(self.getTestResults(suite, "test_hangs").stackTraces)
+        expect(stackTrace).toMatch("(?s)^Timed out after 0.1s\n.*test_hangs")
+
+    def test_hanging_isolated_test_is_killed(self):
+        if not canFork():
+            return
+        # Where
+        suite = TestCaseWithIsolatedHangingTest.suite()
+        start = time.monotonic()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(time.monotonic() - start).toBeLessThan(5)
+        expect(self.results.countErrors()).toEqual(1)
+        expect(self.results.countPasses()).toEqual(1)
+        stackTrace = "".join(self.getTestResults(suite, "test_hangs").stackTraces)
+        expect(stackTrace).toMatch("(?s)^Forked call timed out after 0.5s\n.*test_hangs")
+
+    def test_hanging_isolated_class_is_killed(self):
+        if not canFork():
+            return
+        # Where
+        suite = TestCaseWithIsolatedHangingClass.suite()
+        start = time.monotonic()
+
+        # When
+        suite.run(self.results)
+
+        # Then
+        expect(time.monotonic() - start).toBeLessThan(5)
+        expect(self.results.countErrors()).toEqual(2)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Execution.CoverageTestExecutor import *
+from WellBehavedPython.History.CoverageIndex import *
+
+from ..Samples.Execution import SampleCoverageTestCases
+from ..Samples.Execution.SampleCoverageTestCases import *
+
+import os
+import shutil
+import sys
+import tempfile
+
+class CoverageTestExecutorTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.sampleDirectory = os.path.dirname(os.path.abspath(SampleCoverageTestCases.__file__))
+        self.index = CoverageIndex(os.path.join(self.directory, "coverage.json"),
+                                   self.sampleDirectory)
+        self.executor = CoverageTestExecutor(self.index, [self.sampleDirectory])
+        self.results = TestResults()
+
+    def after(self):
+        shutil.rmtree(self.directory)
+
+    def getLines(self, testClass, testMethodName):
+        identifier = "{}.{}".format(testClass.getTestClassIdentifier(), testMethodName)
+        return self.index.getCoverage(identifier).get("SampleCoverageTestCases.py", set())
+
+    def getBodyLine(self, function):
+        # the first line after the def
+        return function.__code__.co_firstlineno + 1
+
+    def test_executor_runs_every_test(self):
+        # When
+        self.executor.run(TestCaseUsingHelper.suite(), self.results)
+
+        # Then
+        expect(self.results.countTests()).toEqual(2)
+        expect(self.results.countPasses()).toEqual(2)
+
+    def test_lines_run_by_a_test_are_recorded_against_it(self):
+        # When
+        self.executor.run(TestCaseUsingHelper.suite(), self.results)
+
+        # Then
+        expect(self.getLines(TestCaseUsingHelper, "test_uses_helper")).toContain(
+            self.getBodyLine(helper))
+        expect(self.getLines(TestCaseUsingHelper, "test_does_not_use_helper")).Not.toContain(
+            self.getBodyLine(helper))
+
+    def test_lines_run_by_before_class_are_recorded_against_every_test(self):
+        # When
+        self.executor.run(TestCaseUsingHelper.suite(), self.results)
+
+        # Then
+        line = self.getBodyLine(setUpValue)
+        expect(self.getLines(TestCaseUsingHelper, "test_uses_helper")).toContain(line)
+        expect(self.getLines(TestCaseUsingHelper, "test_does_not_use_helper")).toContain(line)
+
+    def test_tests_whose_lines_cannot_be_traced_are_left_out(self):
+        # When
+        self.executor.run(TestCaseWithIsolatedCoverage.suite(), self.results)
+
+        # Then
+        identifier = "{}.test_isolated".format(
+            TestCaseWithIsolatedCoverage.getTestClassIdentifier())
+        expect(self.results.countPasses()).toEqual(1)
+        expect(self.index.hasTest(identifier)).toBeFalse()
+
+    def test_tracing_is_stopped_after_the_run(self):
+        # Where
+        trace = sys.gettrace()
+
+        # When
+        self.executor.run(TestCaseUsingHelper.suite(), self.results)
+
+        # Then
+        expect(sys.gettrace() is trace).toBeTrue()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Execution.DistributedTestExecutor import *
+from WellBehavedPython.Execution.DistributedTestWorker import *
+from WellBehavedPython.Execution.SocketMessages import *
+from WellBehavedPython.Execution.SuiteReference import *
+from WellBehavedPython.Execution.WorkerCoordinator import *
+
+from ..Samples.SampleTestCases import *
+
+import os
+import tempfile
+import threading
+
+class DistributedTestExecutorTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        self.results = TestResults()
+        self.suite = TestSuite("outer")
+        self.suite.add(TestCaseWithPassingTest.suite())
+        self.suite.add(TestCaseWithFailingTest.suite())
+        self.suite.add(TestCaseWithErrorTest.suite())
+        self.suite.add(TestCaseWithIgnoredTest.suite())
+
+    def expectAllResults(self, results):
+        expect(results.countTests()).toEqual(4)
+        expect(results.countPasses()).toEqual(1)
+        expect(results.countFailures()).toEqual(1)
+        expect(results.countErrors()).toEqual(1)
+        expect(results.countIgnored()).toEqual(1)
+
+    def test_local_workers_over_tcp_run_all_tests(self):
+        # Where
+        executor = DistributedTestExecutor(("127.0.0.1", 0), localWorkers = 2)
+
+        # When
+        executor.run(self.suite, self.results)
+
+        # Then
+        self.expectAllResults(self.results)
+        expect(self.results.summary()).toContain("Failing test")
+
+    def test_local_workers_over_unix_socket_run_all_tests(self):
+        # Where
+        directory = tempfile.mkdtemp()
+        address = os.path.join(directory, "coordinator.sock")
+        executor = DistributedTestExecutor(address, localWorkers = 2)
+
+        # When
+        try:
+            executor.run(self.suite, self.results)
+        finally:
+            os.rmdir(directory)
+
+        # Then
+        self.expectAllResults(self.results)
+
+    def test_coordinator_hands_suites_to_connected_workers(self):
+        # Where
+        coordinator = WorkerCoordinator(("127.0.0.1", 0))
+        workers = [DistributedTestWorker(coordinator.address) for i in range(2)]
+        suitesRun = []
+        threads = [threading.Thread(target = lambda worker = worker: suitesRun.append(worker.run()))
+                   for worker in workers]
+        for thread in threads:
+            thread.start()
+        futures = [coordinator.submit(SuiteReference.fromSuite(classSuite))
+                   for classSuite in self.suite.listClassSuites()]
+
+        # When
+        for future in futures:
+            future.result().replay(self.results)
+        coordinator.shutdown()
+        for thread in threads:
+            thread.join()
+
+        # Then
+        self.expectAllResults(self.results)
+        expect(sum(suitesRun)).toEqual(4)
+
+    def test_coordinator_stops_workers_once_the_run_is_stopping(self):
+        # Where
+        stopping = threading.Event()
+        coordinator = WorkerCoordinator(("127.0.0.1", 0), stopping.is_set)
+        futures = [coordinator.submit(SuiteReference.fromSuite(classSuite))
+                   for classSuite in self.suite.listClassSuites()]
+        stopping.set()
+        worker = DistributedTestWorker(coordinator.address)
+
+        # When
+        suitesRun = worker.run()
+        late = coordinator.submit(SuiteReference.fromSuite(TestCaseWithPassingTest.suite()))
+        coordinator.shutdown()
+
+        # Then
+        expect(suitesRun).toEqual(0)
+        expect(all(future.cancelled() for future in futures)).toBeTrue()
+        expect(late.cancelled()).toBeTrue()
+
+    def test_executor_stops_handing_out_suites_after_max_failures(self):
+        # Where
+        executor = DistributedTestExecutor(("127.0.0.1", 0), localWorkers = 1)
+        results = TestResults(maxFailures = 1)
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithFailingTest.suite())
+        suite.add(TestCaseWithPassingTest.suite())
+        suite.add(TestCaseWithPassingTest.suite())
+
+        # When
+        executor.run(suite, results)
+
+        # Then
+        expect(results.countFailures()).toEqual(1)
+        expect(results.countPasses()).toEqual(0)
+
+    def test_unimportable_suite_is_reported_as_errors(self):
+        # Where
+        coordinator = WorkerCoordinator(("127.0.0.1", 0))
+        worker = DistributedTestWorker(coordinator.address)
+        thread = threading.Thread(target = worker.run)
+        thread.start()
+        reference = SuiteReference("NoSuchModule", "NoSuchClass", "NoSuchClass",
+                                   [("test_one", False), ("test_two", False)])
+
+        # When
+        recorder = coordinator.submit(reference).result()
+        coordinator.shutdown()
+        thread.join()
+        recorder.replay(self.results)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(2)
+        expect(self.results.summary()).toContain("Could not build suite NoSuchClass")
+
+    def test_executor_listens_on_loopback_by_default(self):
+        # Where
+        executor = DistributedTestExecutor(localWorkers = 1)
+
+        # When
+        executor.run(self.suite, self.results)
+
+        # Then
+        expect(executor.address[0]).toEqual("127.0.0.1")
+        self.expectAllResults(self.results)
+
+    def test_listening_for_other_machines_needs_a_token(self):
+        expect(lambda: DistributedTestExecutor(("", 0))).toRaise(
+            ValueError, expectedMessageMatches = "token")
+        expect(lambda: WorkerCoordinator(("0.0.0.0", 0))).toRaise(
+            ValueError, expectedMessageMatches = "token")
+
+    def test_workers_with_the_token_run_all_tests(self):
+        # Where
+        executor = DistributedTestExecutor(("127.0.0.1", 0), localWorkers = 2, token = "secret")
+
+        # When
+        executor.run(self.suite, self.results)
+
+        # Then
+        self.expectAllResults(self.results)
+
+    def test_worker_with_the_wrong_token_is_refused(self):
+        # Where
+        coordinator = WorkerCoordinator(("127.0.0.1", 0), token = "secret")
+        worker = DistributedTestWorker(coordinator.address, "guess")
+        future = coordinator.submit(SuiteReference.fromSuite(TestCaseWithPassingTest.suite()))
+
+        # When
+        try:
+            expect(worker.run).toRaise(AuthenticationError)
+        finally:
+            coordinator.shutdown()
+
+        # Then
+        expect(future.running()).toBeFalse()
+
+    def test_local_addresses(self):
+        expect(isLocalAddress(("127.0.0.1", 1234))).toBeTrue()
+        expect(isLocalAddress(("localhost", 1234))).toBeTrue()
+        expect(isLocalAddress(("::1", 1234))).toBeTrue()
+        expect(isLocalAddress("/tmp/workers.sock")).toBeTrue()
+        expect(isLocalAddress(("", 1234))).toBeFalse()
+        expect(isLocalAddress(("0.0.0.0", 1234))).toBeFalse()
+        expect(isLocalAddress(("build-server", 1234))).toBeFalse()
+
+    def test_address_parsing(self):
+        expect(parseAddress("localhost:1234")).toEqual(("localhost", 1234))
+        expect(parseAddress("/tmp/workers.sock")).toEqual("/tmp/workers.sock")
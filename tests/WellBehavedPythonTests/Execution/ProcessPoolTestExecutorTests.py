@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Execution.ProcessPoolTestExecutor import *
+from WellBehavedPython.Runners.ConsoleTestRunner import *
+from WellBehavedPython.Runners.VerboseConsoleTestRunner import *
+
+from ..Samples.SampleTestCases import *
+
+import io
+
+class ProcessPoolTestExecutorTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        self.executor = ProcessPoolTestExecutor(2)
+        self.results = TestResults()
+        self.suite = TestSuite("outer")
+        self.suite.add(TestCaseWithPassingTest.suite())
+        self.suite.add(TestCaseWithFailingTest.suite())
+        self.suite.add(TestCaseWithErrorTest.suite())
+        self.suite.add(TestCaseWithIgnoredTest.suite())
+
+    def after(self):
+        TestCaseWithBeforeAndAfterClass.reset()
+
+    def test_executor_runs_all_tests_in_suite(self):
+        # When
+        self.executor.run(self.suite, self.results)
+
+        # Then
+        results = self.results
+        expect(results.countTests()).toEqual(4)
+        expect(results.countPasses()).toEqual(1)
+        expect(results.countFailures()).toEqual(1)
+        expect(results.countErrors()).toEqual(1)
+        expect(results.countIgnored()).toEqual(1)
+
+    def test_executor_keeps_suite_tree_order(self):
+        # When
+        self.executor.run(self.suite, self.results)
+
+        # Then
+        outer = self.results.suiteResults[0]
+        names = [suiteResults.name for suiteResults in outer.suiteResults]
+        expect(names).toEqual(["TestCaseWithPassingTest",
+                               "TestCaseWithFailingTest",
+                               "TestCaseWithErrorTest",
+                               "TestCaseWithIgnoredTest"])
+
+    def test_before_class_runs_in_worker(self):
+        # Where
+        suite = TestCaseWithBeforeAndAfterClass.suite()
+
+        # When
+        self.executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(1)
+        expect(TestCaseWithBeforeAndAfterClass.beforeClassCalled).toBeFalse()
+
+    def test_unreferenceable_suites_run_in_this_process(self):
+        # Where
+        class LocalTests(TestCase):
+            def test_local(self):
+                pass
+        self.suite.add(LocalTests.suite())
+
+        # When
+        self.executor.run(self.suite, self.results)
+
+        # Then
+        expect(self.results.countTests()).toEqual(5)
+        expect(self.results.countPasses()).toEqual(2)
+
+    def test_console_runner_gives_same_summary_as_serial_run(self):
+        # Where
+        serialOutput = io.StringIO()
+        parallelOutput = io.StringIO()
+        serialRunner = ConsoleTestRunner(serialOutput, bufferOutput = False)
+        parallelRunner = ConsoleTestRunner(parallelOutput, bufferOutput = False,
+                                           executor = self.executor)
+
+        # When
+        serialResults = serialRunner.run(self.suite)
+        parallelResults = parallelRunner.run(self.suite)
+
+        # Then
+        expect(parallelResults.countTests()).toEqual(serialResults.countTests())
+        expect(parallelResults.countFailures()).toEqual(serialResults.countFailures())
+        expect(parallelOutput.getvalue()).toContain(".FEI")
+        expect(parallelOutput.getvalue()).toContain("Failing test")
+
+    def test_verbose_runner_reports_each_test(self):
+        # Where
+        output = io.StringIO()
+        runner = VerboseConsoleTestRunner(output, bufferOutput = False,
+                                          executor = self.executor)
+
+        # When
+        runner.run(self.suite)
+
+        # Then
+        expect(output.getvalue()).toMatch("test_pass\\.* passed in")
+        expect(output.getvalue()).toMatch("test_fail\\.* failed in")
+
+    def test_cached_tests_are_not_run_by_workers(self):
+        # Where
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithBeforeClassSaboteur.suite())
+        suite.add(TestCaseWithFailingTest.suite())
+        for classSuite in suite.listClassSuites():
+            for test in classSuite.tests:
+                test.cached = True
+
+        # When
+        self.executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countCached()).toEqual(3)
+        expect(self.results.countFailures()).toEqual(0)
+        expect(self.results.countErrors()).toEqual(0)
+
+    def test_cached_tests_are_reported_from_partly_cached_classes(self):
+        # Where
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithTwoPassingTests.suite())
+        suite.listClassSuites()[0].tests[0].cached = True
+
+        # When
+        self.executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countCached()).toEqual(1)
+        expect(self.results.countPasses()).toEqual(2)
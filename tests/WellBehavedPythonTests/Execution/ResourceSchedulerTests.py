@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.TestSuite import *
+from WellBehavedPython.Execution.ResourceScheduler import *
+from WellBehavedPython.Execution.ThreadPoolTestExecutor import *
+
+from ..Samples.Execution.SampleResourceTestCases import *
+
+import os
+
+class ResourceSchedulerTests(TestCase):
+
+    def before(self):
+        ResourceUsage.reset()
+        self.results = TestResults()
+
+    def buildSuite(self, *testClasses):
+        suite = TestSuite("outer")
+        for testClass in testClasses:
+            suite.add(testClass.suite())
+        return suite
+
+    def test_tokens_have_weight_one(self):
+        expect(ResourceScheduler.getRequirements(TestCaseUsingPortFirst)).toEqual(
+            { "port:8080" : 1 })
+
+    def test_weights_are_read_from_dictionary(self):
+        expect(ResourceScheduler.getRequirements(TestCaseUsingAllCpu)).toEqual(
+            { "cpu-heavy" : 100 })
+
+    def test_classes_without_resources_have_no_requirements(self):
+        expect(ResourceScheduler.getRequirements(TestCaseUsingNoResources)).toEqual({})
+
+    def test_limit_is_parsed_as_number(self):
+        expect(ResourceScheduler.parseLimit("port:8080=3")).toEqual(("port:8080", 3))
+
+    def test_limit_is_parsed_in_cores(self):
+        cores = os.cpu_count() or 1
+        expect(ResourceScheduler.parseLimit("cpu-heavy=cores")).toEqual(("cpu-heavy", cores))
+        expect(ResourceScheduler.parseLimit("cpu-heavy=cores/2")).toEqual(
+            ("cpu-heavy", max(cores // 2, 1)))
+
+    def test_badly_written_limit_is_rejected(self):
+        expect(lambda: ResourceScheduler.parseLimit("cpu-heavy")).toRaise(ValueError)
+        expect(lambda: ResourceScheduler.parseLimit("cpu-heavy=lots")).toRaise(ValueError)
+
+    def test_classes_sharing_a_token_never_run_together(self):
+        # Where
+        suite = self.buildSuite(TestCaseUsingPortFirst, TestCaseUsingPortSecond,
+                                TestCaseUsingPortThird, TestCaseUsingNoResources)
+        executor = ThreadPoolTestExecutor(4)
+
+        # When
+        executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(5)
+        expect(ResourceUsage.peak["port:8080"]).toEqual(1)
+
+    def test_classes_using_a_token_are_capped_at_its_limit(self):
+        # Where
+        suite = self.buildSuite(TestCaseUsingCpuFirst, TestCaseUsingCpuSecond,
+                                TestCaseUsingCpuThird)
+        executor = ThreadPoolTestExecutor(4, resourceLimits = { "cpu-heavy" : 2 })
+
+        # When
+        executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(3)
+        expect(ResourceUsage.peak["cpu-heavy"]).toBeLessThanOrEqualTo(2)
+
+    def test_class_weighing_more_than_the_limit_runs_alone(self):
+        # Where
+        suite = self.buildSuite(TestCaseUsingCpuFirst, TestCaseUsingAllCpu,
+                                TestCaseUsingCpuSecond, TestCaseUsingCpuThird)
+        executor = ThreadPoolTestExecutor(4, resourceLimits = { "cpu-heavy" : 2 })
+
+        # When
+        executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(4)
+        expect(ResourceUsage.peak["all-cpu"]).toEqual(1)
+        expect(ResourceUsage.peak["cpu-heavy"]).toBeLessThanOrEqualTo(2)
+
+    def test_results_keep_suite_order(self):
+        # Where
+        suite = self.buildSuite(TestCaseUsingPortFirst, TestCaseUsingNoResources,
+                                TestCaseUsingPortSecond)
+        executor = ThreadPoolTestExecutor(2)
+
+        # When
+        executor.run(suite, self.results)
+
+        # Then
+        outer = self.results.suiteResults[0]
+        expect([child.name for child in outer.suiteResults]).toEqual(
+            ["TestCaseUsingPortFirst", "TestCaseUsingNoResources", "TestCaseUsingPortSecond"])
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Execution.Subinterpreter import *
+from WellBehavedPython.Execution.SubinterpreterTestExecutor import *
+from WellBehavedPython.Execution.SubinterpreterTestExecutor import _SubinterpreterPool
+from WellBehavedPython.Runners.ConsoleTestRunner import *
+
+from ..Samples.SampleTestCases import *
+from ..Samples.Execution.SampleIsolationTestCases import *
+from ..Samples.Execution.SampleOutputTestCases import *
+from ..Samples.Execution.SampleParallelMethodTestCases import *
+
+import io
+import sys
+
+class SubinterpreterTestExecutorTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        self.executor = SubinterpreterTestExecutor(2)
+        self.results = TestResults()
+        self.suite = TestSuite("outer")
+        self.suite.add(TestCaseWithPassingTest.suite())
+        self.suite.add(TestCaseWithFailingTest.suite())
+        self.suite.add(TestCaseWithErrorTest.suite())
+        self.suite.add(TestCaseWithIgnoredTest.suite())
+
+    def after(self):
+        TestCaseWithBeforeAndAfterClass.reset()
+
+    def test_subinterpreter_returns_response_to_request(self):
+        if not Subinterpreter.isSupported():
+            return
+        # Where
+        subinterpreter = Subinterpreter()
+
+        # When
+        try:
+            response = subinterpreter.call("respond(request.upper())", "ping")
+        finally:
+            subinterpreter.close()
+
+        # Then
+        expect(response).toEqual("PING")
+
+    def test_subinterpreter_raises_when_script_fails(self):
+        if not Subinterpreter.isSupported():
+            return
+        # Where
+        subinterpreter = Subinterpreter()
+
+        # Then
+        try:
+            expect(lambda: subinterpreter.call("raise KeyError('broken')", "")).toRaise(
+                Exception, expectedMessageMatches = "broken")
+        finally:
+            subinterpreter.close()
+
+    def test_pool_runs_suite_in_subinterpreter(self):
+        if not Subinterpreter.isSupported():
+            return
+        # Where
+        pool = _SubinterpreterPool(2)
+        suites = [TestCaseWithPassingTest.suite(), TestCaseWithFailingTest.suite()]
+
+        # When
+        try:
+            futures = [self.executor._submit(pool, suite) for suite in suites]
+            for future in futures:
+                future.result().replay(self.results)
+        finally:
+            pool.shutdown()
+
+        # Then
+        expect(self.results.countTests()).toEqual(2)
+        expect(self.results.countPasses()).toEqual(1)
+        expect(self.results.countFailures()).toEqual(1)
+
+    def test_executor_runs_all_tests_in_suite(self):
+        # When
+        self.executor.run(self.suite, self.results)
+
+        # Then
+        results = self.results
+        expect(results.countTests()).toEqual(4)
+        expect(results.countPasses()).toEqual(1)
+        expect(results.countFailures()).toEqual(1)
+        expect(results.countErrors()).toEqual(1)
+        expect(results.countIgnored()).toEqual(1)
+
+    def test_executor_keeps_suite_tree_order(self):
+        # When
+        self.executor.run(self.suite, self.results)
+
+        # Then
+        outer = self.results.suiteResults[0]
+        names = [suiteResults.name for suiteResults in outer.suiteResults]
+        expect(names).toEqual(["TestCaseWithPassingTest",
+                               "TestCaseWithFailingTest",
+                               "TestCaseWithErrorTest",
+                               "TestCaseWithIgnoredTest"])
+
+    def test_subinterpreters_are_not_available_where_they_cannot_start_daemon_threads(self):
+        if not Subinterpreter.isSupported():
+            return
+        # Where
+        subinterpreter = Subinterpreter()
+        script = ("import threading\n"
+                  "try:\n"
+                  "    threading.Thread(target = lambda: None, daemon = True).start()\n"
+                  "    respond('started')\n"
+                  "except RuntimeError:\n"
+                  "    respond('refused')\n")
+
+        # When
+        try:
+            response = subinterpreter.call(script, "")
+        finally:
+            subinterpreter.close()
+
+        # Then
+        if response == "refused":
+            expect(Subinterpreter.isAvailable()).toBeFalse()
+
+    def test_executor_runs_class_with_threaded_methods(self):
+        # Where
+        suite = TestCaseWithThreadedMethods.suite()
+
+        # When
+        self.executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countTests()).toEqual(5)
+        expect(self.results.countPasses()).toEqual(2)
+        expect(self.results.countFailures()).toEqual(1)
+        expect(self.results.countErrors()).toEqual(1)
+        expect(self.results.countIgnored()).toEqual(1)
+
+    def test_executor_runs_class_which_forks_in_worker_process(self):
+        # Where
+        suite = TestCaseWithTestIsolation.suite()
+
+        # When
+        self.executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countTests()).toEqual(3)
+        expect(self.results.countPasses()).toEqual(2)
+        expect(self.results.countFailures()).toEqual(1)
+        expect(self.results.countErrors()).toEqual(0)
+
+    def test_classes_run_with_their_own_module_state(self):
+        # Where
+        suite = TestCaseWithBeforeAndAfterClass.suite()
+
+        # When
+        self.executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(1)
+        expect(TestCaseWithBeforeAndAfterClass.beforeClassCalled).toBeFalse()
+
+    def test_output_from_workers_is_replayed(self):
+        # Where
+        output = io.StringIO()
+        runner = ConsoleTestRunner(output, bufferOutput = False, executor = self.executor)
+        suite = TestCaseWithOtherPrintingTests.suite()
+        stdout = sys.stdout
+        sys.stdout = io.StringIO()
+
+        # When
+        try:
+            runner.run(suite)
+            printed = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+
+        # Then
+        expect(printed).toEqual("other output\n")
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.TestSuite import *
+from WellBehavedPython.Execution.SuiteOrderer import *
+from WellBehavedPython.History.FlakyHistory import *
+from WellBehavedPython.History.LastRunHistory import *
+
+from ..Samples.SampleTestCases import *
+
+class SuiteOrdererTests(TestCase):
+
+    def before(self):
+        # an empty path is never loaded from or saved to
+        self.lastRun = LastRunHistory(path = "")
+
+    def buildTest(self, testClass, testMethodName):
+        test = testClass()
+        test.configureTest(testMethodName)
+        return test
+
+    def buildSuite(self, name, *components):
+        suite = TestSuite(name)
+        for component in components:
+            if isinstance(component, TestSuite):
+                suite.add(component)
+            else:
+                suite.add(component.suite())
+        return suite
+
+    def buildDefaultSuite(self):
+        return self.buildSuite("outer", TestCaseWithPassingTest, TestCaseWithTwoPassingTests,
+                               TestCaseWithFailingTest)
+
+    def recordRun(self, suite):
+        results = TestResults()
+        suite.run(results)
+        self.lastRun.update(suite, results)
+
+    def classNames(self, suite):
+        return [classSuite.testClass.__name__ for classSuite in suite.listClassSuites()]
+
+    def test_failed_first_puts_classes_which_failed_first(self):
+        # Where
+        suite = self.buildDefaultSuite()
+        self.recordRun(suite)
+        orderer = SuiteOrderer(["failed-first"], self.lastRun)
+
+        # When
+        reordered = orderer.reorder(suite)
+
+        # Then
+        expect(self.classNames(reordered)).toEqual(
+            ["TestCaseWithFailingTest", "TestCaseWithPassingTest", "TestCaseWithTwoPassingTests"])
+
+    def test_new_first_puts_classes_with_new_tests_first(self):
+        # Where
+        self.recordRun(self.buildSuite("outer", TestCaseWithPassingTest, TestCaseWithFailingTest))
+        orderer = SuiteOrderer(["new-first"], self.lastRun)
+
+        # When
+        reordered = orderer.reorder(self.buildDefaultSuite())
+
+        # Then
+        expect(self.classNames(reordered)).toEqual(
+            ["TestCaseWithTwoPassingTests", "TestCaseWithPassingTest", "TestCaseWithFailingTest"])
+
+    def test_new_first_puts_classes_with_modified_tests_first(self):
+        # Where
+        suite = self.buildDefaultSuite()
+        self.recordRun(suite)
+        identifier = self.buildTest(TestCaseWithFailingTest, "test_fail").getTestIdentifier()
+        self.lastRun.data["tests"][identifier]["fingerprint"] = "changed"
+        orderer = SuiteOrderer(["new-first"], self.lastRun)
+
+        # When
+        reordered = orderer.reorder(suite)
+
+        # Then
+        expect(self.classNames(reordered)[0]).toEqual("TestCaseWithFailingTest")
+
+    def buildFlakyHistory(self, testClass, testMethodName):
+        flakyHistory = FlakyHistory(path = "")
+        flakyHistory.data["tests"][self.buildTest(testClass, testMethodName).getTestIdentifier()] = {
+            "runs" : 2, "flaky" : 1 }
+        return flakyHistory
+
+    def test_flaky_first_puts_classes_which_have_been_flaky_first(self):
+        # Where
+        suite = self.buildDefaultSuite()
+        flakyHistory = self.buildFlakyHistory(TestCaseWithTwoPassingTests, "test_example1")
+        orderer = SuiteOrderer(["flaky-first"], flakyHistory = flakyHistory)
+
+        # When
+        reordered = orderer.reorder(suite)
+
+        # Then
+        expect(self.classNames(reordered)).toEqual(
+            ["TestCaseWithTwoPassingTests", "TestCaseWithPassingTest", "TestCaseWithFailingTest"])
+
+    def test_flaky_last_puts_classes_which_have_been_flaky_last(self):
+        # Where
+        suite = self.buildDefaultSuite()
+        flakyHistory = self.buildFlakyHistory(TestCaseWithPassingTest, "test_pass")
+        orderer = SuiteOrderer(["flaky-last"], flakyHistory = flakyHistory)
+
+        # When
+        reordered = orderer.reorder(suite)
+
+        # Then
+        expect(self.classNames(reordered)).toEqual(
+            ["TestCaseWithTwoPassingTests", "TestCaseWithFailingTest", "TestCaseWithPassingTest"])
+
+    def test_earlier_strategies_take_priority(self):
+        # Where
+        self.recordRun(self.buildSuite("outer", TestCaseWithPassingTest, TestCaseWithFailingTest))
+        orderer = SuiteOrderer(["failed-first", "new-first"], self.lastRun)
+
+        # When
+        reordered = orderer.reorder(self.buildDefaultSuite())
+
+        # Then
+        expect(self.classNames(reordered)).toEqual(
+            ["TestCaseWithFailingTest", "TestCaseWithTwoPassingTests", "TestCaseWithPassingTest"])
+
+    def test_random_order_is_repeated_with_the_same_seed(self):
+        # Where
+        suite = self.buildSuite("outer", TestCaseWithPassingTest, TestCaseWithTwoPassingTests,
+                                TestCaseWithFailingTest, TestCaseWithErrorTest,
+                                TestCaseWithIgnoredTest, TestCaseWithLongTestName)
+
+        # When
+        orders = [self.classNames(SuiteOrderer(["random"], seed = seed).reorder(suite))
+                  for seed in (1, 2, 1)]
+
+        # Then
+        expect(orders[0]).toEqual(orders[2])
+        expect(sorted(orders[0])).toEqual(sorted(self.classNames(suite)))
+
+    def test_seed_is_chosen_when_not_given(self):
+        expect(SuiteOrderer(["random"]).seed).Not.toBeNone()
+
+    def test_tests_within_a_class_keep_their_order(self):
+        # Where
+        suite = self.buildDefaultSuite()
+        self.recordRun(suite)
+
+        # When
+        reordered = SuiteOrderer(["failed-first", "random"], self.lastRun).reorder(suite)
+
+        # Then
+        classSuite = [classSuite for classSuite in reordered.listClassSuites()
+                      if classSuite.testClass is TestCaseWithTwoPassingTests][0]
+        expect([test.testMethodName for test in classSuite.tests]).toEqual(
+            ["test_example1", "test_another_example"])
+
+    def test_module_suites_move_with_their_classes(self):
+        # Where
+        suite = self.buildSuite("outer",
+                                self.buildSuite("first", TestCaseWithPassingTest),
+                                self.buildSuite("second", TestCaseWithTwoPassingTests,
+                                                TestCaseWithFailingTest))
+        self.recordRun(suite)
+
+        # When
+        reordered = SuiteOrderer(["failed-first"], self.lastRun).reorder(suite)
+
+        # Then
+        expect([child.suiteName for child in reordered.tests]).toEqual(["second", "first"])
+        expect(self.classNames(reordered)).toEqual(
+            ["TestCaseWithFailingTest", "TestCaseWithTwoPassingTests", "TestCaseWithPassingTest"])
+
+    def test_failed_classes_stay_behind_earlier_modules_with_failures(self):
+        # Where
+        suite = self.buildSuite("outer",
+                                self.buildSuite("first", TestCaseWithPassingTest,
+                                                TestCaseWithErrorTest),
+                                self.buildSuite("second", TestCaseWithTwoPassingTests,
+                                                TestCaseWithFailingTest))
+        self.recordRun(suite)
+
+        # When
+        reordered = SuiteOrderer(["failed-first"], self.lastRun).reorder(suite)
+
+        # Then
+        expect([child.suiteName for child in reordered.tests]).toEqual(["first", "second"])
+        expect(self.classNames(reordered)).toEqual(
+            ["TestCaseWithErrorTest", "TestCaseWithPassingTest",
+             "TestCaseWithFailingTest", "TestCaseWithTwoPassingTests"])
+
+    def test_original_suite_is_not_changed(self):
+        # Where
+        suite = self.buildDefaultSuite()
+        self.recordRun(suite)
+
+        # When
+        SuiteOrderer(["failed-first"], self.lastRun).reorder(suite)
+
+        # Then
+        expect(self.classNames(suite)).toEqual(
+            ["TestCaseWithPassingTest", "TestCaseWithTwoPassingTests", "TestCaseWithFailingTest"])
+
+    def test_unknown_strategy_is_rejected(self):
+        expect(lambda: SuiteOrderer(["slowest-first"])).toRaise(ValueError)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Execution.SuiteReference import *
+
+from ..Samples.SampleTestCases import *
+
+class SuiteReferenceTests(TestCase):
+
+    def test_class_suite_can_be_referenced(self):
+        suite = TestCaseWithTwoPassingTests.suite()
+
+        expect(SuiteReference.canReference(suite)).toBeTrue()
+
+    def test_suite_of_suites_cannot_be_referenced(self):
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithTwoPassingTests.suite())
+
+        expect(SuiteReference.canReference(suite)).toBeFalse()
+
+    def test_class_defined_in_function_cannot_be_referenced(self):
+        class LocalTests(TestCase):
+            def test_local(self):
+                pass
+
+        expect(SuiteReference.canReference(LocalTests.suite())).toBeFalse()
+
+    def test_nested_class_suite_can_be_referenced_and_built(self):
+        # Where
+        suite = ClassHoldingTestCase.TestCaseWithNestedFailingTest.suite()
+
+        # When
+        built = SuiteReference.fromSuite(suite).build()
+
+        # Then
+        expect(SuiteReference.canReference(suite)).toBeTrue()
+        expect(built.testClass).toEqual(ClassHoldingTestCase.TestCaseWithNestedFailingTest)
+
+    def test_built_suite_matches_original(self):
+        # Where
+        original = TestCaseWithIgnoredTest.suite()
+        reference = SuiteReference.fromSuite(original)
+
+        # When
+        suite = reference.build()
+
+        # Then
+        expect(suite.suiteName).toEqual(original.suiteName)
+        expect(suite.testClass).toEqual(TestCaseWithIgnoredTest)
+        expect(len(suite.tests)).toEqual(1)
+        expect(suite.tests[0].testMethodName).toEqual("xtest_ignore")
+        expect(suite.tests[0].ignore).toBeTrue()
+
+    def test_running_reference_returns_recorded_events(self):
+        # Where
+        reference = SuiteReference.fromSuite(TestCaseWithFailingTest.suite())
+        results = TestResults()
+
+        # When
+        reference.run().replay(results)
+
+        # Then
+        expect(results.countTests()).toEqual(1)
+        expect(results.countFailures()).toEqual(1)
+
+    def test_reference_survives_conversion_to_dictionary(self):
+        # Where
+        original = SuiteReference.fromSuite(TestCaseWithTwoPassingTests.suite())
+
+        # When
+        reference = SuiteReference.fromDict(original.toDict())
+
+        # Then
+        expect(reference.moduleName).toEqual(original.moduleName)
+        expect(reference.className).toEqual(original.className)
+        expect(reference.suiteName).toEqual(original.suiteName)
+        expect(reference.tests).toEqual(original.tests)
+
+    def test_built_suite_keeps_cached_tests(self):
+        # Where
+        original = TestCaseWithTwoPassingTests.suite()
+        original.tests[1].cached = True
+        reference = SuiteReference.fromDict(SuiteReference.fromSuite(original).toDict())
+
+        # When
+        suite = reference.build()
+
+        # Then
+        expect([test.cached for test in suite.tests]).toEqual([False, True])
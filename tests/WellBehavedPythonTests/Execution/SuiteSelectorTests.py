@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.TestSuite import *
+from WellBehavedPython.Execution.SuiteSelector import *
+
+from ..Samples.SampleTestCases import *
+
+class SuiteSelectorTests(TestCase):
+
+    def buildSuite(self, name, *testClasses):
+        suite = TestSuite(name)
+        for testClass in testClasses:
+            suite.add(testClass.suite())
+        return suite
+
+    def buildDefaultSuite(self):
+        return self.buildSuite("outer", TestCaseWithPassingTest, TestCaseWithTwoPassingTests,
+                               TestCaseWithFailingTest)
+
+    def methodNames(self, suite):
+        return [test.testMethodName for classSuite in suite.listClassSuites()
+                for test in classSuite.tests]
+
+    def test_matching_selects_tests_whose_identifiers_match(self):
+        # Where
+        selector = SuiteSelector.matching(["example"])
+
+        # When
+        selected = selector.select(self.buildDefaultSuite())
+
+        # Then
+        expect(self.methodNames(selected)).toEqual(["test_example1", "test_another_example"])
+
+    def test_matching_selects_tests_matching_any_pattern(self):
+        # Where
+        selector = SuiteSelector.matching(["test_pass$", "WithFailingTest"])
+
+        # When
+        selected = selector.select(self.buildDefaultSuite())
+
+        # Then
+        expect(self.methodNames(selected)).toEqual(["test_pass", "test_fail"])
+
+    def test_classes_without_selected_tests_are_left_out(self):
+        # Where
+        selector = SuiteSelector.matching(["test_fail"])
+
+        # When
+        selected = selector.select(self.buildDefaultSuite())
+
+        # Then
+        classes = [classSuite.testClass for classSuite in selected.listClassSuites()]
+        expect(classes).toEqual([TestCaseWithFailingTest])
+
+    def test_selected_suites_keep_their_names(self):
+        # Where
+        suite = self.buildDefaultSuite()
+        selector = SuiteSelector.matching(["test_fail"])
+
+        # When
+        selected = selector.select(suite)
+
+        # Then
+        expect(selected.suiteName).toEqual("outer")
+        expect(selected.listClassSuites()[0].suiteName).toEqual(
+            suite.listClassSuites()[2].suiteName)
+
+    def test_select_does_not_change_the_suite(self):
+        # Where
+        suite = self.buildDefaultSuite()
+
+        # When
+        SuiteSelector.matching(["test_fail"]).select(suite)
+
+        # Then
+        expect(suite.countTests()).toEqual(4)
+
+    def test_select_returns_an_empty_suite_when_nothing_matches(self):
+        # When
+        selected = SuiteSelector.matching(["no such test"]).select(self.buildDefaultSuite())
+
+        # Then
+        expect(selected.countTests()).toEqual(0)
+        results = TestResults()
+        selected.run(results)
+        expect(results.countTests()).toEqual(0)
+
+    def test_selected_suite_runs_before_and_after_class(self):
+        # Where
+        suite = self.buildSuite("outer", TestCaseWithAfterClassSaboteur)
+        selected = SuiteSelector.matching(["test_two"]).select(suite)
+
+        # When
+        results = TestResults()
+        selected.run(results)
+
+        # Then
+        expect(results.countTests()).toEqual(1)
+        expect(results.countErrors()).toEqual(1)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Execution.SuiteSharder import *
+from WellBehavedPython.History.DurationHistory import *
+
+from ..Samples.SampleTestCases import *
+
+class SuiteSharderTests(TestCase):
+
+    def before(self):
+        self.suite = TestSuite("outer")
+        inner = TestSuite("inner")
+        inner.add(TestCaseWithPassingTest.suite())
+        inner.add(TestCaseWithFailingTest.suite())
+        self.suite.add(inner)
+        self.suite.add(TestCaseWithErrorTest.suite())
+        self.suite.add(TestCaseWithTwoPassingTests.suite())
+        self.history = DurationHistory(path = "")
+
+    def setClassDuration(self, klass, seconds):
+        self.history.data["classes"][klass.getTestClassIdentifier()] = seconds
+        for test in klass.suite().tests:
+            self.history.data["tests"][test.getTestIdentifier()] = seconds / len(klass.suite().tests)
+
+    def test_every_class_suite_is_in_exactly_one_shard(self):
+        # Where
+        sharder = SuiteSharder(3)
+
+        # When
+        shards = [sharder.buildShard(self.suite, i) for i in range(3)]
+
+        # Then
+        expect(sum(shard.countTests() for shard in shards)).toEqual(self.suite.countTests())
+        names = []
+        for shard in shards:
+            names.extend(classSuite.suiteName for classSuite in shard.listClassSuites())
+        expect(sorted(names)).toEqual(sorted(classSuite.suiteName
+                                             for classSuite in self.suite.listClassSuites()))
+
+    def test_shards_keep_suite_structure(self):
+        # Where
+        sharder = SuiteSharder(1)
+
+        # When
+        shard = sharder.buildShard(self.suite, 0)
+
+        # Then
+        expect(shard.suiteName).toEqual("outer")
+        expect(shard.tests[0].suiteName).toEqual("inner")
+        expect(shard.countTests()).toEqual(self.suite.countTests())
+
+    def test_shards_are_balanced_by_duration(self):
+        # Where
+        self.setClassDuration(TestCaseWithPassingTest, 10)
+        self.setClassDuration(TestCaseWithFailingTest, 4)
+        self.setClassDuration(TestCaseWithErrorTest, 3)
+        self.setClassDuration(TestCaseWithTwoPassingTests, 3)
+        sharder = SuiteSharder(2, self.history)
+
+        # When
+        shards = sharder.assignShards(self.suite)
+
+        # Then
+        expect([suite.suiteName for suite in shards[0]]).toEqual(["TestCaseWithPassingTest"])
+        expect(len(shards[1])).toEqual(3)
+
+    def test_assignment_is_deterministic(self):
+        # Where
+        sharder = SuiteSharder(2, self.history)
+        otherSuite = TestSuite("outer")
+        for classSuite in reversed(self.suite.listClassSuites()):
+            otherSuite.add(classSuite.testClass.suite())
+
+        # When
+        first = [[suite.testClass for suite in shard] for shard in sharder.assignShards(self.suite)]
+        second = [[suite.testClass for suite in shard] for shard in sharder.assignShards(otherSuite)]
+
+        # Then
+        expect(first).toEqual(second)
+
+    def test_empty_shard_is_an_empty_suite(self):
+        # Where
+        sharder = SuiteSharder(10)
+
+        # When
+        shard = sharder.buildShard(TestCaseWithPassingTest.suite(), 9)
+
+        # Then
+        expect(shard.countTests()).toEqual(0)
+
+    def test_parse_shard_counts_from_one(self):
+        expect(SuiteSharder.parseShard("1/4")).toEqual((0, 4))
+        expect(SuiteSharder.parseShard("4/4")).toEqual((3, 4))
+
+    def test_parse_shard_rejects_bad_shards(self):
+        expect(lambda: SuiteSharder.parseShard("0/4")).toRaise(ValueError)
+        expect(lambda: SuiteSharder.parseShard("5/4")).toRaise(ValueError)
+        expect(lambda: SuiteSharder.parseShard("two")).toRaise(ValueError)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.TestSuite import *
+from WellBehavedPython.Execution.ProcessPoolTestExecutor import *
+from WellBehavedPython.Execution.SuiteReference import *
+from WellBehavedPython.Execution.SupervisedProcessPool import *
+
+from ..Samples.SampleTestCases import *
+from ..Samples.Execution.SampleCrashingTestCases import *
+from ..Samples.Execution.SampleMemoryTestCases import *
+from ..Samples.Execution.SampleMultiprocessingTestCases import *
+from ..Samples.Execution.SampleTimeoutTestCases import *
+from ..Samples.Execution import SampleTimeoutTestCases
+
+class SupervisedProcessPoolTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        # workers forked from this process must see hung tests hang
+        SampleTimeoutTestCases.release.clear()
+        self.pool = SupervisedProcessPool(2)
+        self.results = TestResults()
+
+    def after(self):
+        self.pool.shutdown()
+        SampleTimeoutTestCases.release.set()
+
+    def runSuite(self, testClass):
+        reference = SuiteReference.fromSuite(testClass.suite())
+        self.pool.submit(reference).result().replay(self.results)
+        return self.results.suiteResults[0]
+
+    def getTestResults(self, suiteResults, testName):
+        for results in suiteResults.suiteResults:
+            if results.name == testName:
+                return results
+        return None
+
+    def test_suite_without_crashes_runs_on_one_worker(self):
+        # When
+        self.runSuite(TestCaseWithTwoPassingTests)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(2)
+        expect(self.pool.workersStarted).toEqual(1)
+
+    def test_tests_can_start_processes_of_their_own(self):
+        # When
+        self.runSuite(TestCaseStartingProcesses)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(2)
+        expect(self.results.countErrors()).toEqual(0)
+
+    def test_shutdown_stops_the_workers(self):
+        # Where
+        self.runSuite(TestCaseWithTwoPassingTests)
+        workers = list(self.pool._workers)
+
+        # When
+        self.pool.shutdown()
+
+        # Then
+        expect(len(workers)).toEqual(1)
+        expect(workers[0]._process.is_alive()).toBeFalse()
+        expect(len(self.pool._workers)).toEqual(0)
+
+    def test_crashed_test_is_registered_as_error_with_signal(self):
+        # When
+        suiteResults = self.runSuite(TestCaseWithCrashingTest)
+
+        # Then
+        stackTrace = self.getTestResults(suiteResults, "test_b_crashes").stackTraces
+        expect(stackTrace).toEqual(
+            ["Worker process killed by signal SIGSEGV while running the test\n"])
+
+    def test_tests_after_a_crash_run_on_a_new_worker(self):
+        # When
+        suiteResults = self.runSuite(TestCaseWithCrashingTest)
+
+        # Then
+        expect(self.results.countTests()).toEqual(5)
+        expect(self.results.countPasses()).toEqual(2)
+        expect(self.results.countErrors()).toEqual(2)
+        expect(self.results.countFailures()).toEqual(1)
+        expect([results.name for results in suiteResults.suiteResults]).toEqual(
+            ["test_a_passes", "test_b_crashes", "test_c_passes", "test_d_crashes", "test_e_fails"])
+        expect(self.pool.workersStarted).toEqual(3)
+
+    def test_crash_in_before_class_registers_every_test_as_error(self):
+        # When
+        self.runSuite(TestCaseWithCrashingBeforeClass)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(2)
+        expect(self.results.suiteResults[0].stackTraces).toEqual(
+            ["Worker process killed by signal SIGSEGV in beforeClass\n"])
+
+    def test_crash_in_after_class_registers_after_class_error(self):
+        # When
+        self.runSuite(TestCaseWithCrashingAfterClass)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(1)
+        expect(self.results.countErrors()).toEqual(1)
+
+    def test_later_suites_run_after_a_crash(self):
+        # Where
+        executor = ProcessPoolTestExecutor(1)
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithCrashingTest.suite())
+        suite.add(TestCaseWithTwoPassingTests.suite())
+
+        # When
+        executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countTests()).toEqual(7)
+        expect(self.results.countPasses()).toEqual(4)
+
+    def test_worker_left_running_a_timed_out_test_is_recycled(self):
+        # When
+        self.runSuite(TestCaseWithHangingTest)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(1)
+        expect(self.pool.workersRecycled).toEqual(1)
+
+    @timeout(60)
+    def test_suites_with_timeouts_and_crashes_finish(self):
+        # Where
+        executor = ProcessPoolTestExecutor(2)
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithHangingTest.suite())
+        suite.add(TestCaseWithIsolatedHangingTest.suite())
+        suite.add(TestCaseWithCrashingTest.suite())
+        suite.add(TestCaseWithIsolatedHangingClass.suite())
+        suite.add(TestCaseWithCrashingBeforeClass.suite())
+        suite.add(TestCaseWithTimeoutOnClass.suite())
+
+        # When
+        executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(5)
+        expect(self.results.countFailures()).toEqual(2)
+        expect(self.results.countErrors()).toEqual(9)
+
+    def test_worker_is_recycled_after_max_tests(self):
+        # Where
+        self.pool.shutdown()
+        self.pool = SupervisedProcessPool(1, maxTestsPerWorker = 3)
+
+        # When
+        for i in range(3):
+            self.runSuite(TestCaseWithTwoPassingTests)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(6)
+        expect(self.pool.workersRecycled).toEqual(1)
+        expect(self.pool.workersStarted).toEqual(2)
+
+    def test_worker_is_recycled_once_its_memory_passes_the_limit(self):
+        # Where
+        self.pool.shutdown()
+        self.pool = SupervisedProcessPool(1, maxWorkerMemory = 1)
+
+        # When
+        self.runSuite(TestCaseWithTwoPassingTests)
+        self.runSuite(TestCaseWithTwoPassingTests)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(4)
+        expect(self.pool.workersStarted).toEqual(2)
+
+    def test_test_going_over_the_memory_limit_is_an_error(self):
+        # Where
+        self.pool.shutdown()
+        self.pool = SupervisedProcessPool(1, memoryLimit = self.getAddressSpace() + 512 * 1024 * 1024)
+
+        # When
+        suiteResults = self.runSuite(TestCaseUsingTooMuchMemory)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(1)
+        expect(self.results.countPasses()).toEqual(1)
+        stackTrace = self.getTestResults(suiteResults, "test_allocate_too_much_memory").stackTraces
+        expect("".join(stackTrace)).toContain("MemoryError")
+
+    def getAddressSpace(self):
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+
+    def test_memory_sizes_are_parsed_with_suffixes(self):
+        expect(SupervisedProcessPool.parseMemorySize("1000")).toEqual(1000)
+        expect(SupervisedProcessPool.parseMemorySize("4K")).toEqual(4096)
+        expect(SupervisedProcessPool.parseMemorySize("512M")).toEqual(512 * 1024 * 1024)
+        expect(SupervisedProcessPool.parseMemorySize("2gb")).toEqual(2 * 1024 ** 3)
+
+    def test_badly_written_memory_size_is_rejected(self):
+        expect(lambda: SupervisedProcessPool.parseMemorySize("lots")).toRaise(ValueError)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.TestSuite import *
+from WellBehavedPython.Execution.ProcessPoolTestExecutor import *
+from WellBehavedPython.Execution.SystemLoadMonitor import *
+from WellBehavedPython.Execution.ThreadPoolTestExecutor import *
+from WellBehavedPython.History.MemoryHistory import *
+
+from ..Samples.SampleTestCases import *
+from ..Samples.Execution.SampleMemoryTestCases import *
+from ..Samples.Execution.SampleResourceTestCases import ResourceUsage
+
+import os
+import shutil
+import tempfile
+
+gigabyte = 1024 * 1024 * 1024
+
+class SystemLoadMonitorTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        ResourceUsage.reset()
+        self.directory = tempfile.mkdtemp()
+        self.history = MemoryHistory(os.path.join(self.directory, "memory.json"))
+
+    def after(self):
+        shutil.rmtree(self.directory)
+
+    def writeProc(self, load, availableMemory, totalMemory = 8 * gigabyte):
+        with open(os.path.join(self.directory, "loadavg"), "w") as file:
+            file.write("{} 0.50 0.25 1/100 12345\n".format(load))
+        with open(os.path.join(self.directory, "meminfo"), "w") as file:
+            file.write("MemTotal:       {} kB\n".format(totalMemory // 1024))
+            file.write("MemFree:        {} kB\n".format(availableMemory // 2048))
+            file.write("MemAvailable:   {} kB\n".format(availableMemory // 1024))
+
+    def buildMonitor(self, maxWorkers = 8, minWorkers = 1, interval = 0, memoryReserve = None):
+        monitor = SystemLoadMonitor(maxWorkers, minWorkers, self.history, memoryReserve,
+                                    interval, self.directory)
+        monitor.cpuCount = 4
+        return monitor
+
+    def buildSuite(self, *testClasses):
+        suite = TestSuite("outer")
+        for testClass in testClasses:
+            suite.add(testClass.suite())
+        return suite
+
+    def test_load_average_and_memory_are_read_from_proc(self):
+        # Where
+        self.writeProc(1.5, 2 * gigabyte)
+        monitor = self.buildMonitor()
+
+        # Then
+        expect(monitor.readLoadAverage()).toEqual(1.5)
+        expect(monitor.readMemory()).toEqual((8 * gigabyte, 2 * gigabyte))
+
+    def test_workers_start_at_the_number_of_idle_cpus(self):
+        # Where
+        self.writeProc(1.2, 4 * gigabyte)
+        monitor = self.buildMonitor()
+
+        # Then
+        expect(monitor.getWorkerCount()).toEqual(3)
+
+    def test_workers_start_within_the_limits(self):
+        # Where
+        self.writeProc(0, 4 * gigabyte)
+        monitor = self.buildMonitor(maxWorkers = 2)
+
+        # Then
+        expect(monitor.getWorkerCount()).toEqual(2)
+
+    def test_workers_shrink_while_load_is_above_the_cpu_count(self):
+        # Where
+        self.writeProc(1, 4 * gigabyte)
+        monitor = self.buildMonitor()
+        monitor.getWorkerCount()
+
+        # When
+        self.writeProc(6, 4 * gigabyte)
+
+        # Then
+        expect(monitor.getWorkerCount()).toEqual(2)
+        expect(monitor.getWorkerCount()).toEqual(1)
+        expect(monitor.getWorkerCount()).toEqual(1)
+
+    def test_workers_grow_while_cpus_are_idle(self):
+        # Where
+        self.writeProc(3, 4 * gigabyte)
+        monitor = self.buildMonitor(maxWorkers = 3)
+        monitor.getWorkerCount()
+
+        # When
+        self.writeProc(0.5, 4 * gigabyte)
+
+        # Then
+        expect(monitor.getWorkerCount()).toEqual(2)
+        expect(monitor.getWorkerCount()).toEqual(3)
+        expect(monitor.getWorkerCount()).toEqual(3)
+
+    def test_workers_shrink_while_memory_is_below_the_reserve(self):
+        # Where
+        self.writeProc(0, 4 * gigabyte)
+        monitor = self.buildMonitor()
+        monitor.getWorkerCount()
+
+        # When
+        self.writeProc(0, gigabyte // 2)
+
+        # Then
+        expect(monitor.getWorkerCount()).toEqual(3)
+
+    def test_readings_are_taken_at_most_once_per_interval(self):
+        # Where
+        self.writeProc(0, 4 * gigabyte)
+        monitor = self.buildMonitor(interval = 60)
+        monitor.getWorkerCount()
+
+        # When
+        self.writeProc(6, 4 * gigabyte)
+
+        # Then
+        expect(monitor.getWorkerCount()).toEqual(4)
+
+    def test_max_workers_are_used_when_proc_cannot_be_read(self):
+        # Where
+        monitor = self.buildMonitor(maxWorkers = 5)
+
+        # Then
+        expect(monitor.getWorkerCount()).toEqual(5)
+        expect(monitor.canStart(TestCaseUsingMuchMemoryFirst, 1)).toBeTrue()
+
+    def test_class_needing_more_memory_than_is_free_is_held_back(self):
+        # Where
+        self.writeProc(0, 2 * gigabyte)
+        self.history.recordClassMemory(TestCaseUsingMuchMemoryFirst, 3 * gigabyte)
+        monitor = self.buildMonitor(memoryReserve = 0)
+
+        # Then
+        expect(monitor.canStart(TestCaseUsingMuchMemoryFirst, 1)).toBeFalse()
+        expect(monitor.canStart(TestCaseUsingLittleMemory, 1)).toBeTrue()
+
+    def test_class_is_started_when_nothing_else_is_running(self):
+        # Where
+        self.writeProc(0, 2 * gigabyte)
+        self.history.recordClassMemory(TestCaseUsingMuchMemoryFirst, 3 * gigabyte)
+        monitor = self.buildMonitor(memoryReserve = 0)
+
+        # Then
+        expect(monitor.canStart(TestCaseUsingMuchMemoryFirst, 0)).toBeTrue()
+
+    def test_memory_of_started_classes_is_counted_until_the_next_reading(self):
+        # Where
+        self.writeProc(0, 3 * gigabyte)
+        self.history.recordClassMemory(TestCaseUsingMuchMemoryFirst, 2 * gigabyte)
+        self.history.recordClassMemory(TestCaseUsingMuchMemorySecond, 2 * gigabyte)
+        monitor = self.buildMonitor(interval = 60, memoryReserve = 0)
+
+        # When
+        monitor.suiteStarted(TestCaseUsingMuchMemoryFirst)
+
+        # Then
+        expect(monitor.canStart(TestCaseUsingMuchMemorySecond, 1)).toBeFalse()
+
+    def test_reserve_defaults_to_a_tenth_of_total_memory(self):
+        # Where
+        self.writeProc(0, 2 * gigabyte, 10 * gigabyte)
+        self.history.recordClassMemory(TestCaseUsingMuchMemoryFirst, int(1.5 * gigabyte))
+        monitor = self.buildMonitor()
+
+        # Then
+        expect(monitor.canStart(TestCaseUsingMuchMemoryFirst, 1)).toBeFalse()
+
+    def test_parallel_run_is_limited_to_the_monitor_worker_count(self):
+        # Where
+        self.writeProc(3, 4 * gigabyte)
+        suite = self.buildSuite(TestCaseUsingLittleMemory, TestCaseUsingMuchMemoryFirst,
+                                TestCaseUsingMuchMemorySecond, TestCaseUsingMuchMemoryThird)
+        executor = ThreadPoolTestExecutor(4, loadMonitor = self.buildMonitor(interval = 60))
+        results = TestResults()
+
+        # When
+        executor.run(suite, results)
+
+        # Then
+        expect(results.countPasses()).toEqual(4)
+        expect(ResourceUsage.peak["running"]).toEqual(1)
+
+    def test_parallel_run_holds_back_classes_which_need_too_much_memory(self):
+        # Where
+        self.writeProc(0, 3 * gigabyte)
+        for testClass in (TestCaseUsingMuchMemoryFirst, TestCaseUsingMuchMemorySecond,
+                          TestCaseUsingMuchMemoryThird):
+            self.history.recordClassMemory(testClass, 2 * gigabyte)
+        suite = self.buildSuite(TestCaseUsingMuchMemoryFirst, TestCaseUsingMuchMemorySecond,
+                                TestCaseUsingMuchMemoryThird, TestCaseUsingLittleMemory)
+        monitor = self.buildMonitor(interval = 60, memoryReserve = 0)
+        executor = ThreadPoolTestExecutor(4, loadMonitor = monitor)
+        results = TestResults()
+
+        # When
+        executor.run(suite, results)
+
+        # Then
+        expect(results.countPasses()).toEqual(4)
+        expect(ResourceUsage.peak["much-memory"]).toEqual(1)
+        expect(ResourceUsage.peak["running"]).toEqual(2)
+
+    def test_peak_memory_of_worker_processes_is_recorded(self):
+        # Where
+        monitor = SystemLoadMonitor(2, memoryHistory = self.history)
+        executor = ProcessPoolTestExecutor(2, loadMonitor = monitor)
+
+        # When
+        executor.run(self.buildSuite(TestCaseWithTwoPassingTests), TestResults())
+
+        # Then
+        expect(self.history.getClassMemory(TestCaseWithTwoPassingTests)).toBeGreaterThan(0)
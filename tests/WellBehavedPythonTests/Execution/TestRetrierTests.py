@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.TestSuite import *
+from WellBehavedPython.Execution.TestRetrier import *
+
+from ..Samples.Execution.SampleFlakyTestCases import *
+
+class TestRetrierTests(TestCase):
+    usesProcesses = True
+
+    def after(self):
+        TestCaseWithFlakyTest.failuresLeft = 0
+        TestCaseWithFlakyFixture.brokenSetUpsLeft = 0
+        TestCaseWithIsolatedFlakyTest.failuresLeft = 0
+
+    def runSuite(self, *testClasses):
+        suite = TestSuite("outer")
+        for testClass in testClasses:
+            suite.add(testClass.suite())
+        results = TestResults()
+        suite.run(results)
+        return suite, results
+
+    def test_failed_tests_are_found(self):
+        # Where
+        TestCaseWithFlakyTest.failuresLeft = 1
+        suite, results = self.runSuite(TestCaseWithFlakyTest, TestCaseWithBrokenTest)
+
+        # When
+        failed = TestRetrier(1).findFailedTests(suite, results)
+
+        # Then
+        expect([test.testMethodName for test, testResults in failed]).toEqual(
+            ["test_flaky", "test_broken"])
+
+    def test_test_which_passes_again_is_flaky(self):
+        # Where
+        TestCaseWithFlakyTest.failuresLeft = 1
+        suite, results = self.runSuite(TestCaseWithFlakyTest)
+
+        # When
+        flaky = TestRetrier(1).retry(suite, results)
+
+        # Then
+        expect([test.testMethodName for test in flaky]).toEqual(["test_flaky"])
+        expect(results.countFailures()).toEqual(0)
+        expect(results.countPasses()).toEqual(2)
+        expect(results.countFlaky()).toEqual(1)
+        expect(results.getStackTraces()).toEqual([])
+
+    def test_test_is_retried_up_to_the_number_of_retries(self):
+        # Where
+        TestCaseWithFlakyTest.failuresLeft = 2
+        suite, results = self.runSuite(TestCaseWithFlakyTest)
+
+        # When
+        flaky = TestRetrier(2).retry(suite, results)
+
+        # Then
+        expect(len(flaky)).toEqual(1)
+        expect(TestCaseWithFlakyTest.failuresLeft).toEqual(0)
+
+    def test_test_which_fails_every_retry_still_fails(self):
+        # Where
+        TestCaseWithFlakyTest.failuresLeft = 4
+        suite, results = self.runSuite(TestCaseWithFlakyTest)
+
+        # When
+        flaky = TestRetrier(2).retry(suite, results)
+
+        # Then
+        expect(flaky).toEqual([])
+        expect(results.countFailures()).toEqual(1)
+        expect(results.countFlaky()).toEqual(0)
+        expect(TestCaseWithFlakyTest.failuresLeft).toEqual(1)
+
+    def test_broken_test_is_not_flaky(self):
+        # Where
+        suite, results = self.runSuite(TestCaseWithBrokenTest)
+
+        # When
+        flaky = TestRetrier(3).retry(suite, results)
+
+        # Then
+        expect(flaky).toEqual([])
+        expect(results.countFailures()).toEqual(1)
+
+    def test_passing_tests_are_not_run_again(self):
+        # Where
+        suite, results = self.runSuite(TestCaseWithFlakyTest)
+        TestCaseWithFlakyTest.failuresLeft = 1
+
+        # When
+        flaky = TestRetrier(1).retry(suite, results)
+
+        # Then
+        expect(flaky).toEqual([])
+        expect(TestCaseWithFlakyTest.failuresLeft).toEqual(1)
+
+    def test_retry_runs_before_class_again(self):
+        # Where
+        TestCaseWithFlakyFixture.brokenSetUpsLeft = 1
+        suite, results = self.runSuite(TestCaseWithFlakyFixture)
+
+        # When
+        flaky = TestRetrier(1).retry(suite, results)
+
+        # Then
+        expect([test.testMethodName for test in flaky]).toEqual(["test_needs_working_fixture"])
+        expect(TestCaseWithFlakyFixture.fixtureBroken).toBeFalse()
+
+    def test_retry_keeps_the_isolation_of_the_class(self):
+        # Where
+        TestCaseWithIsolatedFlakyTest.failuresLeft = 1
+        suite, results = self.runSuite(TestCaseWithIsolatedFlakyTest)
+
+        # When
+        flaky = TestRetrier(2).retry(suite, results)
+
+        # Then
+        expect(flaky).toEqual([])
+        expect(TestCaseWithIsolatedFlakyTest.failuresLeft).toEqual(1)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.ThreadLocalStream import *
+from WellBehavedPython.Execution.ThreadPoolTestExecutor import *
+from WellBehavedPython.History.DurationHistory import *
+from WellBehavedPython.Runners.ConsoleTestRunner import *
+
+from ..Samples.SampleTestCases import *
+from ..Samples.Execution.SampleIsolationTestCases import *
+from ..Samples.Execution.SampleMultiprocessingTestCases import *
+from ..Samples.Execution.SampleOutputTestCases import *
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+class ThreadPoolTestExecutorTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        self.executor = ThreadPoolTestExecutor(3)
+        self.results = TestResults()
+        self.suite = TestSuite("outer")
+        self.suite.add(TestCaseWithPassingTest.suite())
+        self.suite.add(TestCaseWithFailingTest.suite())
+        self.suite.add(TestCaseWithErrorTest.suite())
+        self.suite.add(TestCaseWithIgnoredTest.suite())
+
+    def test_executor_runs_all_tests_in_suite(self):
+        # When
+        self.executor.run(self.suite, self.results)
+
+        # Then
+        results = self.results
+        expect(results.countTests()).toEqual(4)
+        expect(results.countPasses()).toEqual(1)
+        expect(results.countFailures()).toEqual(1)
+        expect(results.countErrors()).toEqual(1)
+        expect(results.countIgnored()).toEqual(1)
+
+    def test_classes_which_fork_are_run(self):
+        # Where
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithTestIsolation.suite())
+        suite.add(TestCaseWithClassIsolation.suite())
+        suite.add(TestCaseWithPassingTest.suite())
+
+        # When
+        self.executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countErrors()).toEqual(0)
+        expect(self.results.countFailures()).toEqual(1)
+        expect(self.results.countPasses()).toEqual(5)
+        names = [suiteResults.name for suiteResults in self.results.suiteResults[0].suiteResults]
+        expect(names).toEqual(["TestCaseWithTestIsolation", "TestCaseWithClassIsolation",
+                               "TestCaseWithPassingTest"])
+
+    def test_classes_which_start_processes_run_on_the_calling_thread(self):
+        # Where
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithPassingTest.suite())
+        suite.add(TestCaseStartingProcesses.suite())
+        TestCaseStartingProcesses.thread = None
+
+        # When
+        self.executor.run(suite, self.results)
+
+        # Then
+        expect(self.results.countPasses()).toEqual(3)
+        expect(TestCaseStartingProcesses.thread is threading.current_thread()).toBeTrue()
+
+    def test_classes_which_start_processes_stop_at_failure_limit(self):
+        # Where
+        results = TestResults(maxFailures = 1)
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithTestIsolation.suite())
+        suite.add(TestCaseStartingProcesses.suite())
+
+        # When
+        self.executor.run(suite, results)
+
+        # Then
+        expect(results.countFailures()).toEqual(1)
+        expect(results.countTests()).toEqual(3)
+
+    def test_output_is_kept_in_suite_order(self):
+        # Where
+        suite = TestSuite("printing")
+        suite.add(TestCaseWithPrintingTests.suite())
+        suite.add(TestCaseWithOtherPrintingTests.suite())
+        output = io.StringIO()
+        oldStdout = sys.stdout
+        sys.stdout = output
+
+        # When
+        try:
+            self.executor.run(suite, self.results)
+        finally:
+            sys.stdout = oldStdout
+
+        # Then
+        expect(output.getvalue()).toMatch("(?s)(first|second) output.*(first|second) output.*other output")
+
+    def test_executor_restores_streams(self):
+        # Where
+        stdout = sys.stdout
+        stderr = sys.stderr
+
+        # When
+        self.executor.run(self.suite, self.results)
+
+        # Then
+        expect(sys.stdout is stdout).toBeTrue()
+        expect(sys.stderr is stderr).toBeTrue()
+
+    def test_console_runner_reports_thread_pool_results(self):
+        # Where
+        output = io.StringIO()
+        runner = ConsoleTestRunner(output, bufferOutput = False, executor = self.executor)
+
+        # When
+        results = runner.run(self.suite)
+
+        # Then
+        expect(results.countTests()).toEqual(4)
+        expect(output.getvalue()).toContain(".FEI")
+
+    def test_history_orders_submission_longest_first(self):
+        # Where
+        directory = tempfile.mkdtemp()
+        history = DurationHistory(os.path.join(directory, "durations.json"))
+        history.data["classes"][TestCaseWithIgnoredTest.getTestClassIdentifier()] = 10
+        history.data["tests"][TestCaseWithIgnoredTest.getTestClassIdentifier() + ".xtest_ignore"] = 10
+        history.data["tests"][TestCaseWithPassingTest.getTestClassIdentifier() + ".test_pass"] = 1
+        history.data["tests"][TestCaseWithFailingTest.getTestClassIdentifier() + ".test_fail"] = 1
+        executor = ThreadPoolTestExecutor(1, history = history)
+        submitted = []
+        submit = executor._submit
+        def recordingSubmit(pool, suite):
+            submitted.append(suite.suiteName)
+            return submit(pool, suite)
+        executor._submit = recordingSubmit
+
+        # When
+        try:
+            executor.run(self.suite, self.results)
+        finally:
+            shutil.rmtree(directory)
+
+        # Then
+        expect(submitted[0]).toEqual("TestCaseWithIgnoredTest")
+        expect(self.results.countTests()).toEqual(4)
+
+    def test_runner_records_history_after_run(self):
+        # Where
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "durations.json")
+        runner = ConsoleTestRunner(io.StringIO(), bufferOutput = False,
+                                   executor = self.executor,
+                                   history = DurationHistory(path))
+
+        # When
+        try:
+            runner.run(self.suite)
+            history = DurationHistory(path)
+        finally:
+            shutil.rmtree(directory)
+
+        # Then
+        expect(self.executor.history is runner.history).toBeTrue()
+        expect(history.getClassDuration(TestCaseWithPassingTest)).Not.toBeNone()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Execution.WarmProcessPoolTestExecutor import *
+
+from ..Samples.SampleTestCases import *
+
+import gc
+import multiprocessing
+
+class WarmProcessPoolTestExecutorTests(TestCase):
+    usesProcesses = True
+
+    def before(self):
+        self.results = TestResults()
+        self.suite = TestSuite("outer")
+        self.suite.add(TestCaseWithPassingTest.suite())
+        self.suite.add(TestCaseWithFailingTest.suite())
+        self.suite.add(TestCaseWithErrorTest.suite())
+
+    def expectAllResults(self):
+        expect(self.results.countTests()).toEqual(3)
+        expect(self.results.countPasses()).toEqual(1)
+        expect(self.results.countFailures()).toEqual(1)
+        expect(self.results.countErrors()).toEqual(1)
+
+    def test_default_start_method_is_fork_where_available(self):
+        expected = "fork"
+        if "fork" not in multiprocessing.get_all_start_methods():
+            expected = "forkserver"
+
+        expect(WarmProcessPoolTestExecutor.getDefaultStartMethod()).toEqual(expected)
+
+    def test_forked_workers_run_all_tests(self):
+        # Where
+        executor = WarmProcessPoolTestExecutor(2, startMethod = "fork")
+
+        # When
+        executor.run(self.suite, self.results)
+
+        # Then
+        self.expectAllResults()
+
+    def test_garbage_collector_is_unfrozen_after_run(self):
+        # Where
+        executor = WarmProcessPoolTestExecutor(2, startMethod = "fork")
+        frozenBefore = gc.get_freeze_count()
+
+        # When
+        executor.run(self.suite, self.results)
+
+        # Then
+        expect(gc.get_freeze_count()).toEqual(frozenBefore)
+
+    def test_garbage_collector_frozen_before_run_stays_frozen(self):
+        # Where
+        executor = WarmProcessPoolTestExecutor(2, startMethod = "fork")
+        gc.freeze()
+
+        # When
+        try:
+            executor.run(self.suite, self.results)
+            frozenAfter = gc.get_freeze_count()
+        finally:
+            gc.unfreeze()
+
+        # Then
+        expect(frozenAfter).toBeGreaterThan(0)
+
+    def test_forkserver_workers_run_all_tests(self):
+        # Where
+        executor = WarmProcessPoolTestExecutor(2, startMethod = "forkserver")
+
+        # When
+        executor.run(self.suite, self.results)
+
+        # Then
+        self.expectAllResults()
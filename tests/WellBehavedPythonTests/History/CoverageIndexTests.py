@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.History.CoverageIndex import *
+
+import os
+import shutil
+import tempfile
+
+class CoverageIndexTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "coverage.json")
+        self.index = CoverageIndex(self.path, self.directory)
+        self.source = os.path.join(self.directory, "source.py")
+        self.other = os.path.join(self.directory, "other.py")
+
+    def after(self):
+        shutil.rmtree(self.directory)
+
+    def test_lines_are_formatted_as_ranges(self):
+        expect(CoverageIndex.formatLines({1, 2, 3, 5, 7, 8})).toEqual("1-3,5,7-8")
+
+    def test_ranges_are_parsed_into_lines(self):
+        expect(sorted(CoverageIndex.parseLines("1-3,5,7-8"))).toEqual([1, 2, 3, 5, 7, 8])
+
+    def test_recorded_coverage_is_stored_relative_to_base_directory(self):
+        # When
+        self.index.recordTest("package.Tests.test_one", { self.source : {3, 4, 5} })
+
+        # Then
+        coverage = self.index.getCoverage("package.Tests.test_one")
+        expect(list(coverage)).toEqual(["source.py"])
+        expect(sorted(coverage["source.py"])).toEqual([3, 4, 5])
+        expect(self.index.data["files"]).toEqual({ "source.py" : { "0" : "3-5" } })
+
+    def test_tests_which_ran_a_changed_file_are_affected(self):
+        # Where
+        self.index.recordTest("package.Tests.test_one", { self.source : {3, 4} })
+        self.index.recordTest("package.Tests.test_two", { self.other : {1} })
+
+        # When
+        affected = self.index.findAffectedTests({ "source.py" : None })
+
+        # Then
+        expect(sorted(affected)).toEqual(["package.Tests.test_one"])
+
+    def test_tests_which_ran_changed_lines_are_affected(self):
+        # Where
+        self.index.recordTest("package.Tests.test_one", { self.source : {3, 4} })
+        self.index.recordTest("package.Tests.test_two", { self.source : {10, 11} })
+
+        # When
+        affected = self.index.findAffectedTests({ self.source : [(9, 10)] })
+
+        # Then
+        expect(sorted(affected)).toEqual(["package.Tests.test_two"])
+
+    def test_removed_tests_are_not_affected(self):
+        # Where
+        self.index.recordTest("package.Tests.test_one", { self.source : {3, 4} })
+
+        # When
+        self.index.removeTests(["package.Tests.test_one"])
+
+        # Then
+        expect(len(self.index.findAffectedTests({ "source.py" : None }))).toEqual(0)
+        expect(self.index.data["files"]).toEqual({})
+
+    def test_removed_tests_are_no_longer_known(self):
+        # Where
+        self.index.recordTest("package.Tests.test_one", { self.source : {3, 4} })
+
+        # When
+        self.index.removeTests(["package.Tests.test_one"])
+        self.index.recordTest("package.Tests.test_one", {})
+
+        # Then
+        expect(self.index.hasTest("package.Tests.test_one")).toBeFalse()
+
+    def test_saving_closes_gaps_left_by_removed_tests(self):
+        # Where
+        self.index.recordTest("package.Tests.test_one", { self.source : {3, 4} })
+        self.index.recordTest("package.Tests.test_two", { self.source : {10} })
+        self.index.removeTests(["package.Tests.test_one"])
+
+        # When
+        self.index.save()
+        index = CoverageIndex(self.path, self.directory)
+
+        # Then
+        expect(index.data["tests"]).toEqual(["package.Tests.test_two"])
+        expect(index.data["files"]).toEqual({ "source.py" : { "0" : "10" } })
+        expect(index.hasTest("package.Tests.test_one")).toBeFalse()
+        expect(sorted(index.findAffectedTests({ "source.py" : [(10, 10)] }))).toEqual(
+            ["package.Tests.test_two"])
+
+    def test_index_is_saved_and_loaded(self):
+        # Where
+        self.index.recordTest("package.Tests.test_one", { self.source : {3, 4} })
+
+        # When
+        self.index.save()
+        index = CoverageIndex(self.path, self.directory)
+
+        # Then
+        expect(index.hasTest("package.Tests.test_one")).toBeTrue()
+        expect(index.hasTest("package.Tests.test_two")).toBeFalse()
+        expect(sorted(index.findAffectedTests({ "source.py" : [(4, 4)] }))).toEqual(
+            ["package.Tests.test_one"])
+
+    def test_change_can_name_a_whole_file(self):
+        expect(CoverageIndex.parseChange("src/module.py")).toEqual(("src/module.py", None))
+
+    def test_change_can_name_lines(self):
+        expect(CoverageIndex.parseChange("src/module.py:3-7")).toEqual(
+            ("src/module.py", [(3, 7)]))
+        expect(CoverageIndex.parseChange("src/module.py:12")).toEqual(
+            ("src/module.py", [(12, 12)]))
+
+    def test_diff_gives_changed_lines_of_old_files(self):
+        # Where
+        diff = """diff --git a/src/module.py b/src/module.py
+index 1234567..89abcde 100644
+--- a/src/module.py
++++ b/src/module.py
+@@ -3,2 +3,3 @@ def function():
+ unchanged
+--- a removed line which looks like a header
++added
++added
+@@ -10 +11,0 @@
+-removed
+diff --git a/src/other.py b/src/other.py
+--- a/src/other.py
++++ b/src/other.py
+@@ -5,0 +6,2 @@
++added
++added
+"""
+
+        # When
+        changes = CoverageIndex.parseDiff(diff)
+
+        # Then
+        expect(changes).toEqual({ "src/module.py" : [(4, 4), (10, 10)],
+                                  "src/other.py" : [(5, 6)] })
+
+    def test_diff_gives_lines_either_side_of_lines_added_between_context(self):
+        # Where
+        diff = """--- a/src/module.py
++++ b/src/module.py
+@@ -1,6 +1,7 @@
+ first
+ second
++added
+ third
+ fourth
+-removed
+ sixth
+"""
+
+        # When
+        changes = CoverageIndex.parseDiff(diff)
+
+        # Then
+        expect(changes).toEqual({ "src/module.py" : [(2, 3), (5, 5)] })
+
+    def test_diff_of_new_file_names_the_new_file(self):
+        # Where
+        diff = """--- /dev/null
++++ b/src/new.py
+@@ -0,0 +1,2 @@
++added
++added
+"""
+
+        # When
+        changes = CoverageIndex.parseDiff(diff)
+
+        # Then
+        expect(list(changes)).toEqual(["src/new.py"])
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.History.DurationHistory import *
+
+from ..Samples.SampleTestCases import *
+
+from datetime import *
+import os
+import shutil
+import tempfile
+
+class DurationHistoryTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "durations.json")
+        self.history = DurationHistory(self.path)
+
+    def after(self):
+        shutil.rmtree(self.directory)
+
+    def runSuite(self, suite, secondsPerTest):
+        """Runs the suite, then rewrites the recorded times so each test
+        appears to have taken the given number of seconds."""
+        results = TestResults()
+        suite.run(results)
+        self.setDurations(results, secondsPerTest)
+        return results
+
+    def setDurations(self, results, seconds):
+        if results.startTime is not None:
+            results.endTime = results.startTime + timedelta(seconds = seconds)
+        for child in results.suiteResults:
+            self.setDurations(child, seconds)
+
+    def test_update_records_class_and_test_durations(self):
+        # Where
+        suite = TestCaseWithTwoPassingTests.suite()
+        results = self.runSuite(suite, 2)
+
+        # When
+        self.history.update(suite, results)
+
+        # Then
+        expect(self.history.getClassDuration(TestCaseWithTwoPassingTests)).toEqual(4)
+        expect(self.history.getTestDuration(suite.tests[0])).toEqual(2)
+
+    def test_update_finds_class_suites_inside_suite_tree(self):
+        # Where
+        suite = TestSuite("outer")
+        suite.add(TestCaseWithPassingTest.suite())
+        suite.add(TestCaseWithFailingTest.suite())
+        results = self.runSuite(suite, 3)
+
+        # When
+        self.history.update(suite, results)
+
+        # Then
+        expect(self.history.getClassDuration(TestCaseWithPassingTest)).toEqual(3)
+        expect(self.history.getClassDuration(TestCaseWithFailingTest)).toEqual(3)
+
+    def test_history_is_saved_and_loaded(self):
+        # Where
+        suite = TestCaseWithPassingTest.suite()
+        self.history.update(suite, self.runSuite(suite, 5))
+
+        # When
+        self.history.save()
+        loaded = DurationHistory(self.path)
+
+        # Then
+        expect(loaded.getClassDuration(TestCaseWithPassingTest)).toEqual(5)
+
+    def test_estimate_uses_recorded_class_duration(self):
+        # Where
+        suite = TestCaseWithTwoPassingTests.suite()
+        self.history.update(suite, self.runSuite(suite, 2))
+
+        # When
+        estimate = self.history.estimateDuration(suite)
+
+        # Then
+        expect(estimate).toEqual(4)
+
+    def test_estimate_without_history_uses_typical_test_duration(self):
+        # Where
+        known = TestCaseWithPassingTest.suite()
+        self.history.update(known, self.runSuite(known, 2))
+        unknown = TestCaseWithTwoPassingTests.suite()
+
+        # When
+        estimate = self.history.estimateDuration(unknown)
+
+        # Then
+        expect(estimate).toEqual(4)
+
+    def test_typical_test_duration_follows_updates(self):
+        # Where
+        known = TestCaseWithPassingTest.suite()
+        self.history.update(known, self.runSuite(known, 2))
+        unknown = TestCaseWithTwoPassingTests.suite()
+        self.history.estimateDuration(unknown)
+        other = TestCaseWithFailingTest.suite()
+        self.history.update(other, self.runSuite(other, 6))
+
+        # When
+        estimate = self.history.estimateDuration(unknown)
+
+        # Then
+        expect(estimate).toEqual(12)
+
+    def test_order_longest_first(self):
+        # Where
+        short = TestCaseWithPassingTest.suite()
+        long = TestCaseWithFailingTest.suite()
+        self.history.update(short, self.runSuite(short, 1))
+        self.history.update(long, self.runSuite(long, 10))
+
+        # When
+        ordered = self.history.orderLongestFirst([short, long])
+
+        # Then
+        expect(ordered).toEqual([long, short])
+
+    def test_order_with_equal_estimates_keeps_suite_order(self):
+        # Where
+        first = TestCaseWithPassingTest.suite()
+        second = TestCaseWithErrorTest.suite()
+
+        # When
+        ordered = self.history.orderLongestFirst([first, second])
+
+        # Then
+        expect(ordered).toEqual([first, second])
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.TestSuite import *
+from WellBehavedPython.Execution.TestRetrier import *
+from WellBehavedPython.History.FlakyHistory import *
+
+from ..Samples.Execution.SampleFlakyTestCases import *
+from ..Samples.SampleTestCases import TestCaseWithIgnoredTest
+
+import os
+import shutil
+import tempfile
+
+class FlakyHistoryTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "flaky.json")
+        self.history = FlakyHistory(self.path)
+
+    def after(self):
+        TestCaseWithFlakyTest.failuresLeft = 0
+        shutil.rmtree(self.directory)
+
+    def buildTest(self, testClass, testMethodName):
+        test = testClass()
+        test.configureTest(testMethodName)
+        return test
+
+    def runAndUpdate(self, *testClasses, failuresLeft = 0):
+        TestCaseWithFlakyTest.failuresLeft = failuresLeft
+        suite = TestSuite("outer")
+        for testClass in testClasses:
+            suite.add(testClass.suite())
+        results = TestResults()
+        suite.run(results)
+        TestRetrier(1).retry(suite, results)
+        self.history.update(suite, results)
+
+    def test_test_which_has_not_run_is_not_flaky(self):
+        # Where
+        test = self.buildTest(TestCaseWithFlakyTest, "test_flaky")
+
+        # Then
+        expect(self.history.getFlakeRate(test)).toEqual(0.0)
+        expect(self.history.isFlaky(test)).toBeFalse()
+
+    def test_flake_rate_is_fraction_of_runs_which_were_flaky(self):
+        # When
+        self.runAndUpdate(TestCaseWithFlakyTest, failuresLeft = 1)
+        self.runAndUpdate(TestCaseWithFlakyTest)
+        self.runAndUpdate(TestCaseWithFlakyTest)
+        self.runAndUpdate(TestCaseWithFlakyTest, failuresLeft = 1)
+
+        # Then
+        test = self.buildTest(TestCaseWithFlakyTest, "test_flaky")
+        expect(self.history.getFlakeRate(test)).toEqual(0.5)
+        expect(self.history.isFlaky(test)).toBeTrue()
+
+    def test_failing_and_passing_tests_are_not_flaky(self):
+        # When
+        self.runAndUpdate(TestCaseWithFlakyTest, TestCaseWithBrokenTest)
+
+        # Then
+        expect(self.history.isFlaky(self.buildTest(TestCaseWithFlakyTest, "test_passes"))).toBeFalse()
+        expect(self.history.isFlaky(self.buildTest(TestCaseWithBrokenTest, "test_broken"))).toBeFalse()
+
+    def test_ignored_tests_are_not_counted(self):
+        # When
+        self.runAndUpdate(TestCaseWithIgnoredTest)
+
+        # Then
+        expect(self.history.data["tests"]).toEqual({})
+
+    def test_history_is_kept_between_runs(self):
+        # Where
+        self.runAndUpdate(TestCaseWithFlakyTest, failuresLeft = 1)
+
+        # When
+        self.history.save()
+
+        # Then
+        loaded = FlakyHistory(self.path)
+        expect(loaded.isFlaky(self.buildTest(TestCaseWithFlakyTest, "test_flaky"))).toBeTrue()
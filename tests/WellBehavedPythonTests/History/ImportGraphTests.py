@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Discovery.TestDiscoverer import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.History.ImportGraph import *
+
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+class ImportGraphTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.packageName = "ImportedTests" + uuid.uuid4().hex
+        self.packageDirectory = os.path.join(self.directory, self.packageName)
+        os.mkdir(self.packageDirectory)
+        self.writeModule("helpers", """
+def value():
+    return 1
+""")
+        self.writeModule("wrapper", """
+from .helpers import value
+
+def wrapped():
+    return value()
+""")
+        self.writeModule("hidden", "")
+        self.writeModule("UsesWrapperTests", self.buildTestSource("from .wrapper import wrapped"))
+        self.writeModule("AlsoUsesWrapperTests", self.buildTestSource("from . import wrapper"))
+        self.writeModule("ImportsHiddenTests", self.buildTestSource(
+                "import importlib\nimportlib.import_module(__package__ + '.hidden')"))
+        self.writeModule("OtherTests", self.buildTestSource(""))
+        sys.path.insert(0, self.directory)
+        self.path = os.path.join(self.directory, "imports.json")
+        self.graph = ImportGraph(self.path, [self.directory])
+
+    def after(self):
+        sys.path.remove(self.directory)
+        for name in list(sys.modules):
+            if name.startswith(self.packageName):
+                del sys.modules[name]
+        shutil.rmtree(self.directory)
+
+    def writeModule(self, name, source):
+        with open(self.getModulePath(name), "w") as file:
+            file.write(source)
+
+    def getModulePath(self, name):
+        return os.path.join(self.packageDirectory, name + ".py")
+
+    def buildTestSource(self, imports):
+        return """
+from WellBehavedPython.Engine.TestCase import TestCase
+{}
+
+class Tests(TestCase):
+
+    def test_nothing(self):
+        pass
+""".format(imports)
+
+    def recordAll(self, graph = None):
+        TestDiscoverer(graph or self.graph).buildSuiteFromModuleName(self.packageName)
+
+    def findAffected(self, *names, graph = None):
+        paths = [self.getModulePath(name) for name in names]
+        return (graph or self.graph).findAffectedTestModules(self.packageName, paths)
+
+    def moduleNames(self, *names):
+        return ["{}.{}".format(self.packageName, name) for name in names]
+
+    def test_graph_has_no_test_modules_before_recording(self):
+        expect(self.graph.hasTestModules()).toBeFalse()
+
+    def test_graph_has_test_modules_after_recording(self):
+        # When
+        self.recordAll()
+
+        # Then
+        expect(self.graph.hasTestModules()).toBeTrue()
+
+    def test_test_modules_importing_changed_module_indirectly_are_affected(self):
+        # Where
+        self.recordAll()
+
+        # When
+        affected = self.findAffected("helpers")
+
+        # Then
+        expect(affected).toEqual(self.moduleNames("AlsoUsesWrapperTests", "UsesWrapperTests"))
+
+    def test_changed_test_module_is_affected(self):
+        # Where
+        self.recordAll()
+
+        # When
+        affected = self.findAffected("OtherTests")
+
+        # Then
+        expect(affected).toEqual(self.moduleNames("OtherTests"))
+
+    def test_module_imported_without_binding_a_global_is_recorded(self):
+        # Where
+        self.recordAll()
+
+        # When
+        affected = self.findAffected("hidden")
+
+        # Then
+        expect(affected).toEqual(self.moduleNames("ImportsHiddenTests"))
+
+    def test_module_a_value_is_imported_from_is_followed_transitively(self):
+        # Where
+        self.writeModule("config", "expected = 1\n")
+        self.writeModule("settings", "from .config import expected\n")
+        self.writeModule("ConfigTests", self.buildTestSource("from . import config"))
+        self.writeModule("SettingsTests", self.buildTestSource("from .settings import expected"))
+        self.recordAll()
+
+        # When
+        affected = self.findAffected("config")
+
+        # Then
+        expect(affected).toEqual(self.moduleNames("ConfigTests", "SettingsTests"))
+
+    def test_no_test_modules_are_affected_without_changes(self):
+        # Where
+        self.recordAll()
+
+        # When
+        affected = self.findAffected()
+
+        # Then
+        expect(affected).toEqual([])
+
+    def test_graph_is_saved_and_loaded(self):
+        # Where
+        self.recordAll()
+
+        # When
+        self.graph.save()
+        loaded = ImportGraph(self.path, [self.directory])
+
+        # Then
+        expect(self.findAffected("helpers", graph = loaded)).toEqual(
+            self.moduleNames("AlsoUsesWrapperTests", "UsesWrapperTests"))
+
+    def test_recording_again_keeps_imports_of_modules_already_loaded(self):
+        # Where
+        self.recordAll()
+        self.graph.save()
+        graph = ImportGraph(self.path, [self.directory])
+
+        # When
+        self.recordAll(graph)
+
+        # Then
+        expect(self.findAffected("hidden", graph = graph)).toEqual(
+            self.moduleNames("ImportsHiddenTests"))
+
+    def test_module_changed_since_recording_counts_as_changed(self):
+        # Where
+        self.recordAll()
+        path = self.getModulePath("helpers")
+        modified = os.path.getmtime(path) + 10
+        os.utime(path, (modified, modified))
+
+        # When
+        affected = self.findAffected()
+
+        # Then
+        expect(self.graph.findStaleModules()).toEqual(self.moduleNames("helpers"))
+        expect(affected).toEqual(self.moduleNames("AlsoUsesWrapperTests", "UsesWrapperTests"))
+
+    def test_unrecorded_test_modules_are_affected(self):
+        # Where
+        self.recordAll()
+        self.writeModule("NewTests", self.buildTestSource(""))
+        os.mkdir(os.path.join(self.packageDirectory, "sub"))
+        self.writeModule(os.path.join("sub", "DeeperTests"), self.buildTestSource(""))
+
+        # When
+        affected = self.findAffected()
+
+        # Then
+        expect(affected).toEqual(self.moduleNames("NewTests", "sub.DeeperTests"))
+
+    def test_every_test_module_is_affected_before_recording(self):
+        # When
+        affected = self.findAffected()
+
+        # Then
+        expect(affected).toEqual(self.moduleNames(
+                "AlsoUsesWrapperTests", "ImportsHiddenTests", "OtherTests", "UsesWrapperTests",
+                "helpers", "hidden", "wrapper"))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.History.JsonStore import *
+
+import os
+import shutil
+import tempfile
+
+class JsonStoreTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "nested", "store.json")
+
+    def after(self):
+        shutil.rmtree(self.directory)
+
+    def test_missing_file_loads_as_empty(self):
+        store = JsonStore(self.path)
+
+        expect(store.data).toEqual({})
+
+    def test_saved_data_is_loaded_again(self):
+        # Where
+        store = JsonStore(self.path)
+        store.data["key"] = [1, 2, 3]
+
+        # When
+        store.save()
+
+        # Then
+        expect(JsonStore(self.path).data).toEqual({"key" : [1, 2, 3]})
+
+    def test_corrupt_file_loads_as_empty(self):
+        # Where
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as file:
+            file.write("{ not json")
+
+        # When
+        store = JsonStore(self.path)
+
+        # Then
+        expect(store.data).toEqual({})
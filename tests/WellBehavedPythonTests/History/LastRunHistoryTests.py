@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Engine.TestSuite import *
+from WellBehavedPython.History.LastRunHistory import *
+
+from ..Samples.SampleTestCases import *
+
+import os
+import shutil
+import tempfile
+
+class LastRunHistoryTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "lastrun.json")
+        self.history = LastRunHistory(self.path)
+
+    def after(self):
+        shutil.rmtree(self.directory)
+
+    def buildTest(self, testClass, testMethodName):
+        test = testClass()
+        test.configureTest(testMethodName)
+        return test
+
+    def runAndUpdate(self, *testClasses):
+        suite = TestSuite("outer")
+        for testClass in testClasses:
+            suite.add(testClass.suite())
+        results = TestResults()
+        suite.run(results)
+        self.history.update(suite, results)
+        return suite
+
+    def test_states_of_tests_are_recorded(self):
+        # When
+        suite = self.runAndUpdate(TestCaseWithPassingTest, TestCaseWithFailingTest,
+                                  TestCaseWithErrorTest, TestCaseWithIgnoredTest)
+
+        # Then
+        expect([self.history.getState(classSuite.tests[0]) for classSuite in suite.tests]).toEqual(
+            ["passed", "failed", "error", "ignored"])
+
+    def test_failed_and_error_tests_have_failed(self):
+        # When
+        suite = self.runAndUpdate(TestCaseWithPassingTest, TestCaseWithFailingTest,
+                                  TestCaseWithErrorTest)
+
+        # Then
+        expect([self.history.hasFailed(classSuite.tests[0]) for classSuite in suite.tests]).toEqual(
+            [False, True, True])
+
+    def test_test_which_has_not_run_is_new(self):
+        # Where
+        test = self.buildTest(TestCaseWithPassingTest, "test_pass")
+
+        # Then
+        expect(self.history.getState(test)).toBeNone()
+        expect(self.history.isNewOrModified(test)).toBeTrue()
+
+    def test_test_which_has_run_is_not_new(self):
+        # When
+        suite = self.runAndUpdate(TestCaseWithPassingTest)
+
+        # Then
+        expect(self.history.isNewOrModified(suite.tests[0].tests[0])).toBeFalse()
+
+    def test_test_whose_source_changed_is_modified(self):
+        # Where
+        suite = self.runAndUpdate(TestCaseWithPassingTest)
+        test = suite.tests[0].tests[0]
+
+        # When
+        self.history.data["tests"][test.getTestIdentifier()]["fingerprint"] = "changed"
+
+        # Then
+        expect(self.history.isNewOrModified(test)).toBeTrue()
+
+    def test_tests_which_did_not_run_keep_their_state(self):
+        # Where
+        self.runAndUpdate(TestCaseWithFailingTest)
+
+        # When
+        self.runAndUpdate(TestCaseWithPassingTest)
+
+        # Then
+        expect(self.history.getState(self.buildTest(TestCaseWithFailingTest, "test_fail"))).toEqual("failed")
+
+    def test_states_are_kept_between_runs(self):
+        # Where
+        self.runAndUpdate(TestCaseWithFailingTest)
+
+        # When
+        self.history.save()
+
+        # Then
+        expect(LastRunHistory(self.path).hasFailed(self.buildTest(TestCaseWithFailingTest, "test_fail"))).toBeTrue()
+
+    def test_error_in_before_class_is_recorded_against_every_test(self):
+        # When
+        suite = self.runAndUpdate(TestCaseWithBeforeClassSaboteur)
+
+        # Then
+        expect([self.history.getState(test) for test in suite.tests[0].tests]).toEqual(
+            ["error", "error"])
+
+    def test_error_in_after_class_is_recorded_against_every_test(self):
+        # When
+        suite = self.runAndUpdate(TestCaseWithAfterClassSaboteur)
+
+        # Then
+        expect([self.history.hasFailed(test) for test in suite.tests[0].tests]).toEqual(
+            [True, True])
+
+    def test_failed_and_error_tests_are_listed(self):
+        # Where
+        moduleName = "WellBehavedPythonTests.Samples.SampleTestCases"
+
+        # When
+        self.runAndUpdate(TestCaseWithPassingTest, TestCaseWithFailingTest, TestCaseWithErrorTest)
+
+        # Then
+        expect(self.history.listFailedTests()).toEqual([
+                (moduleName, "TestCaseWithErrorTest", "test_error"),
+                (moduleName, "TestCaseWithFailingTest", "test_fail")])
+
+    def test_failed_tests_outside_package_are_not_listed(self):
+        # When
+        self.runAndUpdate(TestCaseWithFailingTest)
+
+        # Then
+        expect(self.history.listFailedTests("WellBehavedPythonTests.Samples")).toEqual([
+                ("WellBehavedPythonTests.Samples.SampleTestCases",
+                 "TestCaseWithFailingTest", "test_fail")])
+        expect(self.history.listFailedTests("WellBehavedPythonTests.Samples.Sample")).toEqual([])
+
+    def test_failed_suite_holds_only_failed_tests(self):
+        # Where
+        self.runAndUpdate(TestCaseWithPassingTest, TestCaseWithFailingTest, TestCaseWithErrorTest)
+
+        # When
+        suite = self.history.buildFailedSuite("WellBehavedPythonTests")
+
+        # Then
+        expect(suite.countTests()).toEqual(2)
+        moduleSuite = suite.tests[0]
+        expect(moduleSuite.suiteName).toEqual("WellBehavedPythonTests.Samples.SampleTestCases")
+        expect([classSuite.suiteName for classSuite in moduleSuite.tests]).toEqual(
+            ["TestCaseWithErrorTest", "TestCaseWithFailingTest"])
+        expect(moduleSuite.tests[1].tests[0].testMethodName).toEqual("test_fail")
+
+    def test_failed_suite_holds_tests_of_nested_classes(self):
+        # Where
+        self.runAndUpdate(ClassHoldingTestCase.TestCaseWithNestedFailingTest)
+
+        # When
+        suite = self.history.buildFailedSuite("WellBehavedPythonTests")
+
+        # Then
+        expect(suite.countTests()).toEqual(1)
+        classSuite = suite.tests[0].tests[0]
+        expect(classSuite.suiteName).toEqual("TestCaseWithNestedFailingTest")
+        expect(classSuite.tests[0].testMethodName).toEqual("test_fail")
+
+    def test_failed_suite_leaves_out_tests_which_no_longer_exist(self):
+        # Where
+        self.history.data["tests"]["Missing.Tests.test_gone"] = {
+            "state" : "failed", "fingerprint" : "", "module" : "MissingModule",
+            "class" : "Tests", "method" : "test_gone" }
+        self.history.data["tests"]["Samples.Gone.test_gone"] = {
+            "state" : "error", "fingerprint" : "",
+            "module" : "WellBehavedPythonTests.Samples.SampleTestCases",
+            "class" : "TestCaseWithFailingTest", "method" : "test_gone" }
+
+        # When
+        missingModuleSuite = self.history.buildFailedSuite("MissingModule")
+        missingMethodSuite = self.history.buildFailedSuite("WellBehavedPythonTests")
+
+        # Then
+        expect(missingModuleSuite.countTests()).toEqual(0)
+        expect(missingMethodSuite.countTests()).toEqual(0)
+
+    def test_tests_recorded_without_their_module_are_not_listed(self):
+        # Where
+        self.history.data["tests"]["Old.Tests.test_fail"] = { "state" : "failed",
+                                                               "fingerprint" : "" }
+
+        # Then
+        expect(self.history.listFailedTests()).toEqual([])
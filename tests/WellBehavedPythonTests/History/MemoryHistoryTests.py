@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.History.MemoryHistory import *
+
+from ..Samples.SampleTestCases import *
+
+import os
+import shutil
+import tempfile
+
+class MemoryHistoryTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "memory.json")
+        self.history = MemoryHistory(self.path)
+
+    def after(self):
+        shutil.rmtree(self.directory)
+
+    def test_unknown_class_has_no_memory(self):
+        expect(self.history.getClassMemory(TestCaseWithPassingTest)).toBeNone()
+
+    def test_recorded_memory_is_returned(self):
+        # When
+        self.history.recordClassMemory(TestCaseWithPassingTest, 1000)
+
+        # Then
+        expect(self.history.getClassMemory(TestCaseWithPassingTest)).toEqual(1000)
+
+    def test_memory_is_kept_between_runs(self):
+        # Where
+        self.history.recordClassMemory(TestCaseWithPassingTest, 1000)
+
+        # When
+        self.history.save()
+
+        # Then
+        expect(MemoryHistory(self.path).getClassMemory(TestCaseWithPassingTest)).toEqual(1000)
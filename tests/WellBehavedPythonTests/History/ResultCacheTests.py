@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Discovery.TestDiscoverer import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.History.ResultCache import *
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+class ResultCacheTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.packageName = "CachedTests" + uuid.uuid4().hex
+        self.packageDirectory = os.path.join(self.directory, self.packageName)
+        os.mkdir(self.packageDirectory)
+        self.writeModule("__init__", "")
+        self.writeModule("helpers", """
+def value():
+    return 1
+""")
+        self.writeModule("UsesHelpersTests", """
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import TestCase
+from .helpers import value
+
+class UsesHelpersTests(TestCase):
+
+    def test_value(self):
+        expect(value()).toEqual(1)
+
+    def test_fail(self):
+        expect(value()).toEqual(2)
+
+    def xtest_ignored(self):
+        pass
+""")
+        sys.path.insert(0, self.directory)
+        self.path = os.path.join(self.directory, "resultcache.json")
+        self.cache = ResultCache(self.path, [self.directory])
+
+    def after(self):
+        sys.path.remove(self.directory)
+        for name in list(sys.modules):
+            if name.startswith(self.packageName):
+                del sys.modules[name]
+        shutil.rmtree(self.directory)
+
+    def writeModule(self, name, source):
+        with open(os.path.join(self.packageDirectory, name + ".py"), "w") as file:
+            file.write(source)
+
+    def buildSuite(self):
+        return TestDiscoverer().buildSuiteFromModuleName(self.packageName + ".UsesHelpersTests")
+
+    def runAndUpdate(self, suite):
+        results = TestResults()
+        suite.run(results)
+        self.cache.update(suite, results)
+        return results
+
+    def findTest(self, suite, testMethodName):
+        for test in suite.listClassSuites()[0].tests:
+            if test.testMethodName == testMethodName:
+                return test
+
+    def newCache(self):
+        # a new cache hashes the files again, as the next run would
+        return ResultCache(self.path, [self.directory])
+
+    def test_passed_test_is_cached(self):
+        # Where
+        suite = self.buildSuite()
+        self.runAndUpdate(suite)
+
+        # Then
+        expect(self.cache.isCached(self.findTest(suite, "test_value"))).toBeTrue()
+
+    def test_failed_test_is_not_cached(self):
+        # Where
+        suite = self.buildSuite()
+        self.runAndUpdate(suite)
+
+        # Then
+        expect(self.cache.isCached(self.findTest(suite, "test_fail"))).toBeFalse()
+
+    def test_test_which_has_not_run_is_not_cached(self):
+        expect(self.cache.isCached(self.findTest(self.buildSuite(), "test_value"))).toBeFalse()
+
+    def test_cache_is_saved_and_loaded(self):
+        # Where
+        suite = self.buildSuite()
+        self.runAndUpdate(suite)
+
+        # When
+        self.cache.save()
+
+        # Then
+        expect(self.newCache().isCached(self.findTest(suite, "test_value"))).toBeTrue()
+
+    def test_change_to_imported_module_invalidates_cache(self):
+        # Where
+        suite = self.buildSuite()
+        self.runAndUpdate(suite)
+        self.cache.save()
+
+        # When
+        self.writeModule("helpers", """
+def value():
+    return 3
+""")
+
+        # Then
+        expect(self.newCache().isCached(self.findTest(suite, "test_value"))).toBeFalse()
+
+    def test_change_to_test_module_invalidates_cache(self):
+        # Where
+        suite = self.buildSuite()
+        self.runAndUpdate(suite)
+        self.cache.save()
+
+        # When
+        with open(os.path.join(self.packageDirectory, "UsesHelpersTests.py"), "a") as file:
+            file.write("\n# changed\n")
+
+        # Then
+        expect(self.newCache().isCached(self.findTest(suite, "test_value"))).toBeFalse()
+
+    def test_change_to_environment_invalidates_cache(self):
+        # Where
+        suite = self.buildSuite()
+        self.runAndUpdate(suite)
+        self.cache.save()
+        cache = self.newCache()
+
+        # When
+        cache._environment = cache.getEnvironment() + "\nsomepackage==2.0"
+
+        # Then
+        expect(cache.isCached(self.findTest(suite, "test_value"))).toBeFalse()
+
+    def test_test_which_fails_after_being_cached_is_removed(self):
+        # Where
+        self.runAndUpdate(self.buildSuite())
+        self.writeModule("helpers", """
+def value():
+    return 1 + 1
+""")
+        importlib.reload(sys.modules[self.packageName + ".helpers"])
+        importlib.reload(sys.modules[self.packageName + ".UsesHelpersTests"])
+        self.cache = self.newCache()
+        suite = self.buildSuite()
+
+        # When
+        self.runAndUpdate(suite)
+
+        # Then
+        expect(self.cache.isCached(self.findTest(suite, "test_value"))).toBeFalse()
+        expect(self.cache.isCached(self.findTest(suite, "test_fail"))).toBeTrue()
+
+    def test_dependencies_include_imported_modules_and_packages(self):
+        # Where
+        moduleName = self.packageName + ".UsesHelpersTests"
+        importlib.import_module(moduleName)
+
+        # When
+        dependencies = self.cache.findDependencies(moduleName)
+
+        # Then
+        expect(dependencies).toEqual([self.packageName, self.packageName + ".UsesHelpersTests",
+                                      self.packageName + ".helpers"])
+
+    def writeSettings(self, source):
+        # outside the package, so that it is not bound to the package's globals
+        with open(os.path.join(self.directory, self.packageName + "Settings.py"), "w") as file:
+            file.write(source)
+
+    def test_dependencies_include_modules_values_are_imported_from(self):
+        # Where
+        self.writeSettings("timeout = 5\n")
+        self.writeModule("UsesSettingsTests", """
+from WellBehavedPython.Engine.TestCase import TestCase
+from {}Settings import timeout
+
+class UsesSettingsTests(TestCase):
+
+    def test_timeout(self):
+        pass
+""".format(self.packageName))
+        moduleName = self.packageName + ".UsesSettingsTests"
+        importlib.import_module(moduleName)
+
+        # When
+        dependencies = self.cache.findDependencies(moduleName)
+
+        # Then
+        expect(dependencies).toContain(self.packageName + "Settings")
+
+    def test_change_to_module_value_is_imported_from_invalidates_cache(self):
+        # Where
+        self.writeSettings("expected = 1\n")
+        self.writeModule("UsesSettingsTests", """
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import TestCase
+from {}Settings import expected
+
+class UsesSettingsTests(TestCase):
+
+    def test_expected(self):
+        expect(expected).toEqual(1)
+""".format(self.packageName))
+        suite = TestDiscoverer().buildSuiteFromModuleName(self.packageName + ".UsesSettingsTests")
+        self.runAndUpdate(suite)
+        self.cache.save()
+        test = self.findTest(suite, "test_expected")
+
+        # When
+        self.writeSettings("expected = 2\n")
+
+        # Then
+        expect(self.newCache().isCached(test)).toBeFalse()
+
+    def test_mark_cached_marks_cached_tests(self):
+        # Where
+        suite = self.buildSuite()
+        self.runAndUpdate(suite)
+        suite = self.buildSuite()
+
+        # When
+        count = self.cache.markCached(suite)
+
+        # Then
+        expect(count).toEqual(1)
+        expect(self.findTest(suite, "test_value").cached).toBeTrue()
+        expect(self.findTest(suite, "test_fail").cached).toBeFalse()
+        expect(self.findTest(suite, "xtest_ignored").cached).toBeFalse()
+
+    def test_marked_tests_are_registered_as_cached_passes(self):
+        # Where
+        suite = self.buildSuite()
+        self.runAndUpdate(suite)
+        suite = self.buildSuite()
+        self.cache.markCached(suite)
+
+        # When
+        results = self.runAndUpdate(suite)
+
+        # Then
+        expect(results.countCached()).toEqual(1)
+        expect(results.countPasses()).toEqual(1)
+        expect(results.countFailures()).toEqual(1)
+        expect(self.cache.isCached(self.findTest(suite, "test_value"))).toBeTrue()
+
+    def writeTestImportingSettingsWhileRunning(self):
+        self.writeModule("ImportsSettingsTests", """
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import TestCase
+import importlib
+
+class ImportsSettingsTests(TestCase):
+
+    def test_expected(self):
+        settings = importlib.import_module("{}Settings")
+        expect(settings.expected).toEqual(1)
+""".format(self.packageName))
+        return TestDiscoverer().buildSuiteFromModuleName(
+            self.packageName + ".ImportsSettingsTests")
+
+    def test_change_to_module_imported_while_running_invalidates_cache(self):
+        # Where
+        self.writeSettings("expected = 1\n")
+        suite = self.writeTestImportingSettingsWhileRunning()
+        self.runAndUpdate(suite)
+        self.cache.save()
+        test = self.findTest(suite, "test_expected")
+
+        # When
+        self.writeSettings("expected = 2\n")
+
+        # Then
+        expect(self.newCache().isCached(test)).toBeFalse()
+
+    def test_module_loaded_before_running_is_recorded_when_imported_while_running(self):
+        # Where
+        self.writeSettings("expected = 1\n")
+        importlib.import_module(self.packageName + "Settings")
+        suite = self.writeTestImportingSettingsWhileRunning()
+
+        # When
+        self.runAndUpdate(suite)
+
+        # Then
+        entry = self.cache.data["tests"][self.findTest(suite, "test_expected").getTestIdentifier()]
+        expect(entry["modules"]).toContain(self.packageName + "Settings")
+
+    def test_cached_test_keeps_the_modules_it_used_when_it_last_ran(self):
+        # Where
+        self.writeSettings("expected = 1\n")
+        suite = self.writeTestImportingSettingsWhileRunning()
+        self.runAndUpdate(suite)
+        suite = TestDiscoverer().buildSuiteFromModuleName(
+            self.packageName + ".ImportsSettingsTests")
+        self.cache.markCached(suite)
+        self.runAndUpdate(suite)
+        self.cache.save()
+
+        # When
+        self.writeSettings("expected = 2\n")
+
+        # Then
+        expect(self.newCache().isCached(self.findTest(suite, "test_expected"))).toBeFalse()
+
+    def test_module_used_is_found_when_it_is_not_loaded_here(self):
+        # Where
+        self.writeSettings("expected = 1\n")
+        suite = self.writeTestImportingSettingsWhileRunning()
+        self.runAndUpdate(suite)
+        self.cache.save()
+        test = self.findTest(suite, "test_expected")
+
+        # When
+        # as when the test ran in a worker process
+        del sys.modules[self.packageName + "Settings"]
+
+        # Then
+        expect(self.newCache().isCached(test)).toBeTrue()
+        self.writeSettings("expected = 2\n")
+        expect(self.newCache().isCached(test)).toBeFalse()
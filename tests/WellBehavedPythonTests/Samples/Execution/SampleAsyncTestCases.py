@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+
+import asyncio
+
+# Sample async test cases
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+class TestCaseWithAsyncTests(TestCase):
+
+    async def before(self):
+        await asyncio.sleep(0)
+        self.beforeRan = True
+
+    async def test_async_pass(self):
+        await asyncio.sleep(0)
+        expect(self.beforeRan).toBeTrue()
+
+    async def test_async_fail(self):
+        await asyncio.sleep(0)
+        expect(None).fail("Failing async test")
+
+    async def test_async_error(self):
+        await asyncio.sleep(0)
+        raise KeyError("Async error")
+
+class TestCaseWithConcurrentAsyncTests(TestCase):
+
+    asyncConcurrency = 2
+    running = 0
+    maxRunning = 0
+
+    @classmethod
+    def reset(klass):
+        klass.running = 0
+        klass.maxRunning = 0
+
+    async def wait(self):
+        klass = type(self)
+        klass.running += 1
+        klass.maxRunning = max(klass.maxRunning, klass.running)
+        await asyncio.sleep(0.01)
+        print(self.testMethodName)
+        klass.running -= 1
+
+    async def test_first(self):
+        await self.wait()
+
+    async def test_second(self):
+        await self.wait()
+
+    async def test_third(self):
+        await self.wait()
+
+    def test_synchronous(self):
+        pass
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+
+# Sample test cases for recording the lines each test runs
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+def helper():
+    return 42
+
+def setUpValue():
+    return 1
+
+class TestCaseUsingHelper(TestCase):
+
+    @classmethod
+    def beforeClass(klass):
+        klass.value = setUpValue()
+
+    def test_uses_helper(self):
+        expect(helper()).toEqual(42)
+
+    def test_does_not_use_helper(self):
+        expect(self.value).toEqual(1)
+
+class TestCaseWithIsolatedCoverage(TestCase):
+
+    isolation = "test"
+
+    def test_isolated(self):
+        expect(helper()).toEqual(42)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+from WellBehavedPython.Engine.TestCase import *
+
+import os
+import signal
+
+# Sample test cases which crash the process running them
+# These should not be run directly, and must only be run in worker
+# processes. They exist to be called from within the tests themselves.
+
+def crash():
+    os.kill(os.getpid(), signal.SIGSEGV)
+
+class TestCaseWithCrashingTest(TestCase):
+
+    def test_a_passes(self):
+        pass
+
+    def test_b_crashes(self):
+        crash()
+
+    def test_c_passes(self):
+        pass
+
+    def test_d_crashes(self):
+        crash()
+
+    def test_e_fails(self):
+        raise AssertionError("failed")
+
+class TestCaseWithCrashingBeforeClass(TestCase):
+
+    @classmethod
+    def beforeClass(klass):
+        crash()
+
+    def test_not_run(self):
+        pass
+
+    def test_not_run_either(self):
+        pass
+
+class TestCaseWithCrashingAfterClass(TestCase):
+
+    @classmethod
+    def afterClass(klass):
+        crash()
+
+    def test_passes(self):
+        pass
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+
+# Sample test cases for stopping a run after a number of failures
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+moduleState = { "afterClassCalls" : 0 }
+
+class TestCaseWithThreeFailingTests(TestCase):
+
+    def test_fail_first(self):
+        expect(False).toBeTrue()
+
+    def test_fail_second(self):
+        expect(False).toBeTrue()
+
+    def test_fail_third(self):
+        expect(False).toBeTrue()
+
+    @classmethod
+    def afterClass(klass):
+        moduleState["afterClassCalls"] += 1
+
+class TestCaseWithPassingTestsAfterFailures(TestCase):
+
+    def test_pass_first(self):
+        pass
+
+    def test_pass_second(self):
+        pass
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+
+# Sample test cases for retrying failed tests
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+class TestCaseWithFlakyTest(TestCase):
+
+    # the number of times test_flaky fails before it passes
+    failuresLeft = 0
+
+    def test_flaky(self):
+        if TestCaseWithFlakyTest.failuresLeft > 0:
+            TestCaseWithFlakyTest.failuresLeft -= 1
+            expect(None).fail("Flaky failure")
+
+    def test_passes(self):
+        pass
+
+class TestCaseWithBrokenTest(TestCase):
+
+    def test_broken(self):
+        expect(None).fail("Always fails")
+
+class TestCaseWithFlakyFixture(TestCase):
+
+    # the number of times beforeClass sets up a broken fixture before it
+    # sets up a working one
+    brokenSetUpsLeft = 0
+    fixtureBroken = False
+
+    @classmethod
+    def beforeClass(testCase):
+        TestCaseWithFlakyFixture.fixtureBroken = TestCaseWithFlakyFixture.brokenSetUpsLeft > 0
+        if TestCaseWithFlakyFixture.fixtureBroken:
+            TestCaseWithFlakyFixture.brokenSetUpsLeft -= 1
+
+    def test_needs_working_fixture(self):
+        expect(TestCaseWithFlakyFixture.fixtureBroken).toBeFalse()
+
+class TestCaseWithIsolatedFlakyTest(TestCase):
+
+    isolation = "test"
+
+    # the number of times test_flaky fails before it passes, which only
+    # counts down in the forked child the test runs in
+    failuresLeft = 0
+
+    def test_flaky(self):
+        if TestCaseWithIsolatedFlakyTest.failuresLeft > 0:
+            TestCaseWithIsolatedFlakyTest.failuresLeft -= 1
+            expect(None).fail("Flaky failure")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+
+import gc
+import os
+import signal
+
+# Sample test cases for isolating tests in forked processes
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+moduleState = []
+
+class TestCaseWithTestIsolation(TestCase):
+
+    isolation = "test"
+
+    def test_first_change_to_module_state(self):
+        expect(moduleState).toEqual([])
+        moduleState.append("first")
+
+    def test_second_change_to_module_state(self):
+        expect(moduleState).toEqual([])
+        moduleState.append("second")
+
+    def test_fail(self):
+        moduleState.append("fail")
+        expect(None).fail("Failing isolated test")
+
+class TestCaseWithClassIsolation(TestCase):
+
+    isolation = "class"
+
+    @classmethod
+    def beforeClass(klass):
+        moduleState.append("beforeClass")
+
+    def test_sees_before_class_change(self):
+        expect(moduleState).toEqual(["beforeClass"])
+        moduleState.append("test")
+
+    def test_print(self):
+        print("isolated output")
+
+class TestCaseWithIsolatedTestsSharingFixture(TestCase):
+
+    isolation = "test"
+
+    @classmethod
+    def beforeClass(klass):
+        klass.fixture = list(range(1000))
+
+    def test_first_change_to_fixture(self):
+        expect(len(self.fixture)).toEqual(1000)
+        self.fixture.clear()
+
+    def test_second_change_to_fixture(self):
+        expect(len(self.fixture)).toEqual(1000)
+        self.fixture.append("second")
+
+    def test_fixture_is_frozen(self):
+        expect(gc.get_freeze_count()).toBeGreaterThan(0)
+
+class TestCaseWithKilledIsolatedTest(TestCase):
+
+    isolation = "test"
+
+    def test_killed(self):
+        os.kill(os.getpid(), signal.SIGKILL)
+
+    def test_pass(self):
+        pass
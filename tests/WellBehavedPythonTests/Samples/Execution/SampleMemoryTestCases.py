@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.Engine.TestCase import *
+
+from .SampleResourceTestCases import ResourceUsage
+
+# Sample test cases run by adaptive parallel runs
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+class TestCaseUsingLittleMemory(TestCase):
+
+    def test_use_little_memory(self):
+        ResourceUsage.use(["running"])
+
+class TestCaseUsingMuchMemoryFirst(TestCase):
+
+    def test_use_much_memory(self):
+        ResourceUsage.use(["running", "much-memory"])
+
+class TestCaseUsingMuchMemorySecond(TestCase):
+
+    def test_use_much_memory(self):
+        ResourceUsage.use(["running", "much-memory"])
+
+class TestCaseUsingMuchMemoryThird(TestCase):
+
+    def test_use_much_memory(self):
+        ResourceUsage.use(["running", "much-memory"])
+
+class TestCaseUsingTooMuchMemory(TestCase):
+
+    def test_allocate_too_much_memory(self):
+        data = bytearray(4 * 1024 * 1024 * 1024)
+
+    def test_allocate_little_memory(self):
+        data = bytearray(1024)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+
+import multiprocessing
+import threading
+
+# Sample test cases which start processes of their own
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+def square(value):
+    return value * value
+
+class TestCaseStartingProcesses(TestCase):
+    usesProcesses = True
+    thread = None
+
+    def test_process_runs(self):
+        TestCaseStartingProcesses.thread = threading.current_thread()
+        process = multiprocessing.Process(target = square, args = (2,))
+        process.start()
+        process.join()
+        expect(process.exitcode).toEqual(0)
+
+    def test_pool_maps(self):
+        with multiprocessing.Pool(2) as pool:
+            expect(pool.map(square, [1, 2, 3])).toEqual([1, 4, 9])
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.Engine.TestCase import *
+
+# Sample test cases which write output
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+class TestCaseWithPrintingTests(TestCase):
+
+    def test_print_first(self):
+        print("first output")
+
+    def test_print_second(self):
+        print("second output")
+
+class TestCaseWithOtherPrintingTests(TestCase):
+
+    def test_print_other(self):
+        print("other output")
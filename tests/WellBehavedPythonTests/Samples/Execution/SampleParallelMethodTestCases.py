@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+
+import os
+import threading
+import time
+
+# Sample test cases whose methods run in parallel
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+class MethodActivity:
+    """Records where and how many at once tests ran."""
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    @classmethod
+    def reset(klass):
+        klass.running = 0
+        klass.peak = 0
+
+    @classmethod
+    def run(klass):
+        with klass.lock:
+            klass.running += 1
+            klass.peak = max(klass.peak, klass.running)
+        time.sleep(0.05)
+        with klass.lock:
+            klass.running -= 1
+        return os.getpid()
+
+class TestCaseWithThreadedMethods(TestCase):
+    parallelMethods = "thread"
+    methodWorkers = 4
+    beforeClassCalls = 0
+    shared = None
+
+    @classmethod
+    def beforeClass(klass):
+        klass.beforeClassCalls += 1
+        klass.shared = "set up once"
+
+    def test_first(self):
+        MethodActivity.run()
+        print("first output")
+        expect(self.shared).toEqual("set up once")
+
+    def test_second(self):
+        MethodActivity.run()
+        print("second output")
+
+    def test_third(self):
+        MethodActivity.run()
+        expect(False).toBeTrue()
+
+    def test_fourth(self):
+        MethodActivity.run()
+        raise KeyError("error")
+
+    def xtest_ignored(self):
+        pass
+
+class TestCaseWithForkedMethods(TestCase):
+    parallelMethods = "process"
+    methodWorkers = 2
+    shared = None
+    changedByTest = False
+
+    @classmethod
+    def beforeClass(klass):
+        klass.shared = "set up once"
+
+    def test_first(self):
+        expect(self.shared).toEqual("set up once")
+        TestCaseWithForkedMethods.changedByTest = True
+
+    def test_second(self):
+        expect(self.shared).toEqual("set up once")
+
+    def test_third(self):
+        expect(False).toBeTrue()
+
+    def test_fourth(self):
+        os.kill(os.getpid(), 9)
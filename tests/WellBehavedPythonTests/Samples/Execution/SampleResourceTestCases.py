@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+from WellBehavedPython.Engine.TestCase import *
+
+import threading
+import time
+
+# Sample test cases which declare resources
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+# records how many tests are using each resource at once
+class ResourceUsage:
+    lock = threading.Lock()
+    current = {}
+    peak = {}
+
+    @classmethod
+    def reset(klass):
+        klass.current = {}
+        klass.peak = {}
+
+    @classmethod
+    def use(klass, tokens):
+        with klass.lock:
+            for token in tokens:
+                klass.current[token] = klass.current.get(token, 0) + 1
+                klass.peak[token] = max(klass.peak.get(token, 0), klass.current[token])
+        time.sleep(0.05)
+        with klass.lock:
+            for token in tokens:
+                klass.current[token] -= 1
+
+class TestCaseUsingPortFirst(TestCase):
+    resources = ["port:8080"]
+
+    def test_use_port(self):
+        ResourceUsage.use(["port:8080"])
+
+class TestCaseUsingPortSecond(TestCase):
+    resources = ["port:8080"]
+
+    def test_use_port(self):
+        ResourceUsage.use(["port:8080"])
+
+class TestCaseUsingPortThird(TestCase):
+    resources = ["port:8080"]
+
+    def test_use_port(self):
+        ResourceUsage.use(["port:8080"])
+
+class TestCaseUsingCpuFirst(TestCase):
+    resources = { "cpu-heavy" : 1 }
+
+    def test_use_cpu(self):
+        ResourceUsage.use(["cpu-heavy"])
+
+class TestCaseUsingCpuSecond(TestCase):
+    resources = { "cpu-heavy" : 1 }
+
+    def test_use_cpu(self):
+        ResourceUsage.use(["cpu-heavy"])
+
+class TestCaseUsingCpuThird(TestCase):
+    resources = { "cpu-heavy" : 1 }
+
+    def test_use_cpu(self):
+        ResourceUsage.use(["cpu-heavy"])
+
+class TestCaseUsingAllCpu(TestCase):
+    resources = { "cpu-heavy" : 100 }
+
+    def test_use_cpu(self):
+        ResourceUsage.use(["cpu-heavy", "all-cpu"])
+
+class TestCaseUsingNoResources(TestCase):
+
+    def test_use_nothing(self):
+        ResourceUsage.use(["nothing"])
+
+    def test_use_nothing_again(self):
+        ResourceUsage.use(["nothing"])
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+
+import asyncio
+import threading
+import time
+
+# Sample test cases which take longer than they are allowed to
+# These should not be run directly. They exist to be called from within the
+# tests themselves.
+
+# hung tests wait on this, so that they can be released once the
+# tests using them are finished with them
+release = threading.Event()
+
+class TestCaseWithHangingTest(TestCase):
+
+    @timeout(0.1)
+    def test_hangs(self):
+        release.wait(10)
+
+    def test_passes(self):
+        pass
+
+@timeout(0.1)
+class TestCaseWithTimeoutOnClass(TestCase):
+
+    def test_hangs(self):
+        release.wait(10)
+
+    @timeout(10)
+    def test_waits_with_longer_timeout(self):
+        time.sleep(0.2)
+
+    def test_fails(self):
+        expect(False).toBeTrue()
+
+class TestCaseWithClassTimeout(TestCase):
+    classTimeout = 0.1
+
+    def test_hangs(self):
+        release.wait(10)
+
+    def test_not_started(self):
+        pass
+
+class TestCaseWithAsyncHangingTest(TestCase):
+    timeout = 0.1
+
+    async def test_hangs(self):
+        await asyncio.sleep(10)
+
+    async def test_passes(self):
+        pass
+
+class TestCaseWithIsolatedHangingTest(TestCase):
+    isolation = "test"
+    timeout = 0.5
+
+    def test_hangs(self):
+        time.sleep(10)
+
+    def test_passes(self):
+        pass
+
+class TestCaseWithIsolatedHangingClass(TestCase):
+    isolation = "class"
+    classTimeout = 0.5
+
+    def test_hangs(self):
+        time.sleep(10)
+
+    def test_passes(self):
+        pass
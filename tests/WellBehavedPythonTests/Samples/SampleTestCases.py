@@ -98,6 +98,14 @@ class TestCaseWithAfterClassSaboteur(TestCaseWithBeforeAndAfterClass):
     def test_two(self):
         pass
 
+class ClassHoldingTestCase:
+    """Holds a test case class, which can only be found from its qualified name."""
+
+    class TestCaseWithNestedFailingTest(TestCase):
+
+        def test_fail(self):
+            expect(None).fail('Failing test')
+
 class TestCaseWithLongTestName(TestCase):
 
     def test_case_with_test_name_longer_than_test_case_name(self):
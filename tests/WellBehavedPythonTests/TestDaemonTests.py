@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Execution.SocketMessages import *
+from WellBehavedPython.Runners.TestClient import TestClient
+from WellBehavedPython.Runners.TestDaemon import TestDaemon
+from WellBehavedPython.Runners import TestClient as TestClientModule
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+
+class TestDaemonTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.packageName = "DaemonTests" + uuid.uuid4().hex
+        self.packageDirectory = os.path.join(self.directory, self.packageName)
+        os.mkdir(self.packageDirectory)
+        self.writeModule("PassingTests", """
+from WellBehavedPython.Engine.TestCase import TestCase
+
+class PassingTests(TestCase):
+
+    def test_first(self):
+        pass
+
+    def test_second(self):
+        pass
+""")
+        self.writeModule("FailingTests", self.buildFailingModule("2"))
+        sys.path.insert(0, self.directory)
+        self.address = os.path.join(self.directory, "daemon.socket")
+        self.daemon = TestDaemon(self.packageName, self.address, roots = [self.directory])
+        self.thread = threading.Thread(target = self.daemon.serve, daemon = True)
+        self.thread.start()
+        self.output = io.StringIO()
+        self.client = TestClient(self.address, self.output)
+
+    def after(self):
+        if self.thread.is_alive():
+            self.client.stop()
+            self.thread.join()
+        sys.path.remove(self.directory)
+        for name in list(sys.modules):
+            if name.startswith(self.packageName):
+                del sys.modules[name]
+        shutil.rmtree(self.directory)
+
+    def buildFailingModule(self, expected):
+        return """
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import TestCase
+
+class FailingTests(TestCase):
+
+    def test_value(self):
+        expect(1).toEqual({})
+""".format(expected)
+
+    def writeModule(self, name, source):
+        path = os.path.join(self.packageDirectory, name + ".py")
+        existed = os.path.exists(path)
+        with open(path, "w") as file:
+            file.write(source)
+        if existed:
+            # make sure the change is seen, however coarse the file system's times are
+            modified = os.stat(path).st_mtime + 10
+            os.utime(path, (modified, modified))
+
+    def test_run_runs_every_test(self):
+        # When
+        self.client.run()
+
+        # Then
+        expect(self.output.getvalue()).toContain("from 3 tests")
+
+    def test_run_with_patterns_runs_matching_tests(self):
+        # When
+        exitCode = self.client.run(["PassingTests.test_first"])
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("0 failures 0 errors 0 ignored from 1 test ")
+
+    def test_run_returns_one_when_tests_fail(self):
+        # When
+        exitCode = self.client.run(["FailingTests"])
+
+        # Then
+        expect(exitCode).toEqual(1)
+        expect(self.output.getvalue()).toContain("1 failure 0 errors 0 ignored from 1 test ")
+
+    def test_verbose_run_lists_each_test(self):
+        # When
+        self.client.run(["PassingTests"], verbose = True)
+
+        # Then
+        expect(self.output.getvalue()).toContain("test_first")
+        expect(self.output.getvalue()).toContain("test_second")
+
+    def test_changed_modules_are_reloaded_before_running(self):
+        # Where
+        self.client.run(["FailingTests"])
+
+        # When
+        self.writeModule("FailingTests", self.buildFailingModule("1"))
+        exitCode = self.client.run(["FailingTests"])
+
+        # Then
+        expect(exitCode).toEqual(0)
+
+    def test_new_test_modules_are_discovered_before_running(self):
+        # Where
+        self.writeModule("NewTests", """
+from WellBehavedPython.Engine.TestCase import TestCase
+
+class NewTests(TestCase):
+
+    def test_new(self):
+        pass
+""")
+
+        # When
+        exitCode = self.client.run(["NewTests"])
+
+        # Then
+        expect(exitCode).toEqual(0)
+        expect(self.output.getvalue()).toContain("from 1 test ")
+
+    def test_module_which_cannot_be_reloaded_is_an_error(self):
+        # Where
+        self.writeModule("FailingTests", "def value(:\n")
+
+        # When
+        exitCode = self.client.run()
+
+        # Then
+        expect(exitCode).toEqual(1)
+        expect(self.output.getvalue()).toContain("Could not reload the changed modules")
+
+    def sendRawRequest(self, text):
+        connection = createSocket(self.address)
+        try:
+            connection.connect(self.address)
+            stream = openStream(connection)
+            try:
+                stream.write(text)
+                stream.flush()
+                messages = []
+                while len(messages) == 0 or messages[-1]["type"] != "done":
+                    messages.append(receiveMessage(stream))
+                return messages
+            finally:
+                stream.close()
+        finally:
+            connection.close()
+
+    def test_malformed_request_is_answered_with_an_error(self):
+        # When
+        messages = self.sendRawRequest("not json\n")
+
+        # Then
+        expect(messages[0]["text"]).toContain("Could not read the request")
+        expect(messages[-1]).toEqual({ "type" : "done", "failures" : 0, "errors" : 1 })
+        expect(self.client.run()).toEqual(1)
+        expect(self.output.getvalue()).toContain("from 3 tests")
+
+    def test_invalid_pattern_is_answered_with_an_error(self):
+        # When
+        messages = self.sendRawRequest('{ "type" : "run", "tests" : ["("] }\n')
+
+        # Then
+        expect(messages[0]["text"]).toContain("Invalid test pattern")
+        expect(messages[-1]).toEqual({ "type" : "done", "failures" : 0, "errors" : 1 })
+        expect(self.client.run()).toEqual(1)
+        expect(self.output.getvalue()).toContain("from 3 tests")
+
+    def test_tests_which_are_not_a_list_are_answered_with_an_error(self):
+        # When
+        messages = self.sendRawRequest('{ "type" : "run", "tests" : "test_first" }\n')
+
+        # Then
+        expect(messages[0]["text"]).toContain("must be a list of patterns")
+        expect(messages[-1]["errors"]).toEqual(1)
+        expect(self.thread.is_alive()).toBeTrue()
+
+    def test_max_failures_which_is_not_a_number_is_answered_with_an_error(self):
+        # When
+        messages = self.sendRawRequest('{ "type" : "run", "maxFailures" : "1" }\n')
+
+        # Then
+        expect(messages[0]["text"]).toContain("must be a whole number")
+        expect(messages[-1]["errors"]).toEqual(1)
+        expect(self.thread.is_alive()).toBeTrue()
+
+    def test_unknown_request_is_answered_with_an_error(self):
+        # When
+        messages = self.sendRawRequest("[]\n")
+
+        # Then
+        expect(messages[0]["text"]).toContain("Unknown request")
+        expect(messages[-1]["errors"]).toEqual(1)
+        expect(self.thread.is_alive()).toBeTrue()
+
+    def test_stop_stops_the_daemon(self):
+        # When
+        self.client.stop()
+        self.thread.join(10)
+
+        # Then
+        expect(self.thread.is_alive()).toBeFalse()
+        expect(os.path.exists(self.address)).toBeFalse()
+
+    def test_main_returns_two_when_no_daemon_is_listening(self):
+        # Where
+        address = os.path.join(self.directory, "missing.socket")
+        stderr = sys.stderr
+        sys.stderr = io.StringIO()
+
+        # When
+        try:
+            exitCode = TestClientModule.main([address])
+            message = sys.stderr.getvalue()
+        finally:
+            sys.stderr = stderr
+
+        # Then
+        expect(exitCode).toEqual(2)
+        expect(message).toContain("Could not reach a test daemon")
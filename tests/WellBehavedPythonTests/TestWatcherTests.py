@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+# Copyright 2013-4 Iain Peddie inr314159@hotmail.com
+# 
+#    This file is part of WellBehavedPython
+#
+#    WellBehavedPython is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    WellBehavedPython is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with WellBehavedPython. If not, see <http://www.gnu.org/licenses/>.
+
+
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import *
+from WellBehavedPython.Engine.TestResults import *
+from WellBehavedPython.Runners.TestWatcher import *
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+class TestWatcherTests(TestCase):
+
+    def before(self):
+        self.directory = tempfile.mkdtemp()
+        self.packageName = "WatchedTests" + uuid.uuid4().hex
+        self.packageDirectory = os.path.join(self.directory, self.packageName)
+        os.mkdir(self.packageDirectory)
+        self.writeModule("helpers", """
+def value():
+    return 1
+""")
+        self.writeModule("UsesHelpersTests", """
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import TestCase
+from .helpers import value
+
+class UsesHelpersTests(TestCase):
+
+    def test_value(self):
+        expect(value()).toEqual(1)
+""")
+        self.writeModule("OtherTests", self.buildTestModule("OtherTests"))
+        sys.path.insert(0, self.directory)
+        self.output = io.StringIO()
+        self.suites = []
+        self.watcher = TestWatcher(self.packageName, self.runSuite, roots = [self.directory],
+                                   output = self.output)
+
+    def after(self):
+        sys.path.remove(self.directory)
+        for name in list(sys.modules):
+            if name.startswith(self.packageName):
+                del sys.modules[name]
+        shutil.rmtree(self.directory)
+
+    def buildTestModule(self, className):
+        return """
+from WellBehavedPython.Engine.TestCase import TestCase
+
+class {}(TestCase):
+
+    def test_pass(self):
+        pass
+""".format(className)
+
+    def writeModule(self, name, source):
+        path = os.path.join(self.packageDirectory, name + ".py")
+        existed = os.path.exists(path)
+        with open(path, "w") as file:
+            file.write(source)
+        if existed:
+            # make sure the change is seen, however coarse the file system's times are
+            modified = os.stat(path).st_mtime + 10
+            os.utime(path, (modified, modified))
+
+    def runSuite(self, suite):
+        self.suites.append(suite)
+        results = TestResults()
+        suite.run(results)
+        return results
+
+    def test_start_runs_every_test(self):
+        # When
+        results = self.watcher.start()
+
+        # Then
+        expect(results.countTests()).toEqual(2)
+        expect(results.countPasses()).toEqual(2)
+
+    def test_nothing_is_run_when_nothing_changed(self):
+        # Where
+        self.watcher.start()
+
+        # When
+        results = self.watcher.checkForChanges()
+
+        # Then
+        expect(results).toBeNone()
+        expect(len(self.suites)).toEqual(1)
+
+    def test_changed_test_module_is_rerun_alone(self):
+        # Where
+        self.watcher.start()
+
+        # When
+        self.writeModule("OtherTests", self.buildTestModule("OtherTests") + """
+    def test_another_pass(self):
+        pass
+""")
+        results = self.watcher.checkForChanges()
+
+        # Then
+        expect(results.countTests()).toEqual(2)
+        expect(self.output.getvalue()).toContain(
+            "Re-running tests in {}.OtherTests".format(self.packageName))
+
+    def test_tests_importing_a_changed_module_are_rerun(self):
+        # Where
+        self.watcher.start()
+
+        # When
+        self.writeModule("helpers", """
+def value():
+    return 2
+""")
+        results = self.watcher.checkForChanges()
+
+        # Then
+        expect(results.countTests()).toEqual(1)
+        expect(results.countFailures()).toEqual(1)
+        expect(self.output.getvalue()).toContain(
+            "Re-running tests in {}.UsesHelpersTests\n".format(self.packageName))
+
+    def test_tests_reaching_a_changed_module_through_a_value_imported_from_it_are_rerun(self):
+        # Where
+        self.writeModule("config", "expected = 1\n")
+        self.writeModule("settings", "from .config import expected\n")
+        self.writeModule("SettingsTests", """
+from WellBehavedPython.api import *
+from WellBehavedPython.Engine.TestCase import TestCase
+from .settings import expected
+
+class SettingsTests(TestCase):
+
+    def test_expected(self):
+        expect(expected).toEqual(1)
+""")
+        self.watcher.start()
+
+        # When
+        self.writeModule("config", "expected = 2\n")
+        results = self.watcher.checkForChanges()
+
+        # Then
+        expect(results.countTests()).toEqual(1)
+        expect(results.countFailures()).toEqual(1)
+        expect(self.output.getvalue()).toContain(
+            "Re-running tests in {}.SettingsTests\n".format(self.packageName))
+
+    def test_new_test_module_is_run(self):
+        # Where
+        self.watcher.start()
+
+        # When
+        self.writeModule("NewTests", self.buildTestModule("NewTests"))
+        results = self.watcher.checkForChanges()
+
+        # Then
+        expect(results.countTests()).toEqual(1)
+        expect(self.output.getvalue()).toContain(
+            "Re-running tests in {}.NewTests".format(self.packageName))
+
+    def test_module_which_cannot_be_reloaded_is_reported(self):
+        # Where
+        self.watcher.start()
+
+        # When
+        self.writeModule("helpers", "def value(:\n")
+        results = self.watcher.checkForChanges()
+
+        # Then
+        expect(results).toBeNone()
+        expect(self.output.getvalue()).toContain("Could not reload the changed modules")
+        expect(self.output.getvalue()).toContain("SyntaxError")
+
+    def test_affected_modules_come_after_the_modules_they_import(self):
+        # Where
+        self.watcher.start()
+
+        # When
+        affected = self.watcher.findAffectedModules([self.packageName + ".helpers"])
+
+        # Then
+        expect(affected).toEqual([self.packageName + ".helpers",
+                                  self.packageName + ".UsesHelpersTests"])
+
+    def test_default_roots_leave_out_the_standard_library(self):
+        # When
+        roots = TestWatcher.getDefaultRoots()
+
+        # Then
+        expect(roots).Not.toContain(os.path.dirname(os.__file__))
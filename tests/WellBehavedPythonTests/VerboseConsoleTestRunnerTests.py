@@ -76,6 +76,19 @@ class VerboseConsoleTestRunnerTests(TestCase):
  *test_pass.* passed in [0-9\\.]+s""")
         
 
+    def test_that_error_in_before_class_is_reported(self):
+        # Where
+        suite = TestSuite()
+        suite.add(TestCaseWithPassingTest.suite())
+        suite.add(TestCaseWithBeforeClassSaboteur.suite())
+
+        # When
+        self.runner.run(suite)
+
+        # Then
+        expect(self.output.getvalue()).toMatch("beforeClass\\.* error\n")
+        expect(self.output.getvalue()).toMatch("from 1 test")
+
     def test_that_runner_returns_test_result(self):
         # Where
         runner = self.runner
@@ -279,3 +292,13 @@ Failing test
         expect(output).toContain("TestCaseWithPassingTest passed")
         expect(output).toMatch("Outer\\.+ failed")
 
+    def test_that_cached_pass_is_described_as_cached(self):
+        # Where
+        suite = TestCaseWithPassingTest.suite()
+        suite.tests[0].cached = True
+
+        # When
+        self.runner.run(suite)
+
+        # Then
+        expect(self.output.getvalue()).toMatch("test_pass\\.* cached pass in")